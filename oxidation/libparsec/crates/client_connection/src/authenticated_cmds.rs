@@ -35,8 +35,9 @@ use std::{collections::HashMap, num::NonZeroU64};
 use libparsec_crypto::{PublicKey, SigningKey};
 use libparsec_protocol::{
     authenticated_cmds::v3::{
-        self as authenticated_cmds, invite_delete::InvitationDeletedReason,
-        invite_new::UserOrDevice,
+        self as authenticated_cmds, block_create_batch::BlockCreateBatchReqItem,
+        invite_delete::InvitationDeletedReason, invite_new::UserOrDevice,
+        vlob_read_batch::VlobReadBatchReqItem,
     },
     IntegerBetween1And100,
 };
@@ -197,6 +198,8 @@ impl AuthenticatedCmds {
     impl_auth_cmds!(
         /// Create a new block.
         block_create(block_id: BlockID, realm_id: RealmID, block: Vec<u8>)
+        /// Create multiple blocks of the same realm at once.
+        block_create_batch(realm_id: RealmID, blocks: Vec<BlockCreateBatchReqItem>)
         /// Read a block.
         block_read(block_id: BlockID)
     );
@@ -343,6 +346,12 @@ impl AuthenticatedCmds {
             version: Option<u32>,
             timestamp: Option<DateTime>
         )
+        /// Read several Vlobs of a realm at once
+        vlob_read_batch(
+            realm_id: RealmID,
+            encryption_revision: u64,
+            items: Vec<VlobReadBatchReqItem>
+        )
         /// Update a Vlob
         vlob_update(
             encryption_revision: u64,
@@ -121,6 +121,143 @@ fn serde_block_create_rep(#[case] raw_expected: (&[u8], authenticated_cmds::bloc
     assert_eq!(data2, expected);
 }
 
+#[rstest]
+fn serde_block_create_batch_req() {
+    // Generated from the schema with Python msgpack (Parsec v2.12.1+dev)
+    // Content:
+    //   blocks: [
+    //     {
+    //       block: hex!("666f6f626172")
+    //       block_id: ext(2, hex!("57c629b69d6c4abbaf651cafa46dbc93"))
+    //     }
+    //   ]
+    //   cmd: "block_create_batch"
+    //   realm_id: ext(2, hex!("1d3353157d7d4e95ad2fdea7b3bd19c5"))
+    let raw = hex!(
+        "83a3636d64b2626c6f636b5f6372656174655f6261746368a87265616c6d5f6964d8021d33"
+        "53157d7d4e95ad2fdea7b3bd19c5a6626c6f636b739182a8626c6f636b5f6964d80257c629"
+        "b69d6c4abbaf651cafa46dbc93a5626c6f636bc406666f6f626172"
+    );
+
+    let req = authenticated_cmds::block_create_batch::Req {
+        realm_id: "1d3353157d7d4e95ad2fdea7b3bd19c5".parse().unwrap(),
+        blocks: vec![
+            authenticated_cmds::block_create_batch::BlockCreateBatchReqItem {
+                block_id: "57c629b69d6c4abbaf651cafa46dbc93".parse().unwrap(),
+                block: b"foobar".to_vec(),
+            },
+        ],
+    };
+
+    let expected = authenticated_cmds::AnyCmdReq::BlockCreateBatch(req.clone());
+
+    let data = authenticated_cmds::AnyCmdReq::load(&raw).unwrap();
+
+    assert_eq!(data, expected);
+
+    // Also test serialization round trip
+    let raw2 = req.dump().unwrap();
+
+    let data2 = authenticated_cmds::AnyCmdReq::load(&raw2).unwrap();
+
+    assert_eq!(data2, expected);
+}
+
+#[rstest]
+#[case::ok(
+    (
+        // Generated from the schema with Python msgpack (Parsec v2.12.1+dev)
+        // Content:
+        //   status: "ok"
+        &hex!(
+            "81a6737461747573a26f6b"
+        )[..],
+        authenticated_cmds::block_create_batch::Rep::Ok
+    )
+)]
+#[case::already_exists(
+    (
+        // Generated from the schema with Python msgpack (Parsec v2.12.1+dev)
+        // Content:
+        //   status: "already_exists"
+        &hex!(
+            "81a6737461747573ae616c72656164795f657869737473"
+        )[..],
+        authenticated_cmds::block_create_batch::Rep::AlreadyExists
+    )
+)]
+#[case::not_found(
+    (
+        // Generated from the schema with Python msgpack (Parsec v2.12.1+dev)
+        // Content:
+        //   status: "not_found"
+        &hex!(
+            "81a6737461747573a96e6f745f666f756e64"
+        )[..],
+        authenticated_cmds::block_create_batch::Rep::NotFound
+    )
+)]
+#[case::timeout(
+    (
+        // Generated from the schema with Python msgpack (Parsec v2.12.1+dev)
+        // Content:
+        //   status: "timeout"
+        &hex!(
+            "81a6737461747573a774696d656f7574"
+        )[..],
+        authenticated_cmds::block_create_batch::Rep::Timeout
+    )
+)]
+#[case::not_allowed(
+    (
+        // Generated from the schema with Python msgpack (Parsec v2.12.1+dev)
+        // Content:
+        //   status: "not_allowed"
+        &hex!(
+            "81a6737461747573ab6e6f745f616c6c6f776564"
+        )[..],
+        authenticated_cmds::block_create_batch::Rep::NotAllowed
+    )
+)]
+#[case::in_maintenance(
+    (
+        // Generated from the schema with Python msgpack (Parsec v2.12.1+dev)
+        // Content:
+        //   status: "in_maintenance"
+        &hex!(
+            "81a6737461747573ae696e5f6d61696e74656e616e6365"
+        )[..],
+        authenticated_cmds::block_create_batch::Rep::InMaintenance
+    )
+)]
+#[case::too_large(
+    (
+        // Generated from the schema with Python msgpack (Parsec v2.12.1+dev)
+        // Content:
+        //   status: "too_large"
+        &hex!(
+            "81a6737461747573a9746f6f5f6c61726765"
+        )[..],
+        authenticated_cmds::block_create_batch::Rep::TooLarge
+    )
+)]
+fn serde_block_create_batch_rep(
+    #[case] raw_expected: (&[u8], authenticated_cmds::block_create_batch::Rep),
+) {
+    let (raw, expected) = raw_expected;
+
+    let data = authenticated_cmds::block_create_batch::Rep::load(raw).unwrap();
+
+    assert_eq!(data, expected);
+
+    // Also test serialization round trip
+    let raw2 = data.dump().unwrap();
+
+    let data2 = authenticated_cmds::block_create_batch::Rep::load(&raw2).unwrap();
+
+    assert_eq!(data2, expected);
+}
+
 #[rstest]
 fn serde_block_read_req() {
     // Generated from Python implementation (Parsec v2.6.0+dev)
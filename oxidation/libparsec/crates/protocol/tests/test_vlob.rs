@@ -416,6 +416,176 @@ fn serde_vlob_read_rep(#[case] raw_expected: (&[u8], authenticated_cmds::vlob_re
     assert_eq!(data2, expected);
 }
 
+#[rstest]
+fn serde_vlob_read_batch_req() {
+    // Generated from the schema with Python msgpack (Parsec v2.12.1+dev)
+    // Content:
+    //   cmd: "vlob_read_batch"
+    //   encryption_revision: 8
+    //   items: [
+    //     {
+    //       timestamp: ext(1, 946774800.0)
+    //       version: 8
+    //       vlob_id: ext(2, hex!("2b5f314728134a12863da1ce49c112f6"))
+    //     }
+    //     {
+    //       timestamp: None
+    //       version: None
+    //       vlob_id: ext(2, hex!("57c629b69d6c4abbaf651cafa46dbc93"))
+    //     }
+    //   ]
+    //   realm_id: ext(2, hex!("1d3353157d7d4e95ad2fdea7b3bd19c5"))
+    let raw = hex!(
+        "84a3636d64af766c6f625f726561645f6261746368a87265616c6d5f6964d8021d3353157d"
+        "7d4e95ad2fdea7b3bd19c5b3656e6372797074696f6e5f7265766973696f6e08a56974656d"
+        "739283a7766c6f625f6964d8022b5f314728134a12863da1ce49c112f6a776657273696f6e"
+        "08a974696d657374616d70d70141cc37518800000083a7766c6f625f6964d80257c629b69d"
+        "6c4abbaf651cafa46dbc93a776657273696f6ec0a974696d657374616d70c0"
+    );
+
+    let req = authenticated_cmds::vlob_read_batch::Req {
+        realm_id: "1d3353157d7d4e95ad2fdea7b3bd19c5".parse().unwrap(),
+        encryption_revision: 8,
+        items: vec![
+            authenticated_cmds::vlob_read_batch::VlobReadBatchReqItem {
+                vlob_id: "2b5f314728134a12863da1ce49c112f6".parse().unwrap(),
+                version: Some(8),
+                timestamp: Some("2000-1-2T01:00:00Z".parse().unwrap()),
+            },
+            authenticated_cmds::vlob_read_batch::VlobReadBatchReqItem {
+                vlob_id: "57c629b69d6c4abbaf651cafa46dbc93".parse().unwrap(),
+                version: None,
+                timestamp: None,
+            },
+        ],
+    };
+
+    let expected = authenticated_cmds::AnyCmdReq::VlobReadBatch(req);
+
+    let data = authenticated_cmds::AnyCmdReq::load(&raw).unwrap();
+
+    assert_eq!(data, expected);
+
+    // Also test serialization round trip
+    let raw2 = data.dump().unwrap();
+
+    let data2 = authenticated_cmds::AnyCmdReq::load(&raw2).unwrap();
+
+    assert_eq!(data2, expected);
+}
+
+#[rstest]
+#[case::ok(
+    (
+        // Generated from the schema with Python msgpack (Parsec v2.12.1+dev)
+        // Content:
+        //   items: [
+        //     {
+        //       author: "alice@dev1"
+        //       author_last_role_granted_on: ext(1, 946774800.0)
+        //       blob: hex!("666f6f626172")
+        //       timestamp: ext(1, 946774800.0)
+        //       version: 8
+        //       vlob_id: ext(2, hex!("2b5f314728134a12863da1ce49c112f6"))
+        //     }
+        //   ]
+        //   status: "ok"
+        &hex!(
+            "82a6737461747573a26f6ba56974656d739186a7766c6f625f6964d8022b5f314728134a12"
+            "863da1ce49c112f6a776657273696f6e08a4626c6f62c406666f6f626172a6617574686f72"
+            "aa616c6963654064657631a974696d657374616d70d70141cc375188000000bb617574686f"
+            "725f6c6173745f726f6c655f6772616e7465645f6f6ed70141cc375188000000"
+        )[..],
+        authenticated_cmds::vlob_read_batch::Rep::Ok {
+            items: vec![
+                authenticated_cmds::vlob_read_batch::VlobReadBatchRepItem {
+                    vlob_id: "2b5f314728134a12863da1ce49c112f6".parse().unwrap(),
+                    version: 8,
+                    blob: b"foobar".to_vec(),
+                    author: "alice@dev1".parse().unwrap(),
+                    timestamp: "2000-1-2T01:00:00Z".parse().unwrap(),
+                    author_last_role_granted_on: "2000-1-2T01:00:00Z".parse().unwrap(),
+                },
+            ],
+        }
+    )
+)]
+#[case::ok_empty(
+    (
+        // Generated from the schema with Python msgpack (Parsec v2.12.1+dev)
+        // Content:
+        //   items: []
+        //   status: "ok"
+        &hex!(
+            "82a6737461747573a26f6ba56974656d7390"
+        )[..],
+        authenticated_cmds::vlob_read_batch::Rep::Ok { items: vec![] }
+    )
+)]
+#[case::not_found(
+    (
+        // Generated from Python implementation (Parsec v2.6.0+dev)
+        // Content:
+        //   reason: "foobar"
+        //   status: "not_found"
+        &hex!(
+            "82a6726561736f6ea6666f6f626172a6737461747573a96e6f745f666f756e64"
+        )[..],
+        authenticated_cmds::vlob_read_batch::Rep::NotFound {
+            reason: Some("foobar".to_owned()),
+        }
+    )
+)]
+#[case::not_allowed(
+    (
+        // Generated from the schema with Python msgpack (Parsec v2.12.1+dev)
+        // Content:
+        //   status: "not_allowed"
+        &hex!(
+            "81a6737461747573ab6e6f745f616c6c6f776564"
+        )[..],
+        authenticated_cmds::vlob_read_batch::Rep::NotAllowed
+    )
+)]
+#[case::bad_encryption_revision(
+    (
+        // Generated from the schema with Python msgpack (Parsec v2.12.1+dev)
+        // Content:
+        //   status: "bad_encryption_revision"
+        &hex!(
+            "81a6737461747573b76261645f656e6372797074696f6e5f7265766973696f6e"
+        )[..],
+        authenticated_cmds::vlob_read_batch::Rep::BadEncryptionRevision
+    )
+)]
+#[case::in_maintenance(
+    (
+        // Generated from the schema with Python msgpack (Parsec v2.12.1+dev)
+        // Content:
+        //   status: "in_maintenance"
+        &hex!(
+            "81a6737461747573ae696e5f6d61696e74656e616e6365"
+        )[..],
+        authenticated_cmds::vlob_read_batch::Rep::InMaintenance
+    )
+)]
+fn serde_vlob_read_batch_rep(
+    #[case] raw_expected: (&[u8], authenticated_cmds::vlob_read_batch::Rep),
+) {
+    let (raw, expected) = raw_expected;
+
+    let data = authenticated_cmds::vlob_read_batch::Rep::load(raw).unwrap();
+
+    assert_eq!(data, expected);
+
+    // Also test serialization round trip
+    let raw2 = data.dump().unwrap();
+
+    let data2 = authenticated_cmds::vlob_read_batch::Rep::load(&raw2).unwrap();
+
+    assert_eq!(data2, expected);
+}
+
 #[rstest]
 #[rstest]
 #[case::legacy(
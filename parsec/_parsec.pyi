@@ -112,6 +112,17 @@ from parsec._parsec_pyi.protocol import (
     BlockCreateRepNotFound,
     BlockCreateRepTimeout,
     BlockCreateRepUnknownStatus,
+    BlockCreateBatchReqItem,
+    BlockCreateBatchReq,
+    BlockCreateBatchRep,
+    BlockCreateBatchRepOk,
+    BlockCreateBatchRepAlreadyExists,
+    BlockCreateBatchRepNotFound,
+    BlockCreateBatchRepTimeout,
+    BlockCreateBatchRepNotAllowed,
+    BlockCreateBatchRepInMaintenance,
+    BlockCreateBatchRepTooLarge,
+    BlockCreateBatchRepUnknownStatus,
     BlockReadReq,
     BlockReadRep,
     BlockReadRepOk,
@@ -398,6 +409,16 @@ from parsec._parsec_pyi.protocol import (
     VlobReadRepBadEncryptionRevision,
     VlobReadRepInMaintenance,
     VlobReadRepUnknownStatus,
+    VlobReadBatchReqItem,
+    VlobReadBatchRepItem,
+    VlobReadBatchReq,
+    VlobReadBatchRep,
+    VlobReadBatchRepOk,
+    VlobReadBatchRepNotFound,
+    VlobReadBatchRepNotAllowed,
+    VlobReadBatchRepBadEncryptionRevision,
+    VlobReadBatchRepInMaintenance,
+    VlobReadBatchRepUnknownStatus,
     VlobUpdateReq,
     VlobUpdateRep,
     VlobUpdateRepOk,
@@ -545,6 +566,17 @@ __all__ = [
     "BlockCreateRepNotFound",
     "BlockCreateRepTimeout",
     "BlockCreateRepUnknownStatus",
+    "BlockCreateBatchReqItem",
+    "BlockCreateBatchReq",
+    "BlockCreateBatchRep",
+    "BlockCreateBatchRepOk",
+    "BlockCreateBatchRepAlreadyExists",
+    "BlockCreateBatchRepNotFound",
+    "BlockCreateBatchRepTimeout",
+    "BlockCreateBatchRepNotAllowed",
+    "BlockCreateBatchRepInMaintenance",
+    "BlockCreateBatchRepTooLarge",
+    "BlockCreateBatchRepUnknownStatus",
     "BlockReadReq",
     "BlockReadRep",
     "BlockReadRepOk",
@@ -831,6 +863,16 @@ __all__ = [
     "VlobReadRepBadEncryptionRevision",
     "VlobReadRepInMaintenance",
     "VlobReadRepUnknownStatus",
+    "VlobReadBatchReqItem",
+    "VlobReadBatchRepItem",
+    "VlobReadBatchReq",
+    "VlobReadBatchRep",
+    "VlobReadBatchRepOk",
+    "VlobReadBatchRepNotFound",
+    "VlobReadBatchRepNotAllowed",
+    "VlobReadBatchRepBadEncryptionRevision",
+    "VlobReadBatchRepInMaintenance",
+    "VlobReadBatchRepUnknownStatus",
     "VlobUpdateReq",
     "VlobUpdateRep",
     "VlobUpdateRepOk",
@@ -535,6 +535,41 @@ class BlockCreateRepUnknownStatus(BlockCreateRep):
     @property
     def reason(self) -> Optional[str]: ...
 
+class BlockCreateBatchReqItem:
+    def __init__(self, block_id: BlockID, block: bytes) -> None: ...
+    @property
+    def block_id(self) -> BlockID: ...
+    @property
+    def block(self) -> bytes: ...
+
+class BlockCreateBatchReq:
+    def __init__(self, realm_id: RealmID, blocks: Iterable[BlockCreateBatchReqItem]) -> None: ...
+    def dump(self) -> bytes: ...
+    @property
+    def realm_id(self) -> RealmID: ...
+    @property
+    def blocks(self) -> Tuple[BlockCreateBatchReqItem]: ...
+
+class BlockCreateBatchRep:
+    def dump(self) -> bytes: ...
+    @classmethod
+    def load(cls, buf: bytes) -> BlockCreateBatchRep: ...
+
+class BlockCreateBatchRepOk(BlockCreateBatchRep): ...
+class BlockCreateBatchRepAlreadyExists(BlockCreateBatchRep): ...
+class BlockCreateBatchRepNotFound(BlockCreateBatchRep): ...
+class BlockCreateBatchRepTimeout(BlockCreateBatchRep): ...
+class BlockCreateBatchRepNotAllowed(BlockCreateBatchRep): ...
+class BlockCreateBatchRepInMaintenance(BlockCreateBatchRep): ...
+class BlockCreateBatchRepTooLarge(BlockCreateBatchRep): ...
+
+class BlockCreateBatchRepUnknownStatus(BlockCreateBatchRep):
+    def __init__(self, status: str, reason: Optional[str]) -> None: ...
+    @property
+    def status(self) -> str: ...
+    @property
+    def reason(self) -> Optional[str]: ...
+
 class BlockReadReq:
     def __init__(self, block_id: BlockID) -> None: ...
     def dump(self) -> bytes: ...
@@ -1603,6 +1638,78 @@ class VlobReadRepUnknownStatus(VlobReadRep):
     @property
     def reason(self) -> Optional[str]: ...
 
+class VlobReadBatchReqItem:
+    def __init__(
+        self, vlob_id: VlobID, version: Optional[int], timestamp: Optional[DateTime]
+    ) -> None: ...
+    @property
+    def vlob_id(self) -> VlobID: ...
+    @property
+    def version(self) -> Optional[int]: ...
+    @property
+    def timestamp(self) -> Optional[DateTime]: ...
+
+class VlobReadBatchRepItem:
+    def __init__(
+        self,
+        vlob_id: VlobID,
+        version: int,
+        blob: bytes,
+        author: DeviceID,
+        timestamp: DateTime,
+        author_last_role_granted_on: DateTime,
+    ) -> None: ...
+    @property
+    def vlob_id(self) -> VlobID: ...
+    @property
+    def version(self) -> int: ...
+    @property
+    def blob(self) -> bytes: ...
+    @property
+    def author(self) -> DeviceID: ...
+    @property
+    def timestamp(self) -> DateTime: ...
+    @property
+    def author_last_role_granted_on(self) -> DateTime: ...
+
+class VlobReadBatchReq:
+    def __init__(
+        self, realm_id: RealmID, encryption_revision: int, items: Iterable[VlobReadBatchReqItem]
+    ) -> None: ...
+    def dump(self) -> bytes: ...
+    @property
+    def realm_id(self) -> RealmID: ...
+    @property
+    def encryption_revision(self) -> int: ...
+    @property
+    def items(self) -> Tuple[VlobReadBatchReqItem]: ...
+
+class VlobReadBatchRep:
+    def dump(self) -> bytes: ...
+    @classmethod
+    def load(cls, buf: bytes) -> VlobReadBatchRep: ...
+
+class VlobReadBatchRepOk(VlobReadBatchRep):
+    def __init__(self, items: Iterable[VlobReadBatchRepItem]) -> None: ...
+    @property
+    def items(self) -> Tuple[VlobReadBatchRepItem]: ...
+
+class VlobReadBatchRepNotFound(VlobReadBatchRep):
+    def __init__(self, reason: Optional[str]) -> None: ...
+    @property
+    def reason(self) -> Optional[str]: ...
+
+class VlobReadBatchRepNotAllowed(VlobReadBatchRep): ...
+class VlobReadBatchRepBadEncryptionRevision(VlobReadBatchRep): ...
+class VlobReadBatchRepInMaintenance(VlobReadBatchRep): ...
+
+class VlobReadBatchRepUnknownStatus(VlobReadBatchRep):
+    def __init__(self, status: str, reason: Optional[str]) -> None: ...
+    @property
+    def status(self) -> str: ...
+    @property
+    def reason(self) -> Optional[str]: ...
+
 class VlobUpdateReq:
     def __init__(
         self,
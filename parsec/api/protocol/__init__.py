@@ -8,6 +8,9 @@ from parsec.api.protocol.base import (
     InvalidMessageError,
     packb,
     unpackb,
+    is_multiplexed_msg,
+    pack_multiplexed_msg,
+    unpack_multiplexed_msg,
     settle_compatible_versions,
     IncompatibleAPIVersionsError,
 )
@@ -108,7 +111,9 @@ from parsec.api.protocol.realm import (
 )
 from parsec.api.protocol.block import (
     BlockID,
+    BLOCK_CREATE_BATCH_MAX_SIZE,
     block_create_serializer,
+    block_create_batch_serializer,
     block_read_serializer,
 )
 from parsec.api.protocol.vlob import (
@@ -116,6 +121,7 @@ from parsec.api.protocol.vlob import (
     VlobIDField,
     vlob_create_serializer,
     vlob_read_serializer,
+    vlob_read_batch_serializer,
     vlob_update_serializer,
     vlob_poll_changes_serializer,
     vlob_list_versions_serializer,
@@ -153,6 +159,9 @@ __all__ = (
     "InvalidMessageError",
     "packb",
     "unpackb",
+    "is_multiplexed_msg",
+    "pack_multiplexed_msg",
+    "unpack_multiplexed_msg",
     "HandshakeError",
     "HandshakeFailedChallenge",
     "HandshakeBadAdministrationToken",
@@ -248,6 +257,7 @@ __all__ = (
     "VlobIDField",
     "vlob_create_serializer",
     "vlob_read_serializer",
+    "vlob_read_batch_serializer",
     "vlob_update_serializer",
     "vlob_poll_changes_serializer",
     "vlob_list_versions_serializer",
@@ -255,7 +265,9 @@ __all__ = (
     "vlob_maintenance_save_reencryption_batch_serializer",
     # Block
     "BlockID",
+    "BLOCK_CREATE_BATCH_MAX_SIZE",
     "block_create_serializer",
+    "block_create_batch_serializer",
     "block_read_serializer",
     "BlockReadReq",
     "BlockReadRep",
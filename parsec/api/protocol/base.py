@@ -1,6 +1,7 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
 from __future__ import annotations
 
+import struct
 from enum import Enum
 from parsec._parsec import DateTime
 from typing import (
@@ -103,6 +104,36 @@ def unpackb(data: bytes) -> dict:  # type: ignore[type-arg]
     return _unpackb(data, MessageSerializationError)
 
 
+# Multiplexed messages are prefixed by a marker followed by the request id
+# chosen by the client, the backend then answers with the same prefix. This
+# allows many commands to be in flight on a single connection, with replies
+# coming in any order.
+# The marker is a byte never used by msgpack, so multiplexed messages cannot
+# be mistaken for regular ones (which are always msgpack maps).
+MULTIPLEXED_MSG_MARKER = b"\xc1"
+_MULTIPLEXED_MSG_HEADER = struct.Struct("!cI")
+MAX_MULTIPLEXED_REQ_ID = 2**32 - 1
+
+
+def is_multiplexed_msg(raw: bytes) -> bool:
+    return raw[:1] == MULTIPLEXED_MSG_MARKER and len(raw) >= _MULTIPLEXED_MSG_HEADER.size
+
+
+def pack_multiplexed_msg(req_id: int, msg: bytes) -> bytes:
+    return _MULTIPLEXED_MSG_HEADER.pack(MULTIPLEXED_MSG_MARKER, req_id) + msg
+
+
+def unpack_multiplexed_msg(raw: bytes) -> Tuple[int, bytes]:
+    """
+    Raises:
+        MessageSerializationError
+    """
+    if not is_multiplexed_msg(raw):
+        raise MessageSerializationError("Not a multiplexed message")
+    _, req_id = _MULTIPLEXED_MSG_HEADER.unpack_from(raw)
+    return req_id, raw[_MULTIPLEXED_MSG_HEADER.size :]
+
+
 def serializer_factory(schema_cls: Type[BaseSchema]) -> MsgpackSerializer:
     return MsgpackSerializer(schema_cls, InvalidMessageError, MessageSerializationError)
 
@@ -7,14 +7,23 @@ from parsec._parsec import (
     BlockReadRep,
     BlockCreateReq,
     BlockCreateRep,
+    BlockCreateBatchReq,
+    BlockCreateBatchRep,
 )
 from parsec.api.protocol.base import ApiCommandSerializer
 
 __all__ = (
     "BlockID",
     "block_create_serializer",
+    "block_create_batch_serializer",
+    "BLOCK_CREATE_BATCH_MAX_SIZE",
     "block_read_serializer",
 )
 
+
+# Maximum total size of the blocks sent in a single `block_create_batch` request
+BLOCK_CREATE_BATCH_MAX_SIZE = 4 * 1024 * 1024
+
 block_create_serializer = ApiCommandSerializer(BlockCreateReq, BlockCreateRep)
+block_create_batch_serializer = ApiCommandSerializer(BlockCreateBatchReq, BlockCreateBatchRep)
 block_read_serializer = ApiCommandSerializer(BlockReadReq, BlockReadRep)
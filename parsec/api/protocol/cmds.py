@@ -26,11 +26,13 @@ AUTHENTICATED_CMDS = {
     "invite_4_greeter_communicate",
     # Block
     "block_create",
+    "block_create_batch",
     "block_read",
     # Vlob
     "vlob_poll_changes",
     "vlob_create",
     "vlob_read",
+    "vlob_read_batch",
     "vlob_update",
     "vlob_list_versions",
     "vlob_maintenance_get_reencryption_batch",
@@ -8,6 +8,8 @@ from parsec._parsec import (
     VlobCreateRep,
     VlobReadReq,
     VlobReadRep,
+    VlobReadBatchReq,
+    VlobReadBatchRep,
     VlobUpdateReq,
     VlobUpdateRep,
     VlobPollChangesReq,
@@ -27,6 +29,7 @@ __all__ = (
     "VlobIDField",
     "vlob_create_serializer",
     "vlob_read_serializer",
+    "vlob_read_batch_serializer",
     "vlob_update_serializer",
     "vlob_poll_changes_serializer",
     "vlob_list_versions_serializer",
@@ -50,6 +53,7 @@ class SequesterInconsistencyRepSchema(BaseRepSchema):
 
 vlob_create_serializer = ApiCommandSerializer(VlobCreateReq, VlobCreateRep)
 vlob_read_serializer = ApiCommandSerializer(VlobReadReq, VlobReadRep)
+vlob_read_batch_serializer = ApiCommandSerializer(VlobReadBatchReq, VlobReadBatchRep)
 vlob_update_serializer = ApiCommandSerializer(VlobUpdateReq, VlobUpdateRep)
 vlob_poll_changes_serializer = ApiCommandSerializer(VlobPollChangesReq, VlobPollChangesRep)
 vlob_list_versions_serializer = ApiCommandSerializer(VlobListVersionsReq, VlobListVersionsRep)
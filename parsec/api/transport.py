@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from uuid import uuid4
-from typing import Optional, Type, Union
+from typing import Dict, Optional, Type, Union
 import trio
 from trio import BrokenResourceError
 from trio.abc import Stream
@@ -22,6 +22,12 @@ from wsproto.events import (
 )
 
 from parsec._version import __version__
+from parsec.api.protocol.base import (
+    MessageSerializationError,
+    MAX_MULTIPLEXED_REQ_ID,
+    pack_multiplexed_msg,
+    unpack_multiplexed_msg,
+)
 
 
 __all__ = ("TransportError", "Transport")
@@ -55,6 +61,18 @@ class Transport:
         self.conn_id = uuid4().hex
         self.logger = logger.bind(conn_id=self.conn_id)
         self._ws_events = ws.events()
+        # Kept across calls so that a cancelled `recv` can be resumed
+        self._recv_data = bytearray()
+        self._send_lock = trio.StrictFIFOLock()
+        # Multiplexing state (see `enable_multiplexing`)
+        self._multiplexed = False
+        self._next_req_id = 1
+        self._task_req_ids: Dict[trio.lowlevel.Task, int] = {}
+        # Replies are `None` until received
+        self._replies: Dict[int, Optional[bytes]] = {}
+        self._receiving = False
+        self._replies_changed = trio.Event()
+        self._broken: Optional[TransportError] = None
 
     async def _next_ws_event(self) -> Event:
         try:
@@ -85,14 +103,22 @@ class Transport:
             self.ws.receive_data(in_data)
 
     async def _net_send(self, wsmsg: Event) -> None:
-        try:
-            await self.stream.send_all(self.ws.send(wsmsg))
+        # Multiplexed requests and keepalive pings can be sent concurrently
+        async with self._send_lock:
+            try:
+                await self.stream.send_all(self.ws.send(wsmsg))
 
-        except BrokenResourceError as exc:
-            raise TransportError(*exc.args) from exc
+            except BrokenResourceError as exc:
+                raise TransportError(*exc.args) from exc
 
-        except RemoteProtocolError as exc:
-            raise TransportError(*exc.args) from exc
+            except RemoteProtocolError as exc:
+                raise TransportError(*exc.args) from exc
+
+            except trio.Cancelled:
+                # Part of the message may have been sent, so the stream can no longer be used
+                if self._multiplexed:
+                    self._broken = TransportError("Send has been cancelled")
+                raise
 
     @classmethod
     async def init_for_client(
@@ -170,19 +196,114 @@ class Transport:
         except (BrokenResourceError, TransportError):
             pass
 
+    @property
+    def multiplexed(self) -> bool:
+        return self._multiplexed
+
+    @property
+    def broken(self) -> bool:
+        """
+        A multiplexed transport shared between tasks cannot be used anymore
+        once one of them has encountered an error
+        """
+        return self._broken is not None
+
+    def enable_multiplexing(self) -> None:
+        """
+        Once enabled, each `send` is tagged with a request id and the following
+        `recv` from the same task returns the reply with this id. Hence many
+        tasks can concurrently send requests on the transport (as long as each
+        task has a single request in flight) and the replies can come in any
+        order.
+
+        The peer must support multiplexed messages (see `MULTIPLEXED_API_VERSION`).
+        """
+        self._multiplexed = True
+
     async def send(self, msg: bytes) -> None:
         """
         Raises:
             TransportError
         """
-        await self._net_send(BytesMessage(data=msg))
+        if self._multiplexed:
+            await self._multiplexed_send(msg)
+        else:
+            await self._net_send(BytesMessage(data=msg))
 
     async def recv(self) -> bytes:
         """
         Raises:
             TransportError
         """
-        data = bytearray()
+        if self._multiplexed:
+            return await self._multiplexed_recv()
+        else:
+            return await self._recv_msg()
+
+    def _check_not_broken(self) -> None:
+        if self._broken is not None:
+            raise TransportError(*self._broken.args) from self._broken
+
+    async def _multiplexed_send(self, msg: bytes) -> None:
+        self._check_not_broken()
+        req_id = self._next_req_id
+        self._next_req_id = req_id % MAX_MULTIPLEXED_REQ_ID + 1
+        task = trio.lowlevel.current_task()
+        previous_req_id = self._task_req_ids.pop(task, None)
+        if previous_req_id is not None:
+            # Previous request has been abandoned without waiting for its reply
+            self._replies.pop(previous_req_id, None)
+        self._task_req_ids[task] = req_id
+        self._replies[req_id] = None
+        try:
+            await self._net_send(BytesMessage(data=pack_multiplexed_msg(req_id, msg)))
+
+        except BaseException as exc:
+            del self._task_req_ids[task]
+            del self._replies[req_id]
+            if isinstance(exc, TransportError):
+                self._broken = exc
+            raise
+
+    async def _multiplexed_recv(self) -> bytes:
+        req_id = self._task_req_ids.pop(trio.lowlevel.current_task())
+        try:
+            while True:
+                self._check_not_broken()
+                rep = self._replies[req_id]
+                if rep is not None:
+                    return rep
+
+                # A single task receives on behalf of all the others, the role
+                # is taken over by another waiting task once it has got its reply
+                if self._receiving:
+                    await self._replies_changed.wait()
+                    continue
+
+                self._receiving = True
+                try:
+                    raw = await self._recv_msg()
+                    try:
+                        rep_id, rep = unpack_multiplexed_msg(raw)
+                    except MessageSerializationError as exc:
+                        raise TransportError(f"Invalid multiplexed message: {exc}") from exc
+                    # Reply is ignored if the request has been abandoned in the meantime
+                    if rep_id in self._replies:
+                        self._replies[rep_id] = rep
+
+                except TransportError as exc:
+                    self._broken = exc
+                    raise
+
+                finally:
+                    self._receiving = False
+                    self._replies_changed.set()
+                    self._replies_changed = trio.Event()
+
+        finally:
+            self._replies.pop(req_id, None)
+
+    async def _recv_msg(self) -> bytes:
         while True:
             if self.keepalive:
                 with trio.move_on_after(self.keepalive) as cancel_scope:
@@ -206,8 +327,10 @@ class Transport:
             elif isinstance(event, BytesMessage):
                 # TODO: check that data doesn't go over MAX_BIN_LEN (1 MB)
                 # Msgpack will refuse to unpack it so we should fail early on if that happens
-                data += event.data
+                self._recv_data += event.data
                 if event.message_finished:
+                    data = self._recv_data
+                    self._recv_data = bytearray()
                     return data
 
             elif isinstance(event, Ping):
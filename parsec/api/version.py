@@ -26,10 +26,17 @@ class ApiVersion(NamedTuple):
 # v2 (Parsec 1.14+): Incompatible handshake with system with SAS-based authentication
 # - v2.7 (Parsec +2.9): Add `organization_bootstrap` to anonymous commands
 # - v2.8 (Parsec 2.11+): Sequester API
+# - v2.9 (Parsec 2.13+): Add `vlob_read_batch` & `block_create_batch` commands
 # v3 (Parsec 2.9+): Incompatible handshake challenge answer format
 # - v3.1 (Parsec 2.10+): Add `user_revoked` return status to `realm_update_role` command
 # - v3.2 (Parsec 2.11+): Sequester API
+# - v3.3 (Parsec 2.12+): Multiplexed commands
+# - v3.4 (Parsec 2.13+): Add `vlob_read_batch` & `block_create_batch` commands
 API_V1_VERSION = ApiVersion(version=1, revision=3)
-API_V2_VERSION = ApiVersion(version=2, revision=8)
-API_V3_VERSION = ApiVersion(version=3, revision=2)
+API_V2_VERSION = ApiVersion(version=2, revision=9)
+API_V3_VERSION = ApiVersion(version=3, revision=4)
 API_VERSION = API_V3_VERSION
+
+# Backend accepts multiplexed commands (see `parsec.api.protocol.base.pack_multiplexed_msg`)
+# starting with this version
+MULTIPLEXED_API_VERSION = ApiVersion(version=3, revision=3)
@@ -1,8 +1,10 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) BUSL-1.1 (eventually AGPL-3.0) 2016-present Scille SAS
 from __future__ import annotations
 
-from typing import Any, Type, Optional, List, Tuple, TypeVar
+from typing import Any, Awaitable, Callable, Type, Optional, List, Tuple, TypeVar
 from pathlib import Path
+import os
+import socket
 import logging
 import trio
 import trio_typing
@@ -121,14 +123,27 @@ async def serve_backend_with_asgi(
     port: int,
     ssl_certfile: Optional[Path] = None,
     ssl_keyfile: Optional[Path] = None,
+    sock: Optional[socket.socket] = None,
+    shutdown_trigger: Optional[Callable[[], Awaitable[None]]] = None,
     task_status: trio_typing.TaskStatus[T] = trio.TASK_STATUS_IGNORED,
 ) -> None:
+    """
+    `sock` is an already bound socket to listen on (`host` and `port` are then
+    ignored), typically shared with other processes.
+
+    `shutdown_trigger` returning triggers a graceful shutdown.
+    """
     app = app_factory(backend)
+    if sock is not None:
+        # Hypercorn closes the socket once done, so give it its own file descriptor
+        bind = f"fd://{os.dup(sock.fileno())}"
+    else:
+        bind = f"{host}:{port}"
     # Note: Hypercorn comes with default values for incoming data size to
     # avoid DoS abuse, so just trust them on that ;-)
     hyper_config = HyperConfig.from_mapping(
         {
-            "bind": [f"{host}:{port}"],
+            "bind": [bind],
             "accesslog": logging.getLogger("hypercorn.access"),
             # Timestamp is added by the log processor configured in `parsec.logging`,
             # here we configure peer address + req line + rep status + rep body size + time
@@ -142,7 +157,7 @@ async def serve_backend_with_asgi(
     )
     _patch_server_header(backend.config, hyper_config=hyper_config)
 
-    await serve(app, hyper_config, task_status=task_status)
+    await serve(app, hyper_config, shutdown_trigger=shutdown_trigger, task_status=task_status)
 
     # `hypercorn.serve` catches KeyboardInterrupt and returns, so re-raise
     # the keyboard interrupt to continue shutdown
@@ -36,6 +36,9 @@ SUPPORTED_API_VERSIONS = (
     API_V2_VERSION,
     API_V3_VERSION,
 )
+# Events are pushed to the client's connection, which only exists with the
+# Websocket transport (each HTTP request gets its own short-lived context)
+WEBSOCKET_ONLY_CMDS = frozenset(("events_subscribe", "events_listen"))
 
 
 rpc_bp = Blueprint("anonymous_api", __name__)
@@ -248,7 +251,7 @@ async def authenticated_api(raw_organization_id: str) -> Response:
         return _rpc_msgpack_rep({"status": "invalid_msg_format"}, api_version)
 
     cmd = msg.get("cmd")
-    if not isinstance(cmd, str):
+    if not isinstance(cmd, str) or cmd in WEBSOCKET_ONLY_CMDS:
         return _rpc_msgpack_rep({"status": "unknown_command"}, api_version)
 
     try:
@@ -267,5 +270,9 @@ async def authenticated_api(raw_organization_id: str) -> Response:
         verify_key=device.verify_key,
     )
 
-    cmd_rep = await cmd_func(client_ctx, msg)
+    try:
+        cmd_rep = await cmd_func(client_ctx, msg)
+    finally:
+        # Should be a no-op, but never let a context outlive its request
+        backend.events.unsubscribe(client_ctx)
     return _rpc_msgpack_rep(cmd_rep, api_version)
@@ -5,12 +5,15 @@ import trio
 from functools import partial
 from quart import g, websocket, Websocket, Blueprint
 from structlog import get_logger
-from typing import Awaitable, NoReturn, Callable, TypeVar, Union
+from typing import Awaitable, NoReturn, Callable, Optional, TypeVar, Union
 
 from parsec.api.protocol.base import MessageSerializationError
 from parsec.api.protocol import (
     packb,
     unpackb,
+    is_multiplexed_msg,
+    pack_multiplexed_msg,
+    unpack_multiplexed_msg,
     ProtocolError,
     InvalidMessageError,
     InvitationStatus,
@@ -18,6 +21,7 @@ from parsec.api.protocol import (
     UserID,
     InvitationToken,
 )
+from parsec.utils import open_service_nursery
 from parsec.backend.app import BackendApp
 from parsec.backend.utils import run_with_cancel_on_client_sending_new_cmd, CancelledByNewCmd
 from parsec.backend.backend_events import BackendEvent
@@ -35,6 +39,10 @@ R = dict[str, object]
 
 logger = get_logger()
 
+# Maximum number of multiplexed commands processed concurrently for a single
+# connection, the next ones are not read until one of them has completed
+MAX_MULTIPLEXED_REQUESTS = 64
+
 
 ws_bp = Blueprint("ws_api", __name__)
 
@@ -101,7 +109,10 @@ async def handle_ws() -> None:
                 )
 
                 # 3) Serve commands
-                await _handle_client_websocket_loop(api_cmds, websocket, client_ctx)
+                try:
+                    await _handle_client_websocket_loop(api_cmds, websocket, client_ctx)
+                finally:
+                    backend.events.unsubscribe(client_ctx)
 
     elif isinstance(client_ctx, InvitedClientContext):
         await backend.invite.claimer_joined(
@@ -168,64 +179,105 @@ async def _handle_client_websocket_loop(
     websocket: Websocket,
     client_ctx: Ctx,
 ) -> NoReturn:
+    # Multiplexed commands (see `MULTIPLEXED_API_VERSION`) are processed
+    # concurrently and answered as soon as they complete, whereas regular ones
+    # are processed one at a time
+    send_lock = trio.Lock()
+    multiplexed_requests = trio.Semaphore(MAX_MULTIPLEXED_REQUESTS)
+
+    async def _send(raw_rep: bytes) -> None:
+        async with send_lock:
+            await websocket.send(raw_rep)
 
-    raw_req: Union[None, bytes, str] = None
-    while True:
-        # raw_req can be already defined if we received a new request
-        # while processing a command
-        raw_req = raw_req or await websocket.receive()
-        rep: R
+    async def _serve_multiplexed_req(req_id: int, raw_req: bytes) -> None:
         try:
-            # Wesocket can return both bytes or utf8-string messages, we only accept the former
-            if not isinstance(raw_req, bytes):
-                raise MessageSerializationError
-            req = unpackb(raw_req)
+            rep = await _process_req(api_cmds, client_ctx, raw_req)
+            await _send(pack_multiplexed_msg(req_id, packb(rep)))
+        finally:
+            multiplexed_requests.release()
+
+    async with open_service_nursery() as nursery:
+        raw_req: Union[None, bytes, str] = None
+        while True:
+            # raw_req can be already defined if we received a new request
+            # while processing a command
+            raw_req = raw_req or await websocket.receive()
+
+            if isinstance(raw_req, bytes) and is_multiplexed_msg(raw_req):
+                req_id, raw_req = unpack_multiplexed_msg(raw_req)
+                await multiplexed_requests.acquire()
+                nursery.start_soon(_serve_multiplexed_req, req_id, raw_req)
+                raw_req = None
+                continue
 
-        except MessageSerializationError:
-            rep = {"status": "invalid_msg_format", "reason": "Invalid message format"}
-            cmd = ""  # Dummy placeholder for the log
+            try:
+                rep = await _process_req(api_cmds, client_ctx, raw_req, websocket=websocket)
 
-        else:
+            except CancelledByNewCmd as exc:
+                # Long command handling such as message_get can be cancelled
+                # when the peer send a new request
+                raw_req = exc.new_raw_req
+                continue
 
-            try:
-                cmd = req.get("cmd", "<missing>")
-                if not isinstance(cmd, str):
-                    raise KeyError()
+            await _send(packb(rep))
+            raw_req = None
 
-                cmd_func = api_cmds[cmd]
 
-            except KeyError:
-                rep = {"status": "unknown_command", "reason": "Unknown command"}
+async def _process_req(
+    api_cmds: dict[str, Callable[[Ctx, R], Awaitable[R]]],
+    client_ctx: Ctx,
+    raw_req: Union[bytes, str],
+    websocket: Optional[Websocket] = None,
+) -> R:
+    """
+    Commands with `cancel_on_client_sending_new_cmd` are cancelled if a new
+    request is received on `websocket` in the meantime (this doesn't apply
+    to multiplexed commands, hence no websocket is provided for them).
+
+    Raises:
+        CancelledByNewCmd
+    """
+    rep: R
+    try:
+        # Wesocket can return both bytes or utf8-string messages, we only accept the former
+        if not isinstance(raw_req, bytes):
+            raise MessageSerializationError
+        req = unpackb(raw_req)
+
+    except MessageSerializationError:
+        return {"status": "invalid_msg_format", "reason": "Invalid message format"}
+
+    try:
+        cmd = req.get("cmd", "<missing>")
+        if not isinstance(cmd, str):
+            raise KeyError()
+
+        cmd_func = api_cmds[cmd]
+
+    except KeyError:
+        rep = {"status": "unknown_command", "reason": "Unknown command"}
 
+    else:
+        try:
+            if (
+                websocket is not None
+                and cmd_func._api_info["cancel_on_client_sending_new_cmd"]  # type: ignore[attr-defined]
+            ):
+                rep = await run_with_cancel_on_client_sending_new_cmd(
+                    websocket, cmd_func, client_ctx, req
+                )
             else:
-                try:
-                    if cmd_func._api_info[  # type: ignore[attr-defined]
-                        "cancel_on_client_sending_new_cmd"
-                    ]:
-                        rep = await run_with_cancel_on_client_sending_new_cmd(
-                            websocket, cmd_func, client_ctx, req
-                        )
-                    else:
-                        rep = await cmd_func(client_ctx, req)
-
-                except InvalidMessageError as exc:
-                    rep = {
-                        "status": "bad_message",
-                        "errors": exc.errors,
-                        "reason": "Invalid message.",
-                    }
-
-                except ProtocolError as exc:
-                    rep = {"status": "bad_message", "reason": str(exc)}
-
-                except CancelledByNewCmd as exc:
-                    # Long command handling such as message_get can be cancelled
-                    # when the peer send a new request
-                    raw_req = exc.new_raw_req
-                    continue
-
-            client_ctx.logger.info("Request", cmd=cmd, status=rep["status"])
-
-        raw_rep = packb(rep)
-        await websocket.send(raw_rep)
-        raw_req = None
+                rep = await cmd_func(client_ctx, req)
+
+        except InvalidMessageError as exc:
+            rep = {
+                "status": "bad_message",
+                "errors": exc.errors,
+                "reason": "Invalid message.",
+            }
+
+        except ProtocolError as exc:
+            rep = {"status": "bad_message", "reason": str(exc)}
+
+    client_ctx.logger.info("Request", cmd=cmd, status=rep["status"])
+    return rep
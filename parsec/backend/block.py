@@ -1,6 +1,6 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) BUSL-1.1 (eventually AGPL-3.0) 2016-present Scille SAS
 from __future__ import annotations
-from typing import Optional
+from typing import List, Optional, Tuple
 
 from parsec._parsec import (
     DateTime,
@@ -10,6 +10,13 @@ from parsec._parsec import (
     BlockCreateRepInMaintenance,
     BlockCreateRepNotAllowed,
     BlockCreateRepNotFound,
+    BlockCreateBatchRepOk,
+    BlockCreateBatchRepAlreadyExists,
+    BlockCreateBatchRepTimeout,
+    BlockCreateBatchRepInMaintenance,
+    BlockCreateBatchRepNotAllowed,
+    BlockCreateBatchRepNotFound,
+    BlockCreateBatchRepTooLarge,
     BlockReadRepOk,
     BlockReadRepInMaintenance,
     BlockReadRepNotAllowed,
@@ -25,6 +32,9 @@ from parsec.api.protocol import (
     BlockReadRep,
     BlockCreateReq,
     BlockCreateRep,
+    BlockCreateBatchReq,
+    BlockCreateBatchRep,
+    BLOCK_CREATE_BATCH_MAX_SIZE,
 )
 from parsec.backend.client_context import AuthenticatedClientContext
 from parsec.backend.utils import catch_protocol_errors, api, api_typed_msg_adapter
@@ -113,6 +123,43 @@ class BaseBlockComponent:
 
         return BlockCreateRepOk()
 
+    @api("block_create_batch")
+    @catch_protocol_errors
+    @api_typed_msg_adapter(BlockCreateBatchReq, BlockCreateBatchRep)
+    async def api_block_create_batch(
+        self, client_ctx: AuthenticatedClientContext, req: BlockCreateBatchReq
+    ) -> BlockCreateBatchRep:
+        blocks = [(item.block_id, item.block) for item in req.blocks]
+        if sum(len(block) for _, block in blocks) > BLOCK_CREATE_BATCH_MAX_SIZE:
+            return BlockCreateBatchRepTooLarge()
+
+        try:
+            await self.create_batch(
+                organization_id=client_ctx.organization_id,
+                author=client_ctx.device_id,
+                realm_id=req.realm_id,
+                blocks=blocks,
+                created_on=DateTime.now(),
+            )
+
+        except BlockAlreadyExistsError:
+            return BlockCreateBatchRepAlreadyExists()
+
+        except BlockNotFoundError:
+            return BlockCreateBatchRepNotFound()
+
+        except BlockStoreError:
+            # Consistent with `block_create` legacy status
+            return BlockCreateBatchRepTimeout()
+
+        except BlockAccessError:
+            return BlockCreateBatchRepNotAllowed()
+
+        except BlockInMaintenanceError:
+            return BlockCreateBatchRepInMaintenance()
+
+        return BlockCreateBatchRepOk()
+
     async def read(
         self, organization_id: OrganizationID, author: DeviceID, block_id: BlockID
     ) -> bytes:
@@ -143,3 +190,26 @@ class BaseBlockComponent:
             BlockInMaintenanceError
         """
         raise NotImplementedError()
+
+    async def create_batch(
+        self,
+        organization_id: OrganizationID,
+        author: DeviceID,
+        realm_id: RealmID,
+        blocks: List[Tuple[BlockID, bytes]],
+        created_on: Optional[DateTime] = None,
+    ) -> None:
+        """
+        Create multiple blocks of the same realm at once.
+
+        Blocks that already exist in the realm are left untouched, this way a
+        batch can be retried after a partial failure.
+
+        Raises:
+            BlockNotFoundError: if cannot found realm
+            BlockAlreadyExistsError: if a block ID is already used by another realm
+            BlockStoreError
+            BlockAccessError
+            BlockInMaintenanceError
+        """
+        raise NotImplementedError()
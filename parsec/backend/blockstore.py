@@ -1,10 +1,12 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) BUSL-1.1 (eventually AGPL-3.0) 2016-present Scille SAS
 from __future__ import annotations
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 from parsec.api.protocol import OrganizationID, BlockID
 from parsec.backend.config import (
     BaseBlockStoreConfig,
+    CacheBlockStoreConfig,
     RAID0BlockStoreConfig,
     RAID1BlockStoreConfig,
     RAID5BlockStoreConfig,
@@ -87,6 +89,8 @@ def blockstore_factory(
                 config.s3_key,
                 config.s3_secret,
                 config.s3_endpoint_url,
+                max_concurrency=config.s3_max_concurrency,
+                timeout=config.s3_timeout,
             )
         except ImportError as exc:
             raise ValueError("S3 block store is not available") from exc
@@ -110,14 +114,20 @@ def blockstore_factory(
 
         blocks = [blockstore_factory(subconf, postgresql_dbh) for subconf in config.blockstores]
 
-        return RAID1BlockStoreComponent(blocks, partial_create_ok=config.partial_create_ok)
+        return RAID1BlockStoreComponent(
+            blocks,
+            partial_create_ok=config.partial_create_ok,
+            hedged_read=config.hedged_read,
+            hedged_read_delay=config.hedged_read_delay,
+            hedged_read_percentile=config.hedged_read_percentile,
+        )
 
     elif isinstance(config, RAID0BlockStoreConfig):
         from parsec.backend.raid0_blockstore import RAID0BlockStoreComponent
 
         blocks = [blockstore_factory(subconf, postgresql_dbh) for subconf in config.blockstores]
 
-        return RAID0BlockStoreComponent(blocks)
+        return RAID0BlockStoreComponent(blocks, rendezvous_hashing=config.rendezvous_hashing)
 
     elif isinstance(config, RAID5BlockStoreConfig):
         from parsec.backend.raid5_blockstore import RAID5BlockStoreComponent
@@ -129,5 +139,15 @@ def blockstore_factory(
 
         return RAID5BlockStoreComponent(blocks, partial_create_ok=config.partial_create_ok)
 
+    elif isinstance(config, CacheBlockStoreConfig):
+        from parsec.backend.cache_blockstore import CacheBlockStoreComponent
+
+        return CacheBlockStoreComponent(
+            blockstore_factory(config.blockstore, postgresql_dbh),
+            memory_size=config.memory_size,
+            disk_dir=Path(config.disk_dir) if config.disk_dir else None,
+            disk_size=config.disk_size,
+        )
+
     else:
         raise ValueError(f"Unknown block store configuration `{config}`")
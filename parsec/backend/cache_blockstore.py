@@ -0,0 +1,236 @@
+# Parsec Cloud (https://parsec.cloud) Copyright (c) BUSL-1.1 (eventually AGPL-3.0) 2016-present Scille SAS
+from __future__ import annotations
+
+import os
+import trio
+from pathlib import Path
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from parsec.api.protocol import OrganizationID, BlockID
+from parsec.backend.blockstore import BaseBlockStoreComponent
+
+
+CacheKey = Tuple[OrganizationID, BlockID]
+
+
+class _MemoryLRU:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.size = 0
+        self._data: OrderedDict[CacheKey, bytes] = OrderedDict()
+
+    def get(self, key: CacheKey) -> Optional[bytes]:
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            return None
+        return self._data[key]
+
+    def set(self, key: CacheKey, block: bytes) -> None:
+        if len(block) > self.max_size:
+            return
+        previous = self._data.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+        self._data[key] = block
+        self.size += len(block)
+        while self.size > self.max_size:
+            _, evicted = self._data.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class _DiskLRU:
+    """
+    Each block is stored as `<base_dir>/<organization_id>/<block_id>`, the
+    LRU order is kept in memory and rebuilt from the files mtime on startup.
+
+    The index is only accessed from the trio thread, while the files are read
+    and written from worker threads (see `_read_file`/`_write_file`), hence
+    disk accesses don't have to be serialized.
+    """
+
+    def __init__(self, base_dir: Path, max_size: int):
+        self.base_dir = base_dir
+        self.max_size = max_size
+        self.size = 0
+        self._index: OrderedDict[Path, int] = OrderedDict()
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        existing = []
+        for path in self.base_dir.glob("*/*"):
+            if not path.is_file():
+                continue
+            if path.suffix == ".tmp":
+                # Leftover of an interrupted write
+                path.unlink()
+                continue
+            stat = path.stat()
+            existing.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(existing, key=lambda x: x[0]):
+            self._index[path] = size
+            self.size += size
+        _remove_files(self._evict())
+
+    def get_path(self, key: CacheKey) -> Path:
+        organization_id, block_id = key
+        return self.base_dir / organization_id.str / block_id.hex
+
+    def _evict(self) -> List[Path]:
+        evicted = []
+        while self.size > self.max_size:
+            path, size = self._index.popitem(last=False)
+            self.size -= size
+            evicted.append(path)
+        return evicted
+
+    def lookup(self, key: CacheKey) -> Optional[Path]:
+        path = self.get_path(key)
+        if path not in self._index:
+            return None
+        self._index.move_to_end(path)
+        return path
+
+    def discard(self, path: Path) -> None:
+        self.size -= self._index.pop(path, 0)
+
+    def add(self, path: Path, size: int) -> List[Path]:
+        """Returns the paths of the evicted blocks, to be removed by the caller"""
+        self.discard(path)
+        self._index[path] = size
+        self.size += size
+        return self._evict()
+
+
+def _read_file(path: Path) -> Optional[bytes]:
+    try:
+        return path.read_bytes()
+    except OSError:
+        return None
+
+
+def _write_file(path: Path, data: bytes) -> bool:
+    # Write in a temporary file then rename it to never expose a partial block
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    try:
+        path.parent.mkdir(exist_ok=True)
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        return False
+    return True
+
+
+def _remove_files(paths: List[Path]) -> None:
+    for path in paths:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+class CacheBlockStoreComponent(BaseBlockStoreComponent):
+    """
+    Cache in front of another blockstore.
+
+    Blocks are immutable once created, so a cached block never has to be
+    invalidated: the cache only has to evict (in LRU order) when reaching its
+    size limit.
+
+    Cache is composed of a memory tier and an optional disk tier (a block
+    found on disk is promoted to memory). Concurrent reads of the same missing
+    block are coalesced into a single read on the underlying blockstore.
+    """
+
+    def __init__(
+        self,
+        blockstore: BaseBlockStoreComponent,
+        memory_size: int,
+        disk_dir: Optional[Path] = None,
+        disk_size: int = 0,
+    ):
+        self.blockstore = blockstore
+        self._memory = _MemoryLRU(memory_size)
+        self._disk = _DiskLRU(disk_dir, disk_size) if disk_dir and disk_size else None
+        self._pending_reads: Dict[CacheKey, trio.Event] = {}
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    async def _disk_get(self, key: CacheKey) -> Optional[bytes]:
+        if not self._disk:
+            return None
+        path = self._disk.lookup(key)
+        if not path:
+            return None
+        block = await trio.to_thread.run_sync(_read_file, path)
+        if block is None:
+            # Block file has been removed (e.g. evicted while being read)
+            self._disk.discard(path)
+        return block
+
+    async def _disk_set(self, key: CacheKey, block: bytes) -> None:
+        if not self._disk or len(block) > self._disk.max_size:
+            return
+        # Concurrent writes of the same block are prevented by the coalescing of the reads
+        path = self._disk.get_path(key)
+        if not await trio.to_thread.run_sync(_write_file, path, block):
+            return
+        evicted = self._disk.add(path, len(block))
+        if evicted:
+            await trio.to_thread.run_sync(_remove_files, evicted)
+
+    async def read(self, organization_id: OrganizationID, block_id: BlockID) -> bytes:
+        key = (organization_id, block_id)
+
+        while True:
+            block = self._memory.get(key)
+            if block is not None:
+                self.memory_hits += 1
+                return block
+
+            pending = self._pending_reads.get(key)
+            if not pending:
+                break
+            # Another task is already fetching this block, wait for it then retry
+            await pending.wait()
+            if self._memory.get(key) is None:
+                # Fetch has failed (or block too big to be kept in memory),
+                # no need to wait on it further
+                break
+
+        pending = self._pending_reads[key] = trio.Event()
+        try:
+            block = await self._disk_get(key)
+            if block is not None:
+                self.disk_hits += 1
+                self._memory.set(key, block)
+                return block
+
+            self.misses += 1
+            # Errors are logged by the underlying blockstore
+            block = await self.blockstore.read(organization_id, block_id)
+            self._memory.set(key, block)
+            await self._disk_set(key, block)
+            return block
+
+        finally:
+            if self._pending_reads.get(key) is pending:
+                del self._pending_reads[key]
+            pending.set()
+
+    async def create(
+        self, organization_id: OrganizationID, block_id: BlockID, block: bytes
+    ) -> None:
+        await self.blockstore.create(organization_id, block_id, block)
+        # Freshly created blocks are likely to be soon read by the other
+        # devices of the organization, so only keep them in memory
+        self._memory.set((organization_id, block_id), block)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_size": self._memory.size,
+            "disk_size": self._disk.size if self._disk else 0,
+        }
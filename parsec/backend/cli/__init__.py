@@ -5,6 +5,7 @@ import click
 
 from parsec.backend.cli.run import run_cmd
 from parsec.backend.cli.migration import migrate
+from parsec.backend.cli.rebalance import rebalance_blockstore
 from parsec.backend.cli.sequester import (
     generate_service_certificate,
     import_service_certificate,
@@ -41,5 +42,6 @@ def backend_cmd() -> None:
 
 backend_cmd.add_command(run_cmd, "run")
 backend_cmd.add_command(migrate, "migrate")
+backend_cmd.add_command(rebalance_blockstore, "rebalance_blockstore")
 backend_cmd.add_command(human_accesses, "human_accesses")
 backend_cmd.add_command(backend_sequester_cmd, "sequester")
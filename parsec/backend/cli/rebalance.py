@@ -0,0 +1,211 @@
+# Parsec Cloud (https://parsec.cloud) Copyright (c) BUSL-1.1 (eventually AGPL-3.0) 2016-present Scille SAS
+from __future__ import annotations
+
+import os
+import trio
+import click
+from pathlib import Path
+from typing import List, Tuple
+
+from parsec.utils import open_service_nursery, trio_run
+from parsec.cli_utils import cli_exception_handler, debug_config_options
+from parsec.api.protocol import OrganizationID, BlockID
+from parsec.backend.block import BlockStoreError
+from parsec.backend.blockstore import blockstore_factory
+from parsec.backend.config import BaseBlockStoreConfig, RAID0BlockStoreConfig
+from parsec.backend.raid0_blockstore import RAID0BlockStoreComponent
+from parsec.backend.cli.utils import db_backend_options, blockstore_backend_options
+from parsec.backend.cli.sequester import BackendDbConfig, run_pg_db_handler
+
+
+def _load_progress(progress_file: Path) -> int:
+    try:
+        return int(progress_file.read_text())
+    except FileNotFoundError:
+        return 0
+
+
+def _save_progress(progress_file: Path, last_block_index: int) -> None:
+    # Write then rename so that an interruption never corrupts the progress
+    tmp_progress_file = progress_file.with_name(f"{progress_file.name}.tmp")
+    tmp_progress_file.write_text(str(last_block_index))
+    os.replace(tmp_progress_file, progress_file)
+
+
+async def _rebalance_blockstore(
+    db_config: BackendDbConfig,
+    blockstore_config: BaseBlockStoreConfig,
+    previous_nodes_count: int,
+    previous_rendezvous_hashing: bool,
+    progress_file: Path,
+    concurrency: int,
+    batch_size: int,
+) -> None:
+    last_block_index = _load_progress(progress_file)
+    if last_block_index:
+        click.echo(f"Resuming from block index {last_block_index}")
+
+    async with run_pg_db_handler(db_config) as dbh:
+        blockstore = blockstore_factory(blockstore_config, postgresql_dbh=dbh)
+        assert isinstance(blockstore, RAID0BlockStoreComponent)
+
+        async with dbh.pool.acquire() as conn:
+            total_count = await conn.fetchval(
+                "SELECT count(*) FROM block WHERE _id > $1", last_block_index
+            )
+        click.echo(f"{click.style(str(total_count), fg='green')} blocks to check")
+        click.echo(
+            f"Use { click.style('^C', fg='yellow') } to stop the rebalance,"
+            " progress won't be lost when restarting the command"
+        )
+
+        moved_count = 0
+        limiter = trio.CapacityLimiter(concurrency)
+
+        async def _move_block(
+            organization_id: OrganizationID,
+            block_id: BlockID,
+            errors: List[Tuple[OrganizationID, BlockID, BlockStoreError]],
+        ) -> None:
+            nonlocal moved_count
+            async with limiter:
+                try:
+                    if await blockstore.move_block(
+                        organization_id,
+                        block_id,
+                        previous_nodes_count=previous_nodes_count,
+                        previous_rendezvous_hashing=previous_rendezvous_hashing,
+                    ):
+                        moved_count += 1
+                except BlockStoreError as exc:
+                    errors.append((organization_id, block_id, exc))
+
+        with click.progressbar(length=total_count, label="Rebalancing blocks") as bar:
+            while True:
+                async with dbh.pool.acquire() as conn:
+                    rows = await conn.fetch(
+                        """
+SELECT
+    block._id,
+    organization.organization_id,
+    block.block_id
+FROM block
+INNER JOIN organization ON block.organization = organization._id
+WHERE block._id > $1
+ORDER BY block._id
+LIMIT $2
+""",
+                        last_block_index,
+                        batch_size,
+                    )
+                if not rows:
+                    break
+
+                errors: List[Tuple[OrganizationID, BlockID, BlockStoreError]] = []
+                async with open_service_nursery() as nursery:
+                    for row in rows:
+                        nursery.start_soon(
+                            _move_block,
+                            OrganizationID(row["organization_id"]),
+                            BlockID(row["block_id"]),
+                            errors,
+                        )
+
+                if errors:
+                    # Progress is not saved, so the whole batch will be retried
+                    # on restart (moving a block is idempotent)
+                    for organization_id, block_id, exc in errors:
+                        click.echo(
+                            f"\nCannot move block {block_id.str} from organization"
+                            f" {organization_id.str}: {exc!r}",
+                            err=True,
+                        )
+                    raise RuntimeError(f"{len(errors)} block(s) couldn't be moved")
+
+                last_block_index = rows[-1]["_id"]
+                await trio.to_thread.run_sync(_save_progress, progress_file, last_block_index)
+                bar.update(len(rows))
+
+    click.echo(f"Done, {click.style(str(moved_count), fg='green')} blocks moved")
+
+
+@click.command(short_help="Move blocks to their new owner after adding nodes to a RAID0 blockstore")
+@click.option(
+    "--previous-nodes",
+    type=click.IntRange(min=1),
+    required=True,
+    help="Number of nodes the RAID0 blockstore had before the new nodes were added",
+)
+@click.option(
+    "--previous-placement",
+    type=click.Choice(["rendezvous", "modulo"], case_sensitive=False),
+    default="rendezvous",
+    show_default=True,
+    help="Block placement used by the RAID0 blockstore before the new nodes were added",
+)
+@click.option(
+    "--progress-file",
+    type=Path,
+    required=True,
+    help="File keeping track of the progress, restarting the command resumes from it",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Maximum number of blocks being moved at the same time",
+)
+@click.option("--batch-size", type=click.IntRange(min=1), default=100, show_default=True)
+@db_backend_options
+@blockstore_backend_options
+# Add --debug
+@debug_config_options
+def rebalance_blockstore(
+    previous_nodes: int,
+    previous_placement: str,
+    progress_file: Path,
+    concurrency: int,
+    batch_size: int,
+    db: str,
+    db_max_connections: int,
+    db_min_connections: int,
+    blockstore: BaseBlockStoreConfig,
+    debug: bool,
+) -> None:
+    """
+    Move the blocks to their owner in the new RAID0 layout (the `--blockstore`
+    params) from their owner in the previous layout (the first `--previous-nodes`
+    nodes).
+
+    The backend can keep running during the rebalance: new blocks are directly
+    created on their new owner and reads fall back to the previous owner until
+    the block has been moved. Note the moved blocks are not removed from their
+    previous owner.
+    """
+    with cli_exception_handler(debug):
+        if not isinstance(blockstore, RAID0BlockStoreConfig) or not blockstore.rendezvous_hashing:
+            raise click.BadParameter(
+                "Blockstore must be a RAID0_RENDEZVOUS configuration", param_hint="--blockstore"
+            )
+        if previous_nodes > len(blockstore.blockstores):
+            raise click.BadParameter(
+                "Cannot be greater than the number of nodes in the blockstore configuration",
+                param_hint="--previous-nodes",
+            )
+        if db.upper() == "MOCKED":
+            raise click.BadParameter("MOCKED DB cannot be used to rebalance", param_hint="--db")
+        db_config = BackendDbConfig(
+            db_url=db, db_min_connections=db_min_connections, db_max_connections=db_max_connections
+        )
+        trio_run(
+            _rebalance_blockstore,
+            db_config,
+            blockstore,
+            previous_nodes,
+            previous_placement.lower() == "rendezvous",
+            progress_file,
+            concurrency,
+            batch_size,
+            use_asyncio=True,
+        )
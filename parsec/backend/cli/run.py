@@ -1,10 +1,13 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) BUSL-1.1 (eventually AGPL-3.0) 2016-present Scille SAS
 from __future__ import annotations
 
+import os
 import trio
 import click
+import signal
+import socket
 from structlog import get_logger
-from typing import Any, Optional, Tuple
+from typing import Any, Awaitable, Callable, Optional, Tuple
 from functools import partial
 import tempfile
 from pathlib import Path
@@ -17,12 +20,19 @@ from parsec.cli_utils import (
     debug_config_options,
 )
 from parsec.backend.cli.utils import db_backend_options, blockstore_backend_options
+from parsec.backend.cli.workers import (
+    WORKER_MIN_DB_CONNECTIONS,
+    WorkersSupervisor,
+    create_listen_socket,
+    split_db_connections,
+)
 from parsec.backend import backend_app_factory
 from parsec.backend.asgi import serve_backend_with_asgi
 from parsec.backend.config import (
     BackendConfig,
     EmailConfig,
     BaseBlockStoreConfig,
+    CacheBlockStoreConfig,
     SmtpEmailConfig,
     MockedEmailConfig,
 )
@@ -105,6 +115,20 @@ For instance:
     envvar="PARSEC_PORT",
     help="Port to listen on",
 )
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    envvar="PARSEC_WORKERS",
+    help=(
+        "Number of processes serving the backend on the same port"
+        " (requires a PostgreSQL database and a non-mocked blockstore)."
+        " The database connections are split between the processes (each of them needs at"
+        " least 2), crashed processes"
+        " are restarted and SIGHUP gracefully restarts all of them"
+    ),
+)
 @db_backend_options
 @click.option(
     "--maximum-database-connection-attempts",
@@ -278,6 +302,7 @@ organization_id, device_id, device_label (can be null), human_email (can be null
 def run_cmd(
     host: str,
     port: int,
+    workers: int,
     db: str,
     db_min_connections: int,
     db_max_connections: int,
@@ -347,6 +372,33 @@ def run_cmd(
             organization_initial_user_profile_outsider_allowed=organization_initial_user_profile_outsider_allowed,
         )
 
+        if workers > 1:
+            if app_config.db_type == "MOCKED":
+                raise click.BadParameter(
+                    "MOCKED database cannot be shared between workers", param_hint="--workers"
+                )
+            if _is_blockstore_mocked(blockstore):
+                raise click.BadParameter(
+                    "MOCKED blockstore cannot be shared between workers", param_hint="--workers"
+                )
+            if _has_blockstore_disk_cache(blockstore):
+                # Each worker keeps its own index of the cached blocks, they would
+                # evict each other's blocks and under-count the used disk space
+                raise click.BadParameter(
+                    "Blockstore disk cache cannot be shared between workers",
+                    param_hint="--workers",
+                )
+            if not hasattr(os, "fork"):
+                raise click.BadParameter(
+                    "Multiple workers are not supported on this platform", param_hint="--workers"
+                )
+            if app_config.db_max_connections // workers < WORKER_MIN_DB_CONNECTIONS:
+                raise click.BadParameter(
+                    f"Each worker needs at least {WORKER_MIN_DB_CONNECTIONS} database connections,"
+                    f" --db-max-connections must be at least {WORKER_MIN_DB_CONNECTIONS * workers}",
+                    param_hint="--workers",
+                )
+
         click.echo(
             f"Starting Parsec Backend on {host}:{port}"
             f" (db={app_config.db_type}"
@@ -354,28 +406,76 @@ def run_cmd(
             f" email={email_config.type}"
             f" telemetry={'on' if sentry_dsn else 'off'}"
             f" backend_addr={app_config.backend_addr.to_url() if app_config.backend_addr else ''}"
+            f" workers={workers}"
             ")"
         )
         try:
             retry_policy = RetryPolicy(
                 maximum_database_connection_attempts, pause_before_retry_database_connection
             )
-            trio_run(
-                partial(
-                    _run_backend,
-                    host=host,
-                    port=port,
-                    ssl_certfile=ssl_certfile,
-                    ssl_keyfile=ssl_keyfile,
-                    retry_policy=retry_policy,
-                    app_config=app_config,
-                ),
-                use_asyncio=True,
-            )
+            if workers == 1:
+                trio_run(
+                    partial(
+                        _run_backend,
+                        host=host,
+                        port=port,
+                        ssl_certfile=ssl_certfile,
+                        ssl_keyfile=ssl_keyfile,
+                        retry_policy=retry_policy,
+                        app_config=app_config,
+                    ),
+                    use_asyncio=True,
+                )
+
+            else:
+                worker_app_config = split_db_connections(app_config, workers)
+
+                def _run_worker(sock: socket.socket) -> None:
+                    trio_run(
+                        partial(
+                            _run_backend,
+                            host=host,
+                            port=port,
+                            ssl_certfile=ssl_certfile,
+                            ssl_keyfile=ssl_keyfile,
+                            retry_policy=retry_policy,
+                            app_config=worker_app_config,
+                            sock=sock,
+                            shutdown_trigger=_wait_for_sigterm,
+                        ),
+                        use_asyncio=True,
+                    )
+
+                with create_listen_socket(host, port) as sock:
+                    WorkersSupervisor(workers, sock, _run_worker).run()
+                click.echo("bye ;-)")
+
         except KeyboardInterrupt:
             click.echo("bye ;-)")
 
 
+def _is_blockstore_mocked(config: BaseBlockStoreConfig) -> bool:
+    if config.type == "MOCKED":
+        return True
+    # RAID and cache configurations
+    nested_configs = getattr(config, "blockstores", None) or [getattr(config, "blockstore", None)]
+    return any(nested and _is_blockstore_mocked(nested) for nested in nested_configs)
+
+
+def _has_blockstore_disk_cache(config: BaseBlockStoreConfig) -> bool:
+    if isinstance(config, CacheBlockStoreConfig) and config.disk_dir and config.disk_size:
+        return True
+    # RAID and cache configurations
+    nested_configs = getattr(config, "blockstores", None) or [getattr(config, "blockstore", None)]
+    return any(nested and _has_blockstore_disk_cache(nested) for nested in nested_configs)
+
+
+async def _wait_for_sigterm() -> None:
+    with trio.open_signal_receiver(signal.SIGTERM) as signals:
+        async for _ in signals:
+            return
+
+
 class RetryPolicy:
     def __init__(self, maximum_attempts: int = 10, pause_before_retry: float = 1.0):
         self.maximum_attempts = maximum_attempts
@@ -402,6 +502,8 @@ async def _run_backend(
     ssl_keyfile: Optional[Path],
     retry_policy: RetryPolicy,
     app_config: BackendConfig,
+    sock: Optional[socket.socket] = None,
+    shutdown_trigger: Optional[Callable[[], Awaitable[None]]] = None,
 ) -> None:
     # Loop over connection attempts
     while True:
@@ -422,6 +524,8 @@ async def _run_backend(
                     port=port,
                     ssl_certfile=ssl_certfile,
                     ssl_keyfile=ssl_keyfile,
+                    sock=sock,
+                    shutdown_trigger=shutdown_trigger,
                 )
 
         except ConnectionError as exc:
@@ -1,14 +1,17 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) BUSL-1.1 (eventually AGPL-3.0) 2016-present Scille SAS
 from __future__ import annotations
 
+import attr
 import click
-from typing import Callable, Optional, List, TypeVar
+from typing import Any, Callable, Dict, Optional, List, TypeVar, cast
+from functools import wraps
 from typing_extensions import ParamSpec
 from itertools import count
 from collections import defaultdict
 
 from parsec.backend.config import (
     BaseBlockStoreConfig,
+    CacheBlockStoreConfig,
     MockedBlockStoreConfig,
     PostgreSQLBlockStoreConfig,
     S3BlockStoreConfig,
@@ -91,6 +94,30 @@ def _split_with_escaping(txt: str) -> List[str]:
     return parts
 
 
+def _parse_s3_options(raw_options: List[str]) -> Dict[str, Any]:
+    options: Dict[str, Any] = {}
+    for raw_option in raw_options:
+        name, sep, raw_value = raw_option.partition("=")
+        try:
+            if not sep:
+                raise ValueError
+            if name == "max_concurrency":
+                options["s3_max_concurrency"] = int(raw_value)
+                if options["s3_max_concurrency"] < 1:
+                    raise ValueError
+            elif name == "timeout":
+                options["s3_timeout"] = float(raw_value) if raw_value else None
+                if options["s3_timeout"] is not None and options["s3_timeout"] <= 0:
+                    raise ValueError
+            else:
+                raise click.BadParameter(
+                    f"Invalid S3 option `{name}`, allowed options are `max_concurrency` and `timeout`"
+                )
+        except ValueError:
+            raise click.BadParameter(f"Invalid S3 option `{raw_option}`")
+    return options
+
+
 def _parse_blockstore_param(value: str) -> BaseBlockStoreConfig:
     if value.upper() == "MOCKED":
         return MockedBlockStoreConfig()
@@ -100,11 +127,12 @@ def _parse_blockstore_param(value: str) -> BaseBlockStoreConfig:
         parts = _split_with_escaping(value)
         if parts[0].upper() == "S3":
             try:
-                endpoint_url, region, bucket, key, secret = parts[1:]
+                endpoint_url, region, bucket, key, secret = parts[1:6]
             except ValueError:
                 raise click.BadParameter(
-                    "Invalid S3 config, must be `s3:[<endpoint_url>]:<region>:<bucket>:<key>:<secret>`"
+                    "Invalid S3 config, must be `s3:[<endpoint_url>]:<region>:<bucket>:<key>:<secret>[:<option>=<value>...]`"
                 )
+            s3_options = _parse_s3_options(parts[6:])
             # Provide https by default to avoid anoying escaping for most cases
             if (
                 endpoint_url
@@ -118,6 +146,7 @@ def _parse_blockstore_param(value: str) -> BaseBlockStoreConfig:
                 s3_bucket=bucket,
                 s3_key=key,
                 s3_secret=secret,
+                **s3_options,
             )
 
         elif parts[0].upper() == "SWIFT":
@@ -151,7 +180,11 @@ def _parse_blockstore_params(raw_params: str) -> BaseBlockStoreConfig:
         raid_mode: Optional[str]
         raid_node: Optional[int]
         raw_param_parts = raw_param.split(":", 2)
-        if raw_param_parts[0].upper() in ("RAID0", "RAID1", "RAID5") and len(raw_param_parts) == 3:
+        if (
+            raw_param_parts[0].upper()
+            in ("RAID0", "RAID0_RENDEZVOUS", "RAID1", "RAID1_HEDGED", "RAID5")
+            and len(raw_param_parts) == 3
+        ):
             raid_mode, raw_raid_node, node_param = raw_param_parts
             try:
                 raid_node = int(raw_raid_node)
@@ -189,8 +222,12 @@ def _parse_blockstore_params(raw_params: str) -> BaseBlockStoreConfig:
 
     if raid_mode.upper() == "RAID0":
         return RAID0BlockStoreConfig(blockstores=blockstores)
+    elif raid_mode.upper() == "RAID0_RENDEZVOUS":
+        return RAID0BlockStoreConfig(blockstores=blockstores, rendezvous_hashing=True)
     elif raid_mode.upper() == "RAID1":
         return RAID1BlockStoreConfig(blockstores=blockstores)
+    elif raid_mode.upper() == "RAID1_HEDGED":
+        return RAID1BlockStoreConfig(blockstores=blockstores, hedged_read=True)
     elif raid_mode.upper() == "RAID5":
         return RAID5BlockStoreConfig(blockstores=blockstores)
     else:
@@ -213,24 +250,119 @@ Allowed values:
 \b
 -`MOCKED`: Mocked in memory
 -`POSTGRESQL`: Use the database specified in the `--db` param
--`s3:[<endpoint_url>]:<region>:<bucket>:<key>:<secret>`: Use S3 storage
+-`s3:[<endpoint_url>]:<region>:<bucket>:<key>:<secret>[:<option>=<value>...]`: Use S3 storage
 -`swift:<auth_url>:<tenant>:<container>:<user>:<password>`: Use SWIFT storage
 
 Note endpoint_url/auth_url are considered as https by default (e.g.
 `s3:foo.com:[...]` -> https://foo.com).
 Escaping must be used to provide a custom scheme (e.g. `s3:http\\://foo.com:[...]`).
 
+S3 accepts the following options:
+\b
+-`max_concurrency=<int>`: maximum number of in-flight S3 requests (default: 16)
+-`timeout=<seconds>`: timeout of a single S3 request, empty for no timeout (default: 30)
+
 On top of that, multiple blockstore configurations can be provided to form a
 RAID0/1/5 cluster.
 
 Each configuration must be provided with the form
-`<raid_type>:<node>:<config>` with `<raid_type>` RAID0/RAID1/RAID5, `<node>` a
-integer and `<config>` the MOCKED/POSTGRESQL/S3/SWIFT config.
+`<raid_type>:<node>:<config>` with `<raid_type>` RAID0/RAID0_RENDEZVOUS/RAID1/RAID1_HEDGED/RAID5,
+`<node>` a integer and `<config>` the MOCKED/POSTGRESQL/S3/SWIFT config.
+
+RAID0_RENDEZVOUS is a RAID0 placing the blocks with rendezvous hashing: nodes
+can be added (with the next node index) without having to move most of the
+blocks (see `parsec backend rebalance_blockstore`).
+
+RAID1_HEDGED is a RAID1 reading from the fastest node first, and from the next
+one if the read takes too long (see `--blockstore-hedged-read-delay` and
+`--blockstore-hedged-read-percentile`).
 
 \b
 """,
-        )
+        ),
+        click.option(
+            "--blockstore-hedged-read-delay",
+            type=click.FloatRange(min=0),
+            envvar="PARSEC_BLOCKSTORE_HEDGED_READ_DELAY",
+            metavar="SECONDS",
+            help=(
+                "RAID1_HEDGED delay before reading from the next node, used until enough"
+                " latencies are collected (default: 0.1)"
+            ),
+        ),
+        click.option(
+            "--blockstore-hedged-read-percentile",
+            type=click.FloatRange(min=0, max=100),
+            envvar="PARSEC_BLOCKSTORE_HEDGED_READ_PERCENTILE",
+            metavar="PERCENTILE",
+            help=(
+                "RAID1_HEDGED latency percentile of a node used as delay before reading from the"
+                " next node (default: 95)"
+            ),
+        ),
+        click.option(
+            "--blockstore-cache-memory-size",
+            default=0,
+            show_default=True,
+            type=int,
+            envvar="PARSEC_BLOCKSTORE_CACHE_MEMORY_SIZE",
+            metavar="BYTES",
+            help="Size of the in-memory cache of the blocks read from the blockstore (0 to disable)",
+        ),
+        click.option(
+            "--blockstore-cache-disk-dir",
+            type=click.Path(file_okay=False),
+            envvar="PARSEC_BLOCKSTORE_CACHE_DISK_DIR",
+            help="Directory used to cache the blocks read from the blockstore on disk",
+        ),
+        click.option(
+            "--blockstore-cache-disk-size",
+            default=0,
+            show_default=True,
+            type=int,
+            envvar="PARSEC_BLOCKSTORE_CACHE_DISK_SIZE",
+            metavar="BYTES",
+            help="Size of the on-disk cache of the blocks read from the blockstore (0 to disable)",
+        ),
     ]
+
+    @wraps(fn)
+    def wrapper(
+        *args: Any,
+        blockstore: BaseBlockStoreConfig,
+        blockstore_hedged_read_delay: Optional[float],
+        blockstore_hedged_read_percentile: Optional[float],
+        blockstore_cache_memory_size: int,
+        blockstore_cache_disk_dir: Optional[str],
+        blockstore_cache_disk_size: int,
+        **kwargs: Any,
+    ) -> T:
+        hedged_read_options: Dict[str, float] = {}
+        if blockstore_hedged_read_delay is not None:
+            hedged_read_options["hedged_read_delay"] = blockstore_hedged_read_delay
+        if blockstore_hedged_read_percentile is not None:
+            hedged_read_options["hedged_read_percentile"] = blockstore_hedged_read_percentile
+        if hedged_read_options:
+            if not isinstance(blockstore, RAID1BlockStoreConfig) or not blockstore.hedged_read:
+                raise click.BadParameter(
+                    "--blockstore-hedged-read-delay and --blockstore-hedged-read-percentile"
+                    " are only available for RAID1_HEDGED blockstore"
+                )
+            blockstore = attr.evolve(blockstore, **hedged_read_options)
+        if blockstore_cache_disk_size and not blockstore_cache_disk_dir:
+            raise click.BadParameter(
+                "--blockstore-cache-disk-dir is required when --blockstore-cache-disk-size is provided"
+            )
+        if blockstore_cache_memory_size or blockstore_cache_disk_size:
+            blockstore = CacheBlockStoreConfig(
+                blockstore=blockstore,
+                memory_size=blockstore_cache_memory_size,
+                disk_dir=blockstore_cache_disk_dir,
+                disk_size=blockstore_cache_disk_size,
+            )
+        return fn(*args, blockstore=blockstore, **kwargs)  # type: ignore[arg-type]
+
+    new_fn = cast(Callable[P, T], wrapper)
     for decorator in decorators:
-        fn = decorator(fn)
-    return fn
+        new_fn = decorator(new_fn)
+    return new_fn
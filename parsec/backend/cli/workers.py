@@ -0,0 +1,256 @@
+# Parsec Cloud (https://parsec.cloud) Copyright (c) BUSL-1.1 (eventually AGPL-3.0) 2016-present Scille SAS
+from __future__ import annotations
+
+import os
+import sys
+import math
+import time
+import attr
+import select
+import signal
+import socket
+from structlog import get_logger
+from typing import Callable, Dict, NoReturn, Optional
+
+from parsec.backend.config import BackendConfig
+
+
+logger = get_logger()
+
+
+# A worker exiting before having run this long is considered to have crashed
+# on startup, hence respawning it over and over is pointless
+WORKER_MIN_UPTIME = 10.0
+WORKER_MAX_CONSECUTIVE_STARTUP_CRASHES = 5
+
+# Some requests need two database connections at once (e.g. creating a block
+# holds a transaction while the PostgreSQL blockstore stores the data with
+# another connection), so a smaller pool would hang forever on them
+WORKER_MIN_DB_CONNECTIONS = 2
+
+
+def split_db_connections(app_config: BackendConfig, workers: int) -> BackendConfig:
+    """
+    Each worker has its own database connection pool, so split the
+    connections between them to keep the configured total.
+
+    The total must leave at least `WORKER_MIN_DB_CONNECTIONS` to each worker
+    (see `run_cmd`), otherwise it is exceeded.
+    """
+    db_max_connections = max(app_config.db_max_connections // workers, WORKER_MIN_DB_CONNECTIONS)
+    db_min_connections = min(math.ceil(app_config.db_min_connections / workers), db_max_connections)
+    return attr.evolve(
+        app_config, db_min_connections=db_min_connections, db_max_connections=db_max_connections
+    )
+
+
+def create_listen_socket(host: str, port: int) -> socket.socket:
+    family, *_ = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM, flags=socket.AI_PASSIVE)[0]
+    return socket.create_server((host, port), family=family)
+
+
+@attr.s(slots=True, frozen=True, auto_attribs=True)
+class _Worker:
+    index: int
+    started_on: float
+
+
+class WorkersSupervisor:
+    """
+    Pre-fork `workers` processes, each of them serving the backend on the
+    same listen socket (the kernel then dispatches the incoming connections
+    between them).
+
+    The supervisor (i.e. the parent process) doesn't serve anything, it only
+    respawns the workers that crashed and handles the signals:
+    - SIGTERM/SIGINT: graceful shutdown, the workers stop accepting new
+      connections and have `shutdown_timeout` seconds to terminate before
+      being killed.
+    - SIGHUP: graceful restart, new workers are started while the previous
+      ones are gracefully shut down. Note the workers are forked from the
+      supervisor, so code is not reloaded.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        sock: socket.socket,
+        worker_fn: Callable[[socket.socket], None],
+        shutdown_timeout: float = 10.0,
+    ):
+        self.workers = workers
+        self.sock = sock
+        self.worker_fn = worker_fn
+        self.shutdown_timeout = shutdown_timeout
+        self._running: Dict[int, _Worker] = {}
+        # Workers being shut down, with the time at which they get killed
+        self._retiring: Dict[int, float] = {}
+        self._consecutive_startup_crashes = 0
+        self._stop_requested = False
+        self._restart_requested = False
+        self._wakeup_fds: Optional[tuple[int, int]] = None
+
+    def _on_stop_signal(self, signum: int, frame: object) -> None:
+        self._stop_requested = True
+
+    def _on_restart_signal(self, signum: int, frame: object) -> None:
+        self._restart_requested = True
+
+    def run(self) -> None:
+        rfd, wfd = self._wakeup_fds = os.pipe()
+        os.set_blocking(rfd, False)
+        os.set_blocking(wfd, False)
+        previous_wakeup_fd = signal.set_wakeup_fd(wfd)
+        previous_handlers = {
+            signum: signal.signal(signum, handler)
+            for signum, handler in (
+                (signal.SIGTERM, self._on_stop_signal),
+                (signal.SIGINT, self._on_stop_signal),
+                (signal.SIGHUP, self._on_restart_signal),
+                # No-op handler, only needed to wake up on worker termination
+                (signal.SIGCHLD, lambda signum, frame: None),
+            )
+        }
+        try:
+            for index in range(self.workers):
+                self._spawn(index)
+
+            while not self._stop_requested:
+                self._wait_for_signal(timeout=1.0)
+                self._reap()
+                if self._restart_requested:
+                    self._restart_requested = False
+                    self._restart()
+                self._kill_overdue_retiring()
+
+            self._shutdown()
+
+        finally:
+            # Make sure no worker outlives the supervisor
+            for pid in (*self._running, *self._retiring):
+                self._kill(pid, signal.SIGKILL)
+            signal.set_wakeup_fd(previous_wakeup_fd)
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+            os.close(rfd)
+            os.close(wfd)
+            self._wakeup_fds = None
+
+    def _wait_for_signal(self, timeout: float) -> None:
+        assert self._wakeup_fds is not None
+        rfd, _ = self._wakeup_fds
+        select.select([rfd], [], [], timeout)
+        try:
+            while os.read(rfd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _spawn(self, index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            self._worker_main(index)
+        self._running[pid] = _Worker(index=index, started_on=time.monotonic())
+        logger.info("Worker started", worker=index, pid=pid)
+
+    def _worker_main(self, index: int) -> NoReturn:
+        exit_code = 0
+        try:
+            # Restore the default signals behavior, the worker handles them by itself
+            assert self._wakeup_fds is not None
+            signal.set_wakeup_fd(-1)
+            for fd in self._wakeup_fds:
+                os.close(fd)
+            for signum in (signal.SIGTERM, signal.SIGHUP, signal.SIGCHLD):
+                signal.signal(signum, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+
+            self.worker_fn(self.sock)
+
+        except KeyboardInterrupt:
+            pass
+
+        except BaseException:
+            logger.exception("Worker has crashed", worker=index, pid=os.getpid())
+            exit_code = 1
+
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            # Skip the cleanup (e.g. atexit handlers) inherited from the supervisor
+            os._exit(exit_code)
+
+    def _kill(self, pid: int, signum: int) -> None:
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            if self._retiring.pop(pid, None) is not None:
+                logger.info("Worker stopped", pid=pid)
+                continue
+
+            worker = self._running.pop(pid, None)
+            if worker is None:
+                continue
+            exit_code = os.waitstatus_to_exitcode(status)
+            if self._stop_requested:
+                logger.info("Worker stopped", worker=worker.index, pid=pid, exit_code=exit_code)
+                continue
+
+            logger.warning(
+                "Worker has unexpectedly stopped, respawning it",
+                worker=worker.index,
+                pid=pid,
+                exit_code=exit_code,
+            )
+            if time.monotonic() - worker.started_on < WORKER_MIN_UPTIME:
+                self._consecutive_startup_crashes += 1
+                if self._consecutive_startup_crashes >= WORKER_MAX_CONSECUTIVE_STARTUP_CRASHES:
+                    self._shutdown()
+                    raise RuntimeError(
+                        f"Workers have crashed on startup {self._consecutive_startup_crashes} times in a row"
+                    )
+            else:
+                self._consecutive_startup_crashes = 0
+            self._spawn(worker.index)
+
+    def _retire(self, pid: int) -> None:
+        del self._running[pid]
+        self._retiring[pid] = time.monotonic() + self.shutdown_timeout
+        self._kill(pid, signal.SIGTERM)
+
+    def _restart(self) -> None:
+        logger.info("Restarting workers")
+        for pid, worker in list(self._running.items()):
+            # Listen socket is shared, so the new worker can start accepting
+            # connections while the previous one is completing its requests
+            self._retire(pid)
+            self._spawn(worker.index)
+
+    def _kill_overdue_retiring(self) -> None:
+        now = time.monotonic()
+        for pid, deadline in self._retiring.items():
+            if now > deadline:
+                logger.warning("Worker is too slow to stop, killing it", pid=pid)
+                self._kill(pid, signal.SIGKILL)
+                self._retiring[pid] = math.inf
+
+    def _shutdown(self) -> None:
+        self._stop_requested = True
+        logger.info("Stopping workers")
+        for pid in list(self._running):
+            self._retire(pid)
+        while self._retiring:
+            self._wait_for_signal(timeout=0.1)
+            self._reap()
+            self._kill_overdue_retiring()
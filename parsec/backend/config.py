@@ -19,6 +19,8 @@ class RAID0BlockStoreConfig(BaseBlockStoreConfig):
     type = "RAID0"
 
     blockstores: List[BaseBlockStoreConfig]
+    # Place blocks with rendezvous hashing instead of `block_id % len(blockstores)`
+    rendezvous_hashing: bool = False
 
 
 @attr.s(frozen=True, auto_attribs=True)
@@ -27,6 +29,12 @@ class RAID1BlockStoreConfig(BaseBlockStoreConfig):
 
     blockstores: List[BaseBlockStoreConfig]
     partial_create_ok: bool = False
+    # Read from the fastest node first instead of all nodes at once
+    hedged_read: bool = False
+    # Delay (in seconds) before trying the next node if not enough latency samples
+    hedged_read_delay: float = 0.1
+    # Node's latency percentile used as delay before trying the next node
+    hedged_read_percentile: Optional[float] = 95
 
 
 @attr.s(frozen=True, auto_attribs=True)
@@ -37,6 +45,17 @@ class RAID5BlockStoreConfig(BaseBlockStoreConfig):
     partial_create_ok: bool = False
 
 
+@attr.s(frozen=True, auto_attribs=True)
+class CacheBlockStoreConfig(BaseBlockStoreConfig):
+    type = "CACHE"
+
+    blockstore: BaseBlockStoreConfig
+    # Sizes are in bytes
+    memory_size: int
+    disk_dir: Optional[str] = None
+    disk_size: int = 0
+
+
 @attr.s(frozen=True, auto_attribs=True)
 class S3BlockStoreConfig(BaseBlockStoreConfig):
     type = "S3"
@@ -46,6 +65,11 @@ class S3BlockStoreConfig(BaseBlockStoreConfig):
     s3_bucket: str
     s3_key: str
     s3_secret: str
+    # Maximum number of S3 requests running concurrently (each one occupies a
+    # worker thread and a connection from the boto3 pool)
+    s3_max_concurrency: int = 16
+    # Timeout (in seconds) for a single S3 request, `None` means no timeout
+    s3_timeout: Optional[float] = 30.0
 
 
 @attr.s(frozen=True, auto_attribs=True)
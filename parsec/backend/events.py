@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import trio
-from typing import Any, Awaitable, Callable, Union, Type
+from typing import Any, Awaitable, Callable, Dict, Set, Tuple, TypeVar, Union, Type
 from functools import partial
 
 from parsec._parsec import (
@@ -31,182 +31,243 @@ from parsec.api.protocol import (
     InvitationToken,
 )
 from parsec.api.protocol.types import UserProfile
+from parsec.event_bus import EventBus
 from parsec.backend.utils import catch_protocol_errors, api, api_typed_msg_adapter
 from parsec.backend.client_context import AuthenticatedClientContext
 from parsec.backend.realm import BaseRealmComponent
 from parsec.backend.backend_events import BackendEvent
 
 
+K = TypeVar("K")
+
+
+class _EventsSubscriptions:
+    """
+    Index of the clients subscribed to the events, so that an event is only
+    dispatched to the clients concerned by it (instead of having each client
+    filtering all the events of all the organizations).
+    """
+
+    def __init__(self) -> None:
+        self.by_organization: Dict[OrganizationID, Set[AuthenticatedClientContext]] = {}
+        self.by_user: Dict[Tuple[OrganizationID, UserID], Set[AuthenticatedClientContext]] = {}
+        self.by_realm: Dict[Tuple[OrganizationID, RealmID], Set[AuthenticatedClientContext]] = {}
+        self.admins: Set[AuthenticatedClientContext] = set()
+
+    @staticmethod
+    def _index_add(
+        index: Dict[K, Set[AuthenticatedClientContext]],
+        key: K,
+        client_ctx: AuthenticatedClientContext,
+    ) -> None:
+        index.setdefault(key, set()).add(client_ctx)
+
+    @staticmethod
+    def _index_discard(
+        index: Dict[K, Set[AuthenticatedClientContext]],
+        key: K,
+        client_ctx: AuthenticatedClientContext,
+    ) -> None:
+        clients = index.get(key)
+        if clients is None:
+            return
+        clients.discard(client_ctx)
+        if not clients:
+            del index[key]
+
+    def add(self, client_ctx: AuthenticatedClientContext) -> None:
+        self._index_add(self.by_organization, client_ctx.organization_id, client_ctx)
+        self._index_add(self.by_user, (client_ctx.organization_id, client_ctx.user_id), client_ctx)
+        if client_ctx.profile == UserProfile.ADMIN:
+            self.admins.add(client_ctx)
+        for realm_id in client_ctx.realms:
+            self._index_add(self.by_realm, (client_ctx.organization_id, realm_id), client_ctx)
+
+    def remove(self, client_ctx: AuthenticatedClientContext) -> None:
+        self._index_discard(self.by_organization, client_ctx.organization_id, client_ctx)
+        self._index_discard(
+            self.by_user, (client_ctx.organization_id, client_ctx.user_id), client_ctx
+        )
+        self.admins.discard(client_ctx)
+        for realm_id in client_ctx.realms:
+            self._index_discard(self.by_realm, (client_ctx.organization_id, realm_id), client_ctx)
+
+    def add_realm(self, client_ctx: AuthenticatedClientContext, realm_id: RealmID) -> None:
+        client_ctx.realms.add(realm_id)
+        self._index_add(self.by_realm, (client_ctx.organization_id, realm_id), client_ctx)
+
+    def discard_realm(self, client_ctx: AuthenticatedClientContext, realm_id: RealmID) -> None:
+        client_ctx.realms.discard(realm_id)
+        self._index_discard(self.by_realm, (client_ctx.organization_id, realm_id), client_ctx)
+
+    def set_realms(self, client_ctx: AuthenticatedClientContext, realms: Set[RealmID]) -> None:
+        for realm_id in client_ctx.realms - realms:
+            self.discard_realm(client_ctx, realm_id)
+        for realm_id in realms - client_ctx.realms:
+            self.add_realm(client_ctx, realm_id)
+
+
+def _send_event_to_client(
+    client_ctx: AuthenticatedClientContext, event_rep: EventsListenRep
+) -> None:
+    try:
+        client_ctx.send_events_channel.send_nowait(event_rep)
+    except trio.WouldBlock:
+        client_ctx.close_connection_asap()
+
+
 class EventsComponent:
     def __init__(
-        self, realm_component: BaseRealmComponent, send_event: Callable[..., Awaitable[None]]
+        self,
+        realm_component: BaseRealmComponent,
+        send_event: Callable[..., Awaitable[None]],
+        event_bus: EventBus,
     ):
         self._realm_component = realm_component
         self.send = send_event
+        self._subscriptions = _EventsSubscriptions()
 
-    @api("events_subscribe")
-    @catch_protocol_errors
-    @api_typed_msg_adapter(EventsSubscribeReq, EventsSubscribeRep)
-    async def api_events_subscribe(
-        self, client_ctx: AuthenticatedClientContext, msg: dict[str, object]
-    ) -> EventsSubscribeRep:
-        def _on_roles_updated(
-            backend_event: BackendEvent,
-            organization_id: OrganizationID,
-            author: DeviceID,
-            realm_id: RealmID,
-            user: UserID,
-            role: RealmRole,
-        ) -> None:
-            if organization_id != client_ctx.organization_id or user != client_ctx.user_id:
-                return
+        # A single callback per event for all the subscribed clients
+        event_bus.connect(BackendEvent.PINGED, self._on_pinged)  # type: ignore[arg-type]
+        event_bus.connect(
+            BackendEvent.REALM_VLOBS_UPDATED,
+            partial(self._on_realm_events, EventsListenRepOkRealmVlobsUpdated),
+        )
+        event_bus.connect(
+            BackendEvent.REALM_MAINTENANCE_STARTED,
+            partial(self._on_realm_events, EventsListenRepOkRealmMaintenanceStarted),
+        )
+        event_bus.connect(
+            BackendEvent.REALM_MAINTENANCE_FINISHED,
+            partial(self._on_realm_events, EventsListenRepOkRealmMaintenanceFinished),
+        )
+        event_bus.connect(
+            BackendEvent.MESSAGE_RECEIVED, self._on_message_received  # type: ignore[arg-type]
+        )
+        event_bus.connect(
+            BackendEvent.INVITE_STATUS_CHANGED,
+            self._on_invite_status_changed,  # type: ignore[arg-type]
+        )
+        event_bus.connect(
+            BackendEvent.PKI_ENROLLMENTS_UPDATED,
+            self._on_pki_enrollment_updated,  # type: ignore[arg-type]
+        )
+        event_bus.connect(
+            BackendEvent.REALM_ROLES_UPDATED, self._on_roles_updated  # type: ignore[arg-type]
+        )
 
+    def _on_roles_updated(
+        self,
+        backend_event: BackendEvent,
+        organization_id: OrganizationID,
+        author: DeviceID,
+        realm_id: RealmID,
+        user: UserID,
+        role: RealmRole,
+    ) -> None:
+        for client_ctx in tuple(self._subscriptions.by_user.get((organization_id, user), ())):
             if role is None:
-                client_ctx.realms.discard(realm_id)
+                self._subscriptions.discard_realm(client_ctx, realm_id)
             else:
-                client_ctx.realms.add(realm_id)
+                self._subscriptions.add_realm(client_ctx, realm_id)
 
             # Note for this event we don't filter out the ones sent by the client's
             # device, there is two reason for this:
             # 1) A user cannot change it own role, so this case should never occur
             # 2) Returning this event inform the peer we are ready to send it
             #    `realm.vlobs_updated` events on this realm (especially useful during tests)
-            try:
-                client_ctx.send_events_channel.send_nowait(
-                    EventsListenRepOkRealmRolesUpdated(realm_id, role)
-                )
-            except trio.WouldBlock:
-                client_ctx.close_connection_asap()
+            _send_event_to_client(client_ctx, EventsListenRepOkRealmRolesUpdated(realm_id, role))
 
-        def _on_pinged(
-            backend_event: BackendEvent,
-            organization_id: OrganizationID,
-            author: DeviceID,
-            ping: str,
-        ) -> None:
-            if organization_id != client_ctx.organization_id or author == client_ctx.device_id:
-                return
+    def _on_pinged(
+        self,
+        backend_event: BackendEvent,
+        organization_id: OrganizationID,
+        author: DeviceID,
+        ping: str,
+    ) -> None:
+        for client_ctx in self._subscriptions.by_organization.get(organization_id, ()):
+            if client_ctx.device_id != author:
+                _send_event_to_client(client_ctx, EventsListenRepOkPinged(ping))
 
-            try:
-                client_ctx.send_events_channel.send_nowait(EventsListenRepOkPinged(ping))
-            except trio.WouldBlock:
-                client_ctx.close_connection_asap()
-
-        def _on_realm_events(
-            events_listen_rep_cls: Union[
-                Type[EventsListenRepOkRealmVlobsUpdated],
-                Type[EventsListenRepOkRealmMaintenanceStarted],
-                Type[EventsListenRepOkRealmMaintenanceFinished],
-            ],
-            backend_event: BackendEvent,
-            organization_id: OrganizationID,
-            author: DeviceID,
-            realm_id: RealmID,
-            **kwargs: Any,
-        ) -> None:
-            if (
-                organization_id != client_ctx.organization_id
-                or author == client_ctx.device_id
-                or realm_id not in client_ctx.realms
-            ):
-                return
-            try:
-                client_ctx.send_events_channel.send_nowait(
-                    events_listen_rep_cls(realm_id, **kwargs)
-                )
-            except trio.WouldBlock:
-                client_ctx.close_connection_asap()
-
-        def _on_message_received(
-            backend_event: BackendEvent,
-            organization_id: OrganizationID,
-            author: DeviceID,
-            recipient: UserID,
-            index: int,
-        ) -> None:
-            if organization_id != client_ctx.organization_id or recipient != client_ctx.user_id:
-                return
+    def _on_realm_events(
+        self,
+        events_listen_rep_cls: Union[
+            Type[EventsListenRepOkRealmVlobsUpdated],
+            Type[EventsListenRepOkRealmMaintenanceStarted],
+            Type[EventsListenRepOkRealmMaintenanceFinished],
+        ],
+        backend_event: BackendEvent,
+        organization_id: OrganizationID,
+        author: DeviceID,
+        realm_id: RealmID,
+        **kwargs: Any,
+    ) -> None:
+        clients = self._subscriptions.by_realm.get((organization_id, realm_id))
+        if not clients:
+            return
+        event_rep = events_listen_rep_cls(realm_id, **kwargs)
+        for client_ctx in clients:
+            if client_ctx.device_id != author:
+                _send_event_to_client(client_ctx, event_rep)
 
-            try:
-                client_ctx.send_events_channel.send_nowait(EventsListenRepOkMessageReceived(index))
-            except trio.WouldBlock:
-                client_ctx.close_connection_asap()
-
-        def _on_invite_status_changed(
-            backend_event: BackendEvent,
-            organization_id: OrganizationID,
-            greeter: UserID,
-            token: InvitationToken,
-            status: InvitationStatus,
-        ) -> None:
-            if organization_id != client_ctx.organization_id or greeter != client_ctx.user_id:
-                return
+    def _on_message_received(
+        self,
+        backend_event: BackendEvent,
+        organization_id: OrganizationID,
+        author: DeviceID,
+        recipient: UserID,
+        index: int,
+    ) -> None:
+        for client_ctx in self._subscriptions.by_user.get((organization_id, recipient), ()):
+            _send_event_to_client(client_ctx, EventsListenRepOkMessageReceived(index))
 
-            try:
-                client_ctx.send_events_channel.send_nowait(
-                    EventsListenRepOkInviteStatusChanged(token, status)
-                )
-            except trio.WouldBlock:
-                client_ctx.close_connection_asap()
-
-        def _on_pki_enrollment_updated(
-            backend_event: BackendEvent,
-            organization_id: OrganizationID,
-        ) -> None:
-            if (
-                organization_id != client_ctx.organization_id
-                and client_ctx.profile != UserProfile.ADMIN
-            ):
-                return
-            try:
-                client_ctx.send_events_channel.send_nowait(EventsListenRepOkPkiEnrollmentUpdated())
-            except trio.WouldBlock:
-                client_ctx.close_connection_asap()
+    def _on_invite_status_changed(
+        self,
+        backend_event: BackendEvent,
+        organization_id: OrganizationID,
+        greeter: UserID,
+        token: InvitationToken,
+        status: InvitationStatus,
+    ) -> None:
+        for client_ctx in self._subscriptions.by_user.get((organization_id, greeter), ()):
+            _send_event_to_client(client_ctx, EventsListenRepOkInviteStatusChanged(token, status))
 
-        # Command should be idempotent
-        if not client_ctx.events_subscribed:
-            # Connect the new callbacks
-            client_ctx.event_bus_ctx.connect(
-                BackendEvent.PINGED, _on_pinged  # type: ignore[arg-type]
-            )
-            client_ctx.event_bus_ctx.connect(
-                BackendEvent.REALM_VLOBS_UPDATED,
-                partial(_on_realm_events, EventsListenRepOkRealmVlobsUpdated),
-            )
-            client_ctx.event_bus_ctx.connect(
-                BackendEvent.REALM_MAINTENANCE_STARTED,
-                partial(_on_realm_events, EventsListenRepOkRealmMaintenanceStarted),
-            )
-            client_ctx.event_bus_ctx.connect(
-                BackendEvent.REALM_MAINTENANCE_FINISHED,
-                partial(_on_realm_events, EventsListenRepOkRealmMaintenanceFinished),
-            )
-            client_ctx.event_bus_ctx.connect(
-                BackendEvent.MESSAGE_RECEIVED,
-                _on_message_received,  # type: ignore[arg-type]
-            )
-            client_ctx.event_bus_ctx.connect(
-                BackendEvent.INVITE_STATUS_CHANGED,
-                _on_invite_status_changed,  # type: ignore[arg-type]
-            )
+    def _on_pki_enrollment_updated(
+        self,
+        backend_event: BackendEvent,
+        organization_id: OrganizationID,
+    ) -> None:
+        clients = self._subscriptions.by_organization.get(organization_id, set())
+        for client_ctx in clients | self._subscriptions.admins:
+            _send_event_to_client(client_ctx, EventsListenRepOkPkiEnrollmentUpdated())
 
-            client_ctx.event_bus_ctx.connect(
-                BackendEvent.PKI_ENROLLMENTS_UPDATED,
-                _on_pki_enrollment_updated,  # type: ignore[arg-type]
-            )
+    def unsubscribe(self, client_ctx: AuthenticatedClientContext) -> None:
+        """
+        Must be called once the client's connection is closed.
+        """
+        if client_ctx.events_subscribed:
+            self._subscriptions.remove(client_ctx)
+            client_ctx.events_subscribed = False
 
-            # Final event to keep up to date the list of realm we should listen on
-            client_ctx.event_bus_ctx.connect(
-                BackendEvent.REALM_ROLES_UPDATED,
-                _on_roles_updated,  # type: ignore[arg-type]
-            )
+    @api("events_subscribe")
+    @catch_protocol_errors
+    @api_typed_msg_adapter(EventsSubscribeReq, EventsSubscribeRep)
+    async def api_events_subscribe(
+        self, client_ctx: AuthenticatedClientContext, msg: dict[str, object]
+    ) -> EventsSubscribeRep:
+        # Command should be idempotent
+        if not client_ctx.events_subscribed:
+            # Subscribe first so that the roles updated in the meantime are
+            # taken into account...
+            self._subscriptions.add(client_ctx)
+            client_ctx.events_subscribed = True
 
-            # Finally populate the list of realm we should listen on
+            # ...then populate the list of realm we should listen on
             realms_for_user = await self._realm_component.get_realms_for_user(
                 client_ctx.organization_id, client_ctx.user_id
             )
-            client_ctx.realms = set(realms_for_user.keys())
-            client_ctx.events_subscribed = True
+            if client_ctx.events_subscribed:
+                self._subscriptions.set_realms(client_ctx, set(realms_for_user.keys()))
 
         return EventsSubscribeRepOk()
 
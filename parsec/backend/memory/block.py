@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import attr
-from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from parsec._parsec import DateTime
 from parsec.api.protocol import OrganizationID, DeviceID, UserID, RealmID, RealmRole, BlockID
@@ -128,6 +128,41 @@ class MemoryBlockComponent(BaseBlockComponent):
 
         self._blockmetas[(organization_id, block_id)] = BlockMeta(realm_id, len(block), created_on)
 
+    async def create_batch(
+        self,
+        organization_id: OrganizationID,
+        author: DeviceID,
+        realm_id: RealmID,
+        blocks: List[Tuple[BlockID, bytes]],
+        created_on: Optional[DateTime] = None,
+    ) -> None:
+        assert self._blockstore_component is not None
+
+        created_on = created_on or DateTime.now()
+        self._check_realm_write_access(organization_id, realm_id, author.user_id)
+        for block_id, _ in blocks:
+            blockmeta = self._blockmetas.get((organization_id, block_id))
+            if blockmeta and blockmeta.realm_id != realm_id:
+                raise BlockAlreadyExistsError()
+
+        new_blocks = [
+            (block_id, block)
+            for block_id, block in blocks
+            if (organization_id, block_id) not in self._blockmetas
+        ]
+        for block_id, block in new_blocks:
+            await self._blockstore_component.create(organization_id, block_id, block)
+
+        # Blocks created concurrently while uploading cancel the whole batch (as
+        # the PostgreSQL implementation does)
+        if any((organization_id, block_id) in self._blockmetas for block_id, _ in new_blocks):
+            raise BlockAlreadyExistsError()
+
+        for block_id, block in new_blocks:
+            self._blockmetas[(organization_id, block_id)] = BlockMeta(
+                realm_id, len(block), created_on
+            )
+
 
 class MemoryBlockStoreComponent(BaseBlockStoreComponent):
     def __init__(self) -> None:
@@ -53,7 +53,7 @@ async def components_factory(  # type: ignore[misc]
     sequester = MemorySequesterComponent()
     block = MemoryBlockComponent()
     blockstore = blockstore_factory(config.blockstore_config)
-    events = EventsComponent(realm, send_event=_send_event)
+    events = EventsComponent(realm, send_event=_send_event, event_bus=event_bus)
 
     components = {
         "events": events,
@@ -464,7 +464,11 @@ class MemoryVlobComponent(BaseVlobComponent):
         realm = self._check_realm_read_access(
             organization_id, vlob.realm_id, author.user_id, encryption_revision, timestamp
         )
+        return self._read_vlob_version(realm, vlob, version, timestamp)
 
+    def _read_vlob_version(
+        self, realm: "Realm", vlob: Vlob, version: Optional[int], timestamp: Optional[DateTime]
+    ) -> Tuple[int, bytes, DeviceID, DateTime, DateTime]:
         if version is None:
             if timestamp is None:
                 version = vlob.current_version
@@ -485,6 +489,30 @@ class MemoryVlobComponent(BaseVlobComponent):
         except IndexError:
             raise VlobVersionError()
 
+    async def read_batch(
+        self,
+        organization_id: OrganizationID,
+        author: DeviceID,
+        realm_id: RealmID,
+        encryption_revision: int,
+        items: List[Tuple[VlobID, Optional[int], Optional[DateTime]]],
+    ) -> List[Tuple[VlobID, int, bytes, DeviceID, DateTime, DateTime]]:
+        realm = self._check_realm_read_access(
+            organization_id, realm_id, author.user_id, encryption_revision, None
+        )
+
+        result = []
+        for vlob_id, version, timestamp in items:
+            vlob = self._vlobs.get((organization_id, vlob_id))
+            # Vlobs from another realm must not leak through this realm's access check
+            if vlob is None or vlob.realm_id != realm_id:
+                continue
+            try:
+                result.append((vlob_id, *self._read_vlob_version(realm, vlob, version, timestamp)))
+            except VlobVersionError:
+                continue
+        return result
+
     async def update(
         self,
         organization_id: OrganizationID,
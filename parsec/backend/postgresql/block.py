@@ -1,12 +1,13 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) BUSL-1.1 (eventually AGPL-3.0) 2016-present Scille SAS
 from __future__ import annotations
 
-from typing import Optional
+import trio
+from typing import List, Optional, Tuple
 import triopg
 from triopg.exceptions import UniqueViolationError
 
 from parsec._parsec import DateTime
-from parsec.api.protocol import OrganizationID, DeviceID, RealmID, BlockID
+from parsec.api.protocol import OrganizationID, DeviceID, RealmID, BlockID, MaintenanceType
 from parsec.backend.utils import OperationKind
 from parsec.backend.blockstore import BaseBlockStoreComponent
 from parsec.backend.block import (
@@ -19,6 +20,7 @@ from parsec.backend.block import (
     BlockStoreError,
 )
 from parsec.backend.postgresql.handler import PGHandler
+from parsec.utils import open_service_nursery
 from parsec.backend.postgresql.utils import (
     Q,
     q_organization_internal_id,
@@ -26,29 +28,20 @@ from parsec.backend.postgresql.utils import (
     q_user_can_read_vlob,
     q_user_can_write_vlob,
     q_device_internal_id,
-    q_realm,
     q_realm_internal_id,
     q_block,
 )
 from parsec.backend.postgresql.realm_queries.maintenance import get_realm_status, RealmNotFoundError
 
 
-_q_get_realm_id_from_block_id = Q(
+# Realm status, block metadata and read access are fetched in a single
+# statement (hence no need for a transaction) given block read is the most
+# frequent operation on the backend
+_q_get_block_meta_and_realm_status = Q(
     f"""
 SELECT
-    { q_realm(_id="block.realm", select="realm.realm_id") }
-FROM block
-WHERE
-    organization = { q_organization_internal_id("$organization_id") }
-    AND block_id = $block_id
-"""
-)
-
-
-_q_get_block_meta = Q(
-    f"""
-SELECT
-    deleted_on,
+    realm.maintenance_type,
+    block.deleted_on,
     {
         q_user_can_read_vlob(
             user=q_user_internal_id(
@@ -59,9 +52,10 @@ SELECT
         )
     } as has_access
 FROM block
+INNER JOIN realm ON realm._id = block.realm
 WHERE
-    organization = { q_organization_internal_id("$organization_id") }
-    AND block_id = $block_id
+    block.organization = { q_organization_internal_id("$organization_id") }
+    AND block.block_id = $block_id
 """
 )
 
@@ -101,6 +95,57 @@ VALUES (
 )
 
 
+_q_get_block_write_right_and_existing = Q(
+    f"""
+SELECT
+    {
+        q_user_can_write_vlob(
+            organization_id="$organization_id",
+            user_id="$user_id",
+            realm_id="$realm_id"
+        )
+    } as has_access,
+    ARRAY(
+        SELECT block_id
+        FROM block
+        WHERE
+            organization = { q_organization_internal_id("$organization_id") }
+            AND realm = { q_realm_internal_id(organization_id="$organization_id", realm_id="$realm_id") }
+            AND block_id = ANY($block_ids::UUID[])
+    ) as existing,
+    EXISTS(
+        SELECT 1
+        FROM block
+        WHERE
+            organization = { q_organization_internal_id("$organization_id") }
+            AND realm != { q_realm_internal_id(organization_id="$organization_id", realm_id="$realm_id") }
+            AND block_id = ANY($block_ids::UUID[])
+    ) as existing_in_other_realm
+"""
+)
+
+
+_q_insert_blocks = Q(
+    f"""
+INSERT INTO block (organization, block_id, realm, author, size, created_on)
+SELECT
+    { q_organization_internal_id("$organization_id") },
+    item.block_id,
+    { q_realm_internal_id(organization_id="$organization_id", realm_id="$realm_id") },
+    { q_device_internal_id(organization_id="$organization_id", device_id="$author") },
+    item.size,
+    $created_on
+FROM UNNEST($block_ids::UUID[], $sizes::INTEGER[]) AS item(block_id, size)
+ON CONFLICT DO NOTHING
+RETURNING block_id
+"""
+)
+
+
+# Maximum number of concurrent blockstore writes for a single `block_create_batch`
+BLOCK_CREATE_BATCH_CONCURRENCY = 8
+
+
 async def _check_realm(
     conn: triopg._triopg.TrioConnectionProxy,
     organization_id: OrganizationID,
@@ -130,31 +175,33 @@ class PGBlockComponent(BaseBlockComponent):
     async def read(
         self, organization_id: OrganizationID, author: DeviceID, block_id: BlockID
     ) -> bytes:
-        async with self.dbh.pool.acquire() as conn, conn.transaction():
-            realm_id_uuid = await conn.fetchval(
-                *_q_get_realm_id_from_block_id(
-                    organization_id=organization_id.str, block_id=block_id.uuid
-                )
-            )
-            if not realm_id_uuid:
-                raise BlockNotFoundError()
-            realm_id = RealmID(realm_id_uuid)
-            await _check_realm(conn, organization_id, realm_id, OperationKind.DATA_READ)
+        async with self.dbh.pool.acquire() as conn:
             ret = await conn.fetchrow(
-                *_q_get_block_meta(
+                *_q_get_block_meta_and_realm_status(
                     organization_id=organization_id.str,
                     block_id=block_id.uuid,
                     user_id=author.user_id.str,
                 )
             )
-            if not ret or ret["deleted_on"]:
-                raise BlockNotFoundError()
+        if not ret:
+            raise BlockNotFoundError()
 
-            elif not ret["has_access"]:
-                raise BlockAccessError()
+        # Special case of reading while in reencryption is authorized
+        if (
+            ret["maintenance_type"]
+            and MaintenanceType(ret["maintenance_type"]) != MaintenanceType.REENCRYPTION()
+        ):
+            # Access is not allowed while in maintenance
+            raise BlockInMaintenanceError("Data realm is currently under maintenance")
 
-        # We can do the blockstore read outside of the transaction given the block
-        # are never modified/removed
+        if ret["deleted_on"]:
+            raise BlockNotFoundError()
+
+        elif not ret["has_access"]:
+            raise BlockAccessError()
+
+        # We can do the blockstore read once the connection is released given the
+        # block are never modified/removed
         return await self._blockstore_component.read(organization_id, block_id)
 
     async def create(
@@ -221,6 +268,72 @@ class PGBlockComponent(BaseBlockComponent):
             if ret != "INSERT 0 1":
                 raise BlockError(f"Insertion error: {ret}")
 
+    async def create_batch(
+        self,
+        organization_id: OrganizationID,
+        author: DeviceID,
+        realm_id: RealmID,
+        blocks: List[Tuple[BlockID, bytes]],
+        created_on: Optional[DateTime] = None,
+    ) -> None:
+        created_on = created_on or DateTime.now()
+        async with self.dbh.pool.acquire() as conn, conn.transaction():
+            await _check_realm(conn, organization_id, realm_id, OperationKind.DATA_WRITE)
+
+            # 1) Check access rights once for the whole batch, and skip the blocks
+            # that already exist in this realm given blockstore create overwrite
+            # existing data. A block ID already used by another realm is an error:
+            # skipping it would leave the caller's realm referencing a block it
+            # cannot read.
+            ret = await conn.fetchrow(
+                *_q_get_block_write_right_and_existing(
+                    organization_id=organization_id.str,
+                    user_id=author.user_id.str,
+                    realm_id=realm_id.uuid,
+                    block_ids=[block_id.uuid for block_id, _ in blocks],
+                )
+            )
+
+            if not ret["has_access"]:
+                raise BlockAccessError()
+
+            if ret["existing_in_other_realm"]:
+                raise BlockAlreadyExistsError()
+
+            existing = {BlockID(block_id) for block_id in ret["existing"]}
+            new_blocks = {block_id: block for block_id, block in blocks if block_id not in existing}
+            if not new_blocks:
+                return
+
+            # 2) Upload the blocks data in blockstore concurrently (see `create` for
+            # the reasons why it is done before inserting the metadata)
+            limiter = trio.CapacityLimiter(BLOCK_CREATE_BATCH_CONCURRENCY)
+
+            async def _blockstore_create(block_id: BlockID, block: bytes) -> None:
+                async with limiter:
+                    await self._blockstore_component.create(organization_id, block_id, block)
+
+            async with open_service_nursery() as nursery:
+                for block_id, block in new_blocks.items():
+                    nursery.start_soon(_blockstore_create, block_id, block)
+
+            # 3) Insert all the block metadata in a single statement. Blocks created
+            # concurrently in the meantime (possibly in another realm) have had their
+            # data overwritten in step 2), so the whole batch must be cancelled just
+            # like `create` does on unique violation
+            inserted = await conn.fetch(
+                *_q_insert_blocks(
+                    organization_id=organization_id.str,
+                    realm_id=realm_id.uuid,
+                    author=author.str,
+                    block_ids=[block_id.uuid for block_id in new_blocks],
+                    sizes=[len(block) for block in new_blocks.values()],
+                    created_on=created_on,
+                )
+            )
+            if len(inserted) != len(new_blocks):
+                raise BlockAlreadyExistsError()
+
 
 _q_get_block_data = Q(
     """
@@ -54,7 +54,7 @@ async def components_factory(  # type: ignore[misc]
     block = PGBlockComponent(dbh=dbh, blockstore_component=blockstore)
     pki = PGPkiEnrollmentComponent(dbh)
     sequester = PGPSequesterComponent(dbh)
-    events = EventsComponent(realm_component=realm, send_event=_send_event)
+    events = EventsComponent(realm_component=realm, send_event=_send_event, event_bus=event_bus)
 
     components = {
         "events": events,
@@ -21,6 +21,7 @@ from parsec.event_bus import EventBus
 from parsec.serde import SerdeValidationError, SerdePackingError
 from parsec.utils import start_task, TaskStatus
 from parsec.backend.postgresql import migrations as migrations_module
+from parsec.backend.postgresql.realm_access_cache import RealmAccessCache
 from parsec.backend.backend_events import BackendEvent, backend_event_serializer
 
 P = ParamSpec("P")
@@ -185,6 +186,8 @@ class PGHandler:
         self.notification_conn: triopg._triopg.TrioConnectionProxy
         self._task_status: Optional[TaskStatus] = None
         self._connection_lost = False
+        # Kept up to date by the notifications, hence only enabled while listening
+        self.realm_access_cache = RealmAccessCache()
 
     async def init(self, nursery: trio.Nursery) -> None:
         self._task_status = await start_task(nursery, self._run_connections)
@@ -212,10 +215,12 @@ class PGHandler:
                     self._on_notification_conn_termination
                 )
                 await self.notification_conn.add_listener("app_notification", self._on_notification)
+                self.realm_access_cache.enable()
                 task_status.started()
                 try:
                     await trio.sleep_forever()
                 finally:
+                    self.realm_access_cache.disable()
                     if self._connection_lost:
                         raise ConnectionError("PostgreSQL notification query has been lost")
 
@@ -228,6 +233,8 @@ class PGHandler:
     # And the simplest way to do that is to raise a big exception in _run_connections ;-)
     def _on_notification_conn_termination(self, conn: triopg._triopg.TrioConnectionProxy) -> None:
         self._connection_lost = True
+        # Notifications are no longer received, so cache can no longer be trusted
+        self.realm_access_cache.disable()
         if self._task_status:
             self._task_status.cancel()
 
@@ -240,11 +247,19 @@ class PGHandler:
             logger.warning(
                 "Invalid notif received", pid=pid, channel=channel, payload=payload, exc_info=exc
             )
+            # The notification may have been an invalidation
+            self.realm_access_cache.clear()
             return
 
         logger.debug("notif received", pid=pid, channel=channel, payload=payload)
         data.pop("__id__")  # Simply discard the notification id
         signal = data.pop("__signal__")
+        if signal in (
+            BackendEvent.REALM_ROLES_UPDATED,
+            BackendEvent.REALM_MAINTENANCE_STARTED,
+            BackendEvent.REALM_MAINTENANCE_FINISHED,
+        ):
+            self.realm_access_cache.invalidate(data["organization_id"], data["realm_id"])
         self.event_bus.send(signal, **data)
 
     async def teardown(self) -> None:
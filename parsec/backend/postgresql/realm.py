@@ -30,6 +30,8 @@ class PGRealmComponent(BaseRealmComponent):
     ) -> None:
         async with self.dbh.pool.acquire() as conn:
             await query_create(conn, organization_id, self_granted_role)
+        # The notification also invalidates the cache, but it is received asynchronously
+        self.dbh.realm_access_cache.invalidate(organization_id, self_granted_role.realm_id)
 
     async def get_status(
         self, organization_id: OrganizationID, author: DeviceID, realm_id: RealmID
@@ -69,6 +71,7 @@ class PGRealmComponent(BaseRealmComponent):
     ) -> None:
         async with self.dbh.pool.acquire() as conn:
             await query_update_roles(conn, organization_id, new_role, recipient_message)
+        self.dbh.realm_access_cache.invalidate(organization_id, new_role.realm_id)
 
     async def start_reencryption_maintenance(
         self,
@@ -89,6 +92,7 @@ class PGRealmComponent(BaseRealmComponent):
                 per_participant_message,
                 timestamp,
             )
+        self.dbh.realm_access_cache.invalidate(organization_id, realm_id)
 
     async def finish_reencryption_maintenance(
         self,
@@ -101,6 +105,7 @@ class PGRealmComponent(BaseRealmComponent):
             await query_finish_reencryption_maintenance(
                 conn, organization_id, author, realm_id, encryption_revision
             )
+        self.dbh.realm_access_cache.invalidate(organization_id, realm_id)
 
     async def dump_realms_granted_roles(
         self, organization_id: OrganizationID
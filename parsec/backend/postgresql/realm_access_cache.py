@@ -0,0 +1,132 @@
+# Parsec Cloud (https://parsec.cloud) Copyright (c) BUSL-1.1 (eventually AGPL-3.0) 2016-present Scille SAS
+from __future__ import annotations
+
+import attr
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from parsec._parsec import DateTime
+from parsec.api.protocol import OrganizationID, RealmID, UserID, RealmRole
+from parsec.backend.realm import RealmStatus
+
+
+# Current role of a user in a realm along with when it has been granted,
+# both are `None` if the user has never been part of the realm
+CachedRealmRole = Tuple[Optional[RealmRole], Optional[DateTime]]
+
+
+@attr.s(slots=True, auto_attribs=True)
+class _RealmAccessCacheEntry:
+    status: Optional[RealmStatus] = None
+    roles: Dict[UserID, CachedRealmRole] = attr.ib(factory=dict)
+
+
+class RealmAccessCache:
+    """
+    Per-process cache of the realms status and of the users' current role in
+    them, used to skip the related queries on the read operations hot path.
+
+    Realm status and roles are only modified alongside a `REALM_ROLES_UPDATED`,
+    `REALM_MAINTENANCE_STARTED` or `REALM_MAINTENANCE_FINISHED` event, so the
+    cache is invalidated on those events (received through PostgreSQL's
+    LISTEN/NOTIFY, hence from all the backend processes).
+
+    A value fetched from the database may be outdated by the time it is stored
+    (an invalidation may have occurred in the meantime), hence the caller must
+    retrieve the cache generation *before* querying the database and provide
+    it when storing the value: the value is discarded if the generation has
+    changed.
+
+    The cache is disabled (i.e. everything is fetched from the database) as
+    long as the notification connection is not listening.
+    """
+
+    def __init__(self, max_realms: int = 10000):
+        self.max_realms = max_realms
+        self._enabled = False
+        self._generation = 0
+        self._entries: OrderedDict[
+            Tuple[OrganizationID, RealmID], _RealmAccessCacheEntry
+        ] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def enable(self) -> None:
+        self._enabled = True
+
+    def disable(self) -> None:
+        self._enabled = False
+        self.clear()
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+    def invalidate(self, organization_id: OrganizationID, realm_id: RealmID) -> None:
+        self._generation += 1
+        self._entries.pop((organization_id, realm_id), None)
+
+    def _get_entry(
+        self, organization_id: OrganizationID, realm_id: RealmID
+    ) -> Optional[_RealmAccessCacheEntry]:
+        if not self._enabled:
+            return None
+        key = (organization_id, realm_id)
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:
+            return None
+        return self._entries[key]
+
+    def _get_or_create_entry(
+        self, generation: int, organization_id: OrganizationID, realm_id: RealmID
+    ) -> Optional[_RealmAccessCacheEntry]:
+        if not self._enabled or generation != self._generation:
+            return None
+        entry = self._get_entry(organization_id, realm_id)
+        if entry is None:
+            entry = self._entries[(organization_id, realm_id)] = _RealmAccessCacheEntry()
+            if len(self._entries) > self.max_realms:
+                self._entries.popitem(last=False)
+        return entry
+
+    def get_status(
+        self, organization_id: OrganizationID, realm_id: RealmID
+    ) -> Optional[RealmStatus]:
+        entry = self._get_entry(organization_id, realm_id)
+        return entry.status if entry is not None else None
+
+    def set_status(
+        self,
+        generation: int,
+        organization_id: OrganizationID,
+        realm_id: RealmID,
+        status: RealmStatus,
+    ) -> None:
+        entry = self._get_or_create_entry(generation, organization_id, realm_id)
+        if entry is not None:
+            entry.status = status
+
+    def get_role(
+        self, organization_id: OrganizationID, realm_id: RealmID, user_id: UserID
+    ) -> Optional[CachedRealmRole]:
+        entry = self._get_entry(organization_id, realm_id)
+        return entry.roles.get(user_id) if entry is not None else None
+
+    def set_role(
+        self,
+        generation: int,
+        organization_id: OrganizationID,
+        realm_id: RealmID,
+        user_id: UserID,
+        role: CachedRealmRole,
+    ) -> None:
+        entry = self._get_or_create_entry(generation, organization_id, realm_id)
+        if entry is not None:
+            entry.roles[user_id] = role
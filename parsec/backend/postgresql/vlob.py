@@ -21,6 +21,7 @@ from parsec.backend.postgresql.vlob_queries import (
     query_maintenance_save_reencryption_batch,
     query_maintenance_get_reencryption_batch,
     query_read,
+    query_read_batch,
     query_poll_changes,
     query_list_versions,
     query_create,
@@ -164,7 +165,33 @@ class PGVlobComponent(BaseVlobComponent):
     ) -> Tuple[int, bytes, DeviceID, DateTime, DateTime]:
         async with self.dbh.pool.acquire() as conn:
             return await query_read(
-                conn, organization_id, author, encryption_revision, vlob_id, version, timestamp
+                conn,
+                organization_id,
+                author,
+                encryption_revision,
+                vlob_id,
+                version,
+                timestamp,
+                realm_access_cache=self.dbh.realm_access_cache,
+            )
+
+    async def read_batch(
+        self,
+        organization_id: OrganizationID,
+        author: DeviceID,
+        realm_id: RealmID,
+        encryption_revision: int,
+        items: List[Tuple[VlobID, Optional[int], Optional[DateTime]]],
+    ) -> List[Tuple[VlobID, int, bytes, DeviceID, DateTime, DateTime]]:
+        async with self.dbh.pool.acquire() as conn:
+            return await query_read_batch(
+                conn,
+                organization_id,
+                author,
+                realm_id,
+                encryption_revision,
+                items,
+                realm_access_cache=self.dbh.realm_access_cache,
             )
 
     @retry_on_unique_violation
@@ -206,13 +233,26 @@ class PGVlobComponent(BaseVlobComponent):
         self, organization_id: OrganizationID, author: DeviceID, realm_id: RealmID, checkpoint: int
     ) -> Tuple[int, Dict[VlobID, int]]:
         async with self.dbh.pool.acquire() as conn:
-            return await query_poll_changes(conn, organization_id, author, realm_id, checkpoint)
+            return await query_poll_changes(
+                conn,
+                organization_id,
+                author,
+                realm_id,
+                checkpoint,
+                realm_access_cache=self.dbh.realm_access_cache,
+            )
 
     async def list_versions(
         self, organization_id: OrganizationID, author: DeviceID, vlob_id: VlobID
     ) -> Dict[int, Tuple[DateTime, DeviceID]]:
         async with self.dbh.pool.acquire() as conn:
-            return await query_list_versions(conn, organization_id, author, vlob_id)
+            return await query_list_versions(
+                conn,
+                organization_id,
+                author,
+                vlob_id,
+                realm_access_cache=self.dbh.realm_access_cache,
+            )
 
     async def maintenance_get_reencryption_batch(
         self,
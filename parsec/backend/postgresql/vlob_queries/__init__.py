@@ -8,6 +8,7 @@ from parsec.backend.postgresql.vlob_queries.maintenance import (
 )
 from parsec.backend.postgresql.vlob_queries.read import (
     query_read,
+    query_read_batch,
     query_poll_changes,
     query_list_versions,
 )
@@ -17,6 +18,7 @@ __all__ = (
     "query_maintenance_save_reencryption_batch",
     "query_maintenance_get_reencryption_batch",
     "query_read",
+    "query_read_batch",
     "query_poll_changes",
     "query_list_versions",
     "query_create",
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import triopg
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 
 from parsec._parsec import DateTime
 from parsec.api.protocol import OrganizationID, DeviceID, VlobID, RealmID
@@ -20,6 +20,7 @@ from parsec.backend.postgresql.vlob_queries.utils import (
     _check_realm_and_read_access,
     _get_last_role_granted_on,
 )
+from parsec.backend.postgresql.realm_access_cache import RealmAccessCache
 
 
 _q_read_data_without_timestamp = Q(
@@ -99,9 +100,12 @@ async def query_read(
     vlob_id: VlobID,
     version: Optional[int] = None,
     timestamp: Optional[DateTime] = None,
+    realm_access_cache: Optional[RealmAccessCache] = None,
 ) -> Tuple[int, bytes, DeviceID, DateTime, DateTime]:
     realm_id = await _get_realm_id_from_vlob_id(conn, organization_id, vlob_id)
-    await _check_realm_and_read_access(conn, organization_id, author, realm_id, encryption_revision)
+    await _check_realm_and_read_access(
+        conn, organization_id, author, realm_id, encryption_revision, realm_access_cache
+    )
 
     if version is None:
         if timestamp is None:
@@ -147,12 +151,93 @@ async def query_read(
     vlob_author = DeviceID(vlob_author)
 
     author_last_role_granted_on = await _get_last_role_granted_on(
-        conn, organization_id, realm_id, vlob_author
+        conn, organization_id, realm_id, vlob_author, realm_access_cache
     )
     assert isinstance(author_last_role_granted_on, DateTime)
     return version, blob, vlob_author, created_on, author_last_role_granted_on
 
 
+# Each item resolves to its exact version, or to the last version created before
+# its timestamp, or to the last version if neither is provided. Only vlobs from
+# the realm can match given the encryption revision belongs to it.
+_q_read_batch_data = Q(
+    f"""
+SELECT DISTINCT ON (item.position)
+    vlob_atom.vlob_id,
+    vlob_atom.version,
+    vlob_atom.blob,
+    { q_device(_id="vlob_atom.author", select="device_id") } as author,
+    vlob_atom.created_on
+FROM UNNEST($vlob_ids::UUID[], $versions::INTEGER[], $timestamps::TIMESTAMPTZ[])
+    WITH ORDINALITY AS item(vlob_id, version, created_before, position)
+INNER JOIN vlob_atom ON vlob_atom.vlob_id = item.vlob_id
+WHERE
+    vlob_atom.vlob_encryption_revision = {
+        q_vlob_encryption_revision_internal_id(
+            organization_id="$organization_id",
+            realm_id="$realm_id",
+            encryption_revision="$encryption_revision",
+        )
+    }
+    AND (item.version IS NULL OR vlob_atom.version = item.version)
+    AND (item.created_before IS NULL OR vlob_atom.created_on <= item.created_before)
+ORDER BY item.position, vlob_atom.version DESC
+"""
+)
+
+
+@query(in_transaction=True)
+async def query_read_batch(
+    conn: triopg._triopg.TrioConnectionProxy,
+    organization_id: OrganizationID,
+    author: DeviceID,
+    realm_id: RealmID,
+    encryption_revision: int,
+    items: List[Tuple[VlobID, Optional[int], Optional[DateTime]]],
+    realm_access_cache: Optional[RealmAccessCache] = None,
+) -> List[Tuple[VlobID, int, bytes, DeviceID, DateTime, DateTime]]:
+    await _check_realm_and_read_access(
+        conn, organization_id, author, realm_id, encryption_revision, realm_access_cache
+    )
+    if not items:
+        return []
+
+    rows = await conn.fetch(
+        *_q_read_batch_data(
+            organization_id=organization_id.str,
+            realm_id=realm_id.uuid,
+            encryption_revision=encryption_revision,
+            vlob_ids=[vlob_id.uuid for vlob_id, _, _ in items],
+            versions=[version for _, version, _ in items],
+            timestamps=[timestamp for _, _, timestamp in items],
+        )
+    )
+
+    # A batch is typically written by a handful of devices
+    authors_last_role_granted_on: Dict[DeviceID, DateTime] = {}
+    result = []
+    for row in rows:
+        vlob_author = DeviceID(row["author"])
+        author_last_role_granted_on = authors_last_role_granted_on.get(vlob_author)
+        if author_last_role_granted_on is None:
+            author_last_role_granted_on = await _get_last_role_granted_on(
+                conn, organization_id, realm_id, vlob_author, realm_access_cache
+            )
+            assert isinstance(author_last_role_granted_on, DateTime)
+            authors_last_role_granted_on[vlob_author] = author_last_role_granted_on
+        result.append(
+            (
+                VlobID(row["vlob_id"]),
+                row["version"],
+                row["blob"],
+                vlob_author,
+                row["created_on"],
+                author_last_role_granted_on,
+            )
+        )
+    return result
+
+
 _q_poll_changes = Q(
     f"""
 SELECT
@@ -191,8 +276,11 @@ async def query_poll_changes(
     author: DeviceID,
     realm_id: RealmID,
     checkpoint: int,
+    realm_access_cache: Optional[RealmAccessCache] = None,
 ) -> Tuple[int, Dict[VlobID, int]]:
-    await _check_realm_and_read_access(conn, organization_id, author, realm_id, None)
+    await _check_realm_and_read_access(
+        conn, organization_id, author, realm_id, None, realm_access_cache
+    )
 
     ret = await conn.fetch(
         *_q_poll_changes(
@@ -213,9 +301,12 @@ async def query_list_versions(
     organization_id: OrganizationID,
     author: DeviceID,
     vlob_id: VlobID,
+    realm_access_cache: Optional[RealmAccessCache] = None,
 ) -> Dict[int, Tuple[DateTime, DeviceID]]:
     realm_id = await _get_realm_id_from_vlob_id(conn, organization_id, vlob_id)
-    await _check_realm_and_read_access(conn, organization_id, author, realm_id, None)
+    await _check_realm_and_read_access(
+        conn, organization_id, author, realm_id, None, realm_access_cache
+    )
 
     rows = await conn.fetch(
         *_q_list_versions(organization_id=organization_id.str, vlob_id=vlob_id.uuid)
@@ -23,7 +23,26 @@ from parsec.backend.vlob import (
     VlobAccessError,
     VlobRequireGreaterTimestampError,
 )
+from parsec.backend.realm import RealmStatus
 from parsec.backend.postgresql.realm_queries.maintenance import get_realm_status, RealmNotFoundError
+from parsec.backend.postgresql.realm_access_cache import RealmAccessCache, CachedRealmRole
+
+
+async def _get_realm_status(
+    conn: triopg._triopg.TrioConnectionProxy,
+    organization_id: OrganizationID,
+    realm_id: RealmID,
+    realm_access_cache: Optional[RealmAccessCache],
+) -> RealmStatus:
+    if realm_access_cache is None:
+        return await get_realm_status(conn, organization_id, realm_id)
+
+    status = realm_access_cache.get_status(organization_id, realm_id)
+    if status is None:
+        generation = realm_access_cache.generation
+        status = await get_realm_status(conn, organization_id, realm_id)
+        realm_access_cache.set_status(generation, organization_id, realm_id, status)
+    return status
 
 
 async def _check_realm(
@@ -32,10 +51,11 @@ async def _check_realm(
     realm_id: RealmID,
     encryption_revision: Optional[int],
     operation_kind: OperationKind,
+    realm_access_cache: Optional[RealmAccessCache] = None,
 ) -> None:
     # Get the current realm status
     try:
-        status = await get_realm_status(conn, organization_id, realm_id)
+        status = await _get_realm_status(conn, organization_id, realm_id, realm_access_cache)
     except RealmNotFoundError as exc:
         raise VlobRealmNotFoundError(*exc.args) from exc
 
@@ -93,27 +113,56 @@ WHERE user_._id = { q_user_internal_id(organization_id="$organization_id", user_
 )
 
 
-async def _check_realm_access(
+async def _get_realm_role(
     conn: triopg._triopg.TrioConnectionProxy,
     organization_id: OrganizationID,
     realm_id: RealmID,
     author: DeviceID,
-    allowed_roles: Tuple[RealmRole, ...],
-) -> DateTime:
+    realm_access_cache: Optional[RealmAccessCache],
+) -> Optional[CachedRealmRole]:
+    """
+    Returns `None` if the user doesn't exist
+    """
+    if realm_access_cache is not None:
+        cached = realm_access_cache.get_role(organization_id, realm_id, author.user_id)
+        if cached is not None:
+            return cached
+        generation = realm_access_cache.generation
+
     rep = await conn.fetchrow(
         *_q_check_realm_access(
             organization_id=organization_id.str, realm_id=realm_id.uuid, user_id=author.user_id.str
         )
     )
+    if not rep:
+        return None
+
+    role = RealmRole.from_str(rep[0]) if rep[0] is not None else None
+    if realm_access_cache is not None:
+        realm_access_cache.set_role(
+            generation, organization_id, realm_id, author.user_id, (role, rep[1])
+        )
+    return role, rep[1]
+
+
+async def _check_realm_access(
+    conn: triopg._triopg.TrioConnectionProxy,
+    organization_id: OrganizationID,
+    realm_id: RealmID,
+    author: DeviceID,
+    allowed_roles: Tuple[RealmRole, ...],
+    realm_access_cache: Optional[RealmAccessCache] = None,
+) -> DateTime:
+    rep = await _get_realm_role(conn, organization_id, realm_id, author, realm_access_cache)
 
     if not rep:
         raise VlobNotFoundError(f"User `{author.user_id.str}` doesn't exist")
 
-    role = RealmRole.from_str(rep[0]) if rep[0] is not None else None
+    role, role_granted_on = rep
     if role not in allowed_roles:
         raise VlobAccessError()
 
-    role_granted_on = rep[1]
+    assert role_granted_on is not None
     return role_granted_on
 
 
@@ -123,12 +172,20 @@ async def _check_realm_and_read_access(
     author: DeviceID,
     realm_id: RealmID,
     encryption_revision: Optional[int],
+    realm_access_cache: Optional[RealmAccessCache] = None,
 ) -> None:
     await _check_realm(
-        conn, organization_id, realm_id, encryption_revision, OperationKind.DATA_READ
+        conn,
+        organization_id,
+        realm_id,
+        encryption_revision,
+        OperationKind.DATA_READ,
+        realm_access_cache,
     )
     can_read_roles = (RealmRole.OWNER, RealmRole.MANAGER, RealmRole.CONTRIBUTOR, RealmRole.READER)
-    await _check_realm_access(conn, organization_id, realm_id, author, can_read_roles)
+    await _check_realm_access(
+        conn, organization_id, realm_id, author, can_read_roles, realm_access_cache
+    )
 
 
 async def _check_realm_and_write_access(
@@ -189,10 +246,7 @@ async def _get_last_role_granted_on(
     organization_id: OrganizationID,
     realm_id: RealmID,
     author: DeviceID,
+    realm_access_cache: Optional[RealmAccessCache] = None,
 ) -> Optional[DateTime]:
-    rep = await conn.fetchrow(
-        *_q_check_realm_access(
-            organization_id=organization_id.str, realm_id=realm_id.uuid, user_id=author.user_id.str
-        )
-    )
+    rep = await _get_realm_role(conn, organization_id, realm_id, author, realm_access_cache)
     return None if rep is None else rep[1]
@@ -1,26 +1,129 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) BUSL-1.1 (eventually AGPL-3.0) 2016-present Scille SAS
 from __future__ import annotations
 
+import struct
+from hashlib import blake2b
 from typing import List
 from uuid import UUID
+from structlog import get_logger
 
 from parsec.api.protocol import OrganizationID, BlockID
+from parsec.backend.block import BlockStoreError
 from parsec.backend.blockstore import BaseBlockStoreComponent
 
 
+logger = get_logger()
+
+
+def get_modulo_owner(block_id: UUID, nodes_count: int) -> int:
+    return block_id.int % nodes_count
+
+
+def get_rendezvous_ranking(block_id: UUID, nodes_count: int) -> List[int]:
+    """
+    Rendezvous (a.k.a. highest random weight) hashing: each node gets a score
+    for the block, the node with the highest score owns the block.
+
+    Adding a node only moves the blocks for which the new node gets the
+    highest score (i.e. about `1 / nodes_count` of them) and each moved block
+    was previously owned by the node now ranking second. Note nodes are
+    identified by their index, hence new nodes must always be appended.
+    """
+
+    def _score(node_index: int) -> bytes:
+        return blake2b(block_id.bytes + struct.pack("!I", node_index), digest_size=8).digest()
+
+    return sorted(range(nodes_count), key=_score, reverse=True)
+
+
+def get_rendezvous_owner(block_id: UUID, nodes_count: int) -> int:
+    return get_rendezvous_ranking(block_id, nodes_count)[0]
+
+
 class RAID0BlockStoreComponent(BaseBlockStoreComponent):
-    def __init__(self, blockstores: List[BaseBlockStoreComponent]):
+    def __init__(
+        self, blockstores: List[BaseBlockStoreComponent], rendezvous_hashing: bool = False
+    ):
         self.blockstores = blockstores
+        self.rendezvous_hashing = rendezvous_hashing
+        self._logger = logger.bind(blockstore_type="RAID0", rendezvous_hashing=rendezvous_hashing)
 
     def _get_blockstore(self, block_id: UUID) -> BaseBlockStoreComponent:
-        return self.blockstores[block_id.int % len(self.blockstores)]
+        if self.rendezvous_hashing:
+            return self.blockstores[get_rendezvous_owner(block_id, len(self.blockstores))]
+        else:
+            return self.blockstores[get_modulo_owner(block_id, len(self.blockstores))]
 
     async def read(self, organization_id: OrganizationID, block_id: BlockID) -> bytes:
-        blockstore = self._get_blockstore(block_id.uuid)
-        return await blockstore.read(organization_id, block_id)
+        if not self.rendezvous_hashing:
+            blockstore = self._get_blockstore(block_id.uuid)
+            return await blockstore.read(organization_id, block_id)
+
+        # The block may not have been moved to its owner yet if nodes have been
+        # recently added (see `parsec backend rebalance_blockstore`), in such
+        # case it is on the owner in the previous layout, that is on a node with
+        # a lower rank.
+        for node_index in get_rendezvous_ranking(block_id.uuid, len(self.blockstores)):
+            try:
+                return await self.blockstores[node_index].read(organization_id, block_id)
+            except BlockStoreError:
+                pass
+
+        self._logger.warning(
+            "Block read error: All nodes have failed",
+            organization_id=organization_id.str,
+            block_id=block_id.str,
+        )
+        raise BlockStoreError("All RAID0 nodes have failed")
 
     async def create(
         self, organization_id: OrganizationID, block_id: BlockID, block: bytes
     ) -> None:
         blockstore = self._get_blockstore(block_id.uuid)
         await blockstore.create(organization_id, block_id, block)
+
+    async def move_block(
+        self,
+        organization_id: OrganizationID,
+        block_id: BlockID,
+        previous_nodes_count: int,
+        previous_rendezvous_hashing: bool = True,
+    ) -> bool:
+        """
+        Copy the block from its owner in the previous layout (i.e. only the
+        first `previous_nodes_count` nodes, placed with rendezvous hashing or
+        modulo) to its owner in the current layout.
+
+        Returns False if the block doesn't need to be moved (including when it
+        has been created after the switch to the current layout, hence is
+        already on its owner).
+
+        Raises:
+            BlockStoreError
+        """
+        assert self.rendezvous_hashing
+        assert 0 < previous_nodes_count <= len(self.blockstores)
+        if previous_rendezvous_hashing:
+            previous_owner = get_rendezvous_owner(block_id.uuid, previous_nodes_count)
+        else:
+            previous_owner = get_modulo_owner(block_id.uuid, previous_nodes_count)
+        owner = get_rendezvous_owner(block_id.uuid, len(self.blockstores))
+        if owner == previous_owner:
+            return False
+
+        try:
+            block = await self.blockstores[previous_owner].read(organization_id, block_id)
+        except BlockStoreError:
+            # The backend keeps running during the rebalance, so the block may
+            # have been created directly on its owner in the current layout
+            try:
+                await self.blockstores[owner].read(organization_id, block_id)
+            except BlockStoreError:
+                pass
+            else:
+                return False
+            raise
+
+        # Create is idempotent, so moving the same block twice is not an issue
+        await self.blockstores[owner].create(organization_id, block_id, block)
+        return True
@@ -1,7 +1,9 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) BUSL-1.1 (eventually AGPL-3.0) 2016-present Scille SAS
 from __future__ import annotations
 
-from typing import List
+import trio
+from collections import deque
+from typing import Deque, List, Optional
 from trio import CancelScope, Nursery
 from structlog import get_logger
 
@@ -14,17 +16,137 @@ from parsec.backend.blockstore import BaseBlockStoreComponent
 logger = get_logger()
 
 
+# Number of latency samples kept per node
+LATENCY_SAMPLES_WINDOW = 100
+# Minimum number of samples before using the node's latency percentile as hedge delay
+LATENCY_MIN_SAMPLES = 10
+# Smoothing factor for the latency moving average
+LATENCY_EWMA_ALPHA = 0.2
+# Latency (in seconds) added to the moving average of a node when a read fails on it
+LATENCY_ERROR_PENALTY = 1.0
+
+
+class NodeLatencyStats:
+    def __init__(self) -> None:
+        self.samples: Deque[float] = deque(maxlen=LATENCY_SAMPLES_WINDOW)
+        self.ewma: Optional[float] = None
+
+    def record(self, latency: float) -> None:
+        self.samples.append(latency)
+        if self.ewma is None:
+            self.ewma = latency
+        else:
+            self.ewma += LATENCY_EWMA_ALPHA * (latency - self.ewma)
+
+    def record_outrun(self, elapsed: float) -> None:
+        # The read has been cancelled given another node has been faster, so the
+        # node's latency is only known to be higher than `elapsed`. Such a sample
+        # would drag the percentile (i.e. the hedge delay) down, hence only the
+        # moving average used to order the nodes is updated
+        self.ewma = max(self.ewma or 0.0, elapsed)
+
+    def record_error(self) -> None:
+        # Penalize the node so it is no longer chosen first, successful reads
+        # will then progressively bring back its moving average
+        self.ewma = (self.ewma or 0.0) + LATENCY_ERROR_PENALTY
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        if len(self.samples) < LATENCY_MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return ordered[index]
+
+
 class RAID1BlockStoreComponent(BaseBlockStoreComponent):
+    """
+    By default a read is done on every node concurrently, the first one to
+    return wins and the other ones get cancelled.
+
+    With `hedged_read` a read is first done on the node with the lowest
+    latency moving average. If it hasn't returned after a hedge delay (the
+    node's `hedged_read_percentile` latency percentile if enough samples have
+    been collected, `hedged_read_delay` otherwise) or if it has failed, the
+    next fastest node is also tried, and so on. This way a read typically
+    costs a single request to the nodes, while tail latency stays low.
+    """
+
     def __init__(
         self,
         blockstores: List[BaseBlockStoreComponent],
         partial_create_ok: bool = False,
+        hedged_read: bool = False,
+        hedged_read_delay: float = 0.1,
+        hedged_read_percentile: Optional[float] = 95,
     ):
         self.blockstores = blockstores
         self._partial_create_ok = partial_create_ok
+        self._hedged_read = hedged_read
+        self._hedged_read_delay = hedged_read_delay
+        self._hedged_read_percentile = hedged_read_percentile
+        self.latency_stats = [NodeLatencyStats() for _ in blockstores]
         self._logger = logger.bind(blockstore_type="RAID1", partial_create_ok=partial_create_ok)
 
+    def _get_nodes_by_speed(self) -> List[int]:
+        # Nodes without stats yet are tried first so that they get some
+        return sorted(range(len(self.blockstores)), key=lambda i: self.latency_stats[i].ewma or 0.0)
+
+    def _get_hedge_delay(self, node_index: int) -> float:
+        if self._hedged_read_percentile is not None:
+            delay = self.latency_stats[node_index].percentile(self._hedged_read_percentile)
+            if delay is not None:
+                return delay
+        return self._hedged_read_delay
+
     async def read(self, organization_id: OrganizationID, block_id: BlockID) -> bytes:
+        if self._hedged_read:
+            return await self._hedged_read_block(organization_id, block_id)
+        else:
+            return await self._fan_out_read_block(organization_id, block_id)
+
+    async def _hedged_read_block(self, organization_id: OrganizationID, block_id: BlockID) -> bytes:
+        value = None
+
+        async def _single_blockstore_read(
+            nursery: Nursery, node_index: int, done: trio.Event
+        ) -> None:
+            nonlocal value
+            stats = self.latency_stats[node_index]
+            started_at = trio.current_time()
+            try:
+                value = await self.blockstores[node_index].read(organization_id, block_id)
+                stats.record(trio.current_time() - started_at)
+                nursery.cancel_scope.cancel()
+            except BlockStoreError:
+                stats.record_error()
+            except trio.Cancelled:
+                stats.record_outrun(trio.current_time() - started_at)
+                raise
+            finally:
+                done.set()
+
+        async with open_service_nursery() as nursery:
+            for node_index in self._get_nodes_by_speed():
+                done = trio.Event()
+                nursery.start_soon(_single_blockstore_read, nursery, node_index, done)
+                # Wait for the read to fail or to be too slow before hedging
+                # with the next node (success cancels the whole nursery)
+                with trio.move_on_after(self._get_hedge_delay(node_index)):
+                    await done.wait()
+
+        if not value:
+            self._logger.warning(
+                "Block read error: All nodes have failed",
+                organization_id=organization_id.str,
+                block_id=block_id.str,
+            )
+            raise BlockStoreError("All RAID1 nodes have failed")
+
+        return value
+
+    async def _fan_out_read_block(
+        self, organization_id: OrganizationID, block_id: BlockID
+    ) -> bytes:
         value = None
 
         async def _single_blockstore_read(
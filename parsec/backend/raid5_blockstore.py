@@ -13,10 +13,16 @@ from parsec.backend.block import BlockStoreError
 from parsec.backend.blockstore import BaseBlockStoreComponent
 
 
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type: ignore[assignment]
+
+
 logger = get_logger()
 
 
-def _xor_buffers(*buffers: bytes) -> bytes:
+def _xor_buffers_with_int(*buffers: bytes) -> bytes:
     buff_len = len(buffers[0])
     xored = int.from_bytes(buffers[0], byteorder)
     for buff in buffers[1:]:
@@ -25,16 +31,36 @@ def _xor_buffers(*buffers: bytes) -> bytes:
     return xored.to_bytes(buff_len, byteorder)
 
 
+def _xor_buffers_with_numpy(*buffers: bytes) -> bytes:
+    # `frombuffer` provides a view on the buffer, so the only copies are the
+    # initial accumulator and the final conversion to bytes
+    xored = numpy.frombuffer(buffers[0], dtype=numpy.uint8).copy()
+    for buff in buffers[1:]:
+        assert len(buff) == len(xored)
+        numpy.bitwise_xor(xored, numpy.frombuffer(buff, dtype=numpy.uint8), out=xored)
+    return xored.tobytes()
+
+
+# XOR with Python integers is the default: the buffers are XORed word by word
+# in C, which is much faster than any loop over a memoryview or an array. Numpy
+# is an optional fast path (about ten times faster on 64KB blocks) used when it
+# is installed alongside the backend (see `tests/scripts/bench_raid5.py`)
+_xor_buffers = _xor_buffers_with_numpy if numpy is not None else _xor_buffers_with_int
+
+
 def split_block_in_chunks(block: bytes, nb_chunks: int) -> List[bytes]:
     payload_size = len(block) + 4  # encode block len as a uint32
     chunk_len = payload_size // nb_chunks
     if nb_chunks * chunk_len < payload_size:
         chunk_len += 1
-    padding_len = chunk_len * nb_chunks - payload_size
 
-    payload = struct.pack("!I", len(block)) + block + b"\x00" * padding_len
+    # Build the payload in place (padding being the zero-initialized tail)
+    payload = bytearray(chunk_len * nb_chunks)
+    struct.pack_into("!I", payload, 0, len(block))
+    payload[4:payload_size] = block
 
-    return [payload[chunk_len * i : chunk_len * (i + 1)] for i in range(nb_chunks)]
+    view = memoryview(payload)
+    return [bytes(view[chunk_len * i : chunk_len * (i + 1)]) for i in range(nb_chunks)]
 
 
 def generate_checksum_chunk(chunks: List[bytes]) -> bytes:
@@ -54,9 +80,22 @@ def rebuild_block_from_chunks(
         pass
     # By now, all chunks are valid
     chunks: List[bytes]
-    payload = b"".join(chunks)
-    (block_len,) = struct.unpack("!I", payload[:4])
-    return payload[4 : 4 + block_len]
+    if len(chunks[0]) >= 4:
+        (block_len,) = struct.unpack_from("!I", chunks[0])
+    else:
+        # Invalid chunk, the resulting block will be detected as invalid by the client
+        (block_len,) = struct.unpack_from("!I", b"".join(chunks))
+
+    # Only copy the block data (i.e. skip the size header and the padding)
+    parts = []
+    offset = -4
+    for chunk in chunks:
+        start = max(0, -offset)
+        end = min(len(chunk), block_len - offset)
+        if start < end:
+            parts.append(memoryview(chunk)[start:end])
+        offset += len(chunk)
+    return b"".join(parts)
 
 
 class RAID5BlockStoreComponent(BaseBlockStoreComponent):
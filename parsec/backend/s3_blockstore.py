@@ -3,9 +3,11 @@ from __future__ import annotations
 
 import trio
 import boto3
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import BotoCoreError, ClientError
 from structlog import get_logger
 from functools import partial
+from typing import Any, Callable, TypeVar
 
 from parsec.api.protocol import OrganizationID, BlockID
 from parsec.backend.block import BlockStoreError
@@ -14,6 +16,11 @@ from parsec.backend.blockstore import BaseBlockStoreComponent
 
 logger = get_logger()
 
+T = TypeVar("T")
+
+DEFAULT_S3_MAX_CONCURRENCY = 16
+DEFAULT_S3_TIMEOUT = 30.0
+
 
 def build_s3_slug(organization_id: OrganizationID, block_id: BlockID) -> str:
     # The slug uses the UUID canonical textual representation (eg.
@@ -23,6 +30,18 @@ def build_s3_slug(organization_id: OrganizationID, block_id: BlockID) -> str:
 
 
 class S3BlockStoreComponent(BaseBlockStoreComponent):
+    """
+    boto3 is a synchronous library, hence each S3 request is run in a worker
+    thread so that a slow request doesn't block the trio event loop (and all
+    the other clients served by this process along with it).
+
+    The number of in-flight requests is bounded by `max_concurrency`: it limits
+    both the worker threads used and the size of boto3's HTTP connection pool.
+    Each request is also subject to `timeout` (used both as botocore's socket
+    timeout and as an overall deadline on the request), a request reaching it
+    is considered as failed.
+    """
+
     def __init__(
         self,
         s3_region: str,
@@ -30,26 +49,53 @@ class S3BlockStoreComponent(BaseBlockStoreComponent):
         s3_key: str,
         s3_secret: str,
         s3_endpoint_url: str | None = None,
+        max_concurrency: int = DEFAULT_S3_MAX_CONCURRENCY,
+        timeout: float | None = DEFAULT_S3_TIMEOUT,
     ):
+        if max_concurrency < 1:
+            raise ValueError("S3 max concurrency must be at least 1")
         self._s3 = None
         self._s3_bucket = None
+        boto_config_kwargs: dict[str, Any] = {"max_pool_connections": max_concurrency}
+        if timeout is not None:
+            boto_config_kwargs["connect_timeout"] = timeout
+            boto_config_kwargs["read_timeout"] = timeout
         self._s3 = boto3.client(
             "s3",
             region_name=s3_region,
             aws_access_key_id=s3_key,
             aws_secret_access_key=s3_secret,
             endpoint_url=s3_endpoint_url,
+            config=BotoConfig(**boto_config_kwargs),
         )
         self._s3_bucket = s3_bucket
         self._s3.head_bucket(Bucket=s3_bucket)
+        self._timeout = timeout
+        self._limiter = trio.CapacityLimiter(max_concurrency)
         self._logger = logger.bind(blockstore_type="S3", s3_region=s3_region, s3_bucket=s3_bucket)
 
+    async def _run_in_thread(self, fn: Callable[[], T]) -> T:
+        # Given `cancellable=True`, a timed out request lets the trio task go
+        # right away. The worker thread keeps its limiter token until boto3
+        # returns however, so the number of threads stays bounded.
+        if self._timeout is None:
+            return await trio.to_thread.run_sync(fn, limiter=self._limiter, cancellable=True)
+        with trio.move_on_after(self._timeout) as cancel_scope:
+            return await trio.to_thread.run_sync(fn, limiter=self._limiter, cancellable=True)
+        assert cancel_scope.cancelled_caught
+        raise TimeoutError(f"S3 request has timed out after {self._timeout}s")
+
+    def _sync_read(self, slug: str) -> bytes:
+        assert self._s3 is not None
+        obj = self._s3.get_object(Bucket=self._s3_bucket, Key=slug)
+        # Reading the body is where most of the network I/O occurs
+        return obj["Body"].read()
+
     async def read(self, organization_id: OrganizationID, block_id: BlockID) -> bytes:
         slug = build_s3_slug(organization_id=organization_id, block_id=block_id)
         try:
-            assert self._s3 is not None
-            obj = self._s3.get_object(Bucket=self._s3_bucket, Key=slug)
-        except (BotoCoreError, ClientError) as exc:
+            return await self._run_in_thread(partial(self._sync_read, slug))
+        except (BotoCoreError, ClientError, TimeoutError) as exc:
             self._logger.warning(
                 "Block read error",
                 organization_id=organization_id.str,
@@ -58,18 +104,16 @@ class S3BlockStoreComponent(BaseBlockStoreComponent):
             )
             raise BlockStoreError(exc) from exc
 
-        return obj["Body"].read()
-
     async def create(
         self, organization_id: OrganizationID, block_id: BlockID, block: bytes
     ) -> None:
         slug = build_s3_slug(organization_id=organization_id, block_id=block_id)
         try:
             assert self._s3 is not None
-            await trio.to_thread.run_sync(
+            await self._run_in_thread(
                 partial(self._s3.put_object, Bucket=self._s3_bucket, Key=slug, Body=block)
             )
-        except (BotoCoreError, ClientError) as exc:
+        except (BotoCoreError, ClientError, TimeoutError) as exc:
             self._logger.warning(
                 "Block create error",
                 organization_id=organization_id.str,
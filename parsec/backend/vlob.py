@@ -36,6 +36,14 @@ from parsec._parsec import (
     VlobReadRepBadVersion,
     VlobReadRepBadEncryptionRevision,
     VlobReadRepInMaintenance,
+    VlobReadBatchReq,
+    VlobReadBatchRep,
+    VlobReadBatchRepOk,
+    VlobReadBatchRepNotFound,
+    VlobReadBatchRepNotAllowed,
+    VlobReadBatchRepBadEncryptionRevision,
+    VlobReadBatchRepInMaintenance,
+    VlobReadBatchRepItem,
     VlobUpdateReq,
     VlobUpdateRep,
     VlobUpdateRepOk,
@@ -365,6 +373,49 @@ class BaseVlobComponent:
             author_last_role_granted_on,
         )
 
+    @api("vlob_read_batch")
+    @catch_protocol_errors
+    @api_typed_msg_adapter(VlobReadBatchReq, VlobReadBatchRep)
+    async def api_vlob_read_batch(
+        self, client_ctx: AuthenticatedClientContext, req: VlobReadBatchReq
+    ) -> VlobReadBatchRep:
+        try:
+            items = await self.read_batch(
+                client_ctx.organization_id,
+                client_ctx.device_id,
+                realm_id=req.realm_id,
+                encryption_revision=req.encryption_revision,
+                items=[(item.vlob_id, item.version, item.timestamp) for item in req.items],
+            )
+
+        except (VlobNotFoundError, VlobRealmNotFoundError):
+            return VlobReadBatchRepNotFound(None)
+
+        except VlobAccessError:
+            return VlobReadBatchRepNotAllowed()
+
+        except VlobEncryptionRevisionError:
+            return VlobReadBatchRepBadEncryptionRevision()
+
+        except VlobInMaintenanceError:
+            return VlobReadBatchRepInMaintenance()
+
+        return VlobReadBatchRepOk(
+            [
+                VlobReadBatchRepItem(
+                    vlob_id, version, blob, author, created_on, author_last_role_granted_on
+                )
+                for (
+                    vlob_id,
+                    version,
+                    blob,
+                    author,
+                    created_on,
+                    author_last_role_granted_on,
+                ) in items
+            ]
+        )
+
     @api("vlob_update")
     @catch_protocol_errors
     @api_typed_msg_adapter(VlobUpdateReq, VlobUpdateRep)
@@ -607,6 +658,29 @@ class BaseVlobComponent:
         """
         raise NotImplementedError()
 
+    async def read_batch(
+        self,
+        organization_id: OrganizationID,
+        author: DeviceID,
+        realm_id: RealmID,
+        encryption_revision: int,
+        items: List[Tuple[VlobID, Optional[int], Optional[DateTime]]],
+    ) -> List[Tuple[VlobID, int, bytes, DeviceID, DateTime, DateTime]]:
+        """
+        Read multiple vlobs of the same realm at once, each item being a
+        `(vlob_id, version, timestamp)` tuple with the same meaning as in `read`.
+
+        Vlobs that don't exist in the realm (or not at the requested version)
+        are omitted from the result instead of failing the whole batch.
+
+        Raises:
+            VlobAccessError
+            VlobRealmNotFoundError
+            VlobEncryptionRevisionError: if encryption_revision mismatch
+            VlobInMaintenanceError
+        """
+        raise NotImplementedError()
+
     async def update(
         self,
         organization_id: OrganizationID,
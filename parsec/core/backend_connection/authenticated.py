@@ -131,10 +131,12 @@ class BackendAuthenticatedCmds:
     invite_3b_greeter_signify_trust = expose_cmds_with_retrier(cmds.invite_3b_greeter_signify_trust)
     invite_4_greeter_communicate = expose_cmds_with_retrier(cmds.invite_4_greeter_communicate)
     block_create = expose_cmds_with_retrier(cmds.block_create)
+    block_create_batch = expose_cmds_with_retrier(cmds.block_create_batch)
     block_read = expose_cmds_with_retrier(cmds.block_read)
     vlob_poll_changes = expose_cmds_with_retrier(cmds.vlob_poll_changes)
     vlob_create = expose_cmds_with_retrier(cmds.vlob_create)
     vlob_read = expose_cmds_with_retrier(cmds.vlob_read)
+    vlob_read_batch = expose_cmds_with_retrier(cmds.vlob_read_batch)
     vlob_update = expose_cmds_with_retrier(cmds.vlob_update)
     vlob_list_versions = expose_cmds_with_retrier(cmds.vlob_list_versions)
     vlob_maintenance_get_reencryption_batch = expose_cmds_with_retrier(
@@ -9,6 +9,9 @@ from parsec._parsec import (
     AuthenticatedPingRepUnknownStatus,
     BlockCreateRep,
     BlockCreateRepUnknownStatus,
+    BlockCreateBatchRep,
+    BlockCreateBatchRepUnknownStatus,
+    BlockCreateBatchReqItem,
     BlockReadRep,
     BlockReadRepUnknownStatus,
     DateTime,
@@ -98,6 +101,9 @@ from parsec._parsec import (
     VlobPollChangesRepUnknownStatus,
     VlobReadRep,
     VlobReadRepUnknownStatus,
+    VlobReadBatchRep,
+    VlobReadBatchRepUnknownStatus,
+    VlobReadBatchReqItem,
     VlobUpdateRep,
     VlobUpdateRepBadTimestamp,
     VlobUpdateRepUnknownStatus,
@@ -141,6 +147,7 @@ from parsec.api.protocol import (
     events_listen_serializer,
     message_get_serializer,
     vlob_read_serializer,
+    vlob_read_batch_serializer,
     vlob_create_serializer,
     vlob_update_serializer,
     vlob_poll_changes_serializer,
@@ -154,6 +161,7 @@ from parsec.api.protocol import (
     realm_start_reencryption_maintenance_serializer,
     realm_finish_reencryption_maintenance_serializer,
     block_create_serializer,
+    block_create_batch_serializer,
     block_read_serializer,
     user_get_serializer,
     human_find_serializer,
@@ -175,6 +183,7 @@ COMMAND_RETURN_TYPE = Union[
     dict[str, object],
     AuthenticatedPingRep,
     BlockCreateRep,
+    BlockCreateBatchRep,
     BlockReadRep,
     EventsListenRep,
     EventsSubscribeRep,
@@ -218,6 +227,7 @@ COMMAND_RETURN_TYPE = Union[
     VlobMaintenanceSaveReencryptionBatchRep,
     VlobPollChangesRep,
     VlobReadRep,
+    VlobReadBatchRep,
     VlobUpdateRep,
 ]
 
@@ -279,6 +289,7 @@ async def _send_cmd(
         (
             AuthenticatedPingRep,
             BlockCreateRep,
+            BlockCreateBatchRep,
             BlockReadRep,
             EventsListenRep,
             EventsSubscribeRep,
@@ -322,6 +333,7 @@ async def _send_cmd(
             VlobMaintenanceSaveReencryptionBatchRep,
             VlobPollChangesRep,
             VlobReadRep,
+            VlobReadBatchRep,
             VlobUpdateRep,
         ),
     ):
@@ -330,6 +342,7 @@ async def _send_cmd(
             (
                 AuthenticatedPingRepUnknownStatus,
                 BlockCreateRepUnknownStatus,
+                BlockCreateBatchRepUnknownStatus,
                 BlockReadRepUnknownStatus,
                 DeviceCreateRepUnknownStatus,
                 EventsListenRepUnknownStatus,
@@ -371,6 +384,7 @@ async def _send_cmd(
                 VlobMaintenanceSaveReencryptionBatchRepUnknownStatus,
                 VlobPollChangesRepUnknownStatus,
                 VlobReadRepUnknownStatus,
+                VlobReadBatchRepUnknownStatus,
                 VlobUpdateRepUnknownStatus,
             ),
         ):
@@ -516,6 +530,25 @@ async def vlob_read(
     )
 
 
+async def vlob_read_batch(
+    transport: Transport,
+    realm_id: RealmID,
+    encryption_revision: int,
+    items: List[Tuple[VlobID, Optional[int], Optional[DateTime]]],
+) -> VlobReadBatchRep:
+    return cast(
+        VlobReadBatchRep,
+        await _send_cmd(
+            transport,
+            vlob_read_batch_serializer,
+            cmd="vlob_read_batch",
+            realm_id=realm_id,
+            encryption_revision=encryption_revision,
+            items=[VlobReadBatchReqItem(vlob_id=x[0], version=x[1], timestamp=x[2]) for x in items],
+        ),
+    )
+
+
 async def vlob_update(
     transport: Transport,
     encryption_revision: int,
@@ -709,6 +742,21 @@ async def block_create(
     )
 
 
+async def block_create_batch(
+    transport: Transport, realm_id: RealmID, blocks: List[Tuple[BlockID, bytes]]
+) -> BlockCreateBatchRep:
+    return cast(
+        BlockCreateBatchRep,
+        await _send_cmd(
+            transport,
+            block_create_batch_serializer,
+            cmd="block_create_batch",
+            realm_id=realm_id,
+            blocks=[BlockCreateBatchReqItem(block_id=x[0], block=x[1]) for x in blocks],
+        ),
+    )
+
+
 async def block_read(transport: Transport, block_id: BlockID) -> BlockReadRep:
     return cast(
         BlockReadRep,
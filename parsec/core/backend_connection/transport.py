@@ -18,6 +18,7 @@ from typing import (
 )
 
 from parsec.crypto import SigningKey
+from parsec.api.version import MULTIPLEXED_API_VERSION
 from parsec.api.transport import Transport, TransportError, TransportClosedByPeer
 from parsec.api.protocol import (
     DeviceID,
@@ -53,6 +54,9 @@ CLIENT_HANDSHAKE_TYPE = Union[
     APIV1_AnonymousClientHandshake, AuthenticatedClientHandshake, InvitedClientHandshake
 ]
 
+# Maximum number of commands in flight on the multiplexed transport of a pool
+MAX_MULTIPLEXED_REQUESTS = 32
+
 
 async def apiv1_connect(
     addr: BackendOrganizationBootstrapAddr, keepalive: Optional[int] = None
@@ -141,6 +145,12 @@ async def _connect(
         await transport.aclose()
         raise
 
+    if (
+        isinstance(handshake, AuthenticatedClientHandshake)
+        and handshake.backend_api_version >= MULTIPLEXED_API_VERSION
+    ):
+        transport.enable_multiplexing()
+
     return transport
 
 
@@ -193,11 +203,29 @@ async def _do_handshake(transport: Transport, handshake: CLIENT_HANDSHAKE_TYPE)
 
 
 class TransportPool:
-    def __init__(self, connect_cb: Callable[[], Awaitable[Transport]], max_pool: int):
+    """
+    If the backend supports it, requests are multiplexed on a single shared
+    transport (with up to `max_multiplexed_requests` requests in flight).
+    Otherwise (or if a fresh transport is required) each request gets a
+    transport of its own, up to `max_pool` transports.
+    """
+
+    def __init__(
+        self,
+        connect_cb: Callable[[], Awaitable[Transport]],
+        max_pool: int,
+        max_multiplexed_requests: int = MAX_MULTIPLEXED_REQUESTS,
+    ):
         self._connect_cb = connect_cb
         self._transports: list[Transport] = []
         self._closed = False
         self._lock = trio.Semaphore(max_pool)
+        # The multiplexed transport holds one of the `max_pool` slots
+        self._multiplexed_transport: Optional[Transport] = None
+        self._multiplexed_transport_lock = trio.Lock()
+        self._multiplexed_requests = trio.Semaphore(max_multiplexed_requests)
+        # Unknown until connected to the backend
+        self._multiplexing_supported: Optional[bool] = None
 
     @asynccontextmanager
     async def acquire(self, force_fresh: bool = False) -> AsyncIterator[Transport]:
@@ -206,6 +234,51 @@ class TransportPool:
             BackendConnectionError
             trio.ClosedResourceError: if used after having being closed
         """
+        if not force_fresh and self._multiplexing_supported is not False:
+            async with self._multiplexed_requests:
+                transport = await self._get_multiplexed_transport()
+                if transport is not None:
+                    # Errors specific to a request leave the transport usable, the
+                    # broken transport is replaced the next time it is acquired
+                    yield transport
+                    return
+
+        async with self._acquire_exclusive(force_fresh) as transport:
+            yield transport
+
+    async def _get_multiplexed_transport(self) -> Optional[Transport]:
+        async with self._multiplexed_transport_lock:
+            transport = self._multiplexed_transport
+            if transport is not None and transport.broken:
+                self._multiplexed_transport = None
+                self._lock.release()
+                await transport.aclose()
+
+            if self._multiplexed_transport is None:
+                if self._closed:
+                    raise trio.ClosedResourceError()
+
+                await self._lock.acquire()
+                try:
+                    transport = await self._connect_cb()
+                except BaseException:
+                    self._lock.release()
+                    raise
+
+                if not transport.multiplexed:
+                    # Backend is too old, stick with a transport per request
+                    self._multiplexing_supported = False
+                    self._transports.append(transport)
+                    self._lock.release()
+                    return None
+
+                self._multiplexing_supported = True
+                self._multiplexed_transport = transport
+
+            return self._multiplexed_transport
+
+    @asynccontextmanager
+    async def _acquire_exclusive(self, force_fresh: bool) -> AsyncIterator[Transport]:
         async with self._lock:
             transport = None
             if not force_fresh:
@@ -232,7 +305,11 @@ class TransportPool:
                 raise
 
             else:
-                self._transports.append(transport)
+                if self._multiplexing_supported:
+                    # Requests go through the multiplexed transport, no need to keep this one
+                    await transport.aclose()
+                else:
+                    self._transports.append(transport)
 
 
 async def http_request(
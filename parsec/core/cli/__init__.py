@@ -15,6 +15,7 @@ from parsec.core.cli import share_workspace
 from parsec.core.cli import reencrypt_workspace
 from parsec.core.cli import bootstrap_organization
 from parsec.core.cli import rsync
+from parsec.core.cli import pin
 from parsec.core.cli import run
 from parsec.core.cli import pki
 
@@ -30,6 +31,8 @@ def core_cmd() -> None:
 core_cmd.add_command(run.run_gui, "gui")
 core_cmd.add_command(run.run_mountpoint, "run")
 core_cmd.add_command(rsync.run_rsync, "rsync")
+core_cmd.add_command(pin.pin, "pin")
+core_cmd.add_command(pin.unpin, "unpin")
 core_cmd.add_command(create_workspace.create_workspace, "create_workspace")
 core_cmd.add_command(share_workspace.share_workspace, "share_workspace")
 core_cmd.add_command(reencrypt_workspace.reencrypt_workspace, "reencrypt_workspace")
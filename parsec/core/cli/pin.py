@@ -0,0 +1,79 @@
+# Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
+from __future__ import annotations
+
+import click
+from typing import Any
+
+from parsec.api.data import EntryName
+from parsec.utils import trio_run
+from parsec.cli_utils import cli_exception_handler, spinner
+from parsec.core import logged_core_factory
+from parsec.core.types import LocalDevice
+from parsec.core.config import CoreConfig
+from parsec.core.fs import FsPath
+from parsec.core.cli.utils import cli_command_base_options, core_config_and_device_options
+
+
+async def _pin(
+    config: CoreConfig,
+    device: LocalDevice,
+    workspace_name: EntryName,
+    path: FsPath,
+    recursive: bool,
+    offline: bool,
+) -> None:
+    async with logged_core_factory(config, device) as core:
+        workspace = core.find_workspace_from_name(workspace_name)
+        workspace_fs = core.user_fs.get_workspace(workspace.id)
+        if offline:
+            async with spinner(f"Downloading {path}"):
+                await workspace_fs.pin(path, recursive=recursive)
+        else:
+            await workspace_fs.unpin(path, recursive=recursive)
+
+
+def _parse_path(ctx: click.Context, param: click.Parameter, value: str) -> FsPath:
+    return FsPath(value if value.startswith("/") else f"/{value}")
+
+
+@click.command(short_help="keep files available offline")
+@click.option("--workspace-name", required=True, type=EntryName)
+@click.option("--recursive", "-r", is_flag=True, help="Include the files in the sub-folders")
+@click.argument("path", callback=_parse_path)
+@core_config_and_device_options
+@cli_command_base_options
+def pin(
+    config: CoreConfig,
+    device: LocalDevice,
+    workspace_name: EntryName,
+    recursive: bool,
+    path: FsPath,
+    **kwargs: Any,
+) -> None:
+    """
+    Download the file (or the files in the folder) and keep it in the local
+    cache, so it stays available offline.
+    """
+    with cli_exception_handler(config.debug):
+        trio_run(_pin, config, device, workspace_name, path, recursive, True)
+
+
+@click.command(short_help="stop keeping files available offline")
+@click.option("--workspace-name", required=True, type=EntryName)
+@click.option("--recursive", "-r", is_flag=True, help="Include the files in the sub-folders")
+@click.argument("path", callback=_parse_path)
+@core_config_and_device_options
+@cli_command_base_options
+def unpin(
+    config: CoreConfig,
+    device: LocalDevice,
+    workspace_name: EntryName,
+    recursive: bool,
+    path: FsPath,
+    **kwargs: Any,
+) -> None:
+    """
+    Let the file (or the files in the folder) be removed from the local cache.
+    """
+    with cli_exception_handler(config.debug):
+        trio_run(_pin, config, device, workspace_name, path, recursive, False)
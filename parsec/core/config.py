@@ -14,6 +14,8 @@ from parsec.api.data import EntryID
 from parsec.core.types import BackendAddr
 
 DEFAULT_WORKSPACE_STORAGE_CACHE_SIZE = 512 * 1024 * 1024
+# Number of manifests kept in memory for each workspace
+DEFAULT_WORKSPACE_MANIFEST_CACHE_SIZE = 10000
 
 logger = get_logger()
 
@@ -64,6 +66,12 @@ class CoreConfig:
     sentry_environment: str = ""
     telemetry_enabled: bool = True
     workspace_storage_cache_size: int = DEFAULT_WORKSPACE_STORAGE_CACHE_SIZE
+    workspace_manifest_cache_size: int = DEFAULT_WORKSPACE_MANIFEST_CACHE_SIZE
+    # Compression of the data stored locally, either `zlib`, `zstd` or None
+    workspace_storage_compression: Optional[str] = None
+    # Reference the identical blocks already available in the workspace
+    # instead of uploading them again
+    workspace_block_deduplication: bool = False
     pki_extra_trust_roots: FrozenSet[Path] = frozenset()
 
     gui_last_device: Optional[str] = None
@@ -104,6 +112,9 @@ def config_factory(
     sentry_environment: str = "",
     telemetry_enabled: bool = True,
     workspace_storage_cache_size: int = DEFAULT_WORKSPACE_STORAGE_CACHE_SIZE,
+    workspace_manifest_cache_size: int = DEFAULT_WORKSPACE_MANIFEST_CACHE_SIZE,
+    workspace_storage_compression: Optional[str] = None,
+    workspace_block_deduplication: bool = False,
     pki_extra_trust_roots: FrozenSet[Path] = frozenset(),
     debug: bool = False,
     gui_last_device: Optional[str] = None,
@@ -148,6 +159,9 @@ def config_factory(
         backend_max_connections=backend_max_connections,
         telemetry_enabled=telemetry_enabled,
         workspace_storage_cache_size=workspace_storage_cache_size,
+        workspace_manifest_cache_size=workspace_manifest_cache_size,
+        workspace_storage_compression=workspace_storage_compression,
+        workspace_block_deduplication=workspace_block_deduplication,
         pki_extra_trust_roots=pki_extra_trust_roots,
         debug=debug,
         sentry_dsn=sentry_dsn,
@@ -229,6 +243,20 @@ def load_config(config_dir: Path, **extra_config: Any) -> CoreConfig:
         logger.warning("Invalid value for `preferred_org_creation_backend_addr`", error=str(exc))
         data_conf["preferred_org_creation_backend_addr"] = None
 
+    compression = data_conf.get("workspace_storage_compression")
+    if compression is not None:
+        # Imported here given the storage modules depend on this one
+        from parsec.core.fs.storage.chunk_storage import is_compression_available
+
+        # The algorithm may rely on an optional module that is not installed (anymore),
+        # chunks already compressed with it are the only ones that cannot be read then
+        if not is_compression_available(compression):
+            logger.warning(
+                "Workspace storage compression not available, falling back to zlib",
+                workspace_storage_compression=compression,
+            )
+            data_conf["workspace_storage_compression"] = "zlib"
+
     try:
         data_conf["gui_geometry"] = base64.b64decode(data_conf["gui_geometry"].encode("ascii"))
     except (AttributeError, KeyError, UnicodeEncodeError, binascii.Error):
@@ -263,6 +291,9 @@ def save_config(config: CoreConfig) -> None:
                 "backend_max_cooldown": config.backend_max_cooldown,
                 "backend_connection_keepalive": config.backend_connection_keepalive,
                 "workspace_storage_cache_size": config.workspace_storage_cache_size,
+                "workspace_manifest_cache_size": config.workspace_manifest_cache_size,
+                "workspace_storage_compression": config.workspace_storage_compression,
+                "workspace_block_deduplication": config.workspace_block_deduplication,
                 "pki_extra_trust_roots": list(map(str, config.pki_extra_trust_roots)),
                 "gui_last_device": config.gui_last_device,
                 "gui_tray_enabled": config.gui_tray_enabled,
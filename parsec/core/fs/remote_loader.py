@@ -25,6 +25,13 @@ from parsec._parsec import (
     BlockCreateRepInMaintenance,
     BlockCreateRepNotAllowed,
     BlockCreateRepTimeout,
+    BlockCreateBatchRepOk,
+    BlockCreateBatchRepAlreadyExists,
+    BlockCreateBatchRepInMaintenance,
+    BlockCreateBatchRepNotAllowed,
+    BlockCreateBatchRepTimeout,
+    BlockCreateBatchRepTooLarge,
+    BlockCreateBatchRepUnknownStatus,
     BlockReadRepOk,
     BlockReadRepNotFound,
     BlockReadRepInMaintenance,
@@ -48,6 +55,12 @@ from parsec._parsec import (
     VlobReadRepBadVersion,
     VlobReadRepInMaintenance,
     VlobReadRepNotFound,
+    VlobReadBatchRepOk,
+    VlobReadBatchRepNotFound,
+    VlobReadBatchRepNotAllowed,
+    VlobReadBatchRepBadEncryptionRevision,
+    VlobReadBatchRepInMaintenance,
+    VlobReadBatchRepUnknownStatus,
     VlobUpdateRepOk,
     VlobUpdateRepBadEncryptionRevision,
     VlobUpdateRepBadVersion,
@@ -65,7 +78,15 @@ from parsec._parsec import (
 )
 from parsec.crypto import HashDigest, CryptoError, VerifyKey
 from parsec.utils import open_service_nursery
-from parsec.api.protocol import UserID, DeviceID, RealmID, RealmRole, VlobID, SequesterServiceID
+from parsec.api.protocol import (
+    BLOCK_CREATE_BATCH_MAX_SIZE,
+    UserID,
+    DeviceID,
+    RealmID,
+    RealmRole,
+    VlobID,
+    SequesterServiceID,
+)
 from parsec.api.data import (
     DataError,
     BlockAccess,
@@ -111,6 +132,7 @@ from parsec.core.fs.exceptions import (
     FSSequesterServiceRejectedError,
 )
 from parsec.core.fs.storage import BaseWorkspaceStorage
+from parsec.core.fs.transfer_scheduler import TransferKind, TransferScheduler, TransferSlot
 
 
 if TYPE_CHECKING:
@@ -128,6 +150,15 @@ MANIFEST_STAMP_AHEAD_US = 100_000  # microseconds, or 0.1 seconds
 # priority over manifest updates.
 ROLE_CERTIFICATE_STAMP_AHEAD_US = 500_000  # microseconds, or 0.5 seconds
 
+# Maximum number of manifests fetched by a single `vlob_read_batch` request
+VLOB_READ_BATCH_SIZE = 100
+
+# Blocks up to this size are uploaded by batch with the `block_create_batch` command
+BLOCK_CREATE_BATCH_ITEM_MAX_SIZE = 64 * 1024
+# Leave room below the backend limit for the encryption and serialization overhead
+BLOCK_CREATE_BATCH_SIZE = BLOCK_CREATE_BATCH_MAX_SIZE // 4
+BLOCK_CREATE_BATCH_MAX_ITEMS = 256
+
 
 class VlobRequireGreaterTimestampError(Exception):
     @property
@@ -439,6 +470,10 @@ class UserRemoteLoader:
 
 
 class RemoteLoader(UserRemoteLoader):
+    # Cleared when the backend turns out not to know the corresponding batch command
+    _vlob_read_batch_supported = True
+    _block_create_batch_supported = True
+
     def __init__(
         self,
         device: LocalDevice,
@@ -448,6 +483,7 @@ class RemoteLoader(UserRemoteLoader):
         backend_cmds: BackendAuthenticatedCmds,
         remote_devices_manager: RemoteDevicesManager,
         local_storage: BaseWorkspaceStorage,
+        transfer_scheduler: Optional[TransferScheduler] = None,
     ):
         super().__init__(
             device,
@@ -458,8 +494,12 @@ class RemoteLoader(UserRemoteLoader):
             remote_devices_manager,
         )
         self.local_storage = local_storage
+        # Usually shared by all the workspaces of the user
+        self.transfer_scheduler = transfer_scheduler or TransferScheduler()
 
     async def load_blocks(self, accesses: List[BlockAccess]) -> None:
+        if not accesses:
+            return
         async with open_service_nursery() as nursery:
             async with await self.receive_load_blocks(accesses, nursery) as receive_channel:
                 async for value in receive_channel:
@@ -475,22 +515,28 @@ class RemoteLoader(UserRemoteLoader):
             FSBackendOfflineError
             FSWorkspaceInMaintenance
         """
-        blocks_iter = iter(blocks)
-
         send_channel, receive_channel = open_memory_channel[BlockAccess](math.inf)
 
-        async def _loader(send_channel: "MemorySendChannel[BlockAccess]") -> None:
-            async with send_channel:
-                while True:
-                    access = next(blocks_iter, None)
-                    if not access:
-                        break
+        async def _loader(
+            access: BlockAccess,
+            slot: TransferSlot,
+            send_channel: "MemorySendChannel[BlockAccess]",
+        ) -> None:
+            with slot:
+                async with send_channel:
                     await self.load_block(access)
                     await send_channel.send(access)
 
-        async with send_channel:
-            for _ in range(4):
-                nursery.start_soon(_loader, send_channel.clone())
+        async def _dispatcher(send_channel: "MemorySendChannel[BlockAccess]") -> None:
+            async with send_channel:
+                with self.transfer_scheduler.transfer(
+                    TransferKind.DOWNLOAD, self.workspace_id, sum(access.size for access in blocks)
+                ) as transfer:
+                    for access in blocks:
+                        slot = await self.transfer_scheduler.acquire(access.size, transfer)
+                        nursery.start_soon(_loader, access, slot, send_channel.clone())
+
+        nursery.start_soon(_dispatcher, send_channel)
 
         return receive_channel
 
@@ -528,26 +574,113 @@ class RemoteLoader(UserRemoteLoader):
             raise FSError(f"Cannot decrypt block: {exc}") from exc
 
         # TODO: let encryption manager do the digest check ?
-        assert HashDigest.from_data(block) == access.digest, access
+        # The digest is provided by the manifest author, so it must be checked
+        # before the block ends up in the deduplication index
+        if HashDigest.from_data(block) != access.digest:
+            raise FSError(f"Cannot load block: digest mismatch for `{access.id.hex}`")
         await self.local_storage.set_clean_block(access.id, block)
+        await self.local_storage.index_blocks([access])
 
     async def upload_blocks(self, blocks: List[BlockAccess]) -> None:
-        blocks_iter = iter(blocks)
-
-        async def _uploader() -> None:
-            while True:
-                access = next(blocks_iter, None)
-                if not access:
-                    break
-                try:
-                    data = await self.local_storage.get_dirty_block(access.id)
-                except FSLocalMissError:
-                    continue
+        async def _uploader(access: BlockAccess, data: bytes, slot: TransferSlot) -> None:
+            with slot:
                 await self.upload_block(access, data)
 
-        async with open_service_nursery() as nursery:
-            for _ in range(4):
-                nursery.start_soon(_uploader)
+        async def _batch_uploader(
+            batch: List[Tuple[BlockAccess, bytes]], slot: TransferSlot
+        ) -> None:
+            with slot:
+                await self._upload_blocks_batch(batch)
+
+        with self.transfer_scheduler.transfer(
+            TransferKind.UPLOAD, self.workspace_id, sum(access.size for access in blocks)
+        ) as transfer:
+            async with open_service_nursery() as nursery:
+                # Small blocks are grouped so they don't pay a round trip each
+                batch: List[Tuple[BlockAccess, bytes]] = []
+                batch_size = 0
+                for access in blocks:
+                    try:
+                        data = await self.local_storage.get_dirty_block(access.id)
+                    except FSLocalMissError:
+                        # Already uploaded
+                        transfer.total_bytes -= access.size
+                        continue
+
+                    if (
+                        not self._block_create_batch_supported
+                        or len(data) > BLOCK_CREATE_BATCH_ITEM_MAX_SIZE
+                    ):
+                        slot = await self.transfer_scheduler.acquire(len(data), transfer)
+                        nursery.start_soon(_uploader, access, data, slot)
+                        continue
+
+                    if (
+                        batch_size + len(data) > BLOCK_CREATE_BATCH_SIZE
+                        or len(batch) >= BLOCK_CREATE_BATCH_MAX_ITEMS
+                    ):
+                        slot = await self.transfer_scheduler.acquire(batch_size, transfer)
+                        nursery.start_soon(_batch_uploader, batch, slot)
+                        batch, batch_size = [], 0
+                    batch.append((access, data))
+                    batch_size += len(data)
+
+                if batch:
+                    slot = await self.transfer_scheduler.acquire(batch_size, transfer)
+                    nursery.start_soon(_batch_uploader, batch, slot)
+
+    async def _upload_blocks_batch(self, batch: List[Tuple[BlockAccess, bytes]]) -> None:
+        """
+        Raises:
+            FSError
+            FSBackendOfflineError
+            FSRemoteOperationError
+            FSWorkspaceInMaintenance
+            FSWorkspaceNoAccess
+        """
+        # Encryption
+        try:
+            ciphered = [(access.id, access.key.encrypt(data)) for access, data in batch]
+
+        # Encryption error
+        except CryptoError as exc:
+            raise FSError(f"Cannot encrypt block: {exc}") from exc
+
+        # Upload blocks
+        with translate_backend_cmds_errors():
+            rep = await self.backend_cmds.block_create_batch(
+                RealmID(self.workspace_id.uuid), ciphered
+            )
+
+        if isinstance(rep, BlockCreateBatchRepUnknownStatus) and rep.status == "unknown_command":
+            # Older backend, don't bother asking again
+            self._block_create_batch_supported = False
+            for access, data in batch:
+                await self.upload_block(access, data)
+            return
+        elif isinstance(rep, (BlockCreateBatchRepTooLarge, BlockCreateBatchRepAlreadyExists)):
+            # Should not occur given batches are kept well below the limit and
+            # block IDs are random, let `block_create` sort out the faulty block
+            for access, data in batch:
+                await self.upload_block(access, data)
+            return
+        elif isinstance(rep, BlockCreateBatchRepNotAllowed):
+            # Seems we lost the access to the realm
+            raise FSWorkspaceNoWriteAccess("Cannot upload blocks: no write access")
+        elif isinstance(rep, BlockCreateBatchRepInMaintenance):
+            raise FSWorkspaceInMaintenance(
+                "Cannot upload blocks while the workspace in maintenance"
+            )
+        elif isinstance(rep, BlockCreateBatchRepTimeout):
+            raise FSServerUploadTemporarilyUnavailableError("Temporary failure during block upload")
+        elif not isinstance(rep, BlockCreateBatchRepOk):
+            raise FSError(f"Cannot upload blocks: {rep}")
+
+        # Update local storage
+        for access, data in batch:
+            await self.local_storage.set_clean_block(access.id, data)
+            await self.local_storage.clear_chunk(ChunkID(access.id.uuid), miss_ok=True)
+        await self.local_storage.index_blocks([access for access, _ in batch])
 
     async def upload_block(self, access: BlockAccess, data: bytes) -> None:
         """
@@ -589,6 +722,7 @@ class RemoteLoader(UserRemoteLoader):
         # Update local storage
         await self.local_storage.set_clean_block(access.id, data)
         await self.local_storage.clear_chunk(ChunkID(access.id.uuid), miss_ok=True)
+        await self.local_storage.index_blocks([access])
 
     async def load_manifest(
         self,
@@ -695,12 +829,40 @@ class RemoteLoader(UserRemoteLoader):
                 f"{version} (expecting {expected_backend_timestamp}, got {expected_timestamp})"
             )
 
+        # Get the timestamp of the last role for this particular user
+        author_last_role_granted_on = rep.author_last_role_granted_on
+        # Compatibility with older backends (best effort strategy)
+        if author_last_role_granted_on is None:
+            author_last_role_granted_on = self.device.timestamp()
+
+        return await self._verify_and_load_manifest(
+            entry_id,
+            workspace_entry,
+            rep.blob,
+            expected_author=expected_author,
+            expected_timestamp=expected_timestamp,
+            expected_version=expected_version,
+            author_last_role_granted_on=author_last_role_granted_on,
+        )
+
+    async def _verify_and_load_manifest(
+        self,
+        entry_id: EntryID,
+        workspace_entry: WorkspaceEntry,
+        blob: bytes,
+        expected_author: DeviceID,
+        expected_timestamp: DateTime,
+        expected_version: int,
+        author_last_role_granted_on: DateTime,
+    ) -> AnyRemoteManifest:
+        # Both the device certificates and the realm role certificates are cached,
+        # so verifying a batch of manifests only fetches them once
         with translate_remote_devices_manager_errors():
             author = await self.remote_devices_manager.get_device(expected_author)
 
         try:
             remote_manifest = manifest_decrypt_verify_and_load(
-                rep.blob,
+                blob,
                 key=workspace_entry.key,
                 author_verify_key=author.verify_key,
                 expected_author=expected_author,
@@ -711,12 +873,6 @@ class RemoteLoader(UserRemoteLoader):
         except DataError as exc:
             raise FSError(f"Cannot decrypt vlob: {exc}") from exc
 
-        # Get the timestamp of the last role for this particular user
-        author_last_role_granted_on = rep.author_last_role_granted_on
-        # Compatibility with older backends (best effort strategy)
-        if author_last_role_granted_on is None:
-            author_last_role_granted_on = self.device.timestamp()
-
         # Finally make sure author was allowed to create this manifest
         role_at_timestamp = await self._get_user_realm_role_at(
             expected_author.user_id, expected_timestamp, author_last_role_granted_on
@@ -734,6 +890,101 @@ class RemoteLoader(UserRemoteLoader):
 
         return remote_manifest
 
+    async def load_manifests(
+        self, entry_ids: Iterable[EntryID], timestamp: Optional[DateTime] = None
+    ) -> Dict[EntryID, AnyRemoteManifest]:
+        """
+        Download the last version (or the version at the given timestamp) of multiple
+        manifests, using as few round trips as possible.
+
+        Manifests that don't exist remotely are not part of the result.
+
+        Raises:
+            FSError
+            FSBackendOfflineError
+            FSRemoteOperationError
+            FSWorkspaceInMaintenance
+            FSBadEncryptionRevision
+            FSWorkspaceNoAccess
+            FSUserNotFoundError
+            FSDeviceNotFoundError
+            FSInvalidTrustchainError
+        """
+        entry_ids = list(dict.fromkeys(entry_ids))
+        manifests: Dict[EntryID, AnyRemoteManifest] = {}
+        for i in range(0, len(entry_ids), VLOB_READ_BATCH_SIZE):
+            batch = entry_ids[i : i + VLOB_READ_BATCH_SIZE]
+            if self._vlob_read_batch_supported:
+                batch_manifests = await self._load_manifests_batch(batch, timestamp)
+            else:
+                batch_manifests = None
+            # Fallback to one request per manifest
+            if batch_manifests is None:
+                batch_manifests = {}
+                for entry_id in batch:
+                    try:
+                        batch_manifests[entry_id] = await self.load_manifest(
+                            entry_id, timestamp=timestamp
+                        )
+                    except FSRemoteManifestNotFound:
+                        pass
+            manifests.update(batch_manifests)
+        return manifests
+
+    async def _load_manifests_batch(
+        self, entry_ids: List[EntryID], timestamp: Optional[DateTime]
+    ) -> Optional[Dict[EntryID, AnyRemoteManifest]]:
+        """
+        Returns `None` if the manifests have to be loaded one by one instead
+        """
+        workspace_entry = self.get_workspace_entry()
+        with translate_backend_cmds_errors():
+            rep = await self.backend_cmds.vlob_read_batch(
+                RealmID(self.workspace_id.uuid),
+                workspace_entry.encryption_revision,
+                [(VlobID(entry_id.uuid), None, timestamp) for entry_id in entry_ids],
+            )
+
+        if isinstance(rep, VlobReadBatchRepUnknownStatus) and rep.status == "unknown_command":
+            # Older backend, don't bother asking again
+            self._vlob_read_batch_supported = False
+            return None
+        elif isinstance(rep, VlobReadBatchRepInMaintenance):
+            # `load_manifest` knows how to read from a workspace being reencrypted
+            return None
+        elif isinstance(rep, VlobReadBatchRepNotFound):
+            # The realm hasn't been created yet, hence no manifest exists
+            return {}
+        elif isinstance(rep, VlobReadBatchRepNotAllowed):
+            # Seems we lost the access to the realm
+            raise FSWorkspaceNoReadAccess("Cannot load manifests: no read access")
+        elif isinstance(rep, VlobReadBatchRepBadEncryptionRevision):
+            raise FSBadEncryptionRevision("Cannot fetch vlobs: Bad encryption revision provided")
+        elif not isinstance(rep, VlobReadBatchRepOk):
+            raise FSError(f"Cannot fetch vlobs: {rep}")
+
+        requested = set(entry_ids)
+        manifests: Dict[EntryID, AnyRemoteManifest] = {}
+        for item in rep.items:
+            entry_id = EntryID.from_hex(item.vlob_id.hex)
+            if entry_id not in requested or entry_id in manifests:
+                raise FSError(f"Backend returned unexpected vlob {entry_id.str}")
+            if timestamp is not None and item.timestamp > timestamp:
+                raise FSError(
+                    f"Backend returned invalid timestamp for vlob {entry_id.str} "
+                    f"(expecting at most {timestamp}, got {item.timestamp})"
+                )
+            manifests[entry_id] = await self._verify_and_load_manifest(
+                entry_id,
+                workspace_entry,
+                item.blob,
+                expected_author=item.author,
+                expected_timestamp=item.timestamp,
+                expected_version=item.version,
+                author_last_role_granted_on=item.author_last_role_granted_on,
+            )
+        return manifests
+
     async def upload_manifest(
         self,
         entry_id: EntryID,
@@ -960,12 +1211,18 @@ class RemoteLoaderTimestamped(RemoteLoader):
         self.backend_cmds = remote_loader.backend_cmds
         self.remote_devices_manager = remote_loader.remote_devices_manager
         self.local_storage = remote_loader.local_storage.to_timestamped(timestamp)
+        self.transfer_scheduler = remote_loader.transfer_scheduler
+        self._vlob_read_batch_supported = remote_loader._vlob_read_batch_supported
+        self._block_create_batch_supported = remote_loader._block_create_batch_supported
         self._realm_role_certificates_cache = None
         self.timestamp = timestamp
 
     async def upload_block(self, access: BlockAccess, data: bytes) -> None:
         raise FSError("Cannot upload block through a timestamped remote loader")
 
+    async def _upload_blocks_batch(self, batch: List[Tuple[BlockAccess, bytes]]) -> None:
+        raise FSError("Cannot upload block through a timestamped remote loader")
+
     async def load_manifest(
         self,
         entry_id: EntryID,
@@ -1000,6 +1257,13 @@ class RemoteLoaderTimestamped(RemoteLoader):
             workspace_entry=workspace_entry,
         )
 
+    async def load_manifests(
+        self, entry_ids: Iterable[EntryID], timestamp: Optional[DateTime] = None
+    ) -> Dict[EntryID, AnyRemoteManifest]:
+        return await super().load_manifests(
+            entry_ids, timestamp=self.timestamp if timestamp is None else timestamp
+        )
+
     async def upload_manifest(
         self,
         entry_id: EntryID,
@@ -5,6 +5,7 @@ from parsec.core.fs.storage.local_database import LocalDatabase
 from parsec.core.fs.storage.user_storage import UserStorage, user_storage_non_speculative_init
 from parsec.core.fs.storage.manifest_storage import ManifestStorage
 from parsec.core.fs.storage.chunk_storage import ChunkStorage, BlockStorage
+from parsec.core.fs.storage.block_index import BlockIndex
 from parsec.core.fs.storage.workspace_storage import (
     workspace_storage_non_speculative_init,
     BaseWorkspaceStorage,
@@ -19,6 +20,7 @@ __all__ = (
     "ManifestStorage",
     "ChunkStorage",
     "BlockStorage",
+    "BlockIndex",
     "workspace_storage_non_speculative_init",
     "BaseWorkspaceStorage",
     "WorkspaceStorage",
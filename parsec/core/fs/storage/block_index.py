@@ -0,0 +1,121 @@
+# Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
+from __future__ import annotations
+
+import trio
+from pathlib import Path
+from typing import AsyncIterator, AsyncContextManager, List, Optional
+from contextlib import asynccontextmanager
+
+from parsec.crypto import HashDigest, SecretKey
+from parsec.serde import packb, unpackb
+from parsec.api.data import BlockAccess
+from parsec.api.protocol import BlockID
+from parsec.core.types import LocalDevice
+from parsec.core.fs.storage.local_database import LocalDatabase, Cursor
+from parsec.core.fs.exceptions import FSLocalStorageClosedError
+
+
+# Size of the keyed hash used to index the blocks
+INDEX_KEY_SIZE = 32
+
+
+class BlockIndex:
+    """Index of the blocks available in the realm, by content.
+
+    Blocks are indexed by the digest of their cleartext content so that a new block
+    with the same content can reference an existing block instead of being uploaded
+    again. Only the blocks whose content has been checked against their digest (i.e.
+    the blocks uploaded or downloaded by this device) should be indexed.
+    """
+
+    def __init__(self, device: LocalDevice, localdb: LocalDatabase):
+        self.local_symkey = device.local_symkey
+        self.localdb = localdb
+
+    @property
+    def path(self) -> Path:
+        return Path(self.localdb.path)
+
+    @classmethod
+    @asynccontextmanager
+    async def run(cls, device: LocalDevice, localdb: LocalDatabase) -> AsyncIterator["BlockIndex"]:
+        self = cls(device, localdb)
+        await self._create_db()
+        try:
+            yield self
+        finally:
+            with trio.CancelScope(shield=True):
+                # Commit the pending changes in the local database
+                try:
+                    await self.localdb.commit()
+                # Ignore storage closed exceptions, since it follows an operational error
+                except FSLocalStorageClosedError:
+                    pass
+
+    def _open_cursor(self, readonly: bool = False) -> AsyncContextManager[Cursor]:
+        # Losing the latest entries only means missing a few deduplications,
+        # so they are committed along with the next manifest instead
+        return self.localdb.open_cursor(commit=False, readonly=readonly)
+
+    # Database initialization
+
+    async def _create_db(self) -> None:
+        async with self._open_cursor() as cursor:
+            cursor.execute(
+                """CREATE TABLE IF NOT EXISTS block_index
+                    (index_key BLOB PRIMARY KEY NOT NULL, -- Keyed hash of the block digest
+                     access BLOB NOT NULL -- Ciphered block access
+                );"""
+            )
+
+    # Index operations
+
+    def _get_index_key(self, digest: HashDigest) -> bytes:
+        # Don't store the digests as is, they would reveal the content
+        # of the workspace to anyone able to guess it
+        return self.local_symkey.hmac(digest.digest, INDEX_KEY_SIZE)
+
+    async def get_block_accesses(self, accesses: List[BlockAccess]) -> List[Optional[BlockAccess]]:
+        """Return, for each access, an indexed block with the same content (if any)
+
+        The returned accesses are set at the same offset as the provided ones.
+        """
+        result: List[Optional[BlockAccess]] = []
+        async with self._open_cursor(readonly=True) as cursor:
+            for access in accesses:
+                cursor.execute(
+                    "SELECT access FROM block_index WHERE index_key = ?",
+                    (self._get_index_key(access.digest),),
+                )
+                row = cursor.fetchone()
+                if row is None:
+                    result.append(None)
+                    continue
+                raw = unpackb(self.local_symkey.decrypt(row[0]))
+                result.append(
+                    BlockAccess(
+                        id=BlockID.from_bytes(raw["id"]),
+                        key=SecretKey(raw["key"]),
+                        offset=access.offset,
+                        size=raw["size"],
+                        digest=access.digest,
+                    )
+                )
+        return result
+
+    async def set_block_accesses(self, accesses: List[BlockAccess]) -> None:
+        # Keep the block indexed first, so that the same content keeps
+        # referencing the same block
+        rows = [
+            (
+                self._get_index_key(access.digest),
+                self.local_symkey.encrypt(
+                    packb({"id": access.id.bytes, "key": access.key.secret, "size": access.size})
+                ),
+            )
+            for access in accesses
+        ]
+        async with self._open_cursor() as cursor:
+            cursor.executemany(
+                "INSERT OR IGNORE INTO block_index (index_key, access) VALUES (?, ?)", rows
+            )
@@ -1,29 +1,156 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
 from __future__ import annotations
 
-import secrets
+import os
 import time
+import zlib
 
 import trio
+from trio.lowlevel import RunVar
 from pathlib import Path
-from typing import AsyncIterator, AsyncContextManager, TypeVar, List, Optional
+from collections import OrderedDict
+from typing import (
+    AsyncIterator,
+    AsyncContextManager,
+    TypeVar,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 from contextlib import asynccontextmanager
 
 
-from parsec.core.types import ChunkID
-from parsec.core.types import LocalDevice, DEFAULT_BLOCK_SIZE
+from parsec.utils import open_service_nursery
+from parsec.core.types import ChunkID, EntryID
+from parsec.core.types import LocalDevice
 from parsec.core.fs.storage.local_database import LocalDatabase, Cursor
-from parsec.core.fs.exceptions import FSLocalMissError, FSLocalStorageClosedError
+from parsec.core.fs.exceptions import (
+    FSLocalMissError,
+    FSLocalStorageClosedError,
+    FSLocalStorageOperationalError,
+)
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # type: ignore[assignment]
+
 
 T = TypeVar("T", bound="ChunkStorage")
 
+# Chunks access times are kept in memory and written to the database in a
+# single batch once there are too many of them or they are too old
+ACCESSED_ON_FLUSH_MAX_PENDING = 1000
+ACCESSED_ON_FLUSH_INTERVAL = 60  # seconds
+
+# Once the block cache exceeds its maximum size, the least recently used blocks
+# are removed until it gets back under this ratio of the maximum size (so that
+# the cleanup doesn't have to run again for each new block)
+BLOCK_CLEANUP_TARGET_RATIO = 0.9
+BLOCK_CLEANUP_BATCH_SIZE = 100
+
+# Default maximum number of parameters in a single statement for sqlite < 3.32
+SQLITE_MAX_VARIABLE_NUMBER = 999
+
+# Chunks can be compressed before being encrypted, the algorithm used is stored
+# along with each chunk so that the chunks written with compression disabled
+# (or with another algorithm) can still be read
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+COMPRESSION_ALGORITHMS = {"zlib": COMPRESSION_ZLIB, "zstd": COMPRESSION_ZSTD}
+# Favor speed, chunks are compressed each time they are written
+ZLIB_COMPRESSION_LEVEL = 1
+ZSTD_COMPRESSION_LEVEL = 3
+
+_chunk_thread_limiter: RunVar[trio.CapacityLimiter] = RunVar("chunk_thread_limiter")
+
+
+def get_chunk_thread_limiter() -> trio.CapacityLimiter:
+    """Limiter shared by the chunk storages to encrypt/decrypt in threads
+
+    Encryption is CPU-bound, so there is no point in running it in more threads
+    than there are cores.
+    """
+    try:
+        return _chunk_thread_limiter.get()
+    except LookupError:
+        limiter = trio.CapacityLimiter(os.cpu_count() or 1)
+        _chunk_thread_limiter.set(limiter)
+        return limiter
+
+
+def is_compression_available(algorithm: str) -> bool:
+    compression = COMPRESSION_ALGORITHMS.get(algorithm)
+    if compression == COMPRESSION_ZSTD:
+        return zstandard is not None
+    return compression is not None
+
+
+def get_compression(algorithm: Optional[str]) -> int:
+    if algorithm is None:
+        return COMPRESSION_NONE
+    try:
+        compression = COMPRESSION_ALGORITHMS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unknown compression algorithm `{algorithm}`")
+    if compression == COMPRESSION_ZSTD and zstandard is None:
+        raise ValueError("zstd compression is not available")
+    return compression
+
+
+def compress_chunk(compression: int, raw: bytes) -> Tuple[int, bytes]:
+    """Return the compression actually used along with the compressed data
+
+    Data is kept uncompressed if compressing doesn't make it smaller (e.g. the
+    file is already compressed).
+    """
+    if compression == COMPRESSION_ZLIB:
+        compressed = zlib.compress(raw, ZLIB_COMPRESSION_LEVEL)
+    elif compression == COMPRESSION_ZSTD:
+        compressed = zstandard.ZstdCompressor(level=ZSTD_COMPRESSION_LEVEL).compress(raw)
+    else:
+        return COMPRESSION_NONE, raw
+    if len(compressed) >= len(raw):
+        return COMPRESSION_NONE, raw
+    return compression, compressed
+
+
+def decompress_chunk(compression: int, data: bytes) -> bytes:
+    if compression == COMPRESSION_NONE:
+        return data
+    elif compression == COMPRESSION_ZLIB:
+        return zlib.decompress(data)
+    elif compression == COMPRESSION_ZSTD:
+        if zstandard is None:
+            raise FSLocalStorageOperationalError("zstd compression is not available")
+        return zstandard.ZstdDecompressor().decompress(data)
+    else:
+        raise FSLocalStorageOperationalError(f"Unknown chunk compression `{compression}`")
+
 
 class ChunkStorage:
     """Interface to access the local chunks of data."""
 
-    def __init__(self, device: LocalDevice, localdb: LocalDatabase):
+    def __init__(
+        self,
+        device: LocalDevice,
+        localdb: LocalDatabase,
+        thread_limiter: Optional[trio.CapacityLimiter] = None,
+        compression: Optional[str] = None,
+    ):
         self.local_symkey = device.local_symkey
         self.localdb = localdb
+        # Only applies to the chunks written from now on
+        self.compression = get_compression(compression)
+        # Use the shared limiter by default
+        self._thread_limiter = thread_limiter
+        # Chunk ID bytes to access time, from the least to the most recently accessed
+        self._pending_accessed_on: OrderedDict[bytes, float] = OrderedDict()
+        self._last_accessed_on_flush = time.monotonic()
 
     @property
     def path(self) -> Path:
@@ -32,9 +159,13 @@ class ChunkStorage:
     @classmethod
     @asynccontextmanager
     async def run(
-        cls, device: LocalDevice, localdb: LocalDatabase
+        cls,
+        device: LocalDevice,
+        localdb: LocalDatabase,
+        thread_limiter: Optional[trio.CapacityLimiter] = None,
+        compression: Optional[str] = None,
     ) -> AsyncIterator["ChunkStorage"]:
-        async with cls(device, localdb)._run() as self:
+        async with cls(device, localdb, thread_limiter, compression)._run() as self:
             yield self
 
     @asynccontextmanager
@@ -46,12 +177,13 @@ class ChunkStorage:
             with trio.CancelScope(shield=True):
                 # Commit the pending changes in the local database
                 try:
+                    await self.flush_accessed_on()
                     await self.localdb.commit()
                 # Ignore storage closed exceptions, since it follows an operational error
                 except FSLocalStorageClosedError:
                     pass
 
-    def _open_cursor(self) -> AsyncContextManager[Cursor]:
+    def _open_cursor(self, readonly: bool = False) -> AsyncContextManager[Cursor]:
         # There is no point in committing dirty chunks:
         # they are referenced by a manifest that will get committed
         # soon after them. This greatly improves the performance of
@@ -60,7 +192,7 @@ class ChunkStorage:
         # memory during the writing, this means that the data and
         # metadata is typically not flushed to the disk until an
         # an actual flush operation is performed.
-        return self.localdb.open_cursor(commit=False)
+        return self.localdb.open_cursor(commit=False, readonly=readonly)
 
     # Database initialization
 
@@ -69,23 +201,30 @@ class ChunkStorage:
             cursor.execute(
                 """CREATE TABLE IF NOT EXISTS chunks
                     (chunk_id BLOB PRIMARY KEY NOT NULL, -- UUID
-                     size INTEGER NOT NULL,
-                     offline INTEGER NOT NULL,  -- Boolean
+                     size INTEGER NOT NULL, -- Size of the stored (compressed and ciphered) data
+                     offline INTEGER NOT NULL,  -- Boolean, offline blocks are never evicted from the cache
                      accessed_on REAL, -- Timestamp
-                     data BLOB NOT NULL
+                     data BLOB NOT NULL,
+                     compression INTEGER NOT NULL DEFAULT 0
                 );"""
             )
+            # Chunks stored before compression got introduced are not compressed
+            cursor.execute("PRAGMA table_info(chunks)")
+            if "compression" not in (row[1] for row in cursor.fetchall()):
+                cursor.execute(
+                    "ALTER TABLE chunks ADD COLUMN compression INTEGER NOT NULL DEFAULT 0"
+                )
 
     # Size and chunks
 
     async def get_nb_blocks(self) -> int:
-        async with self._open_cursor() as cursor:
+        async with self._open_cursor(readonly=True) as cursor:
             cursor.execute("SELECT COUNT(*) FROM chunks")
             (result,) = cursor.fetchone()
             return result
 
     async def get_total_size(self) -> int:
-        async with self._open_cursor() as cursor:
+        async with self._open_cursor(readonly=True) as cursor:
             cursor.execute("SELECT COALESCE(SUM(size), 0) FROM chunks")
             (result,) = cursor.fetchone()
             return result
@@ -93,81 +232,97 @@ class ChunkStorage:
     # Generic chunk operations
 
     async def is_chunk(self, chunk_id: ChunkID) -> bool:
-        async with self._open_cursor() as cursor:
+        async with self._open_cursor(readonly=True) as cursor:
             cursor.execute("SELECT chunk_id FROM chunks WHERE chunk_id = ?", (chunk_id.bytes,))
             manifest_row = cursor.fetchone()
         return bool(manifest_row)
 
     async def get_local_chunk_ids(self, chunk_id: List[ChunkID]) -> List[ChunkID]:
+        # Remove duplicates as they may end up in different queries
+        bytes_id_list = list(dict.fromkeys(id.bytes for id in chunk_id))
+        local_chunk_ids = []
+
+        async with self._open_cursor(readonly=True) as cursor:
+            # Split the ids so that each query stays under the sqlite max argument limit
+            for i in range(0, len(bytes_id_list), SQLITE_MAX_VARIABLE_NUMBER):
+                batch = bytes_id_list[i : i + SQLITE_MAX_VARIABLE_NUMBER]
+                placeholders = ", ".join("?" * len(batch))
+                cursor.execute(
+                    f"SELECT chunk_id FROM chunks WHERE chunk_id IN ({placeholders})", batch
+                )
+                local_chunk_ids += [
+                    ChunkID.from_bytes(id_bytes) for (id_bytes,) in cursor.fetchall()
+                ]
 
-        bytes_id_list = [(id.bytes,) for id in chunk_id]
+        return local_chunk_ids
 
-        async with self._open_cursor() as cursor:
-            # Can't use execute many with SELECT so we have to make a temporary table filled with the needed chunk_id
-            # and intersect it with the normal table
-            # create random name for the temporary table to avoid asynchronous errors
-            table_name = "temp" + secrets.token_hex(12)
-            assert table_name.isalnum()
+    @property
+    def thread_limiter(self) -> trio.CapacityLimiter:
+        return self._thread_limiter or get_chunk_thread_limiter()
 
-            cursor.execute(f"""DROP TABLE IF EXISTS {table_name}""")
-            cursor.execute(
-                f"""CREATE TABLE IF NOT EXISTS {table_name}
-                    (chunk_id BLOB PRIMARY KEY NOT NULL -- UUID
-                );"""
-            )
+    async def get_chunk(self, chunk_id: ChunkID) -> bytes:
+        local_symkey = self.local_symkey
 
-            cursor.executemany(
-                f"""INSERT OR REPLACE INTO
-            {table_name} (chunk_id)
-            VALUES (?)""",
-                iter(bytes_id_list),
-            )
+        async with self._open_cursor(readonly=True) as cursor:
 
-            cursor.execute(
-                f"""SELECT chunk_id FROM chunks INTERSECT SELECT chunk_id FROM {table_name}"""
-            )
+            def _thread_target() -> Optional[bytes]:
+                cursor.execute(
+                    """SELECT compression, data FROM chunks WHERE chunk_id = ?""",
+                    (chunk_id.bytes,),
+                )
+                row = cursor.fetchone()
+                if not row:
+                    return None
+                compression, ciphered = row
+                return decompress_chunk(compression, local_symkey.decrypt(ciphered))
 
-            intersect_rows = cursor.fetchall()
-            cursor.execute(f"""DROP TABLE IF EXISTS {table_name}""")
+            # Run CPU and IO expensive logic in a thread
+            async with self.thread_limiter:
+                raw = await self.localdb.run_in_thread(_thread_target)
 
-        return [ChunkID.from_bytes(id_bytes) for (id_bytes,) in intersect_rows]
+        if raw is None:
+            raise FSLocalMissError(chunk_id)
 
-    async def get_chunk(self, chunk_id: ChunkID) -> bytes:
-        async with self._open_cursor() as cursor:
-            # Use a thread as executing a statement that modifies the content of the database might,
-            # in some case, block for several hundreds of milliseconds
-            await self.localdb.run_in_thread(
-                cursor.execute,
-                """
-                UPDATE chunks SET accessed_on = ? WHERE chunk_id = ?;
-                """,
-                (time.time(), chunk_id.bytes),
-            )
-            cursor.execute("SELECT changes()")
-            (changes,) = cursor.fetchone()
-            if not changes:
-                raise FSLocalMissError(chunk_id)
-            cursor.execute("""SELECT data FROM chunks WHERE chunk_id = ?""", (chunk_id.bytes,))
-            (ciphered,) = cursor.fetchone()
+        self._pending_accessed_on[chunk_id.bytes] = time.time()
+        self._pending_accessed_on.move_to_end(chunk_id.bytes)
+        await self._maybe_flush_accessed_on()
 
-        return self.local_symkey.decrypt(ciphered)
+        return raw
 
     async def set_chunk(self, chunk_id: ChunkID, raw: bytes) -> None:
-        ciphered = self.local_symkey.encrypt(raw)
+        local_symkey = self.local_symkey
+        compression = self.compression
 
         # Update database
         async with self._open_cursor() as cursor:
-            # Use a thread as executing a statement that modifies the content of the database might,
-            # in some case, block for several hundreds of milliseconds
-            await self.localdb.run_in_thread(
-                cursor.execute,
-                """INSERT OR REPLACE INTO
-                chunks (chunk_id, size, offline, accessed_on, data)
-                VALUES (?, ?, ?, ?, ?)""",
-                (chunk_id.bytes, len(ciphered), False, time.time(), ciphered),
-            )
+
+            def _thread_target() -> None:
+                used_compression, compressed = compress_chunk(compression, raw)
+                ciphered = local_symkey.encrypt(compressed)
+                cursor.execute(
+                    """INSERT OR REPLACE INTO
+                    chunks (chunk_id, size, offline, accessed_on, data, compression)
+                    VALUES (?, ?, ?, ?, ?, ?)""",
+                    (
+                        chunk_id.bytes,
+                        len(ciphered),
+                        False,
+                        time.time(),
+                        ciphered,
+                        used_compression,
+                    ),
+                )
+
+            # Run CPU and IO expensive logic in a thread (executing a statement that modifies
+            # the content of the database might, in some case, block for several hundreds of
+            # milliseconds)
+            async with self.thread_limiter:
+                await self.localdb.run_in_thread(_thread_target)
+
+        self._pending_accessed_on.pop(chunk_id.bytes, None)
 
     async def clear_chunk(self, chunk_id: ChunkID) -> None:
+        self._pending_accessed_on.pop(chunk_id.bytes, None)
         async with self._open_cursor() as cursor:
             # Use a thread as executing a statement that modifies the content of the database might,
             # in some case, block for several hundreds of milliseconds
@@ -180,93 +335,430 @@ class ChunkStorage:
         if not changes:
             raise FSLocalMissError(chunk_id)
 
+    # Access time tracking
 
-class BlockStorage(ChunkStorage):
-    """Interface for caching the data blocks."""
+    async def _maybe_flush_accessed_on(self) -> None:
+        if (
+            len(self._pending_accessed_on) >= ACCESSED_ON_FLUSH_MAX_PENDING
+            or time.monotonic() - self._last_accessed_on_flush >= ACCESSED_ON_FLUSH_INTERVAL
+        ):
+            await self.flush_accessed_on()
+
+    async def flush_accessed_on(self, cursor: Optional[Cursor] = None) -> None:
+        """Write the chunks access times kept in memory to the database"""
+        self._last_accessed_on_flush = time.monotonic()
+        if not self._pending_accessed_on:
+            return
+        pending = [
+            (accessed_on, chunk_id) for chunk_id, accessed_on in self._pending_accessed_on.items()
+        ]
+        self._pending_accessed_on.clear()
+
+        async with self._reenter_cursor(cursor) as cursor:
+            # Use a thread as executing a statement that modifies the content of the database might,
+            # in some case, block for several hundreds of milliseconds
+            await self.localdb.run_in_thread(
+                cursor.executemany,
+                "UPDATE chunks SET accessed_on = ? WHERE chunk_id = ?",
+                pending,
+            )
+
+    @asynccontextmanager
+    async def _reenter_cursor(self, cursor: Optional[Cursor]) -> AsyncIterator[Cursor]:
+        if cursor is not None:
+            yield cursor
+            return
+        async with self._open_cursor() as cursor:
+            yield cursor
 
-    def __init__(self, device: LocalDevice, localdb: LocalDatabase, cache_size: int):
-        super().__init__(device, localdb)
+
+class BlockStorage(ChunkStorage):
+    """Interface for caching the data blocks.
+
+    The blocks of the pinned entries are kept offline, i.e. they are never evicted
+    from the cache. A block stays offline as long as at least one pinned file still
+    references it (blocks can be shared between files).
+    """
+
+    def __init__(
+        self,
+        device: LocalDevice,
+        localdb: LocalDatabase,
+        cache_size: int,
+        thread_limiter: Optional[trio.CapacityLimiter] = None,
+        compression: Optional[str] = None,
+    ):
+        super().__init__(device, localdb, thread_limiter, compression)
         self.cache_size = cache_size
+        # Kept up to date in memory to avoid counting the blocks after each insertion
+        self._nb_blocks = 0
+        self._total_size = 0
+        # Offline blocks are not part of the cache size
+        self._offline_size = 0
+        self._pinned_entries: Dict[EntryID, bool] = {}
+        self._cleanup_needed = trio.Event()
+        # Access time of the first block written since the last cleanup, the blocks
+        # written afterward must not get evicted by the cleanup they triggered
+        self._cleanup_requested_on: Optional[float] = None
 
     @classmethod
     @asynccontextmanager
     async def run(  # type: ignore[override]
-        cls, device: LocalDevice, localdb: LocalDatabase, cache_size: int
+        cls,
+        device: LocalDevice,
+        localdb: LocalDatabase,
+        cache_size: int,
+        thread_limiter: Optional[trio.CapacityLimiter] = None,
+        compression: Optional[str] = None,
     ) -> AsyncIterator["BlockStorage"]:
-        async with cls(device, localdb, cache_size)._run() as self:
+        async with cls(device, localdb, cache_size, thread_limiter, compression)._run() as self:
             yield self
 
-    def _open_cursor(self) -> AsyncContextManager[Cursor]:
+    @asynccontextmanager
+    async def _run(self) -> AsyncIterator["BlockStorage"]:
+        async with super()._run():
+            async with open_service_nursery() as nursery:
+                nursery.start_soon(self._cleanup_task)
+                try:
+                    yield self
+                finally:
+                    nursery.cancel_scope.cancel()
+
+    def _open_cursor(self, readonly: bool = False) -> AsyncContextManager[Cursor]:
         # It doesn't matter for blocks to be committed as soon as they're added
         # since they exists in the remote storage anyway. But it's simply more
         # convenient to perform the commit right away as it does't cost much (at
         # least compare to the downloading of the block).
-        return self.localdb.open_cursor(commit=True)
+        return self.localdb.open_cursor(commit=True, readonly=readonly)
 
-    @asynccontextmanager
-    async def _reenter_cursor(self, cursor: Optional[Cursor]) -> AsyncIterator[Cursor]:
-        if cursor is not None:
-            yield cursor
-            return
+    # Database initialization
+
+    async def _create_db(self) -> None:
+        await super()._create_db()
         async with self._open_cursor() as cursor:
-            yield cursor
+            # Used to find the least recently used blocks during the cleanup
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS chunks_accessed_on_idx ON chunks (accessed_on)"
+            )
+            # Entries pinned by the user, a pinned folder pins the files it contains
+            # (and the files in its sub-folders if recursive)
+            cursor.execute(
+                """CREATE TABLE IF NOT EXISTS pinned_entries
+                    (entry_id BLOB PRIMARY KEY NOT NULL, -- UUID
+                     recursive INTEGER NOT NULL -- Boolean
+                );"""
+            )
+            # Blocks of the pinned files, as of their last synchronization
+            cursor.execute(
+                """CREATE TABLE IF NOT EXISTS pinned_blocks
+                    (entry_id BLOB NOT NULL, -- UUID of the file
+                     parent_id BLOB NOT NULL, -- UUID of the folder containing the file
+                     block_id BLOB NOT NULL, -- UUID
+                     PRIMARY KEY (entry_id, block_id)
+                );"""
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS pinned_blocks_block_id_idx ON pinned_blocks (block_id)"
+            )
+            cursor.execute(
+                """CREATE INDEX IF NOT EXISTS pinned_blocks_parent_id_idx
+                ON pinned_blocks (parent_id)"""
+            )
+            cursor.execute(
+                """SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(size * offline), 0)
+                FROM chunks"""
+            )
+            self._nb_blocks, self._total_size, self._offline_size = cursor.fetchone()
+            cursor.execute("SELECT entry_id, recursive FROM pinned_entries")
+            self._pinned_entries = {
+                EntryID.from_bytes(entry_id): bool(recursive)
+                for entry_id, recursive in cursor.fetchall()
+            }
 
-    # Garbage collection
+    # Size and chunks
 
-    @property
-    def block_limit(self) -> int:
-        return self.cache_size // DEFAULT_BLOCK_SIZE
+    async def get_nb_blocks(self) -> int:
+        return self._nb_blocks
 
-    async def clear_all_blocks(self) -> None:
+    async def get_total_size(self) -> int:
+        return self._total_size
+
+    async def get_offline_size(self) -> int:
+        return self._offline_size
+
+    def _is_cache_full(self) -> bool:
+        return self._total_size - self._offline_size > self.cache_size
+
+    # Pinned entries
+
+    async def get_pinned_entries(self) -> Dict[EntryID, bool]:
+        """Return the pinned entries, along with whether they are pinned recursively"""
+        return dict(self._pinned_entries)
+
+    async def set_pinned_entry(self, entry_id: EntryID, recursive: bool) -> None:
         async with self._open_cursor() as cursor:
-            cursor.execute("DELETE FROM chunks")
+            cursor.execute(
+                "INSERT OR REPLACE INTO pinned_entries (entry_id, recursive) VALUES (?, ?)",
+                (entry_id.bytes, recursive),
+            )
+        self._pinned_entries[entry_id] = recursive
+
+    async def clear_pinned_entries(self, entry_ids: List[EntryID]) -> None:
+        async with self._open_cursor() as cursor:
+            cursor.executemany(
+                "DELETE FROM pinned_entries WHERE entry_id = ?",
+                [(entry_id.bytes,) for entry_id in entry_ids],
+            )
+        for entry_id in entry_ids:
+            self._pinned_entries.pop(entry_id, None)
 
-    # Upgraded set method
+    # Pinned blocks
 
-    async def set_chunk(self, chunk_id: ChunkID, raw: bytes) -> None:
-        ciphered = self.local_symkey.encrypt(raw)
+    async def get_pinned_files(self) -> Set[EntryID]:
+        """Return the files having pinned blocks"""
+        async with self._open_cursor(readonly=True) as cursor:
+            cursor.execute("SELECT DISTINCT entry_id FROM pinned_blocks")
+            return {EntryID.from_bytes(entry_id) for (entry_id,) in cursor.fetchall()}
 
-        # Update database
+    async def set_pinned_blocks(
+        self, entry_id: EntryID, parent_id: EntryID, chunk_ids: List[ChunkID]
+    ) -> None:
+        """Pin the blocks of the file, in place of the ones it used to have"""
         async with self._open_cursor() as cursor:
+            cursor.execute(
+                "SELECT block_id FROM pinned_blocks WHERE entry_id = ?", (entry_id.bytes,)
+            )
+            updated = {block_id for (block_id,) in cursor.fetchall()}
+            cursor.execute("DELETE FROM pinned_blocks WHERE entry_id = ?", (entry_id.bytes,))
+            cursor.executemany(
+                """INSERT OR IGNORE INTO pinned_blocks (entry_id, parent_id, block_id)
+                VALUES (?, ?, ?)""",
+                [(entry_id.bytes, parent_id.bytes, chunk_id.bytes) for chunk_id in chunk_ids],
+            )
+            updated.update(chunk_id.bytes for chunk_id in chunk_ids)
+            # Use a thread as executing a statement that modifies the content of the database might,
+            # in some case, block for several hundreds of milliseconds
+            self._offline_size += await self.localdb.run_in_thread(
+                self._update_offline, cursor, list(updated)
+            )
+        if self._is_cache_full():
+            self._cleanup_needed.set()
 
-            # Insert the chunk
+    async def clear_pinned_blocks(self, entry_ids: Iterable[EntryID]) -> None:
+        """Unpin the blocks of the files, unless other pinned files reference them"""
+        updated = set()
+        async with self._open_cursor() as cursor:
+            for entry_id in entry_ids:
+                cursor.execute(
+                    "SELECT block_id FROM pinned_blocks WHERE entry_id = ?", (entry_id.bytes,)
+                )
+                updated.update(block_id for (block_id,) in cursor.fetchall())
+                cursor.execute("DELETE FROM pinned_blocks WHERE entry_id = ?", (entry_id.bytes,))
             # Use a thread as executing a statement that modifies the content of the database might,
             # in some case, block for several hundreds of milliseconds
-            await self.localdb.run_in_thread(
-                cursor.execute,
-                """INSERT OR REPLACE INTO
-                chunks (chunk_id, size, offline, accessed_on, data)
-                VALUES (?, ?, ?, ?, ?)""",
-                (chunk_id.bytes, len(ciphered), False, time.time(), ciphered),
+            self._offline_size += await self.localdb.run_in_thread(
+                self._update_offline, cursor, list(updated)
             )
+        if self._is_cache_full():
+            self._cleanup_needed.set()
+
+    async def clear_removed_pinned_blocks(
+        self, parent_id: EntryID, children_ids: Iterable[EntryID]
+    ) -> None:
+        """Unpin the blocks of the files no longer in the folder"""
+        async with self._open_cursor(readonly=True) as cursor:
+            cursor.execute(
+                "SELECT DISTINCT entry_id FROM pinned_blocks WHERE parent_id = ?",
+                (parent_id.bytes,),
+            )
+            removed = {EntryID.from_bytes(entry_id) for (entry_id,) in cursor.fetchall()}
+        removed.difference_update(children_ids)
+        if removed:
+            await self.clear_pinned_blocks(removed)
+
+    @staticmethod
+    def _update_offline(cursor: Cursor, chunk_ids: List[bytes]) -> int:
+        """Mark the chunks referenced by a pinned file as offline, and only those
+
+        Returns the size difference of the offline chunks.
+        """
+        offline_size_diff = 0
+        for i in range(0, len(chunk_ids), SQLITE_MAX_VARIABLE_NUMBER):
+            batch = chunk_ids[i : i + SQLITE_MAX_VARIABLE_NUMBER]
+            placeholders = ", ".join("?" * len(batch))
+            cursor.execute(
+                f"""SELECT chunk_id, size, offline, EXISTS(
+                    SELECT 1 FROM pinned_blocks WHERE block_id = chunks.chunk_id
+                ) FROM chunks WHERE chunk_id IN ({placeholders})""",
+                batch,
+            )
+            changed = []
+            for chunk_id, size, offline, pinned in cursor.fetchall():
+                if bool(offline) == bool(pinned):
+                    continue
+                changed.append((bool(pinned), chunk_id))
+                offline_size_diff += size if pinned else -size
+            cursor.executemany("UPDATE chunks SET offline = ? WHERE chunk_id = ?", changed)
+        return offline_size_diff
+
+    # Garbage collection
 
-            # Perform cleanup if necessary
-            await self.cleanup(cursor)
+    async def clear_all_blocks(self) -> None:
+        self._pending_accessed_on.clear()
+        async with self._open_cursor() as cursor:
+            cursor.execute("DELETE FROM chunks")
+            self._nb_blocks = 0
+            self._total_size = 0
+            self._offline_size = 0
+
+    async def _cleanup_task(self) -> None:
+        while True:
+            await self._cleanup_needed.wait()
+            self._cleanup_needed = trio.Event()
+            try:
+                await self.cleanup()
+            # The next operation on the storage will report the error
+            except (FSLocalStorageClosedError, FSLocalStorageOperationalError):
+                return
+
+    async def cleanup(self) -> None:
+        """Remove the least recently used blocks if the cache exceeds its maximum size
+
+        Offline blocks are never removed and don't count in the cache size. The blocks
+        written since the cleanup got requested are not removed either, otherwise a
+        block could be evicted right after being downloaded.
+        """
+        protected_since = self._cleanup_requested_on or time.time()
+        self._cleanup_requested_on = None
+        if not self._is_cache_full():
+            return
+        target_size = int(self.cache_size * BLOCK_CLEANUP_TARGET_RATIO)
+
+        # Blocks are removed by batches, so that reading the blocks is not blocked
+        # for the whole cleanup
+        while self._total_size - self._offline_size > target_size:
+            async with self._open_cursor() as cursor:
+                # Eviction relies on the access times
+                await self.flush_accessed_on(cursor)
+                # Use a thread as executing a statement that modifies the content of the database might,
+                # in some case, block for several hundreds of milliseconds
+                nb_blocks, size = await self.localdb.run_in_thread(
+                    self._remove_least_recently_used,
+                    cursor,
+                    self._total_size - self._offline_size - target_size,
+                    protected_since,
+                )
+                self._nb_blocks -= nb_blocks
+                self._total_size -= size
+            if not nb_blocks:
+                break
+
+    @staticmethod
+    def _remove_least_recently_used(
+        cursor: Cursor, size_to_remove: int, protected_since: float
+    ) -> tuple[int, int]:
+        cursor.execute(
+            """SELECT chunk_id, size FROM chunks WHERE NOT offline AND accessed_on < ?
+            ORDER BY accessed_on ASC LIMIT ?""",
+            (protected_since, BLOCK_CLEANUP_BATCH_SIZE),
+        )
+        removed = []
+        removed_size = 0
+        for chunk_id, size in cursor.fetchall():
+            if removed_size >= size_to_remove:
+                break
+            removed.append((chunk_id,))
+            removed_size += size
+        cursor.executemany("DELETE FROM chunks WHERE chunk_id = ?", removed)
+        return len(removed), removed_size
+
+    # Upgraded set and clear methods
 
-    async def cleanup(self, cursor: Optional[Cursor] = None) -> None:
+    async def set_chunk(self, chunk_id: ChunkID, raw: bytes) -> None:
+        local_symkey = self.local_symkey
+        compression = self.compression
 
         # Update database
-        async with self._reenter_cursor(cursor) as cursor:
+        async with self._open_cursor() as cursor:
 
-            # Count the chunks
-            cursor.execute("SELECT COUNT(*) FROM chunks")
-            (nb_blocks,) = cursor.fetchone()
-            extra_blocks = nb_blocks - self.block_limit
+            def _thread_target() -> Tuple[Optional[Tuple[int, bool]], int, bool, float]:
+                used_compression, compressed = compress_chunk(compression, raw)
+                ciphered = local_symkey.encrypt(compressed)
 
-            # No clean up is needed
-            if extra_blocks <= 0:
-                return
+                # The chunk might already exist, in which case it gets replaced
+                cursor.execute(
+                    "SELECT size, offline FROM chunks WHERE chunk_id = ?", (chunk_id.bytes,)
+                )
+                row = cursor.fetchone()
+                # Blocks of the pinned files are offline as soon as they get downloaded
+                cursor.execute(
+                    "SELECT EXISTS(SELECT 1 FROM pinned_blocks WHERE block_id = ?)",
+                    (chunk_id.bytes,),
+                )
+                (offline,) = cursor.fetchone()
+                accessed_on = time.time()
+
+                # Insert the chunk
+                cursor.execute(
+                    """INSERT OR REPLACE INTO
+                    chunks (chunk_id, size, offline, accessed_on, data, compression)
+                    VALUES (?, ?, ?, ?, ?, ?)""",
+                    (
+                        chunk_id.bytes,
+                        len(ciphered),
+                        bool(offline),
+                        accessed_on,
+                        ciphered,
+                        used_compression,
+                    ),
+                )
+                return (
+                    (row[0], bool(row[1])) if row else None,
+                    len(ciphered),
+                    bool(offline),
+                    accessed_on,
+                )
+
+            # Run CPU and IO expensive logic in a thread (executing a statement that modifies
+            # the content of the database might, in some case, block for several hundreds of
+            # milliseconds)
+            async with self.thread_limiter:
+                replaced, size, offline, accessed_on = await self.localdb.run_in_thread(
+                    _thread_target
+                )
+
+            self._pending_accessed_on.pop(chunk_id.bytes, None)
+            if replaced is not None:
+                replaced_size, replaced_offline = replaced
+                self._nb_blocks -= 1
+                self._total_size -= replaced_size
+                if replaced_offline:
+                    self._offline_size -= replaced_size
+            self._nb_blocks += 1
+            self._total_size += size
+            if offline:
+                self._offline_size += size
+
+        # Perform cleanup in the background if necessary
+        if self._is_cache_full():
+            if self._cleanup_requested_on is None:
+                self._cleanup_requested_on = accessed_on
+            self._cleanup_needed.set()
+
+    async def clear_chunk(self, chunk_id: ChunkID) -> None:
+        self._pending_accessed_on.pop(chunk_id.bytes, None)
+        async with self._open_cursor() as cursor:
+            cursor.execute("SELECT size, offline FROM chunks WHERE chunk_id = ?", (chunk_id.bytes,))
+            row = cursor.fetchone()
+            if not row:
+                raise FSLocalMissError(chunk_id)
 
-            # Remove the extra block plus 10 % of the cache size, i.e about 100 blocks
-            limit = extra_blocks + self.block_limit // 10
             # Use a thread as executing a statement that modifies the content of the database might,
             # in some case, block for several hundreds of milliseconds
             await self.localdb.run_in_thread(
-                cursor.execute,
-                """
-                DELETE FROM chunks WHERE chunk_id IN (
-                    SELECT chunk_id FROM chunks ORDER BY accessed_on ASC LIMIT ?
-                )
-                """,
-                (limit,),
+                cursor.execute, "DELETE FROM chunks WHERE chunk_id = ?", (chunk_id.bytes,)
             )
+            self._nb_blocks -= 1
+            self._total_size -= row[0]
+            if row[1]:
+                self._offline_size -= row[0]
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import AsyncIterator, Optional, Union
+from typing import AsyncIterator, List, Optional, Union
 import trio
 from contextlib import asynccontextmanager
 from sqlite3 import Connection, Cursor, OperationalError, connect as sqlite_connect
@@ -10,29 +10,48 @@ from sqlite3 import Connection, Cursor, OperationalError, connect as sqlite_conn
 from parsec.core.fs.exceptions import FSLocalStorageClosedError, FSLocalStorageOperationalError
 
 
+# Maximum number of read-only connections opened alongside the main connection
+DEFAULT_MAX_READERS = 4
+
+
 class LocalDatabase:
     """Base class for managing an sqlite3 connection."""
 
     # Make the trio run_sync function patchable for the tests
     run_in_thread = staticmethod(trio.to_thread.run_sync)
 
-    def __init__(self, path: Union[str, Path, trio.Path], vacuum_threshold: Optional[int] = None):
+    def __init__(
+        self,
+        path: Union[str, Path, trio.Path],
+        vacuum_threshold: Optional[int] = None,
+        max_readers: int = DEFAULT_MAX_READERS,
+    ):
         # Make sure only a single task access the connection object at a time
         self._lock = trio.Lock()
 
         # Those attributes are set by the `run` async context manager
         self._conn: Connection
 
+        # Read-only connections, only available in WAL mode (i.e. when reading
+        # doesn't block writing and vice versa)
+        self._readers_enabled = False
+        self._idle_readers: List[Connection] = []
+        self._nb_readers = 0
+        self.max_readers = max_readers
+
         self.path = trio.Path(path)
         self.vacuum_threshold = vacuum_threshold
 
     @classmethod
     @asynccontextmanager
     async def run(
-        cls, path: Union[str, Path], vacuum_threshold: Optional[int] = None
+        cls,
+        path: Union[str, Path],
+        vacuum_threshold: Optional[int] = None,
+        max_readers: int = DEFAULT_MAX_READERS,
     ) -> AsyncIterator["LocalDatabase"]:
         # Instanciate the local database
-        self = cls(path, vacuum_threshold)
+        self = cls(path, vacuum_threshold, max_readers)
 
         # Create the connection to the sqlite database
         try:
@@ -97,6 +116,40 @@ class LocalDatabase:
                 # Mark the local database as closed
                 finally:
                     del self._conn
+                    self._close_idle_readers()
+
+                # Raise the dedicated operational error
+                raise FSLocalStorageOperationalError from exception
+
+    @asynccontextmanager
+    async def _manage_reader_operational_error(self) -> AsyncIterator[None]:
+        """Close the local database when an operational error is detected on a reader
+
+        Same as `_manage_operational_error`, there is no transaction to check
+        given readers cannot modify the database.
+        """
+        try:
+            yield
+
+        # An operational error has been detected
+        except OperationalError as exception:
+
+            with trio.CancelScope(shield=True):
+
+                # Close the main sqlite3 connection
+                async with self._lock:
+                    if not self._is_closed():
+                        try:
+                            await self.run_in_thread(self._conn.close)
+
+                        # Ignore second operational error (it should not happen though)
+                        except OperationalError:
+                            pass
+
+                        # Mark the local database as closed
+                        finally:
+                            del self._conn
+                            self._close_idle_readers()
 
                 # Raise the dedicated operational error
                 raise FSLocalStorageOperationalError from exception
@@ -119,8 +172,15 @@ class LocalDatabase:
         # to 15 ms the default mode) but still protects the database against
         # corruption in the case of OS crash or power failure.
         async with self._manage_operational_error():
-            self._conn.execute("PRAGMA journal_mode=WAL")
+            (journal_mode,) = self._conn.execute("PRAGMA journal_mode=WAL").fetchone()
             self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._readers_enabled = journal_mode.lower() == "wal"
+
+    def _create_reader_connection(self) -> Connection:
+        # Autocommit mode, so that a read transaction doesn't outlive its cursor
+        conn = sqlite_connect(str(self.path), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA query_only=ON")
+        return conn
 
     async def _connect(self) -> None:
         # Lock the access to the connection object
@@ -152,6 +212,7 @@ class LocalDatabase:
                     # Mark the local database as closed
                     finally:
                         del self._conn
+                        self._close_idle_readers()
 
     async def _commit(self) -> None:
         # Close the local database if an operational error is detected
@@ -165,10 +226,59 @@ class LocalDatabase:
         if self._is_closed():
             raise FSLocalStorageClosedError
 
+    # Reader connections management
+
+    def _acquire_reader(self) -> Optional[Connection]:
+        # Changes that are not committed yet are only visible from the main connection
+        if not self._readers_enabled or self._conn.in_transaction:
+            return None
+        if self._idle_readers:
+            return self._idle_readers.pop()
+        if self._nb_readers >= self.max_readers:
+            return None
+        conn = self._create_reader_connection()
+        self._nb_readers += 1
+        return conn
+
+    def _release_reader(self, conn: Connection) -> None:
+        if self._is_closed():
+            self._nb_readers -= 1
+            conn.close()
+        else:
+            self._idle_readers.append(conn)
+
+    def _close_idle_readers(self) -> None:
+        while self._idle_readers:
+            self._nb_readers -= 1
+            self._idle_readers.pop().close()
+
     # Cursor management
 
     @asynccontextmanager
-    async def open_cursor(self, commit: bool = True) -> AsyncIterator[Cursor]:
+    async def open_cursor(
+        self, commit: bool = True, readonly: bool = False
+    ) -> AsyncIterator[Cursor]:
+        # Read-only cursors don't wait for the main connection if a reader is available
+        if readonly:
+            # Check connection state
+            self._check_open()
+
+            reader = self._acquire_reader()
+            if reader is not None:
+                try:
+                    # Close the local database if an operational error is detected
+                    async with self._manage_reader_operational_error():
+
+                        # Execute SQL commands
+                        cursor = reader.cursor()
+                        try:
+                            yield cursor
+                        finally:
+                            cursor.close()
+                finally:
+                    self._release_reader(reader)
+                return
+
         # Lock the access to the connection object
         async with self._lock:
 
@@ -232,6 +342,7 @@ class LocalDatabase:
                 return
 
             # Run vacuum
+            self._close_idle_readers()
             await self.run_in_thread(self._conn.execute, "VACUUM")
 
             # The connection needs to be recreated
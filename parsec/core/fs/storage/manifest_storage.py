@@ -1,11 +1,15 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
 from __future__ import annotations
 
+import attr
 import trio
 from pathlib import Path
+from itertools import islice
+from collections import OrderedDict
 from structlog import get_logger
 from typing import (
     Dict,
+    List,
     Tuple,
     Set,
     Optional,
@@ -25,6 +29,16 @@ logger = get_logger()
 
 EMPTY_PATTERN = r"^\b$"  # Do not match anything (https://stackoverflow.com/a/2302992/2846140)
 
+# Maximum number of manifests written in a single transaction when flushing the cache
+FLUSH_BATCH_SIZE = 1000
+
+
+@attr.s(slots=True, auto_attribs=True)
+class ManifestCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
 
 class ManifestStorage:
     """Persistent storage with cache for storing manifests.
@@ -32,15 +46,32 @@ class ManifestStorage:
     Also stores the checkpoint.
     """
 
-    def __init__(self, device: LocalDevice, localdb: LocalDatabase, realm_id: EntryID):
+    def __init__(
+        self,
+        device: LocalDevice,
+        localdb: LocalDatabase,
+        realm_id: EntryID,
+        cache_size: Optional[int] = None,
+    ):
         self.device = device
         self.localdb = localdb
         self.realm_id = realm_id
-
-        # This cache contains all the manifests that have been set or accessed
-        # since the last call to `clear_memory_cache`
+        self.cache_size = cache_size
+        self.cache_stats = ManifestCacheStats()
+
+        # This cache contains the manifests that have been set or accessed
+        # since the last call to `clear_memory_cache`. Only the `cache_size`
+        # most recently used ones are kept, except for the realm manifest
+        # (expected to be available synchronously at all time) and the
+        # manifests that still need to be written to the localdb which are
+        # never evicted.
         self._cache: Dict[EntryID, AnyLocalManifest] = {}
 
+        # The ids of the manifests that can be evicted from the cache, from
+        # the least to the most recently used. The manifests that are never
+        # evicted are kept out of it, so that eviction doesn't go through them.
+        self._evictable: OrderedDict[EntryID, None] = OrderedDict()
+
         # This dictionary keeps track of all the entry ids of the manifests
         # that have been added to the cache but still needs to be written to
         # the localdb. The corresponding value is a set with the ids of all
@@ -56,9 +87,13 @@ class ManifestStorage:
     @classmethod
     @asynccontextmanager
     async def run(
-        cls, device: LocalDevice, localdb: LocalDatabase, realm_id: EntryID
+        cls,
+        device: LocalDevice,
+        localdb: LocalDatabase,
+        realm_id: EntryID,
+        cache_size: Optional[int] = None,
     ) -> AsyncIterator["ManifestStorage"]:
-        self = cls(device, localdb, realm_id)
+        self = cls(device, localdb, realm_id, cache_size)
         await self._create_db()
         try:
             yield self
@@ -71,16 +106,30 @@ class ManifestStorage:
                 except FSLocalStorageClosedError:
                     pass
 
-    def _open_cursor(self) -> AsyncContextManager[Cursor]:
+    def _open_cursor(self, readonly: bool = False) -> AsyncContextManager[Cursor]:
         # We want the manifest to be written to the disk as soon as possible
         # (unless they are purposely kept out of the local database)
-        return self.localdb.open_cursor(commit=True)
+        return self.localdb.open_cursor(commit=True, readonly=readonly)
 
     async def clear_memory_cache(self, flush: bool = True) -> None:
         if flush:
             await self._flush_cache_ahead_of_persistance()
         self._cache_ahead_of_localdb.clear()
         self._cache.clear()
+        self._evictable.clear()
+
+    def _mark_evictable(self, entry_id: EntryID) -> None:
+        if entry_id != self.realm_id:
+            self._evictable[entry_id] = None
+            self._evictable.move_to_end(entry_id)
+
+    def _evict_clean_manifests(self) -> None:
+        if self.cache_size is None:
+            return
+        while len(self._cache) > self.cache_size and self._evictable:
+            entry_id, _ = self._evictable.popitem(last=False)
+            del self._cache[entry_id]
+            self.cache_stats.evictions += 1
 
     # Database initialization
 
@@ -98,6 +147,15 @@ class ManifestStorage:
                 );
                 """
             )
+            # Only index the entries that need to be synchronized, so that finding them
+            # doesn't require going through the whole table (this index is added to
+            # the existing databases the first time they are opened)
+            cursor.execute(
+                """
+                CREATE INDEX IF NOT EXISTS vlobs_need_sync_idx ON vlobs (vlob_id)
+                WHERE need_sync = 1 OR base_version != remote_version
+                """
+            )
 
             # Singleton storing the checkpoint
             cursor.execute(
@@ -169,7 +227,7 @@ class ManifestStorage:
         """
         Raises: Nothing !
         """
-        async with self._open_cursor() as cursor:
+        async with self._open_cursor(readonly=True) as cursor:
             cursor.execute("SELECT checkpoint FROM realm_checkpoint WHERE _id = 0")
             rep = cursor.fetchone()
             return rep[0] if rep else 0
@@ -200,7 +258,8 @@ class ManifestStorage:
             entry_id for entry_id, manifest in self._cache.items() if manifest.need_sync
         }
 
-        async with self._open_cursor() as cursor:
+        async with self._open_cursor(readonly=True) as cursor:
+            # Condition must match the one of `vlobs_need_sync_idx` for the index to be used
             cursor.execute(
                 "SELECT vlob_id, need_sync, base_version, remote_version "
                 "FROM vlobs WHERE need_sync = 1 OR base_version != remote_version"
@@ -222,12 +281,17 @@ class ManifestStorage:
         """
         # Look in cache first
         try:
-            return self._cache[entry_id]
+            manifest = self._cache[entry_id]
         except KeyError:
-            pass
+            self.cache_stats.misses += 1
+        else:
+            self.cache_stats.hits += 1
+            if entry_id in self._evictable:
+                self._evictable.move_to_end(entry_id)
+            return manifest
 
         # Look into the database
-        async with self._open_cursor() as cursor:
+        async with self._open_cursor(readonly=True) as cursor:
             cursor.execute("SELECT blob FROM vlobs WHERE vlob_id = ?", (entry_id.bytes,))
             manifest_row = cursor.fetchone()
 
@@ -240,9 +304,12 @@ class ManifestStorage:
             self._cache[entry_id] = local_manifest_decrypt_and_load(
                 manifest_row[0], key=self.device.local_symkey
             )
+            self._mark_evictable(entry_id)
 
         # Always return the cached value
-        return self._cache[entry_id]
+        manifest = self._cache[entry_id]
+        self._evict_clean_manifests()
+        return manifest
 
     async def set_manifest(
         self,
@@ -261,6 +328,8 @@ class ManifestStorage:
 
         # Tag the entry as ahead of localdb
         self._cache_ahead_of_localdb.setdefault(entry_id, set())
+        self._evictable.pop(entry_id, None)
+        self._evict_clean_manifests()
 
         # Cleanup
         if removed_ids:
@@ -271,27 +340,47 @@ class ManifestStorage:
             await self._ensure_manifest_persistent(entry_id)
 
     async def _ensure_manifest_persistent(self, entry_id: EntryID) -> None:
+        await self._ensure_manifests_persistent([entry_id])
+
+    async def _ensure_manifests_persistent(self, entry_ids: List[EntryID]) -> None:
 
         # Get cursor
         async with self._open_cursor() as cursor:
 
             # Flushing is not necessary
-            if entry_id not in self._cache_ahead_of_localdb:
+            entry_ids = [
+                entry_id for entry_id in entry_ids if entry_id in self._cache_ahead_of_localdb
+            ]
+            if not entry_ids:
                 return
 
-            # Safely get the manifest and other information
-            manifest = self._cache[entry_id]
+            # Safely get the manifests and other information
+            manifests = [(entry_id, self._cache[entry_id]) for entry_id in entry_ids]
             pending_chunks_ids = [
-                (chunk_id.bytes,) for chunk_id in self._cache_ahead_of_localdb[entry_id]
+                (chunk_id.bytes,)
+                for entry_id in entry_ids
+                for chunk_id in self._cache_ahead_of_localdb[entry_id]
             ]
             local_symkey = self.device.local_symkey
 
             def _thread_target() -> None:
-                # Dump and decrypt the manifest
-                ciphered = manifest.dump_and_encrypt(local_symkey)
+                # Dump and decrypt the manifests
+                rows = []
+                for entry_id, manifest in manifests:
+                    ciphered = manifest.dump_and_encrypt(local_symkey)
+                    rows.append(
+                        (
+                            entry_id.bytes,
+                            ciphered,
+                            manifest.need_sync,
+                            manifest.base_version,
+                            manifest.base_version,
+                            entry_id.bytes,
+                        )
+                    )
 
                 # Insert into the local database
-                cursor.execute(
+                cursor.executemany(
                     """INSERT OR REPLACE INTO vlobs (vlob_id, blob, need_sync, base_version, remote_version)
                     VALUES (
                     ?, ?, ?, ?,
@@ -300,14 +389,7 @@ class ManifestStorage:
                             IFNULL((SELECT remote_version FROM vlobs WHERE vlob_id=?), 0)
                         )
                     )""",
-                    (
-                        entry_id.bytes,
-                        ciphered,
-                        manifest.need_sync,
-                        manifest.base_version,
-                        manifest.base_version,
-                        entry_id.bytes,
-                    ),
+                    rows,
                 )
 
                 # Clean all the pending chunks
@@ -317,9 +399,12 @@ class ManifestStorage:
             # Run CPU and IO expensive logic in a thread
             await self.localdb.run_in_thread(_thread_target)
 
-        # Tag entry as up-to-date only if no new manifest has been written in the meantime
-        if manifest == self._cache[entry_id]:
-            self._cache_ahead_of_localdb.pop(entry_id)
+        # Tag entries as up-to-date only if no new manifest has been written in the meantime
+        for entry_id, manifest in manifests:
+            if manifest == self._cache[entry_id]:
+                self._cache_ahead_of_localdb.pop(entry_id)
+                self._mark_evictable(entry_id)
+        self._evict_clean_manifests()
 
     async def ensure_manifest_persistent(self, entry_id: EntryID) -> None:
         """
@@ -331,10 +416,11 @@ class ManifestStorage:
             await self._ensure_manifest_persistent(entry_id)
 
     async def _flush_cache_ahead_of_persistance(self) -> None:
-        # Flush until the all the cache is gone
+        # Flush until the all the cache is gone, writing the manifests by batches
+        # so that each batch only requires a single commit
         while self._cache_ahead_of_localdb:
-            entry_id = next(iter(self._cache_ahead_of_localdb))
-            await self._ensure_manifest_persistent(entry_id)
+            entry_ids = list(islice(self._cache_ahead_of_localdb, FLUSH_BATCH_SIZE))
+            await self._ensure_manifests_persistent(entry_ids)
 
     # This method is not used in the code base but it is still tested
     # as it might come handy in a cleanup routine later
@@ -349,6 +435,7 @@ class ManifestStorage:
 
             # Safely remove from cache
             in_cache = bool(self._cache.pop(entry_id, None))
+            self._evictable.pop(entry_id, None)
 
             # Remove from local database
             cursor.execute("DELETE FROM vlobs WHERE vlob_id = ?", (entry_id.bytes,))
@@ -21,6 +21,7 @@ from structlog import get_logger
 from contextlib import asynccontextmanager
 
 from parsec._parsec import Regex
+from parsec.api.data import BlockAccess
 from parsec.core.types import (
     EntryID,
     BlockID,
@@ -30,11 +31,15 @@ from parsec.core.types import (
     LocalFileManifest,
     LocalWorkspaceManifest,
 )
-from parsec.core.config import DEFAULT_WORKSPACE_STORAGE_CACHE_SIZE
+from parsec.core.config import (
+    DEFAULT_WORKSPACE_STORAGE_CACHE_SIZE,
+    DEFAULT_WORKSPACE_MANIFEST_CACHE_SIZE,
+)
 from parsec.core.fs.exceptions import FSError, FSLocalMissError, FSInvalidFileDescriptor
 from parsec.core.fs.storage.local_database import LocalDatabase
 from parsec.core.fs.storage.manifest_storage import ManifestStorage
 from parsec.core.fs.storage.chunk_storage import ChunkStorage, BlockStorage
+from parsec.core.fs.storage.block_index import BlockIndex
 from parsec.core.fs.storage.version import (
     get_workspace_data_storage_db_path,
     get_workspace_cache_storage_db_path,
@@ -78,8 +83,9 @@ class BaseWorkspaceStorage:
         self,
         device: LocalDevice,
         workspace_id: EntryID,
-        block_storage: ChunkStorage,
+        block_storage: BlockStorage,
         chunk_storage: ChunkStorage,
+        block_index: Optional[BlockIndex] = None,
     ):
         self.device = device
         self.device_id = device.device_id
@@ -97,6 +103,9 @@ class BaseWorkspaceStorage:
         self.block_storage = block_storage
         self.chunk_storage = chunk_storage
 
+        # Only set when block deduplication is enabled
+        self.block_index = block_index
+
         # Pattern attributes
         # Set by `_load_prevent_sync_pattern` in WorkspaceStorage.run()
         self._prevent_sync_pattern: Regex
@@ -204,6 +213,50 @@ class BaseWorkspaceStorage:
     async def get_dirty_block(self, block_id: BlockID) -> bytes:
         return await self.chunk_storage.get_chunk(ChunkID(block_id.uuid))
 
+    # Pinning interface
+
+    async def get_pinned_entries(self) -> Dict[EntryID, bool]:
+        """Return the pinned entries, along with whether they are pinned recursively"""
+        return await self.block_storage.get_pinned_entries()
+
+    async def set_pinned_entry(self, entry_id: EntryID, recursive: bool) -> None:
+        await self.block_storage.set_pinned_entry(entry_id, recursive)
+
+    async def clear_pinned_entries(self, entry_ids: List[EntryID]) -> None:
+        await self.block_storage.clear_pinned_entries(entry_ids)
+
+    async def get_pinned_files(self) -> Set[EntryID]:
+        return await self.block_storage.get_pinned_files()
+
+    async def set_pinned_blocks(
+        self, entry_id: EntryID, parent_id: EntryID, block_ids: List[BlockID]
+    ) -> None:
+        """Keep the blocks of the file in the cache, whatever its size"""
+        await self.block_storage.set_pinned_blocks(
+            entry_id, parent_id, [ChunkID(block_id.uuid) for block_id in block_ids]
+        )
+
+    async def clear_pinned_blocks(self, entry_ids: List[EntryID]) -> None:
+        await self.block_storage.clear_pinned_blocks(entry_ids)
+
+    async def clear_removed_pinned_blocks(
+        self, parent_id: EntryID, children_ids: List[EntryID]
+    ) -> None:
+        await self.block_storage.clear_removed_pinned_blocks(parent_id, children_ids)
+
+    # Block deduplication interface
+
+    async def get_indexed_blocks(self, accesses: List[BlockAccess]) -> List[Optional[BlockAccess]]:
+        """Return, for each access, an already available block with the same content"""
+        if self.block_index is None:
+            return [None] * len(accesses)
+        return await self.block_index.get_block_accesses(accesses)
+
+    async def index_blocks(self, accesses: List[BlockAccess]) -> None:
+        if self.block_index is None:
+            return
+        await self.block_index.set_block_accesses(accesses)
+
     # Chunk interface
 
     async def get_chunk(self, chunk_id: ChunkID) -> bytes:
@@ -254,11 +307,12 @@ class WorkspaceStorage(BaseWorkspaceStorage):
         workspace_id: EntryID,
         data_localdb: LocalDatabase,
         cache_localdb: LocalDatabase,
-        block_storage: ChunkStorage,
+        block_storage: BlockStorage,
         chunk_storage: ChunkStorage,
         manifest_storage: ManifestStorage,
+        block_index: Optional[BlockIndex] = None,
     ):
-        super().__init__(device, workspace_id, block_storage, chunk_storage)
+        super().__init__(device, workspace_id, block_storage, chunk_storage, block_index)
         self.data_localdb = data_localdb
         self.cache_localdb = cache_localdb
         self.manifest_storage = manifest_storage
@@ -273,6 +327,9 @@ class WorkspaceStorage(BaseWorkspaceStorage):
         prevent_sync_pattern: Regex = FAILSAFE_PATTERN_FILTER,
         cache_size: int = DEFAULT_WORKSPACE_STORAGE_CACHE_SIZE,
         data_vacuum_threshold: int = DEFAULT_CHUNK_VACUUM_THRESHOLD,
+        manifest_cache_size: Optional[int] = DEFAULT_WORKSPACE_MANIFEST_CACHE_SIZE,
+        compression: Optional[str] = None,
+        block_deduplication: bool = False,
     ) -> AsyncIterator["WorkspaceStorage"]:
         data_path = get_workspace_data_storage_db_path(data_base_dir, device, workspace_id)
         cache_path = get_workspace_cache_storage_db_path(data_base_dir, device, workspace_id)
@@ -294,7 +351,7 @@ class WorkspaceStorage(BaseWorkspaceStorage):
 
                 # Block storage service
                 async with BlockStorage.run(
-                    device, cache_localdb, cache_size=cache_size
+                    device, cache_localdb, cache_size=cache_size, compression=compression
                 ) as block_storage:
 
                     # Clean up block storage and run vacuum if necessary
@@ -304,33 +361,39 @@ class WorkspaceStorage(BaseWorkspaceStorage):
 
                     # Manifest storage service
                     async with ManifestStorage.run(
-                        device, data_localdb, workspace_id
+                        device, data_localdb, workspace_id, cache_size=manifest_cache_size
                     ) as manifest_storage:
 
                         # Chunk storage service
-                        async with ChunkStorage.run(device, data_localdb) as chunk_storage:
-
-                            # Instantiate workspace storage
-                            instance = cls(
-                                device,
-                                workspace_id,
-                                data_localdb=data_localdb,
-                                cache_localdb=cache_localdb,
-                                block_storage=block_storage,
-                                chunk_storage=chunk_storage,
-                                manifest_storage=manifest_storage,
-                            )
-
-                            # Populate the cache with the workspace manifest to be able to
-                            # access it synchronously at all time
-                            await instance._load_workspace_manifest()
-                            assert instance.workspace_id in instance.manifest_storage._cache
-
-                            # Load "prevent sync" pattern
-                            await instance.set_prevent_sync_pattern(prevent_sync_pattern)
-
-                            # Yield point
-                            yield instance
+                        async with ChunkStorage.run(
+                            device, data_localdb, compression=compression
+                        ) as chunk_storage:
+
+                            # Block index service
+                            async with BlockIndex.run(device, data_localdb) as block_index:
+
+                                # Instantiate workspace storage
+                                instance = cls(
+                                    device,
+                                    workspace_id,
+                                    data_localdb=data_localdb,
+                                    cache_localdb=cache_localdb,
+                                    block_storage=block_storage,
+                                    chunk_storage=chunk_storage,
+                                    manifest_storage=manifest_storage,
+                                    block_index=block_index if block_deduplication else None,
+                                )
+
+                                # Populate the cache with the workspace manifest to be able to
+                                # access it synchronously at all time
+                                await instance._load_workspace_manifest()
+                                assert instance.workspace_id in instance.manifest_storage._cache
+
+                                # Load "prevent sync" pattern
+                                await instance.set_prevent_sync_pattern(prevent_sync_pattern)
+
+                                # Yield point
+                                yield instance
 
     # Helpers
 
@@ -0,0 +1,222 @@
+# Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
+from __future__ import annotations
+
+import attr
+import trio
+from enum import Enum
+from types import TracebackType
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Set, Type
+
+from parsec.core.types import EntryID
+from parsec.core.backend_connection.transport import MAX_MULTIPLEXED_REQUESTS
+from parsec.core.fs.exceptions import FSBackendOfflineError
+
+
+# Any more concurrent transfers would only wait for the backend connection
+DEFAULT_TRANSFER_MAX_CONCURRENCY = MAX_MULTIPLEXED_REQUESTS
+# Blocks being transferred are kept in memory
+DEFAULT_TRANSFER_MAX_BYTES_IN_FLIGHT = 64 * 1024 * 1024
+TRANSFER_INITIAL_WINDOW = 4
+# The window is decreased when the transfers of a round take that much longer
+# than the fastest round while the throughput doesn't increase (meaning the
+# additional transfers are only queued somewhere along the way)
+TRANSFER_LATENCY_INFLATION_RATIO = 2.0
+TRANSFER_THROUGHPUT_GAIN_RATIO = 1.05
+TRANSFER_WINDOW_DECREASE_FACTOR = 0.5
+
+
+class TransferKind(Enum):
+    UPLOAD = "upload"
+    DOWNLOAD = "download"
+
+
+@attr.s(slots=True, auto_attribs=True, eq=False)
+class TransferProgress:
+    kind: TransferKind
+    workspace_id: EntryID
+    total_bytes: int
+    started_on: float
+    transferred_bytes: int = 0
+    finished_on: Optional[float] = None
+    # The transfer is finished once it is neither scheduling nor running blocks
+    _references: int = attr.ib(default=1, init=False)
+
+    @property
+    def throughput(self) -> float:
+        """Bytes transferred per second"""
+        finished_on = self.finished_on if self.finished_on is not None else trio.current_time()
+        elapsed = finished_on - self.started_on
+        return self.transferred_bytes / elapsed if elapsed > 0 else 0.0
+
+
+class TransferSlot:
+    """Allow a single block transfer, to be used as a context manager around it"""
+
+    def __init__(self, scheduler: TransferScheduler, size: int, transfer: TransferProgress):
+        self.scheduler = scheduler
+        self.size = size
+        self.transfer = transfer
+        self.started_on = trio.current_time()
+
+    def __enter__(self) -> TransferSlot:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.scheduler._release(self, exc_value)
+
+
+class TransferScheduler:
+    """
+    Schedule the block transfers of all the workspaces of a user, so that as
+    many transfers as the network can handle run concurrently.
+
+    The number of concurrent transfers (i.e. the window) is adjusted AIMD-style
+    after each round of transfers (i.e. as many transfers as the window):
+    - the window is increased by one if the round went as fast as before, or if
+      the throughput increased
+    - the window is halved if the round got slower without increasing the
+      throughput, or if the backend got unreachable
+
+    Whatever the window, the concurrent transfers are capped by `max_concurrency`
+    and `max_bytes_in_flight`.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_TRANSFER_MAX_CONCURRENCY,
+        max_bytes_in_flight: int = DEFAULT_TRANSFER_MAX_BYTES_IN_FLIGHT,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_bytes_in_flight = max_bytes_in_flight
+        self._window = float(min(TRANSFER_INITIAL_WINDOW, max_concurrency))
+        self._in_flight = 0
+        self._bytes_in_flight = 0
+        self._released = trio.Event()
+        self._transfers: Set[TransferProgress] = set()
+        # Measures of the current round
+        self._round_started_on: Optional[float] = None
+        self._round_transfers = 0
+        self._round_bytes = 0
+        self._round_duration = 0.0
+        # Measures of the previous rounds
+        self._throughput = 0.0
+        self._min_latency: Optional[float] = None
+
+    @property
+    def window(self) -> int:
+        return int(self._window)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def bytes_in_flight(self) -> int:
+        return self._bytes_in_flight
+
+    @property
+    def throughput(self) -> float:
+        """Bytes transferred per second during the last round"""
+        return self._throughput
+
+    def get_transfers(self) -> List[TransferProgress]:
+        """Transfers in progress, from the oldest to the newest"""
+        return sorted(self._transfers, key=lambda transfer: transfer.started_on)
+
+    @contextmanager
+    def transfer(
+        self, kind: TransferKind, workspace_id: EntryID, total_bytes: int
+    ) -> Iterator[TransferProgress]:
+        """Track the progress of the blocks transfers scheduled within the context
+
+        The transfer is finished once the context is left and its blocks transfers
+        are done.
+        """
+        transfer = TransferProgress(kind, workspace_id, total_bytes, trio.current_time())
+        self._transfers.add(transfer)
+        try:
+            yield transfer
+        finally:
+            self._dereference(transfer)
+
+    async def acquire(self, size: int, transfer: TransferProgress) -> TransferSlot:
+        """Wait until the transfer of a block of `size` bytes is allowed"""
+        while not self._can_start(size):
+            await self._released.wait()
+        self._in_flight += 1
+        self._bytes_in_flight += size
+        transfer._references += 1
+        if self._round_started_on is None:
+            self._round_started_on = trio.current_time()
+        return TransferSlot(self, size, transfer)
+
+    def _can_start(self, size: int) -> bool:
+        if not self._in_flight:
+            # A block bigger than the limit should still get transferred
+            return True
+        return (
+            self._in_flight < min(self.window, self.max_concurrency)
+            and self._bytes_in_flight + size <= self.max_bytes_in_flight
+        )
+
+    def _release(self, slot: TransferSlot, exc: Optional[BaseException]) -> None:
+        self._in_flight -= 1
+        self._bytes_in_flight -= slot.size
+        if exc is None:
+            slot.transfer.transferred_bytes += slot.size
+            self._on_transfer_done(slot.size, trio.current_time() - slot.started_on)
+        elif isinstance(exc, FSBackendOfflineError):
+            self._decrease_window()
+        # Other errors (including cancellation) don't tell anything about the network
+        self._dereference(slot.transfer)
+        self._released.set()
+        self._released = trio.Event()
+
+    def _dereference(self, transfer: TransferProgress) -> None:
+        transfer._references -= 1
+        if not transfer._references:
+            transfer.finished_on = trio.current_time()
+            self._transfers.discard(transfer)
+
+    def _on_transfer_done(self, size: int, duration: float) -> None:
+        self._round_transfers += 1
+        self._round_bytes += size
+        self._round_duration += duration
+        if self._round_transfers < self.window:
+            return
+
+        assert self._round_started_on is not None
+        elapsed = trio.current_time() - self._round_started_on
+        throughput = self._round_bytes / elapsed if elapsed > 0 else float("inf")
+        latency = self._round_duration / self._round_transfers
+        if self._min_latency is None or latency < self._min_latency:
+            self._min_latency = latency
+
+        if (
+            latency > self._min_latency * TRANSFER_LATENCY_INFLATION_RATIO
+            and throughput < self._throughput * TRANSFER_THROUGHPUT_GAIN_RATIO
+        ):
+            if self._window <= 1:
+                # Transfers are slow whatever the window, the network itself got slower
+                self._min_latency = latency
+            self._decrease_window()
+        else:
+            self._window = min(self._window + 1, self.max_concurrency)
+            self._start_round()
+        self._throughput = throughput
+
+    def _decrease_window(self) -> None:
+        self._window = max(self._window * TRANSFER_WINDOW_DECREASE_FACTOR, 1)
+        self._start_round()
+
+    def _start_round(self) -> None:
+        self._round_started_on = trio.current_time() if self._in_flight else None
+        self._round_transfers = 0
+        self._round_bytes = 0
+        self._round_duration = 0.0
@@ -94,7 +94,10 @@ from parsec.core.types import (
     WorkspaceRole,
     LocalUserManifest,
 )
-from parsec.core.config import DEFAULT_WORKSPACE_STORAGE_CACHE_SIZE
+from parsec.core.config import (
+    DEFAULT_WORKSPACE_STORAGE_CACHE_SIZE,
+    DEFAULT_WORKSPACE_MANIFEST_CACHE_SIZE,
+)
 
 # TODO: handle exceptions status...
 from parsec.core.backend_connection import (
@@ -103,6 +106,7 @@ from parsec.core.backend_connection import (
 )
 from parsec.core.remote_devices_manager import RemoteDevicesManager
 from parsec.core.fs.workspacefs import WorkspaceFS
+from parsec.core.fs.transfer_scheduler import TransferScheduler
 from parsec.core.fs.remote_loader import (
     UserRemoteLoader,
     _validate_sequester_config,
@@ -277,6 +281,9 @@ class UserFS:
         prevent_sync_pattern: Regex,
         preferred_language: str,
         workspace_storage_cache_size: int,
+        workspace_manifest_cache_size: int = DEFAULT_WORKSPACE_MANIFEST_CACHE_SIZE,
+        workspace_storage_compression: Optional[str] = None,
+        workspace_block_deduplication: bool = False,
     ):
         self.data_base_dir = data_base_dir
         self.device = device
@@ -286,6 +293,9 @@ class UserFS:
         self.prevent_sync_pattern = prevent_sync_pattern
         self.preferred_language = preferred_language
         self.workspace_storage_cache_size = workspace_storage_cache_size
+        self.workspace_manifest_cache_size = workspace_manifest_cache_size
+        self.workspace_storage_compression = workspace_storage_compression
+        self.workspace_block_deduplication = workspace_block_deduplication
 
         self.storage: UserStorage  # Setup by UserStorage.run factory
 
@@ -298,6 +308,9 @@ class UserFS:
 
         self._sequester_services_cache: Optional[List[SequesterServiceCertificate]] = None
 
+        # Block transfers of all the workspaces share the network
+        self.transfer_scheduler = TransferScheduler()
+
         timestamp = self.device.timestamp()
         wentry = WorkspaceEntry(
             name=EntryName("<user manifest>"),
@@ -333,6 +346,9 @@ class UserFS:
         prevent_sync_pattern: Regex,
         preferred_language: Optional[str] = None,
         workspace_storage_cache_size: int = DEFAULT_WORKSPACE_STORAGE_CACHE_SIZE,
+        workspace_manifest_cache_size: int = DEFAULT_WORKSPACE_MANIFEST_CACHE_SIZE,
+        workspace_storage_compression: Optional[str] = None,
+        workspace_block_deduplication: bool = False,
     ) -> AsyncIterator[UserFSTypeVar]:
         if preferred_language is None:
             preferred_language = "en"
@@ -345,6 +361,9 @@ class UserFS:
             prevent_sync_pattern,
             preferred_language,
             workspace_storage_cache_size,
+            workspace_manifest_cache_size,
+            workspace_storage_compression,
+            workspace_block_deduplication,
         )
 
         # Run user storage
@@ -431,6 +450,9 @@ class UserFS:
                 device=self.device,
                 workspace_id=workspace_id,
                 cache_size=self.workspace_storage_cache_size,
+                manifest_cache_size=self.workspace_manifest_cache_size,
+                compression=self.workspace_storage_compression,
+                block_deduplication=self.workspace_block_deduplication,
                 prevent_sync_pattern=self.prevent_sync_pattern,
             ) as workspace_storage:
                 task_status.started(workspace_storage)
@@ -449,6 +471,8 @@ class UserFS:
             event_bus=self.event_bus,
             remote_devices_manager=self.remote_devices_manager,
             preferred_language=self.preferred_language,
+            transfer_scheduler=self.transfer_scheduler,
+            prefetch_nursery=self._workspace_storage_nursery,
         )
 
         # Apply the current "prevent sync" pattern
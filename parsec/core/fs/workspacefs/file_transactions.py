@@ -1,18 +1,27 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
 from __future__ import annotations
 
+import attr
+import trio
+from structlog import get_logger
 from parsec.core.core_events import CoreEvent
-from typing import Tuple, List, Callable, Dict, Optional, cast, AsyncIterator
+from typing import Tuple, List, Callable, Dict, Optional, Set, cast, AsyncIterator
 from collections import defaultdict
 from contextlib import asynccontextmanager
 
 from parsec.event_bus import EventBus
 from parsec.api.data import BlockAccess
-from parsec.api.protocol import DeviceID
-from parsec.core.types import FileDescriptor, EntryID, LocalDevice
+from parsec.api.protocol import BlockID, DeviceID
+from parsec.core.types import FileDescriptor, EntryID, ChunkID, LocalDevice
+from parsec.utils import open_service_nursery
 from parsec.core.fs.remote_loader import RemoteLoader
 from parsec.core.fs.storage import BaseWorkspaceStorage
-from parsec.core.fs.exceptions import FSLocalMissError, FSInvalidFileDescriptor, FSEndOfFileError
+from parsec.core.fs.exceptions import (
+    FSError,
+    FSLocalMissError,
+    FSInvalidFileDescriptor,
+    FSEndOfFileError,
+)
 from parsec.core.types import (
     Chunk,
     WorkspaceEntry,
@@ -32,6 +41,14 @@ from parsec.core.fs.workspacefs.file_operations import (
 __all__ = ("FSInvalidFileDescriptor", "FileTransactions")
 
 
+logger = get_logger()
+
+# Maximum number of blocks downloaded ahead of a file descriptor reading sequentially
+READ_AHEAD_MAX_BLOCKS = 32
+# Prefetched blocks end up in the block cache, don't fill it with blocks that may not get read
+READ_AHEAD_MAX_BYTES_IN_FLIGHT = 64 * 1024 * 1024
+
+
 # Helpers
 
 
@@ -52,6 +69,28 @@ def padded_data(data: bytes, start: int, stop: int) -> bytes:
     return b"\x00" * (0 - start) + data[0:stop]
 
 
+@attr.s(slots=True, auto_attribs=True)
+class ReadAhead:
+    """Access pattern of a file descriptor, to download the following blocks
+    in the background while it is read sequentially."""
+
+    # Offset of the next read if the file is read sequentially
+    next_offset: int = 0
+    # Number of blocks to download ahead of the current read
+    window: int = 0
+    # Blocks up to this offset have already been scheduled for download
+    scheduled_until: int = 0
+
+    def update(self, offset: int, size: int) -> None:
+        if offset == self.next_offset:
+            # The window doubles as long as the file is read sequentially
+            self.window = min(max(self.window * 2, 1), READ_AHEAD_MAX_BLOCKS)
+        else:
+            self.window = 0
+            self.scheduled_until = 0
+        self.next_offset = offset + size
+
+
 class FileTransactions:
     """A stateless class to centralize all file transactions.
 
@@ -83,6 +122,7 @@ class FileTransactions:
         remote_loader: RemoteLoader,
         event_bus: EventBus,
         preferred_language: str,
+        prefetch_nursery: Optional[trio.Nursery] = None,
     ):
         self.workspace_id = workspace_id
         self.get_workspace_entry = get_workspace_entry
@@ -92,6 +132,11 @@ class FileTransactions:
         self.event_bus = event_bus
         self._write_count: Dict[FileDescriptor, int] = defaultdict(int)
         self.preferred_language = preferred_language
+        # Blocks are only downloaded ahead of the reads given a nursery to do so
+        self.prefetch_nursery = prefetch_nursery
+        self._read_aheads: Dict[FileDescriptor, ReadAhead] = {}
+        self._prefetching: Dict[BlockID, trio.Event] = {}
+        self._prefetch_bytes_in_flight = 0
 
     @property
     def local_author(self) -> DeviceID:
@@ -132,6 +177,90 @@ class FileTransactions:
         # Return byte array
         return result, missing
 
+    # Read-ahead helpers
+
+    async def _load_blocks(self, accesses: List[BlockAccess]) -> None:
+        # Blocks being prefetched are not downloaded twice
+        prefetched = [
+            self._prefetching[access.id] for access in accesses if access.id in self._prefetching
+        ]
+        await self.remote_loader.load_blocks(
+            [access for access in accesses if access.id not in self._prefetching]
+        )
+        for event in prefetched:
+            await event.wait()
+
+    async def _read_ahead(
+        self, fd: FileDescriptor, manifest: LocalFileManifest, offset: int, size: int
+    ) -> None:
+        """This internal helper does not perform any locking."""
+        if self.prefetch_nursery is None:
+            return
+
+        # Update the access pattern
+        size = max(min(size, manifest.size - offset), 0)
+        read_ahead = self._read_aheads.setdefault(fd, ReadAhead())
+        read_ahead.update(offset, size)
+        if not read_ahead.window:
+            return
+
+        # Range to schedule
+        start = max(offset + size, read_ahead.scheduled_until)
+        stop = min(offset + size + read_ahead.window * manifest.blocksize, manifest.size)
+        if start >= stop:
+            return
+
+        # Remote blocks in the range
+        blocks: Dict[ChunkID, BlockAccess] = {}
+        for chunk in prepare_read(manifest, stop - start, start):
+            if chunk.access is not None and chunk.access.id not in self._prefetching:
+                blocks[chunk.id] = chunk.access
+        for chunk_id in await self.local_storage.get_local_block_ids(list(blocks)):
+            del blocks[chunk_id]
+        for chunk_id in await self.local_storage.get_local_chunk_ids(list(blocks)):
+            del blocks[chunk_id]
+
+        # Schedule the download within the budget
+        accesses = []
+        for access in blocks.values():
+            if self._prefetch_bytes_in_flight + access.size > READ_AHEAD_MAX_BYTES_IN_FLIGHT:
+                # The remaining blocks are scheduled by the next reads
+                stop = access.offset
+                break
+            self._prefetch_bytes_in_flight += access.size
+            self._prefetching[access.id] = trio.Event()
+            accesses.append(access)
+        read_ahead.scheduled_until = stop
+        if accesses:
+            self.prefetch_nursery.start_soon(self._prefetch, accesses)
+
+    async def _prefetch(self, accesses: List[BlockAccess]) -> None:
+        def _done(access: BlockAccess) -> None:
+            event = self._prefetching.pop(access.id, None)
+            if event is not None:
+                self._prefetch_bytes_in_flight -= access.size
+                event.set()
+
+        try:
+            async with open_service_nursery() as nursery:
+                async with await self.remote_loader.receive_load_blocks(
+                    accesses, nursery
+                ) as receive_channel:
+                    async for access in receive_channel:
+                        _done(access)
+        except FSError as exc:
+            # The blocks are downloaded again if they actually get read
+            logger.info("Cannot prefetch blocks", workspace_id=self.workspace_id, exc_info=exc)
+        except Exception:
+            # The prefetch nursery is shared by all the workspaces, a background
+            # read-ahead must not bring them down
+            logger.exception(
+                "Unexpected error while prefetching blocks", workspace_id=self.workspace_id
+            )
+        finally:
+            for access in accesses:
+                _done(access)
+
     # Locking helper
 
     @asynccontextmanager
@@ -204,8 +333,9 @@ class FileTransactions:
             # Atomic change
             self.local_storage.remove_file_descriptor(fd)
 
-            # Clear write count
+            # Clear write count and access pattern
             self._write_count.pop(fd, None)
+            self._read_aheads.pop(fd, None)
 
     async def fd_write(
         self, fd: FileDescriptor, content: bytes, offset: int, constrained: bool = False
@@ -267,10 +397,11 @@ class FileTransactions:
     ) -> bytes:
         # Loop over attempts
         missing: List[BlockAccess] = []
+        read_ahead = True
         while True:
 
             # Load missing blocks
-            await self.remote_loader.load_blocks(missing)
+            await self._load_blocks(missing)
 
             # Fetch and lock
             async with self._load_and_lock_file(fd) as manifest:
@@ -287,6 +418,11 @@ class FileTransactions:
                 if offset > manifest.size:
                     return b""
 
+                # Download the following blocks in the background
+                if read_ahead:
+                    read_ahead = False
+                    await self._read_ahead(fd, manifest, offset, size)
+
                 # Prepare
                 chunks = prepare_read(manifest, size, offset)
                 data, missing = await self._build_data(chunks)
@@ -361,3 +497,49 @@ class FileTransactions:
 
         # Return missing block ids
         return missing
+
+    async def _manifest_deduplicate(self, manifest: LocalFileManifest) -> LocalFileManifest:
+        """This internal helper does not perform any locking.
+
+        Replace the blocks that are still to be uploaded with the identical blocks
+        already available in the workspace, according to the local block index.
+        """
+        # Deduplication is disabled
+        if self.local_storage.block_index is None:
+            return manifest
+
+        # Only the new blocks may need to be uploaded
+        remote_block_ids = {access.id for access in manifest.base.blocks}
+        candidates = [
+            (block, chunks[0])
+            for block, chunks in enumerate(manifest.blocks)
+            if len(chunks) == 1
+            and chunks[0].is_block()
+            and chunks[0].get_block_access().id not in remote_block_ids
+        ]
+        if not candidates:
+            return manifest
+
+        indexed_accesses = await self.local_storage.get_indexed_blocks(
+            [chunk.get_block_access() for _, chunk in candidates]
+        )
+
+        removed_ids: Set[ChunkID] = set()
+        for (block, chunk), indexed_access in zip(candidates, indexed_accesses):
+            if indexed_access is None or indexed_access.id == chunk.get_block_access().id:
+                continue
+            try:
+                data = await self.local_storage.get_dirty_block(chunk.get_block_access().id)
+            # Already uploaded
+            except FSLocalMissError:
+                continue
+
+            # Keep the data available locally for the indexed block
+            await self.local_storage.set_clean_block(indexed_access.id, data)
+            manifest = manifest.evolve_single_block(block, Chunk.from_block_access(indexed_access))
+            removed_ids.add(chunk.id)
+
+        # The dirty chunks are removed once the new manifest is persisted
+        if removed_ids:
+            await self.local_storage.set_manifest(manifest.id, manifest, removed_ids=removed_ids)
+        return manifest
@@ -391,6 +391,10 @@ class SyncTransactions(EntryTransactions):
                 assert isinstance(local_manifest, LocalFileManifest)
                 assert local_manifest.is_reshaped()
 
+            # Reference the blocks already available instead of uploading them again
+            if not final and isinstance(local_manifest, LocalFileManifest):
+                local_manifest = await self._manifest_deduplicate(local_manifest)
+
             # Merge manifests
             timestamp = self.device.timestamp()
             prevent_sync_pattern = self.local_storage.get_prevent_sync_pattern()
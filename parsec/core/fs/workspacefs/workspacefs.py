@@ -27,6 +27,8 @@ from parsec.api.data import FileManifest as RemoteFileManifest
 from parsec.api.protocol import UserID, MaintenanceType, RealmID
 from parsec.core.types import (
     EntryID,
+    BlockID,
+    ChunkID,
     EntryName,
     LocalDevice,
     WorkspaceRole,
@@ -46,7 +48,8 @@ from parsec.core.backend_connection import (
     BackendNotAvailable,
     BackendConnectionError,
 )
-from parsec.core.fs.remote_loader import RemoteLoader
+from parsec.core.fs.remote_loader import RemoteLoader, VLOB_READ_BATCH_SIZE
+from parsec.core.fs.transfer_scheduler import TransferScheduler
 from parsec.core.fs import workspacefs  # Needed to break cyclic import with WorkspaceFSTimestamped
 from parsec.core.fs.workspacefs.sync_transactions import SyncTransactions
 from parsec.core.fs.workspacefs.versioning_helpers import VersionLister
@@ -99,6 +102,8 @@ class WorkspaceFS:
         event_bus: EventBus,
         remote_devices_manager: RemoteDevicesManager,
         preferred_language: str = "en",
+        transfer_scheduler: Optional[TransferScheduler] = None,
+        prefetch_nursery: Optional[trio.Nursery] = None,
     ):
         self.workspace_id = workspace_id
         self.get_workspace_entry = get_workspace_entry
@@ -109,6 +114,7 @@ class WorkspaceFS:
         self.event_bus = event_bus
         self.remote_devices_manager = remote_devices_manager
         self.preferred_language = preferred_language
+        self.prefetch_nursery = prefetch_nursery
         self.sync_locks: Dict[EntryID, trio.Lock] = defaultdict(trio.Lock)
         self.remote_loader = RemoteLoader(
             self.device,
@@ -118,6 +124,7 @@ class WorkspaceFS:
             self.backend_cmds,
             self.remote_devices_manager,
             self.local_storage,
+            transfer_scheduler,
         )
         self.transactions = SyncTransactions(
             self.workspace_id,
@@ -127,6 +134,7 @@ class WorkspaceFS:
             self.remote_loader,
             self.event_bus,
             self.preferred_language,
+            self.prefetch_nursery,
         )
 
     def __repr__(self) -> str:
@@ -166,6 +174,155 @@ class WorkspaceFS:
         """
         return await self.remote_loader.receive_load_blocks(blocks, nursery)
 
+    # Pinning
+
+    async def _is_pinned(
+        self, entry_id: EntryID, parent_id: EntryID, pinned_entries: Dict[EntryID, bool]
+    ) -> bool:
+        """Whether the entry is pinned, either directly or through one of its folders"""
+        if entry_id in pinned_entries or parent_id in pinned_entries:
+            return True
+        # Only the recursively pinned folders pin the entries of their sub-folders
+        while parent_id != self.workspace_id:
+            try:
+                parent = await self.local_storage.get_manifest(parent_id)
+            except FSLocalMissError:
+                return False
+            if not isinstance(parent, LocalFolderManifest):
+                return False
+            parent_id = parent.parent
+            if pinned_entries.get(parent_id):
+                return True
+        return False
+
+    async def _load_pinned_manifest(self, entry_id: EntryID) -> AnyRemoteManifest:
+        # Only the synchronized content is pinned, the local changes are not in the cache
+        try:
+            return (await self.local_storage.get_manifest(entry_id)).base
+        except FSLocalMissError:
+            return await self.remote_loader.load_manifest(entry_id)
+
+    async def _get_pinned_files(
+        self, manifest: AnyRemoteManifest, recursive: bool
+    ) -> List[RemoteFileManifest]:
+        """Returns the file or the files in the folder"""
+        if isinstance(manifest, RemoteFileManifest):
+            return [manifest]
+        files = []
+        for child_id in manifest.children.values():
+            child = await self._load_pinned_manifest(child_id)
+            if isinstance(child, RemoteFileManifest):
+                files.append(child)
+            elif recursive:
+                files += await self._get_pinned_files(child, recursive)
+        return files
+
+    async def _pin_files(self, manifests: List[RemoteFileManifest]) -> None:
+        missing: Dict[BlockID, BlockAccess] = {}
+        for manifest in manifests:
+            await self.local_storage.set_pinned_blocks(
+                manifest.id, manifest.parent, [access.id for access in manifest.blocks]
+            )
+            missing.update((access.id, access) for access in manifest.blocks)
+        local_block_ids = await self.local_storage.get_local_block_ids(
+            [ChunkID(block_id.uuid) for block_id in missing]
+        )
+        for chunk_id in local_block_ids:
+            del missing[BlockID(chunk_id.uuid)]
+        # The blocks are already pinned, so they are kept as soon as they get downloaded
+        await self.remote_loader.load_blocks(list(missing.values()))
+
+    async def _refresh_pinned_blocks(self) -> None:
+        """Pin the blocks of the files in the pinned entries, and only those"""
+        pinned_entries = await self.local_storage.get_pinned_entries()
+        pinned_files: Dict[EntryID, RemoteFileManifest] = {}
+        for entry_id, recursive in pinned_entries.items():
+            manifest = await self._load_pinned_manifest(entry_id)
+            for file_manifest in await self._get_pinned_files(manifest, recursive):
+                pinned_files[file_manifest.id] = file_manifest
+        unpinned = await self.local_storage.get_pinned_files() - pinned_files.keys()
+        await self.local_storage.clear_pinned_blocks(list(unpinned))
+        await self._pin_files(list(pinned_files.values()))
+
+    async def _update_pinned_blocks(self, manifest: AnyRemoteManifest) -> None:
+        """Apply the pinned entries to a freshly synchronized entry"""
+        pinned_entries = await self.local_storage.get_pinned_entries()
+        if not pinned_entries:
+            return
+
+        # The file might have been modified, moved in or out of a pinned folder
+        if isinstance(manifest, RemoteFileManifest):
+            if await self._is_pinned(manifest.id, manifest.parent, pinned_entries):
+                await self._pin_files([manifest])
+            else:
+                await self.local_storage.clear_pinned_blocks([manifest.id])
+            return
+
+        # Removed entries are no longer pinned
+        children_ids = list(manifest.children.values())
+        removed = []
+        for entry_id in pinned_entries.keys() - set(children_ids):
+            try:
+                entry_manifest = await self.local_storage.get_manifest(entry_id)
+            except FSLocalMissError:
+                continue
+            if not isinstance(entry_manifest, LocalWorkspaceManifest):
+                if entry_manifest.parent == manifest.id:
+                    removed.append(entry_id)
+        if removed:
+            await self.local_storage.clear_pinned_entries(removed)
+            await self._refresh_pinned_blocks()
+        else:
+            await self.local_storage.clear_removed_pinned_blocks(manifest.id, children_ids)
+
+    async def pin(self, path: AnyPath, recursive: bool = False) -> None:
+        """
+        Keep the blocks of the file (or of the files in the folder) in the local
+        cache, downloading the missing ones.
+
+        The entry stays pinned until it is unpinned or removed: the blocks of the
+        pinned files are updated each time they get synchronized.
+
+        Raises:
+            FSError
+            FSRemoteBlockNotFound
+            FSBackendOfflineError
+            FSRemoteOperationError
+            FSWorkspaceInMaintenance
+            FSWorkspaceNoAccess
+        """
+        entry_id = await self.path_id(path)
+        await self.local_storage.set_pinned_entry(entry_id, recursive)
+        await self._refresh_pinned_blocks()
+
+    async def unpin(self, path: AnyPath, recursive: bool = False) -> None:
+        """
+        Let the blocks of the file (or of the files in the folder) be removed from
+        the local cache again, along with the pinned entries under the folder if
+        recursive.
+
+        A file stays pinned as long as one of its folders is pinned.
+
+        Raises:
+            FSError
+            FSRemoteBlockNotFound
+            FSBackendOfflineError
+            FSRemoteOperationError
+            FSWorkspaceInMaintenance
+            FSWorkspaceNoAccess
+        """
+        entry_id = await self.path_id(path)
+        unpinned = [entry_id]
+        if recursive:
+            pinned_entries = await self.local_storage.get_pinned_entries()
+            for pinned_id in pinned_entries:
+                pinned_manifest = await self._load_pinned_manifest(pinned_id)
+                if not isinstance(pinned_manifest, RemoteWorkspaceManifest):
+                    if await self._is_pinned(pinned_id, pinned_manifest.parent, {entry_id: True}):
+                        unpinned.append(pinned_id)
+        await self.local_storage.clear_pinned_entries(unpinned)
+        await self._refresh_pinned_blocks()
+
     def get_workspace_name(self) -> EntryName:
         return self.get_workspace_entry().name
 
@@ -623,7 +780,10 @@ class WorkspaceFS:
         return await _recursive_search(path=FsPath("/"))
 
     async def _sync_by_id(
-        self, entry_id: EntryID, remote_changed: bool = True
+        self,
+        entry_id: EntryID,
+        remote_changed: bool = True,
+        remote_manifest: Optional[AnyRemoteManifest] = None,
     ) -> AnyRemoteManifest:
         """
         Synchronize the entry corresponding to a specific ID.
@@ -635,10 +795,12 @@ class WorkspaceFS:
 
         This guarantees that any change prior to the call is saved remotely when this
         method returns.
+
+        The remote manifest can be provided if it has already been fetched (e.g. along
+        with other manifests), an outdated one is simply ignored.
         """
         # Get the current remote manifest if it has changed
-        remote_manifest = None
-        if remote_changed:
+        if remote_changed and remote_manifest is None:
             try:
                 remote_manifest = await self.remote_loader.load_manifest(entry_id)
             except FSRemoteManifestNotFound:
@@ -701,7 +863,11 @@ class WorkspaceFS:
             await self.remote_loader.create_realm(self.workspace_id)
 
     async def sync_by_id(
-        self, entry_id: EntryID, remote_changed: bool = True, recursive: bool = True
+        self,
+        entry_id: EntryID,
+        remote_changed: bool = True,
+        recursive: bool = True,
+        remote_manifest: Optional[AnyRemoteManifest] = None,
     ) -> None:
         """
         Raises:
@@ -714,7 +880,9 @@ class WorkspaceFS:
         try:
             async with self.sync_locks[entry_id]:
                 try:
-                    manifest = await self._sync_by_id(entry_id, remote_changed=remote_changed)
+                    manifest = await self._sync_by_id(
+                        entry_id, remote_changed=remote_changed, remote_manifest=remote_manifest
+                    )
 
                 except FSSequesterServiceRejectedError as exc:
                     # When we try to sync an entry, the server can return a `rejected_by_sequester_service`
@@ -763,15 +931,29 @@ class WorkspaceFS:
             await self.transactions.file_conflict(entry_id, local_manifest, remote_manifest)
             return await self.sync_by_id(local_manifest.parent)
 
+        # Keep the pinned blocks up to date
+        await self._update_pinned_blocks(manifest)
+
         # Non-recursive
         if not recursive or not isinstance(
             manifest, (RemoteFolderManifest, RemoteWorkspaceManifest)
         ):
             return
 
-        # Synchronize children
-        for name, entry_id in manifest.children.items():
-            await self.sync_by_id(entry_id, remote_changed=remote_changed, recursive=True)
+        # Synchronize children, fetching their remote manifests by batch
+        children_ids = list(manifest.children.values())
+        for i in range(0, len(children_ids), VLOB_READ_BATCH_SIZE):
+            batch = children_ids[i : i + VLOB_READ_BATCH_SIZE]
+            remote_manifests = (
+                await self.remote_loader.load_manifests(batch) if remote_changed else {}
+            )
+            for entry_id in batch:
+                await self.sync_by_id(
+                    entry_id,
+                    remote_changed=remote_changed,
+                    recursive=True,
+                    remote_manifest=remote_manifests.get(entry_id),
+                )
 
     async def sync(self, *, remote_changed: bool = True) -> None:
         """
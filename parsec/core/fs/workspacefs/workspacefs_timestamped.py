@@ -23,6 +23,7 @@ class WorkspaceFSTimestamped(WorkspaceFS):
         self.event_bus = workspacefs.event_bus
         self.remote_devices_manager = workspacefs.remote_devices_manager
         self.preferred_language = workspacefs.preferred_language
+        self.prefetch_nursery = workspacefs.prefetch_nursery
 
         self.timestamp = timestamp
 
@@ -35,6 +36,7 @@ class WorkspaceFSTimestamped(WorkspaceFS):
             self.remote_loader,
             self.event_bus,
             self.preferred_language,
+            self.prefetch_nursery,
         )
 
     def timestamp_get_entry(
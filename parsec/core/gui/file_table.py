@@ -103,6 +103,8 @@ class FileTable(QTableWidget):
     open_clicked = pyqtSignal()
     show_history_clicked = pyqtSignal()
     show_status_clicked = pyqtSignal()
+    pin_clicked = pyqtSignal()
+    unpin_clicked = pyqtSignal()
     paste_clicked = pyqtSignal()
     cut_clicked = pyqtSignal()
     copy_clicked = pyqtSignal()
@@ -256,6 +258,11 @@ class FileTable(QTableWidget):
                 action.triggered.connect(self.copy_clicked.emit)
                 action = menu.addAction(_("ACTION_FILE_MENU_CUT"))
                 action.triggered.connect(self.cut_clicked.emit)
+            if not self.is_timestamped_workspace:
+                action = menu.addAction(_("ACTION_FILE_MENU_PIN"))
+                action.triggered.connect(self.pin_clicked.emit)
+                action = menu.addAction(_("ACTION_FILE_MENU_UNPIN"))
+                action.triggered.connect(self.unpin_clicked.emit)
         else:
             if not self.is_read_only():
                 if self.paste_status.source_workspace:
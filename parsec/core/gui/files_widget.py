@@ -85,6 +85,20 @@ async def _do_delete(
                 raise JobResultError("error", multi=len(files) > 1) from exc
 
 
+async def _do_pin(
+    workspace_fs: WorkspaceFS, files: list[Tuple[FsPath, FileType]], offline: bool
+) -> bool:
+    for path, file_type in files:
+        try:
+            if offline:
+                await workspace_fs.pin(path, recursive=True)
+            else:
+                await workspace_fs.unpin(path, recursive=True)
+        except Exception as exc:
+            raise JobResultError("error", multi=len(files) > 1) from exc
+    return offline
+
+
 async def _do_copy_files(
     workspace_fs: WorkspaceFS,
     target_dir: FsPath,
@@ -258,6 +272,8 @@ class FilesWidget(QWidget, Ui_FilesWidget):
     rename_error = pyqtSignal(QtToTrioJob)
     delete_success = pyqtSignal(QtToTrioJob)
     delete_error = pyqtSignal(QtToTrioJob)
+    pin_success = pyqtSignal(QtToTrioJob)
+    pin_error = pyqtSignal(QtToTrioJob)
     folder_stat_success = pyqtSignal(QtToTrioJob)
     folder_stat_error = pyqtSignal(QtToTrioJob)
     folder_create_success = pyqtSignal(QtToTrioJob)
@@ -332,6 +348,8 @@ class FilesWidget(QWidget, Ui_FilesWidget):
         self.table_files.files_dropped.connect(self.on_files_dropped)
         self.table_files.show_history_clicked.connect(self.show_selected_file_history)
         self.table_files.show_status_clicked.connect(self.show_selected_file_status)
+        self.table_files.pin_clicked.connect(lambda: self.pin_files(offline=True))
+        self.table_files.unpin_clicked.connect(lambda: self.pin_files(offline=False))
         self.table_files.paste_clicked.connect(self.on_paste_clicked)
         self.table_files.copy_clicked.connect(self.on_copy_clicked)
         self.table_files.cut_clicked.connect(self.on_cut_clicked)
@@ -352,6 +370,8 @@ class FilesWidget(QWidget, Ui_FilesWidget):
         self.rename_error.connect(self._on_rename_error)
         self.delete_success.connect(self._on_delete_success)
         self.delete_error.connect(self._on_delete_error)
+        self.pin_success.connect(self._on_pin_success)
+        self.pin_error.connect(self._on_pin_error)
         self.folder_stat_success.connect(self._on_folder_stat_success)
         self.folder_stat_error.connect(self._on_folder_stat_error)
         self.folder_create_success.connect(self._on_folder_create_success)
@@ -699,6 +719,17 @@ class FilesWidget(QWidget, Ui_FilesWidget):
             files=[(self.current_directory / f.name, f.type) for f in files],
         )
 
+    def pin_files(self, offline: bool) -> None:
+        files = self.table_files.selected_files()
+        self.jobs_ctx.submit_job(
+            (self, "pin_success"),
+            (self, "pin_error"),
+            _do_pin,
+            workspace_fs=self.workspace_fs,
+            files=[(self.current_directory / f.name, f.type) for f in files],
+            offline=offline,
+        )
+
     def on_open_current_dir_clicked(self) -> None:
         self.desktop_open_files([None])
 
@@ -1109,6 +1140,18 @@ class FilesWidget(QWidget, Ui_FilesWidget):
         else:
             show_error(self, _("TEXT_FILE_DELETE_ERROR"), exception=job.exc)
 
+    def _on_pin_success(self, job: QtToTrioJob) -> None:
+        if job.ret:
+            SnackbarManager.inform(_("TEXT_FILE_PIN_SUCCESS"))
+        else:
+            SnackbarManager.inform(_("TEXT_FILE_UNPIN_SUCCESS"))
+
+    def _on_pin_error(self, job: QtToTrioJob) -> None:
+        if job.exc is not None and job.exc.params.get("multi"):
+            show_error(self, _("TEXT_FILE_PIN_MULTIPLE_ERROR"), exception=job.exc)
+        else:
+            show_error(self, _("TEXT_FILE_PIN_ERROR"), exception=job.exc)
+
     def _on_folder_stat_success(self, job: QtToTrioJob) -> None:
         assert job.ret is not None
         # Extract job information
@@ -413,6 +413,9 @@ async def logged_core_factory(
         prevent_sync_pattern=prevent_sync_pattern,
         preferred_language=config.gui_language,
         workspace_storage_cache_size=config.workspace_storage_cache_size,
+        workspace_manifest_cache_size=config.workspace_manifest_cache_size,
+        workspace_storage_compression=config.workspace_storage_compression,
+        workspace_block_deduplication=config.workspace_block_deduplication,
     ) as user_fs:
 
         backend_conn.register_monitor(partial(monitor_messages, user_fs, event_bus))
@@ -14,8 +14,10 @@ from parsec._parsec import (
     VlobPollChangesRepNotFound,
 )
 from parsec.api.protocol import RealmID
+from parsec.api.data import AnyRemoteManifest
 from parsec.core.core_events import CoreEvent
-from parsec.core.fs.exceptions import FSServerUploadTemporarilyUnavailableError
+from parsec.core.fs.exceptions import FSError, FSServerUploadTemporarilyUnavailableError
+from parsec.core.fs.remote_loader import VLOB_READ_BATCH_SIZE
 from parsec.core.types import EntryID, WorkspaceRole
 from parsec.core.fs import (
     UserFS,
@@ -91,11 +93,16 @@ class SyncContext:
         self._changes_loaded = False
         self._local_changes = {}
         self._remote_changes = set()
+        # Remote manifests fetched along with the one of the remote change being synced
+        self._prefetched_remote_manifests: Dict[EntryID, AnyRemoteManifest] = {}
         self._local_confinement_points = defaultdict(set)
 
     def _sync(self, entry_id: EntryID) -> None:
         raise NotImplementedError
 
+    async def _prefetch_remote_manifests(self) -> None:
+        pass
+
     def _get_backend_cmds(self) -> BackendAuthenticatedCmds:
         raise NotImplementedError
 
@@ -192,9 +199,19 @@ class SyncContext:
 
     def set_remote_change(self, entry_id: EntryID) -> bool:
         self._remote_changes.add(entry_id)
+        # A newer version is available
+        self._prefetched_remote_manifests.pop(entry_id, None)
         self.due_time = self.device.timestamp().timestamp()
         return True
 
+    def _pop_remote_change(self) -> EntryID:
+        # Favor the changes whose remote manifest has already been fetched
+        for entry_id in self._prefetched_remote_manifests:
+            if entry_id in self._remote_changes:
+                self._remote_changes.remove(entry_id)
+                return entry_id
+        return self._remote_changes.pop()
+
     def set_confined_entry(self, entry_id: EntryID, cause_id: EntryID) -> None:
         self._local_confinement_points[cause_id].add(entry_id)
 
@@ -232,7 +249,11 @@ class SyncContext:
 
         # Remote changes sync have priority over local changes
         if self._remote_changes:
-            entry_id = self._remote_changes.pop()
+            try:
+                await self._prefetch_remote_manifests()
+            except FSBackendOfflineError as exc:
+                raise BackendNotAvailable from exc
+            entry_id = self._pop_remote_change()
             try:
                 await self._sync(entry_id)
             except FSBackendOfflineError as exc:
@@ -306,7 +327,27 @@ class WorkspaceSyncContext(SyncContext):
     async def _sync(self, entry_id: EntryID) -> None:
         # No recursion here: only the manifest that has changed
         # (remotely or locally) should get synchronized
-        await self.workspace.sync_by_id(entry_id, recursive=False)
+        await self.workspace.sync_by_id(
+            entry_id,
+            recursive=False,
+            remote_manifest=self._prefetched_remote_manifests.pop(entry_id, None),
+        )
+
+    async def _prefetch_remote_manifests(self) -> None:
+        # Typically after a login, many remote changes are to be synced: fetch
+        # their manifests by batch instead of one round trip per change
+        if len(self._remote_changes) < 2 or self._prefetched_remote_manifests:
+            return
+        entry_ids = list(self._remote_changes)[:VLOB_READ_BATCH_SIZE]
+        try:
+            remote_manifests = await self.workspace.remote_loader.load_manifests(entry_ids)
+        except FSBackendOfflineError:
+            raise
+        except FSError as exc:
+            # Each remote change will be synced (and its error handled) separately
+            logger.info("Cannot prefetch remote changes", workspace_id=self.id.str, exc_info=exc)
+            return
+        self._prefetched_remote_manifests.update(remote_manifests)
 
     def _get_backend_cmds(self) -> BackendAuthenticatedCmds:
         return self.workspace.backend_cmds
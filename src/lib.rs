@@ -107,6 +107,17 @@ fn entrypoint(py: Python, m: &PyModule) -> PyResult<()> {
     m.add_class::<protocol::BlockCreateRepNotAllowed>()?;
     m.add_class::<protocol::BlockCreateRepInMaintenance>()?;
     m.add_class::<protocol::BlockCreateRepUnknownStatus>()?;
+    m.add_class::<protocol::BlockCreateBatchReqItem>()?;
+    m.add_class::<protocol::BlockCreateBatchReq>()?;
+    m.add_class::<protocol::BlockCreateBatchRep>()?;
+    m.add_class::<protocol::BlockCreateBatchRepOk>()?;
+    m.add_class::<protocol::BlockCreateBatchRepAlreadyExists>()?;
+    m.add_class::<protocol::BlockCreateBatchRepNotFound>()?;
+    m.add_class::<protocol::BlockCreateBatchRepTimeout>()?;
+    m.add_class::<protocol::BlockCreateBatchRepNotAllowed>()?;
+    m.add_class::<protocol::BlockCreateBatchRepInMaintenance>()?;
+    m.add_class::<protocol::BlockCreateBatchRepTooLarge>()?;
+    m.add_class::<protocol::BlockCreateBatchRepUnknownStatus>()?;
     m.add_class::<protocol::BlockReadReq>()?;
     m.add_class::<protocol::BlockReadRep>()?;
     m.add_class::<protocol::BlockReadRepOk>()?;
@@ -416,6 +427,16 @@ fn entrypoint(py: Python, m: &PyModule) -> PyResult<()> {
     m.add_class::<protocol::VlobReadRepBadEncryptionRevision>()?;
     m.add_class::<protocol::VlobReadRepInMaintenance>()?;
     m.add_class::<protocol::VlobReadRepUnknownStatus>()?;
+    m.add_class::<protocol::VlobReadBatchReqItem>()?;
+    m.add_class::<protocol::VlobReadBatchRepItem>()?;
+    m.add_class::<protocol::VlobReadBatchReq>()?;
+    m.add_class::<protocol::VlobReadBatchRep>()?;
+    m.add_class::<protocol::VlobReadBatchRepOk>()?;
+    m.add_class::<protocol::VlobReadBatchRepNotFound>()?;
+    m.add_class::<protocol::VlobReadBatchRepNotAllowed>()?;
+    m.add_class::<protocol::VlobReadBatchRepBadEncryptionRevision>()?;
+    m.add_class::<protocol::VlobReadBatchRepInMaintenance>()?;
+    m.add_class::<protocol::VlobReadBatchRepUnknownStatus>()?;
     m.add_class::<protocol::VlobUpdateReq>()?;
     m.add_class::<protocol::VlobUpdateRep>()?;
     m.add_class::<protocol::VlobUpdateRepOk>()?;
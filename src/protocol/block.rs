@@ -1,10 +1,15 @@
 // Parsec Cloud (https://parsec.cloud) Copyright (c) BUSL-1.1 (eventually AGPL-3.0) 2016-present Scille SAS
 
-use pyo3::{exceptions::PyNotImplementedError, import_exception, prelude::*, types::PyBytes};
+use pyo3::{
+    exceptions::PyNotImplementedError,
+    import_exception,
+    prelude::*,
+    types::{PyBytes, PyTuple},
+};
 
 use crate::ids::{BlockID, RealmID};
 use crate::protocol::gen_rep;
-use libparsec::protocol::authenticated_cmds::v2::{block_create, block_read};
+use libparsec::protocol::authenticated_cmds::v2::{block_create, block_create_batch, block_read};
 
 import_exception!(parsec.api.protocol, ProtocolError);
 
@@ -74,6 +79,103 @@ impl BlockCreateRepOk {
     }
 }
 
+#[pyclass]
+#[derive(Clone)]
+pub(crate) struct BlockCreateBatchReqItem(pub block_create_batch::BlockCreateBatchReqItem);
+
+crate::binding_utils::gen_proto!(BlockCreateBatchReqItem, __repr__);
+crate::binding_utils::gen_proto!(BlockCreateBatchReqItem, __richcmp__, eq);
+
+#[pymethods]
+impl BlockCreateBatchReqItem {
+    #[new]
+    fn new(block_id: BlockID, block: Vec<u8>) -> PyResult<Self> {
+        Ok(Self(block_create_batch::BlockCreateBatchReqItem {
+            block_id: block_id.0,
+            block,
+        }))
+    }
+
+    #[getter]
+    fn block_id(&self) -> PyResult<BlockID> {
+        Ok(BlockID(self.0.block_id))
+    }
+
+    #[getter]
+    fn block<'py>(&self, py: Python<'py>) -> PyResult<&'py PyBytes> {
+        Ok(PyBytes::new(py, &self.0.block))
+    }
+}
+
+#[pyclass]
+#[derive(Clone)]
+pub(crate) struct BlockCreateBatchReq(pub block_create_batch::Req);
+
+crate::binding_utils::gen_proto!(BlockCreateBatchReq, __repr__);
+crate::binding_utils::gen_proto!(BlockCreateBatchReq, __richcmp__, eq);
+
+#[pymethods]
+impl BlockCreateBatchReq {
+    #[new]
+    fn new(realm_id: RealmID, blocks: Vec<BlockCreateBatchReqItem>) -> PyResult<Self> {
+        let blocks = blocks.into_iter().map(|item| item.0).collect();
+        Ok(Self(block_create_batch::Req {
+            realm_id: realm_id.0,
+            blocks,
+        }))
+    }
+
+    fn dump<'py>(&self, py: Python<'py>) -> PyResult<&'py PyBytes> {
+        Ok(PyBytes::new(
+            py,
+            &self
+                .0
+                .clone()
+                .dump()
+                .map_err(|e| ProtocolError::new_err(format!("encoding error: {e}")))?,
+        ))
+    }
+
+    #[getter]
+    fn realm_id(&self) -> PyResult<RealmID> {
+        Ok(RealmID(self.0.realm_id))
+    }
+
+    #[getter]
+    fn blocks<'py>(&self, py: Python<'py>) -> PyResult<&'py PyTuple> {
+        Ok(PyTuple::new(
+            py,
+            self.0
+                .blocks
+                .iter()
+                .cloned()
+                .map(|item| BlockCreateBatchReqItem(item).into_py(py)),
+        ))
+    }
+}
+
+gen_rep!(
+    block_create_batch,
+    BlockCreateBatchRep,
+    [AlreadyExists],
+    [NotFound],
+    [Timeout],
+    [NotAllowed],
+    [InMaintenance],
+    [TooLarge]
+);
+
+#[pyclass(extends=BlockCreateBatchRep)]
+pub(crate) struct BlockCreateBatchRepOk;
+
+#[pymethods]
+impl BlockCreateBatchRepOk {
+    #[new]
+    fn new() -> PyResult<(Self, BlockCreateBatchRep)> {
+        Ok((Self, BlockCreateBatchRep(block_create_batch::Rep::Ok)))
+    }
+}
+
 #[pyclass]
 #[derive(Clone)]
 pub(crate) struct BlockReadReq(pub block_read::Req);
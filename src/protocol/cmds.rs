@@ -38,6 +38,7 @@ impl AuthenticatedAnyCmdReq {
         Ok(match cmd {
             AnyCmdReq::BlockRead(x) => BlockReadReq(x).into_py(py),
             AnyCmdReq::BlockCreate(x) => BlockCreateReq(x).into_py(py),
+            AnyCmdReq::BlockCreateBatch(x) => BlockCreateBatchReq(x).into_py(py),
             AnyCmdReq::DeviceCreate(x) => DeviceCreateReq(x).into_py(py),
             AnyCmdReq::EventsListen(x) => EventsListenReq(x).into_py(py),
             AnyCmdReq::EventsSubscribe(x) => EventsSubscribeReq(x).into_py(py),
@@ -77,6 +78,7 @@ impl AuthenticatedAnyCmdReq {
             AnyCmdReq::UserRevoke(x) => UserRevokeReq(x).into_py(py),
             AnyCmdReq::VlobCreate(x) => VlobCreateReq(x).into_py(py),
             AnyCmdReq::VlobRead(x) => VlobReadReq(x).into_py(py),
+            AnyCmdReq::VlobReadBatch(x) => VlobReadBatchReq(x).into_py(py),
             AnyCmdReq::VlobUpdate(x) => VlobUpdateReq(x).into_py(py),
             AnyCmdReq::VlobPollChanges(x) => VlobPollChangesReq(x).into_py(py),
             AnyCmdReq::VlobListVersions(x) => VlobListVersionsReq(x).into_py(py),
@@ -11,7 +11,8 @@ use pyo3::{
 
 use libparsec::protocol::authenticated_cmds::v2::{
     vlob_create, vlob_list_versions, vlob_maintenance_get_reencryption_batch,
-    vlob_maintenance_save_reencryption_batch, vlob_poll_changes, vlob_read, vlob_update,
+    vlob_maintenance_save_reencryption_batch, vlob_poll_changes, vlob_read, vlob_read_batch,
+    vlob_update,
 };
 
 use crate::{
@@ -329,6 +330,195 @@ impl VlobReadRepOk {
     }
 }
 
+#[pyclass]
+#[derive(Clone)]
+pub(crate) struct VlobReadBatchReqItem(pub vlob_read_batch::VlobReadBatchReqItem);
+
+crate::binding_utils::gen_proto!(VlobReadBatchReqItem, __repr__);
+crate::binding_utils::gen_proto!(VlobReadBatchReqItem, __richcmp__, eq);
+
+#[pymethods]
+impl VlobReadBatchReqItem {
+    #[new]
+    fn new(vlob_id: VlobID, version: Option<u32>, timestamp: Option<DateTime>) -> PyResult<Self> {
+        let vlob_id = vlob_id.0;
+        let timestamp = timestamp.map(|x| x.0);
+        Ok(Self(vlob_read_batch::VlobReadBatchReqItem {
+            vlob_id,
+            version,
+            timestamp,
+        }))
+    }
+
+    #[getter]
+    fn vlob_id(&self) -> PyResult<VlobID> {
+        Ok(VlobID(self.0.vlob_id))
+    }
+
+    #[getter]
+    fn version(&self) -> PyResult<Option<u32>> {
+        Ok(self.0.version)
+    }
+
+    #[getter]
+    fn timestamp(&self) -> PyResult<Option<DateTime>> {
+        Ok(self.0.timestamp.map(DateTime))
+    }
+}
+
+#[pyclass]
+#[derive(Clone)]
+pub(crate) struct VlobReadBatchRepItem(pub vlob_read_batch::VlobReadBatchRepItem);
+
+crate::binding_utils::gen_proto!(VlobReadBatchRepItem, __repr__);
+crate::binding_utils::gen_proto!(VlobReadBatchRepItem, __richcmp__, eq);
+
+#[pymethods]
+impl VlobReadBatchRepItem {
+    #[new]
+    fn new(
+        vlob_id: VlobID,
+        version: u32,
+        blob: Vec<u8>,
+        author: DeviceID,
+        timestamp: DateTime,
+        author_last_role_granted_on: DateTime,
+    ) -> PyResult<Self> {
+        Ok(Self(vlob_read_batch::VlobReadBatchRepItem {
+            vlob_id: vlob_id.0,
+            version,
+            blob,
+            author: author.0,
+            timestamp: timestamp.0,
+            author_last_role_granted_on: author_last_role_granted_on.0,
+        }))
+    }
+
+    #[getter]
+    fn vlob_id(&self) -> PyResult<VlobID> {
+        Ok(VlobID(self.0.vlob_id))
+    }
+
+    #[getter]
+    fn version(&self) -> PyResult<u32> {
+        Ok(self.0.version)
+    }
+
+    #[getter]
+    fn blob<'py>(&self, py: Python<'py>) -> PyResult<&'py PyBytes> {
+        Ok(PyBytes::new(py, &self.0.blob))
+    }
+
+    #[getter]
+    fn author(&self) -> PyResult<DeviceID> {
+        Ok(DeviceID(self.0.author.clone()))
+    }
+
+    #[getter]
+    fn timestamp(&self) -> PyResult<DateTime> {
+        Ok(DateTime(self.0.timestamp))
+    }
+
+    #[getter]
+    fn author_last_role_granted_on(&self) -> PyResult<DateTime> {
+        Ok(DateTime(self.0.author_last_role_granted_on))
+    }
+}
+
+#[pyclass]
+#[derive(Clone)]
+pub(crate) struct VlobReadBatchReq(pub vlob_read_batch::Req);
+
+crate::binding_utils::gen_proto!(VlobReadBatchReq, __repr__);
+crate::binding_utils::gen_proto!(VlobReadBatchReq, __richcmp__, eq);
+
+#[pymethods]
+impl VlobReadBatchReq {
+    #[new]
+    fn new(
+        realm_id: RealmID,
+        encryption_revision: u64,
+        items: Vec<VlobReadBatchReqItem>,
+    ) -> PyResult<Self> {
+        let realm_id = realm_id.0;
+        let items = items.into_iter().map(|item| item.0).collect();
+        Ok(Self(vlob_read_batch::Req {
+            realm_id,
+            encryption_revision,
+            items,
+        }))
+    }
+
+    fn dump<'py>(&self, py: Python<'py>) -> PyResult<&'py PyBytes> {
+        Ok(PyBytes::new(
+            py,
+            &self
+                .0
+                .clone()
+                .dump()
+                .map_err(|e| ProtocolError::new_err(format!("encoding error: {e}")))?,
+        ))
+    }
+
+    #[getter]
+    fn realm_id(&self) -> PyResult<RealmID> {
+        Ok(RealmID(self.0.realm_id))
+    }
+
+    #[getter]
+    fn encryption_revision(&self) -> PyResult<u64> {
+        Ok(self.0.encryption_revision)
+    }
+
+    #[getter]
+    fn items<'py>(&self, py: Python<'py>) -> PyResult<&'py PyTuple> {
+        Ok(PyTuple::new(
+            py,
+            self.0
+                .items
+                .iter()
+                .cloned()
+                .map(|item| VlobReadBatchReqItem(item).into_py(py)),
+        ))
+    }
+}
+
+gen_rep!(
+    vlob_read_batch,
+    VlobReadBatchRep,
+    { .. },
+    [NotFound, reason: Reason],
+    [NotAllowed],
+    [BadEncryptionRevision],
+    [InMaintenance],
+);
+
+#[pyclass(extends=VlobReadBatchRep)]
+pub(crate) struct VlobReadBatchRepOk;
+
+#[pymethods]
+impl VlobReadBatchRepOk {
+    #[new]
+    fn new(items: Vec<VlobReadBatchRepItem>) -> PyResult<(Self, VlobReadBatchRep)> {
+        let items = items.into_iter().map(|item| item.0).collect();
+        Ok((Self, VlobReadBatchRep(vlob_read_batch::Rep::Ok { items })))
+    }
+
+    #[getter]
+    fn items<'py>(_self: PyRef<'py, Self>, py: Python<'py>) -> PyResult<&'py PyTuple> {
+        Ok(match &_self.as_ref().0 {
+            vlob_read_batch::Rep::Ok { items } => PyTuple::new(
+                py,
+                items
+                    .iter()
+                    .cloned()
+                    .map(|item| VlobReadBatchRepItem(item).into_py(py)),
+            ),
+            _ => return Err(PyNotImplementedError::new_err("")),
+        })
+    }
+}
+
 #[pyclass]
 #[derive(Clone)]
 pub(crate) struct VlobUpdateReq(pub vlob_update::Req);
@@ -6,8 +6,12 @@ import trio
 from functools import partial
 
 from parsec.serde import BaseSchema, fields
-from parsec.api.transport import Transport, TransportClosedByPeer
-from parsec.api.protocol.base import MsgpackSerializer
+from parsec.api.transport import Transport, TransportClosedByPeer, TransportError
+from parsec.api.protocol.base import (
+    MsgpackSerializer,
+    pack_multiplexed_msg,
+    unpack_multiplexed_msg,
+)
 
 
 async def serve_tcp_testbed(*conns):
@@ -70,6 +74,76 @@ async def test_no_transport_leaks_one_end_close(closing_end):
         await serve_tcp_testbed((closing_end_fn, listening_end_fn))
 
 
+async def _transports_pair(host="127.0.0.1"):
+    server_stream, client_stream = trio.testing.memory_stream_pair()
+    transports = {}
+
+    async def _boot_server():
+        transports["server"] = await Transport.init_for_server(server_stream)
+
+    async def _boot_client():
+        transports["client"] = await Transport.init_for_client(client_stream, host=host)
+
+    async with trio.open_service_nursery() as nursery:
+        nursery.start_soon(_boot_client)
+        nursery.start_soon(_boot_server)
+
+    return transports["client"], transports["server"]
+
+
+@pytest.mark.trio
+async def test_multiplexed_transport():
+    client_transport, server_transport = await _transports_pair()
+    client_transport.enable_multiplexing()
+
+    async def _request(msg):
+        await client_transport.send(msg)
+        return await client_transport.recv()
+
+    replies = {}
+
+    async def _request_and_store(msg):
+        replies[msg] = await _request(msg)
+
+    async with trio.open_service_nursery() as nursery:
+        for i in range(3):
+            nursery.start_soon(_request_and_store, f"req{i}".encode())
+        reqs = [unpack_multiplexed_msg(await server_transport.recv()) for _ in range(3)]
+        assert sorted(msg for _, msg in reqs) == [b"req0", b"req1", b"req2"]
+        # Reply out of order
+        for req_id, msg in reversed(reqs):
+            await server_transport.send(pack_multiplexed_msg(req_id, b"rep" + msg))
+
+    assert replies == {b"req0": b"repreq0", b"req1": b"repreq1", b"req2": b"repreq2"}
+
+    # Cancelled request doesn't prevent the transport from being used
+    with trio.move_on_after(0.1):
+        await _request(b"abandoned")
+    abandoned_req_id, _ = unpack_multiplexed_msg(await server_transport.recv())
+    await server_transport.send(pack_multiplexed_msg(abandoned_req_id, b"too late"))
+    async with trio.open_service_nursery() as nursery:
+        nursery.start_soon(_request_and_store, b"req3")
+        req_id, msg = unpack_multiplexed_msg(await server_transport.recv())
+        await server_transport.send(pack_multiplexed_msg(req_id, b"rep" + msg))
+    assert replies[b"req3"] == b"repreq3"
+    assert not client_transport.broken
+
+    # Whereas a connection error breaks all the requests
+    async def _doomed_request():
+        with pytest.raises(TransportError):
+            await _request(b"doomed")
+
+    async with trio.open_service_nursery() as nursery:
+        for _ in range(2):
+            nursery.start_soon(_doomed_request)
+        for _ in range(2):
+            await server_transport.recv()
+        await server_transport.aclose()
+    assert client_transport.broken
+    with pytest.raises(TransportError):
+        await _request(b"req4")
+
+
 # TODO: basically a benchmark to showcase the performances issues with
 # marshmallow/json serialization
 @pytest.mark.slow
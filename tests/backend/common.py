@@ -9,6 +9,7 @@ from contextlib import asynccontextmanager
 
 from parsec._parsec import (
     AuthenticatedPingRepOk,
+    BlockCreateBatchReqItem,
     BlockCreateRepOk,
     BlockReadRepOk,
     DeviceCreateRepOk,
@@ -46,6 +47,7 @@ from parsec._parsec import (
     VlobMaintenanceGetReencryptionBatchRepOk,
     VlobMaintenanceSaveReencryptionBatchRepOk,
     VlobPollChangesRepOk,
+    VlobReadBatchReqItem,
     VlobReadRepOk,
     VlobUpdateRepOk,
 )
@@ -53,6 +55,7 @@ from parsec.serde import packb
 from parsec.api.protocol import (
     authenticated_ping_serializer,
     block_create_serializer,
+    block_create_batch_serializer,
     block_read_serializer,
     device_create_serializer,
     events_listen_serializer,
@@ -99,6 +102,7 @@ from parsec.api.protocol import (
     vlob_maintenance_save_reencryption_batch_serializer,
     vlob_poll_changes_serializer,
     vlob_read_serializer,
+    vlob_read_batch_serializer,
     vlob_update_serializer,
 )
 
@@ -350,6 +354,16 @@ block_create = CmdSock(
     },
     check_rep_by_default=True,
 )
+block_create_batch = CmdSock(
+    "block_create_batch",
+    block_create_batch_serializer,
+    parse_args=lambda self, realm_id, blocks: {
+        "realm_id": realm_id,
+        "blocks": [
+            BlockCreateBatchReqItem(block_id=block_id, block=block) for block_id, block in blocks
+        ],
+    },
+)
 block_read = CmdSock(
     "block_read", block_read_serializer, parse_args=lambda self, block_id: {"block_id": block_id}
 )
@@ -433,6 +447,18 @@ vlob_read = CmdSock(
         "encryption_revision": encryption_revision,
     },
 )
+vlob_read_batch = CmdSock(
+    "vlob_read_batch",
+    vlob_read_batch_serializer,
+    parse_args=lambda self, realm_id, items, encryption_revision=1: {
+        "realm_id": realm_id,
+        "encryption_revision": encryption_revision,
+        "items": [
+            VlobReadBatchReqItem(vlob_id=vlob_id, version=version, timestamp=timestamp)
+            for vlob_id, version, timestamp in items
+        ],
+    },
+)
 vlob_update = CmdSock(
     "vlob_update",
     vlob_update_serializer,
@@ -1,6 +1,7 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
 from __future__ import annotations
 
+import time
 import trio
 import pytest
 from hypothesis import given, strategies as st
@@ -19,6 +20,13 @@ from parsec._parsec import (
 )
 from parsec.backend.realm import RealmGrantedRole
 from parsec.backend.block import BlockStoreError
+from parsec.backend.memory import MemoryBlockStoreComponent
+from parsec.backend.raid0_blockstore import (
+    RAID0BlockStoreComponent,
+    get_modulo_owner,
+    get_rendezvous_owner,
+)
+from parsec.backend import raid5_blockstore
 from parsec.backend.raid5_blockstore import (
     split_block_in_chunks,
     generate_checksum_chunk,
@@ -220,12 +228,181 @@ async def test_raid1_block_read_partial_failure(alice_ws, backend, block):
     assert rep == BlockReadRepOk(BLOCK_DATA)
 
 
+@pytest.mark.trio
+@customize_fixtures(blockstore_mode="RAID1_HEDGED_READ")
+async def test_raid1_hedged_block_create_and_read(alice_ws, realm):
+    await test_block_create_and_read(alice_ws, realm)
+
+
+@pytest.mark.trio
+@customize_fixtures(blockstore_mode="RAID1_HEDGED_READ")
+async def test_raid1_hedged_block_read_single_node(alice_ws, backend, block):
+    reads = []
+    for index, blockstore in enumerate(backend.blockstore.blockstores):
+
+        def _spy_read(organization_id, id, index=index, original_read=blockstore.read):
+            reads.append(index)
+            return original_read(organization_id, id)
+
+        blockstore.read = _spy_read
+
+    for _ in range(10):
+        rep = await block_read(alice_ws, block)
+        assert rep == BlockReadRepOk(BLOCK_DATA)
+    # Fast nodes never need hedging
+    assert len(reads) == 10
+
+
+@pytest.mark.trio
+@customize_fixtures(blockstore_mode="RAID1_HEDGED_READ")
+@pytest.mark.parametrize("slow_or_failing", ("slow", "failing"))
+async def test_raid1_hedged_block_read_primary_slow_or_failing(
+    alice_ws, backend, block, slow_or_failing
+):
+    primary = backend.blockstore._get_nodes_by_speed()[0]
+
+    async def mock_read(organization_id, id):
+        if slow_or_failing == "slow":
+            await trio.sleep_forever()
+        else:
+            await trio.sleep(0)
+            raise BlockStoreError()
+
+    backend.blockstore.blockstores[primary].read = mock_read
+
+    with trio.fail_after(1):
+        rep = await block_read(alice_ws, block)
+    assert rep == BlockReadRepOk(BLOCK_DATA)
+    # Primary choice adapts to the node's behavior
+    assert backend.blockstore._get_nodes_by_speed()[0] != primary
+    # Cancelled or failed reads don't skew the latency samples
+    assert not backend.blockstore.latency_stats[primary].samples
+
+
 @pytest.mark.trio
 @customize_fixtures(blockstore_mode="RAID0")
 async def test_raid0_block_create_and_read(alice_ws, realm):
     await test_block_create_and_read(alice_ws, realm)
 
 
+@pytest.mark.trio
+@customize_fixtures(blockstore_mode="CACHE")
+async def test_cache_block_create_and_read(alice_ws, realm):
+    await test_block_create_and_read(alice_ws, realm)
+
+
+@pytest.mark.trio
+@customize_fixtures(blockstore_mode="CACHE")
+async def test_cache_block_read_hit(alice_ws, backend, block):
+    async def mock_read(organization_id, id):
+        raise AssertionError("Block should be served from the cache")
+
+    # Block has been kept in cache at creation
+    backend.blockstore.blockstore.read = mock_read
+
+    rep = await block_read(alice_ws, block)
+    assert rep == BlockReadRepOk(BLOCK_DATA)
+    assert backend.blockstore.memory_hits == 1
+    assert backend.blockstore.misses == 0
+
+
+@pytest.mark.trio
+@customize_fixtures(blockstore_mode="RAID0_RENDEZVOUS")
+async def test_raid0_rendezvous_block_create_and_read(alice_ws, realm):
+    await test_block_create_and_read(alice_ws, realm)
+
+
+def test_raid0_rendezvous_placement_stability():
+    block_ids = [BlockID.new() for _ in range(1000)]
+    for nodes_count in (1, 2, 4, 7):
+        moved = 0
+        for block_id in block_ids:
+            owner = get_rendezvous_owner(block_id.uuid, nodes_count)
+            new_owner = get_rendezvous_owner(block_id.uuid, nodes_count + 1)
+            # Adding a node only moves blocks to this node
+            assert new_owner in (owner, nodes_count)
+            moved += new_owner != owner
+        # About `1 / (nodes_count + 1)` of the blocks are moved
+        assert 0.5 / (nodes_count + 1) < moved / len(block_ids) < 1.5 / (nodes_count + 1)
+
+
+@pytest.mark.trio
+@pytest.mark.parametrize("previous_rendezvous_hashing", (True, False))
+async def test_raid0_rendezvous_add_node_and_move_blocks(alice, previous_rendezvous_hashing):
+    org_id = alice.organization_id
+    nodes = [MemoryBlockStoreComponent() for _ in range(3)]
+    previous = RAID0BlockStoreComponent(nodes[:2], rendezvous_hashing=previous_rendezvous_hashing)
+    blocks = {BlockID.new(): f"block {i}".encode() for i in range(100)}
+    for block_id, block in blocks.items():
+        await previous.create(org_id, block_id, block)
+
+    # Add a node, blocks are still readable before being moved
+    current = RAID0BlockStoreComponent(nodes, rendezvous_hashing=True)
+    for block_id, block in blocks.items():
+        assert await current.read(org_id, block_id) == block
+
+    moved = 0
+    for block_id in blocks:
+        moved += await current.move_block(
+            org_id,
+            block_id,
+            previous_nodes_count=2,
+            previous_rendezvous_hashing=previous_rendezvous_hashing,
+        )
+        # Moving is idempotent
+        assert not await current.move_block(
+            org_id, block_id, previous_nodes_count=3, previous_rendezvous_hashing=True
+        )
+    assert moved
+
+    for block_id, block in blocks.items():
+        owner = get_rendezvous_owner(block_id.uuid, 3)
+        assert await nodes[owner].read(org_id, block_id) == block
+        if previous_rendezvous_hashing:
+            assert owner in (get_rendezvous_owner(block_id.uuid, 2), 2)
+        else:
+            previous_owner = get_modulo_owner(block_id.uuid, 2)
+            assert await nodes[previous_owner].read(org_id, block_id) == block
+        assert await current.read(org_id, block_id) == block
+
+
+@pytest.mark.trio
+async def test_raid0_rendezvous_move_blocks_created_during_rebalance(alice):
+    org_id = alice.organization_id
+    nodes = [MemoryBlockStoreComponent() for _ in range(3)]
+    previous = RAID0BlockStoreComponent(nodes[:2], rendezvous_hashing=True)
+    current = RAID0BlockStoreComponent(nodes, rendezvous_hashing=True)
+    old_blocks = {BlockID.new(): f"old block {i}".encode() for i in range(50)}
+    for block_id, block in old_blocks.items():
+        await previous.create(org_id, block_id, block)
+
+    # The backend has switched to the new layout and keeps accepting writes
+    new_blocks = {BlockID.new(): f"new block {i}".encode() for i in range(50)}
+    for block_id, block in new_blocks.items():
+        await current.create(org_id, block_id, block)
+    # Make sure some of the new blocks are only available on the new node
+    assert any(get_rendezvous_owner(block_id.uuid, 3) == 2 for block_id in new_blocks)
+
+    # Rebalance goes through all the blocks, whatever the layout they were created with
+    moved = 0
+    for block_id in [*old_blocks, *new_blocks]:
+        moved += await current.move_block(org_id, block_id, previous_nodes_count=2)
+    assert moved == sum(get_rendezvous_owner(block_id.uuid, 3) == 2 for block_id in old_blocks)
+
+    for block_id, block in {**old_blocks, **new_blocks}.items():
+        owner = get_rendezvous_owner(block_id.uuid, 3)
+        assert await nodes[owner].read(org_id, block_id) == block
+
+    # A block missing from both its previous and current owner is still an error
+    with pytest.raises(BlockStoreError):
+        unknown_block_id = next(
+            block_id
+            for block_id in iter(BlockID.new, None)
+            if get_rendezvous_owner(block_id.uuid, 3) == 2
+        )
+        await current.move_block(org_id, unknown_block_id, previous_nodes_count=2)
+
+
 @pytest.mark.trio
 @customize_fixtures(blockstore_mode="RAID5")
 async def test_raid5_block_create_and_read(alice_ws, realm):
@@ -459,6 +636,31 @@ async def test_access_during_maintenance(backend, alice, alice_ws, realm, block)
     assert rep == BlockReadRepOk(BLOCK_DATA)
 
 
+# Benchmark of the block read authorization (i.e. the database part of the block
+# read, the blockstore being the database as well in this configuration), run
+# it on different revisions to compare them:
+# `pytest tests/backend/realm/test_block.py -k bench --postgresql --runslow -s`
+@pytest.mark.slow
+@pytest.mark.postgresql
+@pytest.mark.trio
+async def test_block_read_bench(backend, alice, realm, block):
+    nb_reads = 2000
+    concurrency = 10
+
+    async def _read_blocks() -> None:
+        for _ in range(nb_reads // concurrency):
+            data = await backend.block.read(alice.organization_id, alice.device_id, block)
+            assert data == BLOCK_DATA
+
+    start = time.perf_counter()
+    async with trio.open_nursery() as nursery:
+        for _ in range(concurrency):
+            nursery.start_soon(_read_blocks)
+    elapsed = time.perf_counter() - start
+
+    print(f"block_read: {nb_reads / elapsed:.0f} reads/s ({concurrency} concurrent readers)")
+
+
 @given(block=st.binary(max_size=2**8), nb_blockstores=st.integers(min_value=3, max_value=16))
 def test_split_block(block, nb_blockstores):
     nb_chunks = nb_blockstores - 1
@@ -478,3 +680,23 @@ def test_split_block(block, nb_blockstores):
         partial_chunks[missing] = None
         rebuilt = rebuild_block_from_chunks(partial_chunks, checksum_chunk)
         assert rebuilt == block
+
+
+@pytest.mark.parametrize("implementation", ["int", "numpy"])
+@given(
+    buffer_size=st.integers(min_value=0, max_value=2**10),
+    nb_buffers=st.integers(min_value=1, max_value=8),
+    data=st.data(),
+)
+def test_xor_buffers_implementations(implementation, buffer_size, nb_buffers, data):
+    if implementation == "numpy" and raid5_blockstore.numpy is None:
+        pytest.skip("numpy is not available")
+    xor_buffers = getattr(raid5_blockstore, f"_xor_buffers_with_{implementation}")
+    buffers = [
+        data.draw(st.binary(min_size=buffer_size, max_size=buffer_size)) for _ in range(nb_buffers)
+    ]
+    expected = bytearray(buffer_size)
+    for buff in buffers:
+        for i, byte in enumerate(buff):
+            expected[i] ^= byte
+    assert xor_buffers(*buffers) == expected
@@ -0,0 +1,141 @@
+# Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
+from __future__ import annotations
+
+import pytest
+
+from parsec._parsec import (
+    DateTime,
+    BlockCreateBatchRepOk,
+    BlockCreateBatchRepAlreadyExists,
+    BlockCreateBatchRepNotFound,
+    BlockCreateBatchRepNotAllowed,
+    BlockCreateBatchRepInMaintenance,
+    BlockCreateBatchRepTooLarge,
+    BlockReadRepOk,
+    BlockReadRepNotFound,
+)
+from parsec.api.protocol import BlockID, RealmID, BLOCK_CREATE_BATCH_MAX_SIZE
+
+from tests.backend.common import block_create, block_create_batch, block_read
+
+
+@pytest.mark.trio
+async def test_block_create_batch_and_read(alice_ws, realm):
+    blocks = [(BlockID.new(), f"block {i}".encode()) for i in range(10)]
+    rep = await block_create_batch(alice_ws, realm, blocks)
+    assert rep == BlockCreateBatchRepOk()
+
+    for block_id, block in blocks:
+        rep = await block_read(alice_ws, block_id)
+        assert rep == BlockReadRepOk(block)
+
+    # Empty batch is a no-op
+    rep = await block_create_batch(alice_ws, realm, [])
+    assert rep == BlockCreateBatchRepOk()
+
+
+@pytest.mark.trio
+async def test_block_create_batch_existing_block(alice_ws, realm):
+    existing_block_id = BlockID.new()
+    await block_create(alice_ws, existing_block_id, realm, b"v1")
+
+    new_block_id = BlockID.new()
+    rep = await block_create_batch(
+        alice_ws, realm, [(existing_block_id, b"v2"), (new_block_id, b"new")]
+    )
+    assert rep == BlockCreateBatchRepOk()
+
+    # Already existing block is left untouched
+    rep = await block_read(alice_ws, existing_block_id)
+    assert rep == BlockReadRepOk(b"v1")
+    rep = await block_read(alice_ws, new_block_id)
+    assert rep == BlockReadRepOk(b"new")
+
+
+@pytest.mark.trio
+async def test_block_create_batch_block_from_other_realm(alice_ws, realm, other_realm):
+    other_realm_block_id = BlockID.new()
+    await block_create(alice_ws, other_realm_block_id, other_realm, b"v1")
+
+    new_block_id = BlockID.new()
+    rep = await block_create_batch(
+        alice_ws, realm, [(other_realm_block_id, b"v2"), (new_block_id, b"new")]
+    )
+    assert isinstance(rep, BlockCreateBatchRepAlreadyExists)
+
+    # Nothing has been created or overwritten
+    rep = await block_read(alice_ws, other_realm_block_id)
+    assert rep == BlockReadRepOk(b"v1")
+    rep = await block_read(alice_ws, new_block_id)
+    assert isinstance(rep, BlockReadRepNotFound)
+
+
+@pytest.mark.trio
+async def test_block_create_batch_concurrent_create_in_other_realm(
+    backend, alice, alice_ws, realm, other_realm
+):
+    concurrent_block_id = BlockID.new()
+    new_block_id = BlockID.new()
+    original_create = backend.blockstore.create
+
+    async def _create_with_concurrent_block_create(organization_id, block_id, block):
+        await original_create(organization_id, block_id, block)
+        if block_id == concurrent_block_id:
+            # Another realm creates the same block between the existence check
+            # and the metadata insertion
+            backend.blockstore.create = original_create
+            await backend.block.create(
+                organization_id=alice.organization_id,
+                author=alice.device_id,
+                block_id=concurrent_block_id,
+                realm_id=other_realm,
+                block=b"other",
+            )
+
+    backend.blockstore.create = _create_with_concurrent_block_create
+    rep = await block_create_batch(
+        alice_ws, realm, [(concurrent_block_id, b"batch"), (new_block_id, b"new")]
+    )
+    assert isinstance(rep, BlockCreateBatchRepAlreadyExists)
+
+    # The whole batch has been cancelled
+    rep = await block_read(alice_ws, new_block_id)
+    assert isinstance(rep, BlockReadRepNotFound)
+    # Block data depends on the blockstore idempotency, only its metadata matter here
+    rep = await block_read(alice_ws, concurrent_block_id)
+    assert isinstance(rep, BlockReadRepOk)
+
+
+@pytest.mark.trio
+async def test_block_create_batch_too_large(alice_ws, realm):
+    half = BLOCK_CREATE_BATCH_MAX_SIZE // 2
+    rep = await block_create_batch(
+        alice_ws, realm, [(BlockID.new(), b"a" * half), (BlockID.new(), b"b" * (half + 1))]
+    )
+    assert isinstance(rep, BlockCreateBatchRepTooLarge)
+
+
+@pytest.mark.trio
+async def test_block_create_batch_unknown_realm(alice_ws):
+    rep = await block_create_batch(alice_ws, RealmID.new(), [(BlockID.new(), b"data")])
+    assert isinstance(rep, BlockCreateBatchRepNotFound)
+
+
+@pytest.mark.trio
+async def test_block_create_batch_not_allowed(bob_ws, realm):
+    rep = await block_create_batch(bob_ws, realm, [(BlockID.new(), b"data")])
+    assert isinstance(rep, BlockCreateBatchRepNotAllowed)
+
+
+@pytest.mark.trio
+async def test_block_create_batch_in_maintenance(backend, alice, alice_ws, realm):
+    await backend.realm.start_reencryption_maintenance(
+        alice.organization_id,
+        alice.device_id,
+        realm,
+        2,
+        {alice.user_id: b"whatever"},
+        DateTime.now(),
+    )
+    rep = await block_create_batch(alice_ws, realm, [(BlockID.new(), b"data")])
+    assert isinstance(rep, BlockCreateBatchRepInMaintenance)
@@ -0,0 +1,118 @@
+# Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
+from __future__ import annotations
+
+import pytest
+
+from parsec._parsec import (
+    DateTime,
+    VlobReadBatchRepOk,
+    VlobReadBatchRepItem,
+    VlobReadBatchRepNotFound,
+    VlobReadBatchRepNotAllowed,
+    VlobReadBatchRepBadEncryptionRevision,
+    VlobReadBatchRepInMaintenance,
+)
+from parsec.api.protocol import RealmID, VlobID
+
+from tests.backend.common import vlob_read_batch
+
+
+@pytest.mark.trio
+async def test_read_batch_ok(alice, alice_ws, realm, vlobs):
+    unknown_vlob_id = VlobID.from_hex("00000000000000000000000000000001")
+    rep = await vlob_read_batch(
+        alice_ws,
+        realm,
+        [
+            (vlobs[0], None, None),
+            (vlobs[1], None, None),
+            (unknown_vlob_id, None, None),
+        ],
+    )
+    assert rep == VlobReadBatchRepOk(
+        [
+            VlobReadBatchRepItem(
+                vlob_id=vlobs[0],
+                version=2,
+                blob=b"r:A b:1 v:2",
+                author=alice.device_id,
+                timestamp=DateTime(2000, 1, 3),
+                author_last_role_granted_on=DateTime(2000, 1, 2),
+            ),
+            VlobReadBatchRepItem(
+                vlob_id=vlobs[1],
+                version=1,
+                blob=b"r:A b:2 v:1",
+                author=alice.device_id,
+                timestamp=DateTime(2000, 1, 4),
+                author_last_role_granted_on=DateTime(2000, 1, 2),
+            ),
+        ]
+    )
+
+
+@pytest.mark.trio
+async def test_read_batch_version_and_timestamp(alice, alice_ws, realm, vlobs):
+    rep = await vlob_read_batch(
+        alice_ws,
+        realm,
+        [
+            (vlobs[0], 1, None),
+            # vlobs[1] doesn't exist yet at this timestamp
+            (vlobs[1], None, DateTime(2000, 1, 3)),
+            # Nor at this version
+            (vlobs[1], 2, None),
+        ],
+    )
+    assert rep == VlobReadBatchRepOk(
+        [
+            VlobReadBatchRepItem(
+                vlob_id=vlobs[0],
+                version=1,
+                blob=b"r:A b:1 v:1",
+                author=alice.device_id,
+                timestamp=DateTime(2000, 1, 2, 1),
+                author_last_role_granted_on=DateTime(2000, 1, 2),
+            )
+        ]
+    )
+
+    rep = await vlob_read_batch(alice_ws, realm, [(vlobs[0], None, DateTime(2000, 1, 2, 10))])
+    assert isinstance(rep, VlobReadBatchRepOk)
+    assert [(item.vlob_id, item.version) for item in rep.items] == [(vlobs[0], 1)]
+
+    rep = await vlob_read_batch(alice_ws, realm, [])
+    assert rep == VlobReadBatchRepOk([])
+
+
+@pytest.mark.trio
+async def test_read_batch_ignores_other_realms(backend, alice, alice_ws, realm_factory, vlobs):
+    other_realm = await realm_factory(backend, alice)
+    rep = await vlob_read_batch(alice_ws, other_realm, [(vlobs[0], None, None)])
+    assert rep == VlobReadBatchRepOk([])
+
+
+@pytest.mark.trio
+async def test_read_batch_errors(backend, alice, alice_ws, bob_ws, realm, vlobs):
+    rep = await vlob_read_batch(
+        alice_ws, RealmID.from_hex("C0000000000000000000000000000000"), [(vlobs[0], None, None)]
+    )
+    assert isinstance(rep, VlobReadBatchRepNotFound)
+
+    # Not part of the realm
+    rep = await vlob_read_batch(bob_ws, realm, [(vlobs[0], None, None)])
+    assert isinstance(rep, VlobReadBatchRepNotAllowed)
+
+    rep = await vlob_read_batch(alice_ws, realm, [(vlobs[0], None, None)], encryption_revision=42)
+    assert isinstance(rep, VlobReadBatchRepBadEncryptionRevision)
+
+    await backend.realm.start_reencryption_maintenance(
+        alice.organization_id,
+        alice.device_id,
+        realm,
+        2,
+        {alice.user_id: b"whatever"},
+        DateTime(2000, 1, 2),
+    )
+    rep = await vlob_read_batch(alice_ws, realm, [(vlobs[0], None, None)], encryption_revision=2)
+    assert isinstance(rep, VlobReadBatchRepInMaintenance)
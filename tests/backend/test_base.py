@@ -3,7 +3,17 @@ from __future__ import annotations
 
 import pytest
 
-from parsec.api.protocol import packb, unpackb
+from parsec._parsec import EventsListenRepOkPinged, EventsSubscribeRepOk
+from parsec.api.protocol import (
+    packb,
+    unpackb,
+    pack_multiplexed_msg,
+    unpack_multiplexed_msg,
+    events_listen_serializer,
+    events_subscribe_serializer,
+)
+
+from tests.backend.common import authenticated_ping
 
 
 @pytest.mark.trio
@@ -34,3 +44,34 @@ async def test_bad_msg_format(alice_ws, kind):
         await alice_ws.send(b"\xc1")  # Never used value according to msgpack spec
     rep = await alice_ws.receive()
     assert unpackb(rep) == {"status": "invalid_msg_format", "reason": "Invalid message format"}
+
+
+@pytest.mark.trio
+async def test_multiplexed_cmds(alice_ws, bob_ws):
+    async def _send(req_id, req):
+        await alice_ws.send(pack_multiplexed_msg(req_id, packb(req)))
+
+    async def _receive():
+        return unpack_multiplexed_msg(await alice_ws.receive())
+
+    await _send(1, {"cmd": "events_subscribe"})
+    req_id, raw_rep = await _receive()
+    assert req_id == 1
+    assert events_subscribe_serializer.rep_loads(raw_rep) == EventsSubscribeRepOk()
+
+    # Long command doesn't block the next ones, nor is it cancelled by them
+    await _send(2, {"cmd": "events_listen", "wait": True})
+    await _send(3, {"cmd": "ping", "ping": "42"})
+    await _send(4, {"cmd": "dummy"})
+    replies = dict([await _receive(), await _receive()])
+    assert unpackb(replies[3]) == {"status": "ok", "pong": "42"}
+    assert unpackb(replies[4]) == {"status": "unknown_command", "reason": "Unknown command"}
+
+    await authenticated_ping(bob_ws, "foo")
+    req_id, raw_rep = await _receive()
+    assert req_id == 2
+    assert events_listen_serializer.rep_loads(raw_rep) == EventsListenRepOkPinged("foo")
+
+    # Regular commands can still be used on the same connection
+    await alice_ws.send(packb({"cmd": "ping", "ping": "43"}))
+    assert unpackb(await alice_ws.receive()) == {"status": "ok", "pong": "43"}
@@ -0,0 +1,123 @@
+# Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
+from __future__ import annotations
+
+import trio
+import trio.testing
+import pytest
+
+from parsec.api.protocol import OrganizationID, BlockID
+from parsec.backend.block import BlockStoreError
+from parsec.backend.blockstore import BaseBlockStoreComponent
+from parsec.backend.cache_blockstore import CacheBlockStoreComponent
+
+
+ORG_ID = OrganizationID("CoolOrg")
+
+
+class SpyBlockStoreComponent(BaseBlockStoreComponent):
+    def __init__(self):
+        self.blocks = {}
+        self.reads = 0
+        self.read_gate = None
+
+    async def read(self, organization_id, block_id):
+        self.reads += 1
+        if self.read_gate:
+            await self.read_gate.wait()
+        try:
+            return self.blocks[(organization_id, block_id)]
+        except KeyError:
+            raise BlockStoreError("Not found")
+
+    async def create(self, organization_id, block_id, block):
+        self.blocks[(organization_id, block_id)] = block
+
+
+@pytest.mark.trio
+async def test_memory_tier_lru():
+    spy = SpyBlockStoreComponent()
+    blockstore = CacheBlockStoreComponent(spy, memory_size=20)
+    b1, b2, b3 = BlockID.new(), BlockID.new(), BlockID.new()
+    spy.blocks[(ORG_ID, b1)] = b"a" * 10
+    spy.blocks[(ORG_ID, b2)] = b"b" * 10
+    spy.blocks[(ORG_ID, b3)] = b"c" * 10
+
+    assert await blockstore.read(ORG_ID, b1) == b"a" * 10
+    assert await blockstore.read(ORG_ID, b2) == b"b" * 10
+    assert await blockstore.read(ORG_ID, b1) == b"a" * 10
+    assert (blockstore.memory_hits, blockstore.misses) == (1, 2)
+
+    # b2 is the least recently used, hence evicted
+    assert await blockstore.read(ORG_ID, b3) == b"c" * 10
+    assert await blockstore.read(ORG_ID, b1) == b"a" * 10
+    assert await blockstore.read(ORG_ID, b2) == b"b" * 10
+    assert (blockstore.memory_hits, blockstore.misses) == (2, 4)
+    assert blockstore.stats()["memory_size"] == 20
+
+
+@pytest.mark.trio
+async def test_create_populates_cache():
+    spy = SpyBlockStoreComponent()
+    blockstore = CacheBlockStoreComponent(spy, memory_size=1024)
+    block_id = BlockID.new()
+
+    await blockstore.create(ORG_ID, block_id, b"data")
+    assert spy.blocks[(ORG_ID, block_id)] == b"data"
+    assert await blockstore.read(ORG_ID, block_id) == b"data"
+    assert spy.reads == 0
+
+
+@pytest.mark.trio
+async def test_read_error_not_cached():
+    spy = SpyBlockStoreComponent()
+    blockstore = CacheBlockStoreComponent(spy, memory_size=1024)
+    block_id = BlockID.new()
+
+    with pytest.raises(BlockStoreError):
+        await blockstore.read(ORG_ID, block_id)
+    spy.blocks[(ORG_ID, block_id)] = b"data"
+    assert await blockstore.read(ORG_ID, block_id) == b"data"
+    assert spy.reads == 2
+
+
+@pytest.mark.trio
+async def test_concurrent_reads_are_coalesced():
+    spy = SpyBlockStoreComponent()
+    spy.read_gate = trio.Event()
+    blockstore = CacheBlockStoreComponent(spy, memory_size=1024)
+    block_id = BlockID.new()
+    spy.blocks[(ORG_ID, block_id)] = b"data"
+    results = []
+
+    async def _read():
+        results.append(await blockstore.read(ORG_ID, block_id))
+
+    async with trio.open_nursery() as nursery:
+        for _ in range(5):
+            nursery.start_soon(_read)
+        await trio.testing.wait_all_tasks_blocked()
+        spy.read_gate.set()
+
+    assert results == [b"data"] * 5
+    assert spy.reads == 1
+
+
+@pytest.mark.trio
+async def test_disk_tier(tmp_path):
+    spy = SpyBlockStoreComponent()
+    b1, b2 = BlockID.new(), BlockID.new()
+    spy.blocks[(ORG_ID, b1)] = b"a" * 10
+    spy.blocks[(ORG_ID, b2)] = b"b" * 10
+
+    blockstore = CacheBlockStoreComponent(spy, memory_size=10, disk_dir=tmp_path, disk_size=100)
+    assert await blockstore.read(ORG_ID, b1) == b"a" * 10
+    assert await blockstore.read(ORG_ID, b2) == b"b" * 10
+    # b1 has been evicted from memory but is still on disk
+    assert await blockstore.read(ORG_ID, b1) == b"a" * 10
+    assert (blockstore.memory_hits, blockstore.disk_hits, blockstore.misses) == (0, 1, 2)
+
+    # Disk tier survives restart
+    blockstore = CacheBlockStoreComponent(spy, memory_size=10, disk_dir=tmp_path, disk_size=100)
+    assert blockstore.stats()["disk_size"] == 20
+    assert await blockstore.read(ORG_ID, b2) == b"b" * 10
+    assert (blockstore.memory_hits, blockstore.disk_hits, blockstore.misses) == (0, 1, 0)
@@ -3,7 +3,9 @@ from __future__ import annotations
 
 import pytest
 
+from parsec.backend.config import BackendConfig, MockedEmailConfig, PostgreSQLBlockStoreConfig
 from parsec.backend.cli.utils import _split_with_escaping
+from parsec.backend.cli.workers import split_db_connections
 
 
 @pytest.mark.parametrize(
@@ -23,3 +25,30 @@ from parsec.backend.cli.utils import _split_with_escaping
 def test_split_with_escaping(txt, expected_parts):
     parts = _split_with_escaping(txt)
     assert parts == expected_parts
+
+
+@pytest.mark.parametrize(
+    "workers,min_connections,max_connections,expected",
+    [
+        (1, 5, 7, (5, 7)),
+        (2, 5, 7, (3, 3)),
+        (4, 5, 20, (2, 5)),
+        (3, 5, 7, (2, 2)),
+        # Not accepted by `backend run`, each worker still gets a working pool
+        (10, 5, 7, (1, 2)),
+    ],
+)
+def test_split_db_connections(workers, min_connections, max_connections, expected):
+    config = BackendConfig(
+        administration_token="s3cr3t",
+        db_url="postgresql://localhost/parsec",
+        db_min_connections=min_connections,
+        db_max_connections=max_connections,
+        blockstore_config=PostgreSQLBlockStoreConfig(),
+        email_config=MockedEmailConfig("sender@example.com", "/tmp"),
+        forward_proto_enforce_https=None,
+        backend_addr=None,
+        debug=False,
+    )
+    worker_config = split_db_connections(config, workers)
+    assert (worker_config.db_min_connections, worker_config.db_max_connections) == expected
@@ -9,6 +9,8 @@ from quart.testing.connections import WebsocketDisconnectError
 from parsec._parsec import AuthenticatedPingRepOk, EventsListenRepNoEvents, EventsListenRepOkPinged
 from parsec.backend.asgi import app_factory
 from parsec.backend.backend_events import BackendEvent
+from parsec.backend.realm import RealmGrantedRole
+from parsec.api.protocol import RealmRole, events_listen_serializer, events_subscribe_serializer
 
 from tests.backend.common import (
     events_subscribe,
@@ -171,4 +173,65 @@ async def test_events_close_connection_on_backpressure(
                     break
 
 
+@pytest.mark.trio
+async def test_events_subscriptions_index(
+    backend, backend_asgi_app, backend_authenticated_ws_factory, alice, bob, realm, next_timestamp
+):
+    subscriptions = backend.events._subscriptions
+
+    async def _update_bob_role(role):
+        with backend.event_bus.listen() as spy:
+            await backend.realm.update_roles(
+                alice.organization_id,
+                RealmGrantedRole(
+                    certificate=b"<dummy>",
+                    realm_id=realm,
+                    user_id=bob.user_id,
+                    role=role,
+                    granted_by=alice.device_id,
+                    granted_on=next_timestamp(),
+                ),
+            )
+            await spy.wait_with_timeout(BackendEvent.REALM_ROLES_UPDATED)
+
+    async with backend_authenticated_ws_factory(backend_asgi_app, bob) as bob_ws:
+        await events_subscribe(bob_ws)
+        (bob_ctx,) = subscriptions.by_user[(bob.organization_id, bob.user_id)]
+        assert subscriptions.by_organization[bob.organization_id] == {bob_ctx}
+        assert (bob.organization_id, realm) not in subscriptions.by_realm
+
+        # Realm index follows the roles changes
+        await _update_bob_role(RealmRole.READER)
+        assert subscriptions.by_realm[(bob.organization_id, realm)] == {bob_ctx}
+        await _update_bob_role(None)
+        assert (bob.organization_id, realm) not in subscriptions.by_realm
+
+        await _update_bob_role(RealmRole.READER)
+
+    # Client is removed from the index once disconnected
+    await trio.testing.wait_all_tasks_blocked()
+    assert not subscriptions.by_user
+    assert not subscriptions.by_organization
+    assert not subscriptions.by_realm
+
+
+@pytest.mark.trio
+@pytest.mark.parametrize("cmd", ("events_subscribe", "events_listen"))
+async def test_events_not_available_through_rpc(backend, alice_rpc, cmd):
+    serializer = {
+        "events_subscribe": events_subscribe_serializer,
+        "events_listen": events_listen_serializer,
+    }[cmd]
+    req = {"cmd": cmd} if cmd == "events_subscribe" else {"cmd": cmd, "wait": False}
+    rep = await alice_rpc.send(req, serializer)
+    assert rep.status == "unknown_command"
+
+    # No context is left behind in the subscriptions index
+    subscriptions = backend.events._subscriptions
+    assert not subscriptions.by_user
+    assert not subscriptions.by_organization
+    assert not subscriptions.by_realm
+    assert not subscriptions.admins
+
+
 # TODO: test message.received and beacon.updated events
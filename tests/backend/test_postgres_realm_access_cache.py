@@ -0,0 +1,135 @@
+# Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
+from __future__ import annotations
+
+import pytest
+
+from parsec._parsec import DateTime
+from parsec.api.protocol import OrganizationID, RealmID, UserID, VlobID, RealmRole
+from parsec.backend.backend_events import BackendEvent
+from parsec.backend.realm import RealmGrantedRole, RealmStatus
+from parsec.backend.vlob import VlobAccessError
+from parsec.backend.postgresql.realm_access_cache import RealmAccessCache
+
+
+ORG = OrganizationID("CoolOrg")
+REALM = RealmID.from_hex("A0000000000000000000000000000000")
+OTHER_REALM = RealmID.from_hex("B0000000000000000000000000000000")
+USER = UserID("alice")
+VLOB = VlobID.from_hex("10000000000000000000000000000000")
+STATUS = RealmStatus(
+    maintenance_type=None,
+    maintenance_started_on=None,
+    maintenance_started_by=None,
+    encryption_revision=1,
+)
+ROLE = (RealmRole.OWNER, DateTime(2000, 1, 2))
+
+
+def test_realm_access_cache_disabled():
+    cache = RealmAccessCache()
+    cache.set_status(cache.generation, ORG, REALM, STATUS)
+    assert cache.get_status(ORG, REALM) is None
+
+    cache.enable()
+    cache.set_status(cache.generation, ORG, REALM, STATUS)
+    cache.set_role(cache.generation, ORG, REALM, USER, ROLE)
+    assert cache.get_status(ORG, REALM) == STATUS
+    assert cache.get_role(ORG, REALM, USER) == ROLE
+
+    # Disabling (i.e. notification connection is lost) drops the cached values
+    cache.disable()
+    assert cache.get_status(ORG, REALM) is None
+    cache.enable()
+    assert cache.get_status(ORG, REALM) is None
+    assert cache.get_role(ORG, REALM, USER) is None
+
+
+def test_realm_access_cache_invalidate():
+    cache = RealmAccessCache()
+    cache.enable()
+    for realm_id in (REALM, OTHER_REALM):
+        cache.set_status(cache.generation, ORG, realm_id, STATUS)
+        cache.set_role(cache.generation, ORG, realm_id, USER, ROLE)
+
+    cache.invalidate(ORG, REALM)
+    assert cache.get_status(ORG, REALM) is None
+    assert cache.get_role(ORG, REALM, USER) is None
+    assert cache.get_status(ORG, OTHER_REALM) == STATUS
+    assert cache.get_role(ORG, OTHER_REALM, USER) == ROLE
+
+
+def test_realm_access_cache_invalidate_while_fetching():
+    cache = RealmAccessCache()
+    cache.enable()
+
+    # Generation is retrieved before querying the database...
+    generation = cache.generation
+    # ...then an invalidation occurs while the query is running...
+    cache.invalidate(ORG, REALM)
+    # ...hence the result of the query may be outdated and must not be cached
+    cache.set_status(generation, ORG, REALM, STATUS)
+    cache.set_role(generation, ORG, REALM, USER, ROLE)
+    assert cache.get_status(ORG, REALM) is None
+    assert cache.get_role(ORG, REALM, USER) is None
+
+
+def test_realm_access_cache_max_realms():
+    cache = RealmAccessCache(max_realms=2)
+    cache.enable()
+    realms = [RealmID.new() for _ in range(3)]
+    cache.set_status(cache.generation, ORG, realms[0], STATUS)
+    cache.set_status(cache.generation, ORG, realms[1], STATUS)
+    # Access the first realm so that the second one is the least recently used
+    assert cache.get_status(ORG, realms[0]) == STATUS
+    cache.set_status(cache.generation, ORG, realms[2], STATUS)
+
+    assert cache.get_status(ORG, realms[0]) == STATUS
+    assert cache.get_status(ORG, realms[1]) is None
+    assert cache.get_status(ORG, realms[2]) == STATUS
+
+
+@pytest.mark.trio
+@pytest.mark.postgresql
+async def test_realm_access_cache_invalidated_by_other_backend(
+    backend_factory, realm_factory, alice, bob, next_timestamp
+):
+    async with backend_factory() as backend1, backend_factory(populated=False) as backend2:
+        cache = backend1.vlob.dbh.realm_access_cache
+        assert cache.enabled
+
+        realm_id = await realm_factory(backend1, alice)
+        await backend1.vlob.create(
+            organization_id=alice.organization_id,
+            author=alice.device_id,
+            realm_id=realm_id,
+            encryption_revision=1,
+            vlob_id=VLOB,
+            timestamp=next_timestamp(),
+            blob=b"v1",
+        )
+
+        async def _update_bob_role(backend, role):
+            with backend1.event_bus.listen() as spy:
+                await backend.realm.update_roles(
+                    alice.organization_id,
+                    RealmGrantedRole(
+                        certificate=b"<dummy>",
+                        realm_id=realm_id,
+                        user_id=bob.user_id,
+                        role=role,
+                        granted_by=alice.device_id,
+                        granted_on=next_timestamp(),
+                    ),
+                )
+                await spy.wait_with_timeout(BackendEvent.REALM_ROLES_UPDATED)
+
+        # Role change on the same backend
+        await _update_bob_role(backend1, RealmRole.READER)
+        await backend1.vlob.read(alice.organization_id, bob.device_id, 1, VLOB)
+        assert cache.get_role(alice.organization_id, realm_id, bob.user_id)[0] == RealmRole.READER
+
+        # Role change on another backend
+        await _update_bob_role(backend2, None)
+        assert cache.get_role(alice.organization_id, realm_id, bob.user_id) is None
+        with pytest.raises(VlobAccessError):
+            await backend1.vlob.read(alice.organization_id, bob.device_id, 1, VLOB)
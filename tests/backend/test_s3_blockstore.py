@@ -1,6 +1,9 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
 from __future__ import annotations
 
+import time
+import trio
+import threading
 from unittest.mock import Mock
 from unittest import mock
 
@@ -66,6 +69,73 @@ async def test_s3_read(caplog):
         _assert_log()
 
 
+@pytest.mark.trio
+async def test_s3_read_timeout(caplog):
+    org_id = OrganizationID("org42")
+    block_id = BlockID.from_hex("0694a21176354e8295e28a543e5887f9")
+
+    with mock.patch("boto3.client") as client_mock:
+        client_mock.return_value = Mock()
+        client_mock().head_bucket.return_value = True
+        blockstore = S3BlockStoreComponent("europe", "parsec", "john", "secret", timeout=0.1)
+
+        def _slow_get_object(**kwargs):
+            time.sleep(1)
+            return {"Body": Mock()}
+
+        client_mock().get_object.side_effect = _slow_get_object
+        with pytest.raises(BlockStoreError):
+            await blockstore.read(org_id, block_id)
+        log = caplog.assert_occured_once("[warning  ] Block read error")
+        assert f"block_id={block_id.str}" in log
+
+
+@pytest.mark.trio
+async def test_s3_read_concurrency_is_bounded():
+    org_id = OrganizationID("org42")
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    with mock.patch("boto3.client") as client_mock:
+        client_mock.return_value = Mock()
+        client_mock().head_bucket.return_value = True
+        blockstore = S3BlockStoreComponent("europe", "parsec", "john", "secret", max_concurrency=2)
+
+        def _get_object(**kwargs):
+            nonlocal in_flight, max_in_flight
+            with lock:
+                in_flight += 1
+                max_in_flight = max(in_flight, max_in_flight)
+            time.sleep(0.05)
+            with lock:
+                in_flight -= 1
+            response_mock = Mock()
+            response_mock.read.return_value = b"content"
+            return {"Body": response_mock}
+
+        client_mock().get_object.side_effect = _get_object
+
+        # Reads are not run on the event loop, so it stays responsive meanwhile
+        ticks = 0
+
+        async def _ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await trio.sleep(0.01)
+
+        async with trio.open_nursery() as nursery:
+            nursery.start_soon(_ticker)
+            async with trio.open_nursery() as readers:
+                for _ in range(6):
+                    readers.start_soon(blockstore.read, org_id, BlockID.new())
+            nursery.cancel_scope.cancel()
+
+        assert max_in_flight == 2
+        assert ticks > 1
+
+
 # This test has been detected as flaky.
 # Using re-runs is a valid temporary solutions but the problem should be investigated in the future.
 @pytest.mark.trio
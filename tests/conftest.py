@@ -24,6 +24,7 @@ from parsec.backend.config import (
     RAID0BlockStoreConfig,
     RAID1BlockStoreConfig,
     RAID5BlockStoreConfig,
+    CacheBlockStoreConfig,
 )
 
 # TODO: needed ?
@@ -412,12 +413,20 @@ def blockstore(backend_store, fixtures_customization):
     raid = fixtures_customization.get("blockstore_mode", "NO_RAID").upper()
     if raid == "RAID0":
         config = RAID0BlockStoreConfig(blockstores=[config, MockedBlockStoreConfig()])
+    elif raid == "RAID0_RENDEZVOUS":
+        config = RAID0BlockStoreConfig(
+            blockstores=[config, MockedBlockStoreConfig()], rendezvous_hashing=True
+        )
     elif raid == "RAID1":
         config = RAID1BlockStoreConfig(blockstores=[config, MockedBlockStoreConfig()])
     elif raid == "RAID1_PARTIAL_CREATE_OK":
         config = RAID1BlockStoreConfig(
             blockstores=[config, MockedBlockStoreConfig()], partial_create_ok=True
         )
+    elif raid == "RAID1_HEDGED_READ":
+        config = RAID1BlockStoreConfig(
+            blockstores=[config, MockedBlockStoreConfig()], hedged_read=True
+        )
     elif raid == "RAID5":
         config = RAID5BlockStoreConfig(
             blockstores=[config, MockedBlockStoreConfig(), MockedBlockStoreConfig()]
@@ -427,6 +436,8 @@ def blockstore(backend_store, fixtures_customization):
             blockstores=[config, MockedBlockStoreConfig(), MockedBlockStoreConfig()],
             partial_create_ok=True,
         )
+    elif raid == "CACHE":
+        config = CacheBlockStoreConfig(blockstore=config, memory_size=1024 * 1024)
     else:
         assert raid == "NO_RAID"
 
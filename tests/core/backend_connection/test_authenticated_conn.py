@@ -14,10 +14,12 @@ from parsec._parsec import (
     RealmID,
 )
 from parsec.api.data import EntryName
+from parsec.api.version import API_V2_VERSION, ApiVersion
 from parsec.api.protocol import RealmRole, VlobID
 from parsec.backend.backend_events import BackendEvent
 from parsec.backend.utils import ClientType
 from parsec.core.types import OrganizationConfig
+from parsec.core.backend_connection import authenticated
 from parsec.core.backend_connection import (
     BackendAuthenticatedConn,
     BackendConnStatus,
@@ -268,6 +270,73 @@ async def test_concurrency_sends(running_backend, alice, event_bus):
             await work_all_done.wait()
 
 
+@pytest.mark.trio
+@pytest.mark.parametrize("backend_multiplexing", (True, False))
+async def test_concurrency_sends_multiplexed(
+    monkeypatch, running_backend, alice, event_bus, backend_multiplexing
+):
+    CONCURRENCY = 10
+    if not backend_multiplexing:
+        # Backend from before multiplexed commands
+        monkeypatch.setattr(
+            "parsec.api.protocol.ServerHandshake.SUPPORTED_API_VERSIONS",
+            (API_V2_VERSION, ApiVersion(3, 2)),
+        )
+
+    transports = []
+    vanilla_connect_as_authenticated = authenticated.connect_as_authenticated
+
+    async def _connect_as_authenticated(*args, **kwargs):
+        transport = await vanilla_connect_as_authenticated(*args, **kwargs)
+        transports.append(transport)
+        return transport
+
+    monkeypatch.setattr(authenticated, "connect_as_authenticated", _connect_as_authenticated)
+
+    # Make sure all the requests are in flight at the same time
+    all_requests_received = trio.Event()
+    requests_received = 0
+    vanilla_api_ping = running_backend.backend.apis[ClientType.AUTHENTICATED]["ping"]
+
+    async def _mocked_api_ping(client_ctx, msg):
+        nonlocal requests_received
+        requests_received += 1
+        if requests_received == CONCURRENCY:
+            all_requests_received.set()
+        if backend_multiplexing:
+            await all_requests_received.wait()
+        return await vanilla_api_ping(client_ctx, msg)
+
+    _mocked_api_ping._api_info = vanilla_api_ping._api_info
+    running_backend.backend.apis[ClientType.AUTHENTICATED]["ping"] = _mocked_api_ping
+
+    conn = BackendAuthenticatedConn(alice, event_bus, max_pool=4)
+    with event_bus.listen() as spy:
+        async with conn.run():
+            await spy.wait_with_timeout(
+                CoreEvent.BACKEND_CONNECTION_CHANGED,
+                {"status": BackendConnStatus.READY, "status_exc": None},
+            )
+
+            async def _sender(x):
+                rep = await conn.cmds.ping(x)
+                assert rep == AuthenticatedPingRepOk(x)
+
+            async with real_clock_timeout():
+                async with trio.open_service_nursery() as nursery:
+                    for x in range(CONCURRENCY):
+                        nursery.start_soon(_sender, str(x))
+
+    if backend_multiplexing:
+        # Event listener + the multiplexed transport
+        assert len(transports) == 2
+        assert all(transport.multiplexed for transport in transports)
+    else:
+        # Event listener + one transport per concurrent request
+        assert len(transports) == 4
+        assert not any(transport.multiplexed for transport in transports)
+
+
 @pytest.mark.trio
 async def test_realm_notif_on_new_entry_sync(running_backend, alice_backend_conn, alice2_user_fs):
     wid = await alice2_user_fs.workspace_create(EntryName("foo"))
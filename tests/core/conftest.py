@@ -81,7 +81,7 @@ async def apiv1_anonymous_backend_cmds(running_backend, coolorg):
 @pytest.fixture
 def user_fs_factory(data_base_dir, event_bus_factory):
     @asynccontextmanager
-    async def _user_fs_factory(device, event_bus=None, data_base_dir=data_base_dir):
+    async def _user_fs_factory(device, event_bus=None, data_base_dir=data_base_dir, **kwargs):
         event_bus = event_bus or event_bus_factory()
 
         async with backend_authenticated_cmds_factory(
@@ -89,7 +89,7 @@ def user_fs_factory(data_base_dir, event_bus_factory):
         ) as cmds:
             rdm = RemoteDevicesManager(cmds, device.root_verify_key, device.time_provider)
             async with UserFS.run(
-                data_base_dir, device, cmds, rdm, event_bus, get_prevent_sync_pattern()
+                data_base_dir, device, cmds, rdm, event_bus, get_prevent_sync_pattern(), **kwargs
             ) as user_fs:
 
                 yield user_fs
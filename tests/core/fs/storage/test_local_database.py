@@ -0,0 +1,69 @@
+# Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
+from __future__ import annotations
+
+import trio
+import pytest
+
+from parsec.core.fs.exceptions import FSLocalStorageClosedError, FSLocalStorageOperationalError
+from parsec.core.fs.storage.local_database import LocalDatabase
+
+
+@pytest.fixture
+async def localdb(tmp_path):
+    async with LocalDatabase.run(tmp_path / "db.sqlite", max_readers=2) as localdb:
+        async with localdb.open_cursor() as cursor:
+            cursor.execute("CREATE TABLE items (key INTEGER PRIMARY KEY, value BLOB)")
+            cursor.execute("INSERT INTO items VALUES (1, 'a')")
+        yield localdb
+
+
+@pytest.mark.trio
+async def test_readers_dont_wait_for_the_main_connection(localdb):
+    async with localdb.open_cursor() as main_cursor:
+        main_cursor.execute("SELECT value FROM items")
+
+        # Main connection is busy (its lock is held), but readers are available
+        with trio.fail_after(1):
+            async with localdb.open_cursor(readonly=True) as cursor1:
+                async with localdb.open_cursor(readonly=True) as cursor2:
+                    for cursor in (cursor1, cursor2):
+                        cursor.execute("SELECT value FROM items WHERE key = 1")
+                        assert cursor.fetchone() == ("a",)
+
+    # Readers are reused
+    async with localdb.open_cursor(readonly=True) as cursor:
+        cursor.execute("SELECT value FROM items WHERE key = 1")
+    assert localdb._nb_readers == 2
+
+
+@pytest.mark.trio
+async def test_readers_see_uncommitted_changes(localdb):
+    async with localdb.open_cursor(commit=False) as cursor:
+        cursor.execute("INSERT INTO items VALUES (2, 'b')")
+
+    # Pending changes are only visible from the main connection, so it gets used instead
+    async with localdb.open_cursor(readonly=True) as cursor:
+        cursor.execute("SELECT value FROM items WHERE key = 2")
+        assert cursor.fetchone() == ("b",)
+    assert localdb._nb_readers == 0
+
+    await localdb.commit()
+    async with localdb.open_cursor(readonly=True) as cursor:
+        cursor.execute("SELECT value FROM items WHERE key = 2")
+        assert cursor.fetchone() == ("b",)
+    assert localdb._nb_readers == 1
+
+
+@pytest.mark.trio
+async def test_reader_operational_error_closes_the_database(localdb):
+    with pytest.raises(FSLocalStorageOperationalError):
+        async with localdb.open_cursor(readonly=True) as cursor:
+            cursor.execute("INSERT INTO items VALUES (2, 'b')")
+
+    with pytest.raises(FSLocalStorageClosedError):
+        async with localdb.open_cursor() as cursor:
+            pass
+    with pytest.raises(FSLocalStorageClosedError):
+        async with localdb.open_cursor(readonly=True) as cursor:
+            pass
+    assert localdb._nb_readers == 0
@@ -1,11 +1,16 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
 from __future__ import annotations
 
+import os
+import time
+import trio
 import pytest
+from itertools import count
+from types import SimpleNamespace
 from parsec._parsec import DateTime
 
 from parsec.api.data.manifest import LOCAL_AUTHOR_LEGACY_PLACEHOLDER
-from parsec.core.fs.storage import WorkspaceStorage
+from parsec.core.fs.storage import WorkspaceStorage, chunk_storage
 from parsec.core.fs import FSError, FSInvalidFileDescriptor
 from parsec.core.fs.exceptions import FSLocalMissError
 from parsec.core.types import (
@@ -332,6 +337,11 @@ async def test_realm_checkpoint(alice_workspace_storage):
     assert await aws.get_realm_checkpoint() == 44
     assert await aws.get_need_sync_entries() == (set(), set([manifest.id]))
 
+    # Same result when the entries are only found in the local database
+    await aws.set_manifest(manifest.id, manifest, check_lock_status=False)
+    await aws.clear_memory_cache()
+    assert await aws.get_need_sync_entries() == (set([manifest.id]), set([manifest.id]))
+
 
 @pytest.mark.trio
 @customize_fixtures(real_data_storage=True)
@@ -352,6 +362,88 @@ async def test_lock_manifest(data_base_dir, alice, workspace_id):
             assert await aws.get_manifest(manifest.id) == m2
 
 
+@pytest.mark.trio
+@customize_fixtures(real_data_storage=True)
+async def test_cache_flushed_in_a_single_commit(monkeypatch, data_base_dir, alice, workspace_id):
+    manifests = [create_manifest(alice, LocalFileManifest) for _ in range(10)]
+    chunk = Chunk.new(0, 7)
+    async with WorkspaceStorage.run(data_base_dir, alice, workspace_id) as aws:
+        await aws.set_chunk(chunk.id, b"0123456")
+        for manifest in manifests:
+            await aws.set_manifest(
+                manifest.id,
+                manifest,
+                cache_only=True,
+                check_lock_status=False,
+                removed_ids={chunk.id},
+            )
+
+        commits = 0
+        commit = aws.data_localdb._commit
+
+        async def _commit_spy():
+            nonlocal commits
+            commits += 1
+            await commit()
+
+        monkeypatch.setattr(aws.data_localdb, "_commit", _commit_spy)
+        await aws.clear_memory_cache()
+        assert commits == 1
+
+        for manifest in manifests:
+            assert await aws.get_manifest(manifest.id) == manifest
+        with pytest.raises(FSLocalMissError):
+            await aws.get_chunk(chunk.id)
+
+
+@pytest.mark.trio
+@customize_fixtures(real_data_storage=True)
+async def test_manifest_cache_eviction(data_base_dir, alice, workspace_id):
+    m1, m2, m3 = [create_manifest(alice, LocalFolderManifest) for _ in range(3)]
+    async with WorkspaceStorage.run(
+        data_base_dir, alice, workspace_id, manifest_cache_size=2
+    ) as aws:
+        manifest_storage = aws.manifest_storage
+        stats = manifest_storage.cache_stats
+        assert stats.evictions == 0
+
+        # Manifests not written to the local database yet are never evicted
+        for manifest in (m1, m2, m3):
+            await manifest_storage.set_manifest(manifest.id, manifest, cache_only=True)
+        assert set(manifest_storage._cache) == {workspace_id, m1.id, m2.id, m3.id}
+
+        # Workspace manifest is never evicted, others are evicted from the least recently used
+        for manifest in (m1, m2, m3):
+            await manifest_storage.ensure_manifest_persistent(manifest.id)
+        assert set(manifest_storage._cache) == {workspace_id, m3.id}
+        assert stats.evictions == 2
+
+        hits, misses = stats.hits, stats.misses
+        assert await aws.get_manifest(m1.id) == m1
+        assert await aws.get_manifest(m1.id) == m1
+        assert aws.get_workspace_manifest().id == workspace_id
+        assert set(manifest_storage._cache) == {workspace_id, m1.id}
+        assert (stats.hits - hits, stats.misses - misses, stats.evictions) == (1, 1, 3)
+
+        # Evicted manifests still need to be synchronized
+        local_changes, _ = await aws.get_need_sync_entries()
+        assert {m1.id, m2.id, m3.id} <= local_changes
+
+        # Dirty manifests are kept out of the eviction order, so that the clean
+        # ones get evicted without going through them
+        for manifest in (m2, m3):
+            await manifest_storage.set_manifest(manifest.id, manifest, cache_only=True)
+        assert set(manifest_storage._cache) == {workspace_id, m2.id, m3.id}
+        assert not manifest_storage._evictable
+        assert stats.evictions == 4
+
+        # Once written to the local database, they can be evicted again
+        await manifest_storage.ensure_manifest_persistent(m2.id)
+        await manifest_storage.ensure_manifest_persistent(m3.id)
+        assert set(manifest_storage._cache) == {workspace_id, m3.id}
+        assert list(manifest_storage._evictable) == [m3.id]
+
+
 @pytest.mark.trio
 @customize_fixtures(real_data_storage=True)
 async def test_block_interface(alice_workspace_storage):
@@ -412,6 +504,82 @@ async def test_chunk_interface(alice_workspace_storage):
     await aws.clear_chunk(chunk.id, miss_ok=True)
 
 
+@pytest.mark.trio
+@customize_fixtures(real_data_storage=True)
+async def test_chunk_compression(data_base_dir, alice, workspace_id):
+    data = b"0123456789" * 1000
+    chunk1 = Chunk.new(0, len(data))
+    chunk2 = Chunk.new(0, len(data)).evolve_as_block(data)
+
+    # Chunks written without compression...
+    async with WorkspaceStorage.run(data_base_dir, alice, workspace_id) as aws:
+        await aws.set_chunk(chunk1.id, data)
+        await aws.set_clean_block(chunk2.access.id, data)
+        await aws.data_localdb.commit()
+        uncompressed_size = await aws.block_storage.get_total_size()
+        assert uncompressed_size > len(data)
+
+    # ...can still be read once it is enabled
+    async with WorkspaceStorage.run(data_base_dir, alice, workspace_id, compression="zlib") as aws:
+        assert await aws.get_chunk(chunk1.id) == data
+        assert await aws.get_chunk(chunk2.id) == data
+
+        # Size accounting is done on the compressed data
+        await aws.set_clean_block(chunk2.access.id, data)
+        assert await aws.get_chunk(chunk2.id) == data
+        assert await aws.block_storage.get_total_size() < uncompressed_size // 10
+        await aws.set_chunk(chunk1.id, data)
+        assert await aws.get_chunk(chunk1.id) == data
+        assert await aws.chunk_storage.get_total_size() < uncompressed_size // 10
+
+        # Incompressible data is stored as is
+        random_data = os.urandom(len(data))
+        await aws.set_chunk(chunk1.id, random_data)
+        assert await aws.get_chunk(chunk1.id) == random_data
+
+    with pytest.raises(ValueError):
+        async with WorkspaceStorage.run(data_base_dir, alice, workspace_id, compression="dummy"):
+            pass
+
+
+@pytest.mark.trio
+@customize_fixtures(real_data_storage=True)
+async def test_block_index(data_base_dir, alice, workspace_id):
+    data = b"0123456789"
+    access = Chunk.new(0, len(data)).evolve_as_block(data).access
+    same_content_access = Chunk.new(10, 10 + len(data)).evolve_as_block(data).access
+    other_access = Chunk.new(0, 5).evolve_as_block(b"other").access
+
+    # Deduplication is disabled by default
+    async with WorkspaceStorage.run(data_base_dir, alice, workspace_id) as aws:
+        assert aws.block_index is None
+        await aws.index_blocks([access])
+        assert await aws.get_indexed_blocks([same_content_access]) == [None]
+
+    async with WorkspaceStorage.run(
+        data_base_dir, alice, workspace_id, block_deduplication=True
+    ) as aws:
+        assert await aws.get_indexed_blocks([same_content_access]) == [None]
+        await aws.index_blocks([access])
+        # The block indexed first is kept
+        await aws.index_blocks([same_content_access])
+        await aws.data_localdb.commit()
+
+    async with WorkspaceStorage.run(
+        data_base_dir, alice, workspace_id, block_deduplication=True
+    ) as aws:
+        indexed_access, other_indexed_access = await aws.get_indexed_blocks(
+            [same_content_access, other_access]
+        )
+        assert other_indexed_access is None
+        assert indexed_access.id == access.id
+        assert indexed_access.key.secret == access.key.secret
+        assert indexed_access.size == access.size
+        assert indexed_access.digest == access.digest
+        # Set at the offset of the block it replaces
+        assert indexed_access.offset == same_content_access.offset
+
+
 @pytest.mark.trio
 @customize_fixtures(real_data_storage=True)
 async def test_chunk_many(alice_workspace_storage):
@@ -430,6 +598,11 @@ async def test_chunk_many(alice_workspace_storage):
         assert ret[i]
     assert len(ret) == chunks_number
 
+    # Duplicated ids are only returned once, missing ones are ignored
+    ret = await aws.get_local_chunk_ids([*chunks, *chunks, Chunk.new(0, 7).id])
+    assert len(ret) == chunks_number
+    assert set(ret) == set(chunks)
+
 
 @pytest.mark.trio
 @customize_fixtures(real_data_storage=True)
@@ -555,8 +728,9 @@ async def test_vacuum(data_base_dir, alice, workspace_id):
 @customize_fixtures(real_data_storage=True)
 async def test_garbage_collection(data_base_dir, alice, workspace_id):
     block_size = DEFAULT_BLOCK_SIZE
-    cache_size = 1 * block_size
     data = b"\x00" * block_size
+    # Cache can hold two blocks
+    cache_size = 2 * len(alice.local_symkey.encrypt(data))
     chunk1 = Chunk.new(0, block_size).evolve_as_block(data)
     chunk2 = Chunk.new(0, block_size).evolve_as_block(data)
     chunk3 = Chunk.new(0, block_size).evolve_as_block(data)
@@ -568,11 +742,160 @@ async def test_garbage_collection(data_base_dir, alice, workspace_id):
         await aws.set_clean_block(chunk1.access.id, data)
         assert await aws.block_storage.get_nb_blocks() == 1
         await aws.set_clean_block(chunk2.access.id, data)
-        assert await aws.block_storage.get_nb_blocks() == 1
+        assert await aws.block_storage.get_nb_blocks() == 2
         await aws.set_clean_block(chunk3.access.id, data)
+
+        # Cleanup runs in the background, and removes enough blocks
+        # not to be needed again for the next block
+        with trio.fail_after(10):
+            while await aws.block_storage.get_total_size() > cache_size:
+                await trio.sleep(0.01)
         assert await aws.block_storage.get_nb_blocks() == 1
+        assert await aws.get_chunk(chunk3.id) == data
+
         await aws.block_storage.clear_all_blocks()
         assert await aws.block_storage.get_nb_blocks() == 0
+        assert await aws.block_storage.get_total_size() == 0
+
+
+@pytest.mark.trio
+@customize_fixtures(real_data_storage=True)
+async def test_garbage_collection_uses_batched_access_times(
+    monkeypatch, data_base_dir, alice, workspace_id
+):
+    # Make sure each access gets its own timestamp
+    clock = count(1)
+    monkeypatch.setattr(
+        chunk_storage, "time", SimpleNamespace(time=lambda: next(clock), monotonic=time.monotonic)
+    )
+
+    data = b"\x00" * 1000
+    # Cache can hold ten blocks and a half
+    cache_size = 21 * len(alice.local_symkey.encrypt(data)) // 2
+    chunks = [Chunk.new(0, len(data)).evolve_as_block(data) for _ in range(11)]
+
+    async with WorkspaceStorage.run(
+        data_base_dir, alice, workspace_id, cache_size=cache_size
+    ) as aws:
+        for chunk in chunks[:10]:
+            await aws.set_clean_block(chunk.access.id, data)
+        # Access time is only kept in memory...
+        assert await aws.get_chunk(chunks[0].id) == data
+        assert aws.block_storage._pending_accessed_on
+
+        # ...but taken into account when evicting the least recently used blocks
+        await aws.set_clean_block(chunks[10].access.id, data)
+        await aws.block_storage.cleanup()
+        assert not aws.block_storage._pending_accessed_on
+        assert await aws.block_storage.get_nb_blocks() == 9
+        assert await aws.get_chunk(chunks[0].id) == data
+        last_accessed_on = aws.block_storage._pending_accessed_on[chunks[0].id.bytes]
+        for chunk in chunks[1:3]:
+            with pytest.raises(FSLocalMissError):
+                await aws.get_chunk(chunk.id)
+
+    # Pending access times are written to the database on exit
+    async with WorkspaceStorage.run(
+        data_base_dir, alice, workspace_id, cache_size=cache_size
+    ) as aws:
+        assert await aws.block_storage.get_nb_blocks() == 9
+        async with aws.block_storage._open_cursor() as cursor:
+            cursor.execute(
+                "SELECT accessed_on FROM chunks WHERE chunk_id = ?", (chunks[0].id.bytes,)
+            )
+            (accessed_on,) = cursor.fetchone()
+        assert accessed_on == last_accessed_on
+
+
+@pytest.mark.trio
+@customize_fixtures(real_data_storage=True)
+async def test_garbage_collection_keeps_pinned_blocks(data_base_dir, alice, workspace_id):
+    data = b"\x00" * 1000
+    block_size = len(alice.local_symkey.encrypt(data))
+    # Cache can hold a single block
+    cache_size = block_size
+    chunk1 = Chunk.new(0, len(data)).evolve_as_block(data)
+    chunk2 = Chunk.new(0, len(data)).evolve_as_block(data)
+    chunk3 = Chunk.new(0, len(data)).evolve_as_block(data)
+    parent_id = EntryID.new()
+    file1_id = EntryID.new()
+    file2_id = EntryID.new()
+
+    async with WorkspaceStorage.run(
+        data_base_dir, alice, workspace_id, cache_size=cache_size
+    ) as aws:
+        await aws.set_clean_block(chunk1.access.id, data)
+        await aws.set_pinned_blocks(file1_id, parent_id, [chunk1.access.id, chunk2.access.id])
+        # Blocks of a pinned file are offline as soon as they get downloaded...
+        await aws.set_clean_block(chunk2.access.id, data)
+        assert await aws.block_storage.get_offline_size() == 2 * block_size
+
+        # ...and don't count in the cache size
+        await aws.set_clean_block(chunk3.access.id, data)
+        await aws.block_storage.cleanup()
+        assert await aws.block_storage.get_nb_blocks() == 3
+
+        # A block stays offline as long as a pinned file references it
+        await aws.set_pinned_blocks(file2_id, parent_id, [chunk1.access.id])
+        await aws.clear_pinned_blocks([file1_id])
+        assert await aws.block_storage.get_offline_size() == block_size
+        await aws.block_storage.cleanup()
+        assert await aws.get_chunk(chunk1.id) == data
+        for chunk in (chunk2, chunk3):
+            with pytest.raises(FSLocalMissError):
+                await aws.get_chunk(chunk.id)
+
+        # Files removed from their folder are no longer pinned
+        await aws.clear_removed_pinned_blocks(parent_id, [file1_id])
+        assert await aws.get_pinned_files() == set()
+        assert await aws.block_storage.get_offline_size() == 0
+
+    # Pinned blocks are kept across restarts
+    async with WorkspaceStorage.run(
+        data_base_dir, alice, workspace_id, cache_size=cache_size
+    ) as aws:
+        await aws.set_pinned_entry(parent_id, recursive=True)
+        await aws.set_pinned_blocks(file1_id, parent_id, [chunk1.access.id])
+
+    async with WorkspaceStorage.run(
+        data_base_dir, alice, workspace_id, cache_size=cache_size
+    ) as aws:
+        assert await aws.get_pinned_entries() == {parent_id: True}
+        assert await aws.get_pinned_files() == {file1_id}
+        assert await aws.block_storage.get_offline_size() == block_size
+        await aws.clear_pinned_entries([parent_id])
+        assert await aws.get_pinned_entries() == {}
+
+
+@pytest.mark.trio
+@customize_fixtures(real_data_storage=True)
+async def test_garbage_collection_keeps_blocks_written_since_requested(
+    monkeypatch, data_base_dir, alice, workspace_id
+):
+    # Make sure each access gets its own timestamp
+    clock = count(1)
+    monkeypatch.setattr(
+        chunk_storage, "time", SimpleNamespace(time=lambda: next(clock), monotonic=time.monotonic)
+    )
+
+    data = b"\x00" * 1000
+    # Cache can hold a single block
+    cache_size = len(alice.local_symkey.encrypt(data))
+    chunk1 = Chunk.new(0, len(data)).evolve_as_block(data)
+    chunk2 = Chunk.new(0, len(data)).evolve_as_block(data)
+
+    async with WorkspaceStorage.run(
+        data_base_dir, alice, workspace_id, cache_size=cache_size
+    ) as aws:
+        await aws.set_clean_block(chunk1.access.id, data)
+        await aws.set_clean_block(chunk2.access.id, data)
+        await aws.block_storage.cleanup()
+
+        # The block that triggered the cleanup is not evicted by it
+        assert await aws.block_storage.get_nb_blocks() == 1
+        assert await aws.get_chunk(chunk2.id) == data
+        with pytest.raises(FSLocalMissError):
+            await aws.get_chunk(chunk1.id)
 
 
 @pytest.mark.trio
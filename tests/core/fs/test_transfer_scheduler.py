@@ -0,0 +1,107 @@
+# Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
+from __future__ import annotations
+
+import trio
+import pytest
+
+from parsec.core.types import EntryID
+from parsec.core.fs.exceptions import FSBackendOfflineError
+from parsec.core.fs.transfer_scheduler import TransferKind, TransferScheduler
+
+
+BLOCK_SIZE = 512 * 1024
+
+
+async def _simulate_transfers(scheduler, nb_blocks, rtt, bandwidth, size=BLOCK_SIZE):
+    # Concurrent transfers share the bandwidth of the link
+    max_in_flight = 0
+    workspace_id = EntryID.new()
+
+    async def _transfer(slot):
+        with slot:
+            await trio.sleep(rtt + size * scheduler.in_flight / bandwidth)
+
+    with scheduler.transfer(TransferKind.DOWNLOAD, workspace_id, nb_blocks * size) as transfer:
+        async with trio.open_nursery() as nursery:
+            for _ in range(nb_blocks):
+                slot = await scheduler.acquire(size, transfer)
+                max_in_flight = max(max_in_flight, scheduler.in_flight)
+                nursery.start_soon(_transfer, slot)
+    return transfer, max_in_flight
+
+
+@pytest.fixture
+def autojump(frozen_clock):
+    # The scheduler doesn't use any thread, so time can safely jump
+    frozen_clock.autojump_threshold = 0
+    yield frozen_clock
+    frozen_clock.autojump_threshold = float("inf")
+
+
+@pytest.mark.trio
+async def test_window_grows_on_high_latency_link(autojump):
+    scheduler = TransferScheduler()
+    assert scheduler.window == 4
+
+    transfer, max_in_flight = await _simulate_transfers(
+        scheduler, nb_blocks=600, rtt=0.1, bandwidth=1024**3
+    )
+    assert scheduler.window == scheduler.max_concurrency
+    assert max_in_flight == scheduler.max_concurrency
+
+    assert transfer.transferred_bytes == transfer.total_bytes
+    assert transfer.finished_on is not None
+    assert transfer.throughput > 0
+    assert scheduler.get_transfers() == []
+    assert scheduler.in_flight == 0
+    assert scheduler.bytes_in_flight == 0
+
+
+@pytest.mark.trio
+async def test_window_stays_small_on_low_bandwidth_link(autojump):
+    scheduler = TransferScheduler()
+
+    _, max_in_flight = await _simulate_transfers(
+        scheduler, nb_blocks=1000, rtt=0.01, bandwidth=10 * 1024**2
+    )
+    # More concurrency would only increase the latency
+    assert max_in_flight < scheduler.max_concurrency // 2
+    assert scheduler.window < scheduler.max_concurrency // 2
+
+
+@pytest.mark.trio
+async def test_bytes_in_flight_cap(autojump):
+    scheduler = TransferScheduler(max_bytes_in_flight=3 * BLOCK_SIZE)
+
+    _, max_in_flight = await _simulate_transfers(
+        scheduler, nb_blocks=100, rtt=0.1, bandwidth=1024**3
+    )
+    assert max_in_flight == 3
+
+    # A block bigger than the cap is still transferred
+    _, max_in_flight = await _simulate_transfers(
+        scheduler, nb_blocks=2, rtt=0.1, bandwidth=1024**3, size=4 * BLOCK_SIZE
+    )
+    assert max_in_flight == 1
+
+
+@pytest.mark.trio
+async def test_offline_error_decreases_window():
+    scheduler = TransferScheduler()
+    with scheduler.transfer(TransferKind.UPLOAD, EntryID.new(), 2 * BLOCK_SIZE) as transfer:
+        assert scheduler.get_transfers() == [transfer]
+
+        with pytest.raises(FSBackendOfflineError):
+            with await scheduler.acquire(BLOCK_SIZE, transfer):
+                raise FSBackendOfflineError()
+        assert scheduler.window == 2
+
+        # Other errors don't tell anything about the network
+        with pytest.raises(RuntimeError):
+            with await scheduler.acquire(BLOCK_SIZE, transfer):
+                raise RuntimeError()
+        assert scheduler.window == 2
+
+    assert transfer.transferred_bytes == 0
+    assert transfer.finished_on is not None
+    assert scheduler.get_transfers() == []
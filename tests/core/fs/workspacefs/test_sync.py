@@ -4,8 +4,10 @@ from __future__ import annotations
 from functools import partial
 import pytest
 
+from parsec._parsec import BlockCreateBatchRepUnknownStatus, VlobReadBatchRepUnknownStatus
 from parsec.api.data import EntryName
 from parsec.core.fs import FsPath
+from parsec.core.types import ChunkID, EntryID
 
 from tests.common import create_shared_workspace
 
@@ -94,3 +96,160 @@ async def test_sync_by_id_couple(alice_workspace, bob_workspace):
     expected = [FsPath("/a"), FsPath("/b")]
     assert await bob_workspace.listdir("/") == expected
     assert await alice_workspace.listdir("/") == expected
+
+
+@pytest.mark.trio
+@pytest.mark.parametrize("batch_supported", [True, False])
+async def test_load_manifests(alice_workspace, bob_workspace, monkeypatch, batch_supported):
+    for name in ("a", "b", "c"):
+        await alice_workspace.mkdir(f"/{name}")
+    await alice_workspace.sync()
+    children_ids = [await alice_workspace.path_id(f"/{name}") for name in ("a", "b", "c")]
+
+    remote_loader = bob_workspace.remote_loader
+    vlob_read_calls = []
+    vanilla_vlob_read = remote_loader.backend_cmds.vlob_read
+
+    async def _vlob_read_spy(*args, **kwargs):
+        vlob_read_calls.append(args)
+        return await vanilla_vlob_read(*args, **kwargs)
+
+    async def _old_backend_vlob_read_batch(*args, **kwargs):
+        return VlobReadBatchRepUnknownStatus("unknown_command", None)
+
+    monkeypatch.setattr(remote_loader.backend_cmds, "vlob_read", _vlob_read_spy)
+    if not batch_supported:
+        monkeypatch.setattr(
+            remote_loader.backend_cmds, "vlob_read_batch", _old_backend_vlob_read_batch
+        )
+
+    # Entries that don't exist remotely are simply ignored
+    manifests = await remote_loader.load_manifests([*children_ids, EntryID.new()])
+    assert manifests.keys() == set(children_ids)
+    for entry_id, manifest in manifests.items():
+        assert manifest.id == entry_id
+        assert manifest.version == 1
+    assert len(vlob_read_calls) == (0 if batch_supported else 4)
+
+    # The manifests are fetched by batch during a recursive sync
+    vlob_read_calls.clear()
+    await bob_workspace.sync()
+    assert await bob_workspace.listdir("/") == [FsPath("/a"), FsPath("/b"), FsPath("/c")]
+    if batch_supported:
+        # Only the workspace manifest is fetched on its own
+        assert len(vlob_read_calls) == 1
+
+
+@pytest.mark.trio
+@pytest.mark.parametrize("batch_supported", [True, False])
+async def test_upload_small_blocks_by_batch(
+    alice_workspace, bob_workspace, monkeypatch, batch_supported
+):
+    remote_loader = alice_workspace.remote_loader
+    block_create_calls = []
+    block_create_batch_calls = []
+    vanilla_block_create = remote_loader.backend_cmds.block_create
+    vanilla_block_create_batch = remote_loader.backend_cmds.block_create_batch
+
+    async def _block_create_spy(*args, **kwargs):
+        block_create_calls.append(args)
+        return await vanilla_block_create(*args, **kwargs)
+
+    async def _block_create_batch_spy(*args, **kwargs):
+        block_create_batch_calls.append(args)
+        if not batch_supported:
+            return BlockCreateBatchRepUnknownStatus("unknown_command", None)
+        return await vanilla_block_create_batch(*args, **kwargs)
+
+    monkeypatch.setattr(remote_loader.backend_cmds, "block_create", _block_create_spy)
+    monkeypatch.setattr(remote_loader.backend_cmds, "block_create_batch", _block_create_batch_spy)
+
+    for name in ("a", "b", "c"):
+        await alice_workspace.write_bytes(f"/{name}", f"content of {name}".encode())
+    await alice_workspace.sync()
+
+    if batch_supported:
+        # A single block per file, so one batch per file
+        assert len(block_create_batch_calls) == 3
+        assert not block_create_calls
+    else:
+        # The fallback is remembered once the backend is known not to support batches
+        assert len(block_create_batch_calls) == 1
+        assert len(block_create_calls) == 3
+
+    await bob_workspace.sync()
+    for name in ("a", "b", "c"):
+        assert await bob_workspace.read_bytes(f"/{name}") == f"content of {name}".encode()
+
+
+@pytest.mark.trio
+async def test_block_deduplication(running_backend, user_fs_factory, alice, monkeypatch):
+    async with user_fs_factory(alice, workspace_block_deduplication=True) as user_fs:
+        wid = await user_fs.workspace_create(EntryName("w"))
+        workspace = user_fs.get_workspace(wid)
+        remote_loader = workspace.remote_loader
+
+        uploaded_block_ids = []
+        vanilla_upload_block = remote_loader.upload_block
+        vanilla_upload_blocks_batch = remote_loader._upload_blocks_batch
+
+        async def _upload_block_spy(access, data):
+            uploaded_block_ids.append(access.id)
+            return await vanilla_upload_block(access, data)
+
+        async def _upload_blocks_batch_spy(batch):
+            uploaded_block_ids.extend(access.id for access, _ in batch)
+            return await vanilla_upload_blocks_batch(batch)
+
+        monkeypatch.setattr(remote_loader, "upload_block", _upload_block_spy)
+        monkeypatch.setattr(remote_loader, "_upload_blocks_batch", _upload_blocks_batch_spy)
+
+        async def _get_block_ids(path):
+            manifest = await workspace.local_storage.get_manifest(await workspace.path_id(path))
+            return [access.id for access in manifest.base.blocks]
+
+        await workspace.write_bytes("/a", b"same content")
+        await workspace.sync()
+        (block_id,) = await _get_block_ids("/a")
+        assert uploaded_block_ids == [block_id]
+
+        # Identical content references the already uploaded block
+        uploaded_block_ids.clear()
+        await workspace.write_bytes("/b", b"same content")
+        await workspace.write_bytes("/c", b"other content")
+        await workspace.sync()
+        assert await _get_block_ids("/b") == [block_id]
+        (other_block_id,) = await _get_block_ids("/c")
+        assert uploaded_block_ids == [other_block_id]
+
+        # The data is still available locally for the deduplicated file
+        assert await workspace.read_bytes("/b") == b"same content"
+        chunk_id = ChunkID(block_id.uuid)
+        assert await workspace.local_storage.get_chunk(chunk_id) == b"same content"
+
+
+@pytest.mark.trio
+async def test_pinned_deduplicated_blocks(running_backend, user_fs_factory, alice):
+    async with user_fs_factory(alice, workspace_block_deduplication=True) as user_fs:
+        wid = await user_fs.workspace_create(EntryName("w"))
+        workspace = user_fs.get_workspace(wid)
+        block_storage = workspace.local_storage.block_storage
+
+        await workspace.write_bytes("/a", b"same content")
+        await workspace.sync()
+        await workspace.write_bytes("/b", b"same content")
+        await workspace.sync()
+        assert await block_storage.get_nb_blocks() == 1
+
+        # The block shared by both files stays pinned as long as one of them is
+        await workspace.pin("/a")
+        await workspace.pin("/b")
+        await workspace.unpin("/a")
+        block_storage.cache_size = 0
+        await block_storage.cleanup()
+        assert await block_storage.get_nb_blocks() == 1
+        assert await workspace.read_bytes("/a") == b"same content"
+
+        await workspace.unpin("/b")
+        await block_storage.cleanup()
+        assert await block_storage.get_nb_blocks() == 0
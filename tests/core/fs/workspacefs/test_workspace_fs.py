@@ -8,6 +8,8 @@ from unittest.mock import ANY
 
 from trio import open_nursery
 from parsec._parsec import (
+    BlockAccess,
+    HashDigest,
     LocalDevice,
     FileManifest,
     FolderManifest,
@@ -18,7 +20,7 @@ from parsec._parsec import (
 
 from parsec.api.protocol import DeviceID, RealmID, RealmRole
 from parsec.api.data import EntryName
-from parsec.core.types import EntryID, DEFAULT_BLOCK_SIZE
+from parsec.core.types import EntryID, ChunkID, DEFAULT_BLOCK_SIZE
 from parsec.core.fs import FsPath
 from parsec.core.fs.exceptions import FSError, FSBackendOfflineError, FSLocalMissError
 from parsec.core.fs.workspacefs.workspacefs import ReencryptionNeed, WorkspaceFS
@@ -664,6 +666,227 @@ async def test_backend_block_data_online(
     check_size_integrity(file_size, proper_blocks_size, pending_chunks_size)
 
 
+@pytest.mark.trio
+async def test_pin_and_unpin(alice_user_fs, alice2_user_fs, running_backend):
+    wid = await alice_user_fs.workspace_create(EntryName("w"))
+    alice_workspace = alice_user_fs.get_workspace(wid)
+    await alice_workspace.mkdir("/foo/sub", parents=True)
+    await alice_workspace.write_bytes("/foo/bar.txt", b"a" * 10)
+    await alice_workspace.write_bytes("/foo/sub/baz.txt", b"b" * 10)
+    await alice_workspace.sync()
+    await alice_user_fs.sync()
+
+    await alice2_user_fs.sync()
+    alice2_workspace = alice2_user_fs.get_workspace(wid)
+    await alice2_workspace.sync()
+    block_storage = alice2_workspace.local_storage.block_storage
+
+    async def _get_cached_blocks(path):
+        block_info = await alice2_workspace.get_blocks_by_type(path)
+        assert not block_info.local_only_blocks
+        return len(block_info.local_and_remote_blocks)
+
+    # Missing blocks are downloaded, only in the folder unless recursive
+    await alice2_workspace.pin("/foo")
+    assert await _get_cached_blocks("/foo/bar.txt") == 1
+    assert await _get_cached_blocks("/foo/sub/baz.txt") == 0
+    await alice2_workspace.pin("/foo", recursive=True)
+    assert await _get_cached_blocks("/foo/sub/baz.txt") == 1
+
+    # Pinned blocks are kept whatever the cache size
+    await alice2_workspace.read_bytes("/foo/bar.txt")
+    block_storage.cache_size = 0
+    await block_storage.cleanup()
+    assert await block_storage.get_nb_blocks() == 2
+
+    # The file is still pinned through its folder
+    await alice2_workspace.unpin("/foo/bar.txt")
+    await block_storage.cleanup()
+    assert await _get_cached_blocks("/foo/bar.txt") == 1
+
+    await alice2_workspace.unpin("/foo")
+    await block_storage.cleanup()
+    assert await block_storage.get_nb_blocks() == 0
+    assert await alice2_workspace.read_bytes("/foo/bar.txt") == b"a" * 10
+
+    # Recursive unpin also unpins the entries in the folder
+    await alice2_workspace.pin("/foo/bar.txt")
+    await alice2_workspace.pin("/foo/sub")
+    await block_storage.cleanup()
+    assert await block_storage.get_nb_blocks() == 2
+    await alice2_workspace.unpin("/foo", recursive=True)
+    await block_storage.cleanup()
+    assert await block_storage.get_nb_blocks() == 0
+
+
+@pytest.mark.trio
+async def test_pinned_entries_follow_sync(alice_user_fs, alice2_user_fs, running_backend):
+    wid = await alice_user_fs.workspace_create(EntryName("w"))
+    alice_workspace = alice_user_fs.get_workspace(wid)
+    await alice_workspace.mkdir("/foo")
+    await alice_workspace.write_bytes("/foo/bar.txt", b"a" * 10)
+    await alice_workspace.sync()
+    await alice_user_fs.sync()
+
+    await alice2_user_fs.sync()
+    alice2_workspace = alice2_user_fs.get_workspace(wid)
+    await alice2_workspace.sync()
+    block_storage = alice2_workspace.local_storage.block_storage
+    await alice2_workspace.pin("/foo")
+    block_storage.cache_size = 0
+
+    # The new blocks of a pinned file are downloaded and pinned in place of the old ones
+    await alice_workspace.write_bytes("/foo/bar.txt", b"b" * 10)
+    await alice_workspace.write_bytes("/foo/new.txt", b"c" * 10)
+    await alice_workspace.sync()
+    await alice2_workspace.sync()
+    await block_storage.cleanup()
+    assert await block_storage.get_nb_blocks() == 2
+    assert await block_storage.get_total_size() == await block_storage.get_offline_size()
+    assert await alice2_workspace.read_bytes("/foo/bar.txt") == b"b" * 10
+
+    # Removed files are no longer pinned
+    await alice_workspace.unlink("/foo/bar.txt")
+    await alice_workspace.sync()
+    await alice2_workspace.sync()
+    await block_storage.cleanup()
+    assert await block_storage.get_nb_blocks() == 1
+
+    # Neither are the files moved out of the pinned folder
+    await alice_workspace.rename("/foo/new.txt", "/new.txt")
+    await alice_workspace.sync()
+    await alice2_workspace.sync()
+    await block_storage.cleanup()
+    assert await block_storage.get_nb_blocks() == 0
+
+    # Removed pinned entries are forgotten
+    await alice2_workspace.pin("/new.txt")
+    await alice2_workspace.unlink("/new.txt")
+    await alice2_workspace.sync()
+    assert await alice2_workspace.local_storage.get_pinned_entries() == {
+        await alice2_workspace.path_id("/foo"): False
+    }
+
+
+@pytest.mark.trio
+async def test_sequential_read_ahead(alice_user_fs, alice2_user_fs, running_backend, monkeypatch):
+    wid = await alice_user_fs.workspace_create(EntryName("w"))
+    alice_workspace = alice_user_fs.get_workspace(wid)
+    data = b"".join(bytes([i]) * DEFAULT_BLOCK_SIZE for i in range(8))
+    await alice_workspace.write_bytes("/foo.txt", data)
+    await alice_workspace.sync()
+    await alice_user_fs.sync()
+
+    await alice2_user_fs.sync()
+    alice2_workspace = alice2_user_fs.get_workspace(wid)
+    await alice2_workspace.sync()
+    transactions = alice2_workspace.transactions
+
+    loaded = []
+    vanilla_load_block = alice2_workspace.remote_loader.load_block
+
+    async def _load_block(access):
+        loaded.append(access.offset // DEFAULT_BLOCK_SIZE)
+        await vanilla_load_block(access)
+
+    monkeypatch.setattr(alice2_workspace.remote_loader, "load_block", _load_block)
+
+    async def _read(f, size):
+        result = await f.read(size)
+        for event in list(transactions._prefetching.values()):
+            await event.wait()
+        return result
+
+    async with await alice2_workspace.open_file("/foo.txt", "rb") as f:
+        # The window doubles while the file is read sequentially
+        assert await _read(f, DEFAULT_BLOCK_SIZE) == data[:DEFAULT_BLOCK_SIZE]
+        assert sorted(loaded) == [0, 1]
+        assert (
+            await _read(f, DEFAULT_BLOCK_SIZE) == data[DEFAULT_BLOCK_SIZE : 2 * DEFAULT_BLOCK_SIZE]
+        )
+        assert sorted(loaded) == [0, 1, 2, 3]
+
+        # Random access resets the window
+        await f.seek(6 * DEFAULT_BLOCK_SIZE)
+        assert (
+            await _read(f, DEFAULT_BLOCK_SIZE)
+            == data[6 * DEFAULT_BLOCK_SIZE : 7 * DEFAULT_BLOCK_SIZE]
+        )
+        assert sorted(loaded) == [0, 1, 2, 3, 6]
+
+        # Blocks are only downloaded once
+        await f.seek(0)
+        assert await f.read() == data
+        assert sorted(loaded) == [0, 1, 2, 3, 4, 5, 6, 7]
+
+    assert not transactions._read_aheads
+    assert transactions._prefetch_bytes_in_flight == 0
+
+
+@pytest.mark.trio
+async def test_read_ahead_unexpected_error(
+    alice_user_fs, alice2_user_fs, running_backend, monkeypatch, caplog
+):
+    wid = await alice_user_fs.workspace_create(EntryName("w"))
+    alice_workspace = alice_user_fs.get_workspace(wid)
+    data = b"".join(bytes([i]) * DEFAULT_BLOCK_SIZE for i in range(4))
+    await alice_workspace.write_bytes("/foo.txt", data)
+    await alice_workspace.sync()
+    await alice_user_fs.sync()
+
+    await alice2_user_fs.sync()
+    alice2_workspace = alice2_user_fs.get_workspace(wid)
+    await alice2_workspace.sync()
+    transactions = alice2_workspace.transactions
+
+    vanilla_load_block = alice2_workspace.remote_loader.load_block
+
+    async def _load_block(access):
+        # Only the first block is actually read, the others are prefetched
+        if access.offset:
+            raise RuntimeError("D'oh !")
+        await vanilla_load_block(access)
+
+    monkeypatch.setattr(alice2_workspace.remote_loader, "load_block", _load_block)
+
+    async with await alice2_workspace.open_file("/foo.txt", "rb") as f:
+        assert await f.read(DEFAULT_BLOCK_SIZE) == data[:DEFAULT_BLOCK_SIZE]
+        for event in list(transactions._prefetching.values()):
+            await event.wait()
+    caplog.assert_occured_once("Unexpected error while prefetching blocks")
+    assert transactions._prefetch_bytes_in_flight == 0
+
+    # The workspace is still usable, the blocks get downloaded when actually read
+    monkeypatch.setattr(alice2_workspace.remote_loader, "load_block", vanilla_load_block)
+    assert await alice2_workspace.read_bytes("/foo.txt") == data
+
+
+@pytest.mark.trio
+async def test_load_block_digest_mismatch(alice_user_fs, alice2_user_fs, running_backend):
+    wid = await alice_user_fs.workspace_create(EntryName("w"))
+    alice_workspace = alice_user_fs.get_workspace(wid)
+    await alice_workspace.write_bytes("/foo.txt", b"foo")
+    await alice_workspace.sync()
+    await alice_user_fs.sync()
+
+    await alice2_user_fs.sync()
+    alice2_workspace = alice2_user_fs.get_workspace(wid)
+    await alice2_workspace.sync()
+    manifest = await alice2_workspace.local_storage.get_manifest(
+        await alice2_workspace.path_id("/foo.txt")
+    )
+    access = manifest.base.blocks[0]
+
+    # The manifest author claims a digest that doesn't match the block content
+    forged_access = BlockAccess(
+        access.id, access.key, access.offset, access.size, HashDigest.from_data(b"bar")
+    )
+    with pytest.raises(FSError):
+        await alice2_workspace.remote_loader.load_block(forged_access)
+    with pytest.raises(FSLocalMissError):
+        await alice2_workspace.local_storage.get_chunk(ChunkID(access.id.uuid))
+
+
 @pytest.mark.trio
 async def test_backend_block_upload_error_during_sync(
     alice_user_fs, alice2_user_fs, running_backend, monkeypatch
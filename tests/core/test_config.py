@@ -0,0 +1,29 @@
+# Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
+from __future__ import annotations
+
+import json
+import pytest
+
+from parsec.core.config import load_config
+from parsec.core.fs.storage import chunk_storage
+
+
+@pytest.mark.parametrize("zstandard_available", (True, False))
+def test_load_config_workspace_storage_compression(tmp_path, monkeypatch, zstandard_available):
+    if not zstandard_available:
+        monkeypatch.setattr(chunk_storage, "zstandard", None)
+    elif chunk_storage.zstandard is None:
+        pytest.skip("zstandard is not installed")
+
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    (config_dir / "config.json").write_text(
+        json.dumps(
+            {"data_base_dir": str(tmp_path / "data"), "workspace_storage_compression": "zstd"}
+        )
+    )
+    config = load_config(config_dir, mountpoint_base_dir=tmp_path / "mountpoint")
+
+    # Falls back to zlib instead of preventing the workspaces from being opened
+    expected = "zstd" if zstandard_available else "zlib"
+    assert config.workspace_storage_compression == expected
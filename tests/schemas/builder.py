@@ -271,6 +271,7 @@ def generate_api_protocol_specs():
                     # Due to oxidation, there is no more schema
                     assert cmd_name in [
                         "block_create",
+                        "block_create_batch",
                         "block_read",
                         "events_subscribe",
                         "events_listen",
@@ -316,6 +317,7 @@ def generate_api_protocol_specs():
                         "vlob_maintenance_save_reencryption_batch",
                         "vlob_poll_changes",
                         "vlob_read",
+                        "vlob_read_batch",
                         "vlob_update",
                     ]
                     continue
@@ -0,0 +1,99 @@
+#! /usr/bin/env python3
+# Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
+"""
+Benchmark of the block cache read throughput against the number of files
+read in parallel (as done by the mountpoint when several applications read
+files at the same time).
+
+Each file is made of `--blocks` blocks stored in a block storage, every file
+is read by its own task while another task measures the event loop latency:
+
+    $ python tests/scripts/bench_chunk_storage_read.py --files=1 --files=4 --files=16
+"""
+from __future__ import annotations
+
+import click
+import trio
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from types import SimpleNamespace
+from typing import List
+
+from parsec.crypto import SecretKey
+from parsec.core.types import ChunkID, DEFAULT_BLOCK_SIZE
+from parsec.core.fs.storage.local_database import LocalDatabase
+from parsec.core.fs.storage.chunk_storage import BlockStorage
+
+
+LATENCY_PROBE_INTERVAL = 0.001
+
+
+async def bench_one(nb_files: int, nb_blocks: int, block_size: int, threads: int) -> None:
+    device = SimpleNamespace(local_symkey=SecretKey.generate())
+    files = [[ChunkID.new() for _ in range(nb_blocks)] for _ in range(nb_files)]
+    data = bytes(block_size)
+    thread_limiter = trio.CapacityLimiter(threads) if threads else None
+
+    with TemporaryDirectory(prefix="parsec-bench-") as tmpdir:
+        async with LocalDatabase.run(Path(tmpdir) / "cache.sqlite") as localdb:
+            async with BlockStorage.run(
+                device,  # type: ignore[arg-type]
+                localdb,
+                cache_size=2 * nb_files * nb_blocks * block_size,
+                thread_limiter=thread_limiter,
+            ) as block_storage:
+                for chunk_ids in files:
+                    for chunk_id in chunk_ids:
+                        await block_storage.set_chunk(chunk_id, data)
+
+                max_latency = 0.0
+
+                async def _measure_latency(
+                    task_status: trio.TaskStatus[None] = trio.TASK_STATUS_IGNORED,
+                ) -> None:
+                    nonlocal max_latency
+                    task_status.started()
+                    while True:
+                        before = perf_counter()
+                        await trio.sleep(LATENCY_PROBE_INTERVAL)
+                        latency = perf_counter() - before - LATENCY_PROBE_INTERVAL
+                        max_latency = max(max_latency, latency)
+
+                async def _read_file(chunk_ids: List[ChunkID]) -> None:
+                    for chunk_id in chunk_ids:
+                        await block_storage.get_chunk(chunk_id)
+
+                async with trio.open_nursery() as nursery:
+                    await nursery.start(_measure_latency)
+                    before = perf_counter()
+                    async with trio.open_nursery() as readers_nursery:
+                        for chunk_ids in files:
+                            readers_nursery.start_soon(_read_file, chunk_ids)
+                    total = perf_counter() - before
+                    nursery.cancel_scope.cancel()
+
+    throughput = nb_files * nb_blocks * block_size / total / 1024 / 1024
+    print(
+        f"{nb_files:>4} files: {throughput:9.1f}MiB/s, "
+        f"max event loop latency {max_latency * 1e3:7.2f}ms"
+    )
+
+
+@click.command()
+@click.option("--files", "nb_files_list", multiple=True, type=int, default=[1, 4, 16])
+@click.option("--blocks", "nb_blocks", default=32, show_default=True, help="Blocks per file")
+@click.option("--block-size", default=DEFAULT_BLOCK_SIZE, show_default=True)
+@click.option(
+    "--threads",
+    default=0,
+    show_default=True,
+    help="Maximum number of threads used to decrypt the blocks (0 for the number of cores)",
+)
+def main(nb_files_list: List[int], nb_blocks: int, block_size: int, threads: int) -> None:
+    for nb_files in nb_files_list:
+        trio.run(bench_one, nb_files, nb_blocks, block_size, threads)
+
+
+if __name__ == "__main__":
+    main()
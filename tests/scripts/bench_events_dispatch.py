@@ -0,0 +1,135 @@
+#! /usr/bin/env python3
+# Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
+"""
+Micro-benchmark of the backend's event dispatch cost against the number of
+clients subscribed to the events.
+
+Clients are spread across organizations (each organization has a single
+realm shared by all its users), then `realm.vlobs_updated` and `pinged`
+events are sent and the time spent in `EventBus.send` is measured:
+
+    $ python tests/scripts/bench_events_dispatch.py --clients=100 --clients=10000
+"""
+from __future__ import annotations
+
+import click
+import trio
+from time import perf_counter
+from typing import Dict, List
+
+from parsec.crypto import SigningKey, PrivateKey
+from parsec.event_bus import EventBus
+from parsec.api.version import API_V2_VERSION
+from parsec.api.protocol import OrganizationID, DeviceID, RealmID, RealmRole, UserProfile, VlobID
+from parsec.backend.backend_events import BackendEvent
+from parsec.backend.client_context import AuthenticatedClientContext
+from parsec.backend.events import EventsComponent
+
+
+class BenchRealmComponent:
+    def __init__(self, realms: Dict[OrganizationID, RealmID]):
+        self.realms = realms
+
+    async def get_realms_for_user(
+        self, organization_id: OrganizationID, user: object
+    ) -> Dict[RealmID, RealmRole]:
+        return {self.realms[organization_id]: RealmRole.CONTRIBUTOR}
+
+
+async def _noop_send_event(*args: object, **kwargs: object) -> None:
+    pass
+
+
+async def bench_one(nb_clients: int, clients_per_organization: int, nb_events: int) -> None:
+    event_bus = EventBus()
+    nb_organizations = max(nb_clients // clients_per_organization, 1)
+    organizations = [OrganizationID(f"Org{i}") for i in range(nb_organizations)]
+    realms = {organization_id: RealmID.new() for organization_id in organizations}
+    try:
+        events = EventsComponent(
+            BenchRealmComponent(realms),  # type: ignore[arg-type]
+            send_event=_noop_send_event,
+            event_bus=event_bus,
+        )
+    except TypeError:
+        # Revision without the subscription index
+        events = EventsComponent(
+            BenchRealmComponent(realms), send_event=_noop_send_event  # type: ignore
+        )
+
+    signing_key = SigningKey.generate()
+    private_key = PrivateKey.generate()
+    clients: List[AuthenticatedClientContext] = []
+    for i in range(nb_clients):
+        client_ctx = AuthenticatedClientContext(
+            api_version=API_V2_VERSION,
+            organization_id=organizations[i % nb_organizations],
+            device_id=DeviceID(f"user{i}@dev1"),
+            human_handle=None,
+            device_label=None,
+            profile=UserProfile.STANDARD,
+            public_key=private_key.public_key,
+            verify_key=signing_key.verify_key,
+        )
+        client_ctx.event_bus_ctx = event_bus.connection_context()
+        await events.api_events_subscribe(client_ctx, {"cmd": "events_subscribe"})
+        clients.append(client_ctx)
+
+    def _drain() -> None:
+        for client_ctx in clients:
+            while True:
+                try:
+                    client_ctx.receive_events_channel.receive_nowait()
+                except trio.WouldBlock:
+                    break
+
+    author = DeviceID("author@dev1")
+    organization_id = organizations[0]
+    realm_id = realms[organization_id]
+    vlob_id = VlobID.new()
+
+    total = 0.0
+    for i in range(nb_events):
+        before = perf_counter()
+        event_bus.send(
+            BackendEvent.REALM_VLOBS_UPDATED,
+            organization_id=organization_id,
+            author=author,
+            realm_id=realm_id,
+            checkpoint=i,
+            src_id=vlob_id,
+            src_version=i,
+        )
+        total += perf_counter() - before
+        _drain()
+    vlobs_updated_time = total / nb_events
+
+    total = 0.0
+    for i in range(nb_events):
+        before = perf_counter()
+        event_bus.send(
+            BackendEvent.PINGED, organization_id=organization_id, author=author, ping=str(i)
+        )
+        total += perf_counter() - before
+        _drain()
+    pinged_time = total / nb_events
+
+    nb_recipients = len(range(0, nb_clients, nb_organizations))
+    print(
+        f"{nb_clients:>6} clients ({nb_recipients} recipients): "
+        f"realm.vlobs_updated {vlobs_updated_time * 1e6:9.1f}us, "
+        f"pinged {pinged_time * 1e6:9.1f}us"
+    )
+
+
+@click.command()
+@click.option("--clients", "nb_clients_list", multiple=True, type=int, default=[10, 1000, 10000])
+@click.option("--clients-per-organization", default=5, show_default=True)
+@click.option("--events", "nb_events", default=100, show_default=True, help="Events per measure")
+def main(nb_clients_list: List[int], clients_per_organization: int, nb_events: int) -> None:
+    for nb_clients in nb_clients_list:
+        trio.run(bench_one, nb_clients, clients_per_organization, nb_events)
+
+
+if __name__ == "__main__":
+    main()
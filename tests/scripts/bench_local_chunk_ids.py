@@ -0,0 +1,67 @@
+#! /usr/bin/env python3
+# Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
+"""
+Micro-benchmark of the lookup of the chunks available in the local storage
+(as done by the GUI to display the status of a file) against the number of
+blocks in the file.
+
+Half of the file's blocks are stored in a chunk storage also containing the
+blocks of other files, then the time spent in `get_local_chunk_ids` is measured:
+
+    $ python tests/scripts/bench_local_chunk_ids.py --blocks=1000 --blocks=10000
+"""
+from __future__ import annotations
+
+import click
+import trio
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from types import SimpleNamespace
+from typing import List
+
+from parsec.crypto import SecretKey
+from parsec.core.types import ChunkID
+from parsec.core.fs.storage.local_database import LocalDatabase
+from parsec.core.fs.storage.chunk_storage import ChunkStorage
+
+
+async def bench_one(nb_blocks: int, nb_other_blocks: int, nb_lookups: int) -> None:
+    device = SimpleNamespace(local_symkey=SecretKey.generate())
+    file_chunk_ids = [ChunkID.new() for _ in range(nb_blocks)]
+    other_chunk_ids = [ChunkID.new() for _ in range(nb_other_blocks)]
+
+    with TemporaryDirectory(prefix="parsec-bench-") as tmpdir:
+        async with LocalDatabase.run(Path(tmpdir) / "data.sqlite") as localdb:
+            async with ChunkStorage.run(device, localdb) as chunk_storage:  # type: ignore[arg-type]
+                for chunk_id in [*file_chunk_ids[::2], *other_chunk_ids]:
+                    await chunk_storage.set_chunk(chunk_id, b"")
+                await localdb.commit()
+
+                total = 0.0
+                for _ in range(nb_lookups):
+                    before = perf_counter()
+                    local_chunk_ids = await chunk_storage.get_local_chunk_ids(file_chunk_ids)
+                    total += perf_counter() - before
+                assert len(local_chunk_ids) == len(file_chunk_ids[::2])
+
+    print(f"{nb_blocks:>7} blocks: get_local_chunk_ids {total / nb_lookups * 1e3:9.2f}ms")
+
+
+@click.command()
+@click.option("--blocks", "nb_blocks_list", multiple=True, type=int, default=[100, 1000, 10000])
+@click.option(
+    "--other-blocks",
+    "nb_other_blocks",
+    default=10000,
+    show_default=True,
+    help="Blocks from other files",
+)
+@click.option("--lookups", "nb_lookups", default=20, show_default=True, help="Lookups per measure")
+def main(nb_blocks_list: List[int], nb_other_blocks: int, nb_lookups: int) -> None:
+    for nb_blocks in nb_blocks_list:
+        trio.run(bench_one, nb_blocks, nb_other_blocks, nb_lookups)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#! /usr/bin/env python3
+# Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
+"""
+Micro-benchmark of the RAID5 blockstore parity computation and block reconstruction.
+
+Compares the Python integer XOR implementation with the numpy one (if
+available) across block sizes and numbers of nodes:
+
+    $ python tests/scripts/bench_raid5.py --block-size=4096 --block-size=524288 --nodes=3 --nodes=5
+"""
+from __future__ import annotations
+
+import os
+import click
+from timeit import timeit
+from unittest.mock import patch
+
+from parsec.backend import raid5_blockstore
+from parsec.backend.raid5_blockstore import (
+    split_block_in_chunks,
+    generate_checksum_chunk,
+    rebuild_block_from_chunks,
+)
+
+
+def bench_one(block: bytes, nb_nodes: int, number: int) -> tuple[float, float]:
+    nb_chunks = nb_nodes - 1
+
+    def _create() -> None:
+        chunks = split_block_in_chunks(block, nb_chunks)
+        generate_checksum_chunk(chunks)
+
+    chunks = split_block_in_chunks(block, nb_chunks)
+    checksum_chunk = generate_checksum_chunk(chunks)
+
+    def _degraded_read() -> None:
+        partial_chunks = [None, *chunks[1:]]
+        rebuild_block_from_chunks(partial_chunks, checksum_chunk)
+
+    create_time = timeit(_create, number=number) / number
+    degraded_read_time = timeit(_degraded_read, number=number) / number
+    return create_time, degraded_read_time
+
+
+@click.command()
+@click.option(
+    "--block-size", "block_sizes", multiple=True, type=int, default=[4096, 64 * 1024, 512 * 1024]
+)
+@click.option("--nodes", "nodes_counts", multiple=True, type=int, default=[3, 5, 9])
+@click.option("--number", default=50, show_default=True, help="Runs per measure")
+def main(block_sizes: list[int], nodes_counts: list[int], number: int) -> None:
+    implementations = {"int": raid5_blockstore._xor_buffers_with_int}
+    if raid5_blockstore.numpy is not None:
+        implementations["numpy"] = raid5_blockstore._xor_buffers_with_numpy
+    else:
+        print("numpy not available, only the integer implementation is benchmarked")
+
+    print(f"{'impl':<6} {'block size':>10} {'nodes':>5} {'create':>12} {'degraded read':>14}")
+    for block_size in block_sizes:
+        block = os.urandom(block_size)
+        for nb_nodes in nodes_counts:
+            for name, xor_buffers in implementations.items():
+                with patch.object(raid5_blockstore, "_xor_buffers", xor_buffers):
+                    create_time, degraded_read_time = bench_one(block, nb_nodes, number)
+                print(
+                    f"{name:<6} {block_size:>10} {nb_nodes:>5}"
+                    f" {create_time * 1e6:>10.1f}us {degraded_read_time * 1e6:>12.1f}us"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#! /usr/bin/env python3
+# Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
+"""
+Benchmark the S3 blockstore against any S3-compatible server.
+
+A local stand-in is enough, e.g. with MinIO:
+
+    $ docker run -p 9000:9000 -e MINIO_ROOT_USER=parsec -e MINIO_ROOT_PASSWORD=parsec123 \\
+        minio/minio server /data
+    $ python tests/scripts/bench_s3_blockstore.py --endpoint-url=http://127.0.0.1:9000 \\
+        --key=parsec --secret=parsec123 --bucket=parsec --concurrency=32
+
+Beside the read/create throughput, the script measures the event loop lag (i.e.
+the delay a ticker task sees while the requests are in progress), which should
+stay close to zero given S3 requests are never run on the event loop.
+"""
+from __future__ import annotations
+
+import os
+import click
+import trio
+import boto3
+from time import monotonic
+
+from parsec.api.protocol import OrganizationID, BlockID
+from parsec.backend.s3_blockstore import S3BlockStoreComponent
+
+
+ORGANIZATION_ID = OrganizationID("BenchOrg")
+
+
+async def _measure_loop_lag(results: list[float]) -> None:
+    period = 0.01
+    while True:
+        before = monotonic()
+        await trio.sleep(period)
+        results.append(monotonic() - before - period)
+
+
+async def bench(
+    blockstore: S3BlockStoreComponent, block_size: int, block_count: int, concurrency: int
+) -> None:
+    block_ids = [BlockID.new() for _ in range(block_count)]
+    block = os.urandom(block_size)
+    semaphore = trio.Semaphore(concurrency)
+
+    async def _create(block_id: BlockID) -> None:
+        async with semaphore:
+            await blockstore.create(ORGANIZATION_ID, block_id, block)
+
+    async def _read(block_id: BlockID) -> None:
+        async with semaphore:
+            assert await blockstore.read(ORGANIZATION_ID, block_id) == block
+
+    for name, step in (("create", _create), ("read", _read)):
+        lags: list[float] = []
+        async with trio.open_nursery() as nursery:
+            nursery.start_soon(_measure_loop_lag, lags)
+            before = monotonic()
+            async with trio.open_nursery() as step_nursery:
+                for block_id in block_ids:
+                    step_nursery.start_soon(step, block_id)
+            duration = monotonic() - before
+            nursery.cancel_scope.cancel()
+
+        throughput = block_count * block_size / duration / 1024 / 1024
+        print(
+            f"{name}: {block_count / duration:.1f} blocks/s ({throughput:.1f} MiB/s),"
+            f" max loop lag {max(lags, default=0) * 1000:.1f}ms"
+        )
+
+
+@click.command()
+@click.option("--endpoint-url", required=True)
+@click.option("--region", default="local", show_default=True)
+@click.option("--bucket", default="parsec", show_default=True)
+@click.option("--key", required=True)
+@click.option("--secret", required=True)
+@click.option("--block-size", default=512 * 1024, show_default=True)
+@click.option("--block-count", default=500, show_default=True)
+@click.option("--concurrency", default=16, show_default=True)
+@click.option("--timeout", default=30.0, show_default=True)
+def main(
+    endpoint_url: str,
+    region: str,
+    bucket: str,
+    key: str,
+    secret: str,
+    block_size: int,
+    block_count: int,
+    concurrency: int,
+    timeout: float,
+) -> None:
+    s3 = boto3.client(
+        "s3",
+        region_name=region,
+        aws_access_key_id=key,
+        aws_secret_access_key=secret,
+        endpoint_url=endpoint_url,
+    )
+    try:
+        s3.create_bucket(Bucket=bucket)
+    except s3.exceptions.BucketAlreadyOwnedByYou:
+        pass
+
+    blockstore = S3BlockStoreComponent(
+        region, bucket, key, secret, endpoint_url, max_concurrency=concurrency, timeout=timeout
+    )
+    trio.run(bench, blockstore, block_size, block_count, concurrency)
+
+
+if __name__ == "__main__":
+    main()
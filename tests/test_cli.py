@@ -8,6 +8,7 @@ from uuid import UUID
 import click
 from pathlib import Path
 from functools import partial
+from urllib.request import urlopen
 import oscrypto.asymmetric
 
 try:
@@ -15,6 +16,7 @@ try:
 except ModuleNotFoundError:  # Not available on Windows
     pass
 import sys
+import signal
 import subprocess
 from time import sleep
 from contextlib import contextmanager, asynccontextmanager
@@ -382,6 +384,78 @@ def test_migrate_backend(postgresql_url, unused_tcp_port):
         assert "100003_migration3.sql (already applied)" in result.output
 
 
+def test_run_backend_workers_not_available_with_mocked():
+    runner = CliRunner()
+    result = runner.invoke(cli, "backend run --db=MOCKED --blockstore=MOCKED --workers=2 --port=0")
+    assert result.exit_code == 2
+    assert "MOCKED database cannot be shared between workers" in result.output
+
+
+def test_run_backend_workers_not_available_with_disk_cache(tmp_path):
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        "backend run --db=postgresql://localhost/parsec --blockstore=POSTGRESQL"
+        f" --blockstore-cache-disk-dir={tmp_path} --blockstore-cache-disk-size=1024"
+        " --workers=2 --port=0",
+    )
+    assert result.exit_code == 2
+    assert "Blockstore disk cache cannot be shared between workers" in result.output
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Workers are not supported on Windows")
+def test_run_backend_workers_not_enough_db_connections():
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        "backend run --db=postgresql://localhost/parsec --blockstore=POSTGRESQL"
+        " --db-max-connections=7 --workers=4 --port=0",
+    )
+    assert result.exit_code == 2
+    assert "--db-max-connections must be at least 8" in result.output
+
+
+@pytest.mark.slow
+@pytest.mark.postgresql
+@pytest.mark.skipif(sys.platform == "win32", reason="Workers are not supported on Windows")
+def test_run_backend_with_workers(backend_store, unused_tcp_port):
+    with _running(
+        (
+            f"backend run --db={backend_store} --blockstore=POSTGRESQL --workers=2"
+            f" --port={unused_tcp_port} --log-level=INFO"
+        ),
+        wait_for="Starting Parsec Backend",
+    ) as bp:
+
+        def _wait_for_started_workers(count):
+            for _ in range(SUBPROCESS_TIMEOUT * 10):  # 10ms sleep steps
+                sleep(0.1)
+                pids = re.findall(r"Worker started.*pid=([0-9]+)", bp.live_stderr.read())
+                if len(pids) >= count:
+                    return [int(pid) for pid in pids]
+            else:
+                raise AssertionError("Too slow")
+
+        pids = _wait_for_started_workers(2)
+        assert len(set(pids)) == 2
+
+        # Both workers serve on the same port
+        for _ in range(4):
+            with urlopen(f"http://127.0.0.1:{unused_tcp_port}/", timeout=SUBPROCESS_TIMEOUT):
+                pass
+
+        # Crashed worker gets respawned
+        os.kill(pids[0], signal.SIGKILL)
+        bp.wait_for_regex(r"Worker has unexpectedly stopped", stderr=True)
+        respawned_pid = _wait_for_started_workers(3)[-1]
+        assert respawned_pid not in pids
+
+        # Graceful shutdown stops all the workers
+        bp.terminate()
+        bp.wait(timeout=SUBPROCESS_TIMEOUT)
+        assert bp.returncode == 0
+
+
 @pytest.fixture(params=(False, True), ids=("no_ssl", "ssl"))
 def ssl_conf(request):
     @attr.s
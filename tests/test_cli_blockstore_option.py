@@ -1,16 +1,19 @@
 # Parsec Cloud (https://parsec.cloud) Copyright (c) AGPL-3.0 2016-present Scille SAS
 from __future__ import annotations
 
+import click
 import pytest
 from click import BadParameter
+from click.testing import CliRunner
 
-from parsec.backend.cli.utils import _parse_blockstore_params
+from parsec.backend.cli.utils import _parse_blockstore_params, blockstore_backend_options
 from parsec.backend.config import (
     MockedBlockStoreConfig,
     PostgreSQLBlockStoreConfig,
     S3BlockStoreConfig,
     SWIFTBlockStoreConfig,
     RAID0BlockStoreConfig,
+    RAID1BlockStoreConfig,
 )
 
 
@@ -59,6 +62,25 @@ def test_parse_s3_with_custom_url_scheme():
     )
 
 
+def test_parse_s3_with_options():
+    config = _parse_blockstore_params(
+        ["s3:s3.example.com:region1:bucketA:key123:S3cr3t:max_concurrency=64:timeout=2.5"]
+    )
+    assert config == S3BlockStoreConfig(
+        s3_endpoint_url="https://s3.example.com",
+        s3_region="region1",
+        s3_bucket="bucketA",
+        s3_key="key123",
+        s3_secret="S3cr3t",
+        s3_max_concurrency=64,
+        s3_timeout=2.5,
+    )
+
+    # Empty timeout means no timeout
+    config = _parse_blockstore_params(["s3::region1:bucketA:key123:S3cr3t:timeout="])
+    assert config.s3_timeout is None
+
+
 def test_parse_swift():
     config = _parse_blockstore_params(["swift:swift.example.com:tenant2:containerB:user123:S3cr3t"])
     assert config == SWIFTBlockStoreConfig(
@@ -114,12 +136,77 @@ def test_parse_simple_raid():
     )
 
 
+def test_parse_rendezvous_raid0():
+    config = _parse_blockstore_params(["raid0_rendezvous:0:MOCKED", "raid0_rendezvous:1:MOCKED"])
+    assert config == RAID0BlockStoreConfig(
+        blockstores=[MockedBlockStoreConfig(), MockedBlockStoreConfig()], rendezvous_hashing=True
+    )
+
+
+def test_parse_hedged_raid1():
+    config = _parse_blockstore_params(["raid1_hedged:0:MOCKED", "raid1_hedged:1:MOCKED"])
+    assert config == RAID1BlockStoreConfig(
+        blockstores=[MockedBlockStoreConfig(), MockedBlockStoreConfig()], hedged_read=True
+    )
+
+
+def _invoke_with_blockstore_options(args):
+    configs = []
+
+    @click.command()
+    @blockstore_backend_options
+    def cli(blockstore):
+        configs.append(blockstore)
+
+    result = CliRunner().invoke(cli, args)
+    return result, configs
+
+
+def test_hedged_read_options():
+    blockstores = ["--blockstore=raid1_hedged:0:MOCKED", "--blockstore=raid1_hedged:1:MOCKED"]
+    result, configs = _invoke_with_blockstore_options(blockstores)
+    assert result.exit_code == 0, result.output
+    assert configs == [
+        RAID1BlockStoreConfig(
+            blockstores=[MockedBlockStoreConfig(), MockedBlockStoreConfig()], hedged_read=True
+        )
+    ]
+
+    result, configs = _invoke_with_blockstore_options(
+        [
+            *blockstores,
+            "--blockstore-hedged-read-delay=0.5",
+            "--blockstore-hedged-read-percentile=99",
+        ]
+    )
+    assert result.exit_code == 0, result.output
+    assert configs == [
+        RAID1BlockStoreConfig(
+            blockstores=[MockedBlockStoreConfig(), MockedBlockStoreConfig()],
+            hedged_read=True,
+            hedged_read_delay=0.5,
+            hedged_read_percentile=99,
+        )
+    ]
+
+    # Only available for hedged RAID1
+    for blockstores in (["--blockstore=raid1:0:MOCKED"], ["--blockstore=MOCKED"]):
+        result, configs = _invoke_with_blockstore_options(
+            [*blockstores, "--blockstore-hedged-read-delay=0.5"]
+        )
+        assert result.exit_code == 2
+        assert not configs
+
+
 @pytest.mark.parametrize(
     "param",
     [
         "foo",  # Unknown type
         "s3:",  # Too few parts
         "s3:s3.example.com:region1:bucketA:key123:S3cr3t:dummy",  # Too much parts
+        "s3:s3.example.com:region1:bucketA:key123:S3cr3t:dummy=1",  # Unknown option
+        "s3:s3.example.com:region1:bucketA:key123:S3cr3t:max_concurrency=0",  # Bad option value
+        "s3:s3.example.com:region1:bucketA:key123:S3cr3t:timeout=foo",  # Bad option value
     ],
 )
 def test_bad_single_param(param):